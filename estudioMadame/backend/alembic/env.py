@@ -0,0 +1,88 @@
+"""
+Alembic migration environment.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from app.core.config import settings
+from app.core.database import Base
+from app.core.search import is_search_table
+
+# Import all models to ensure they are registered with Base.metadata
+from app.models.user import User  # noqa: F401
+from app.models.client import Client  # noqa: F401
+from app.models.gallery import Gallery  # noqa: F401
+from app.models.photo import Photo  # noqa: F401
+from app.models.approval import Approval  # noqa: F401
+from app.models.google_drive_integration import GoogleDriveIntegration  # noqa: F401
+from app.models.sync_job import SyncJob  # noqa: F401
+from app.models.job import Job  # noqa: F401
+
+config = context.config
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_name(name, type_, parent_names) -> bool:
+    """
+    Leave the full-text search tables and indexes out of autogenerate.
+
+    They are managed by app.core.search, not declared on the models.
+    """
+    if type_ == "table":
+        return not is_search_table(name)
+    if type_ == "index":
+        return not (name or "").endswith("_search")
+    return True
+
+
+def run_migrations_offline() -> None:
+    """
+    Run migrations in 'offline' mode (emit SQL without a connection).
+    """
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+        include_name=include_name,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """
+    Run migrations against a live database connection.
+    """
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite needs batch mode to alter tables
+            render_as_batch=True,
+            include_name=include_name,
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,60 @@
+"""gallery photo counters
+
+Adds denormalized photo_count, selected_count and total_bytes columns to
+galleries and backfills them from the photos table.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("galleries") as batch_op:
+        batch_op.add_column(
+            sa.Column("photo_count", sa.Integer(), server_default="0", nullable=False)
+        )
+        batch_op.add_column(
+            sa.Column("selected_count", sa.Integer(), server_default="0", nullable=False)
+        )
+        batch_op.add_column(
+            sa.Column("total_bytes", sa.BigInteger(), server_default="0", nullable=False)
+        )
+        batch_op.create_index("ix_galleries_photo_count", ["photo_count"])
+
+    # Backfill from the photos table
+    op.execute(
+        """
+        UPDATE galleries SET
+            photo_count = (
+                SELECT count(*) FROM photos WHERE photos.gallery_id = galleries.id
+            ),
+            selected_count = (
+                SELECT count(*) FROM photos
+                WHERE photos.gallery_id = galleries.id AND photos.selected_by_client
+            ),
+            total_bytes = (
+                SELECT coalesce(sum(photos.file_size), 0) FROM photos
+                WHERE photos.gallery_id = galleries.id
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("galleries") as batch_op:
+        batch_op.drop_index("ix_galleries_photo_count")
+        batch_op.drop_column("total_bytes")
+        batch_op.drop_column("selected_count")
+        batch_op.drop_column("photo_count")
@@ -0,0 +1,43 @@
+"""access path indexes
+
+Adds indexes matching the filters and sort orders used by the services:
+photo listing and selection within a gallery, gallery status tabs and
+per-client listings, approval listings and client listing.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 11:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("ix_photos_gallery_id_selected_by_client", "photos", ["gallery_id", "selected_by_client"]),
+    ("ix_photos_gallery_id_file_name_id", "photos", ["gallery_id", "file_name", "id"]),
+    ("ix_galleries_status_date_created", "galleries", ["status", "date_created", "id"]),
+    ("ix_galleries_client_id_date_created", "galleries", ["client_id", "date_created", "id"]),
+    ("ix_galleries_date_created_id", "galleries", ["date_created", "id"]),
+    ("ix_approvals_client_id_updated_at", "approvals", ["client_id", "updated_at", "id"]),
+    ("ix_approvals_gallery_id", "approvals", ["gallery_id"]),
+    ("ix_approvals_updated_at_id", "approvals", ["updated_at", "id"]),
+    ("ix_clients_created_at_id", "clients", ["created_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
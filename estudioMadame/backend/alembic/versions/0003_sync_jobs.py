@@ -0,0 +1,51 @@
+"""sync jobs
+
+Adds the sync_jobs table tracking Google Drive folder sync runs and their
+progress.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 13:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sync_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("gallery_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("galleries.id"), nullable=False),
+        sa.Column("requested_by", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column(
+            "status",
+            sa.Enum("running", "completed", "failed", name="sync_job_status"),
+            nullable=False
+        ),
+        sa.Column("files_seen", sa.Integer(), nullable=False),
+        sa.Column("photos_added", sa.Integer(), nullable=False),
+        sa.Column("photos_updated", sa.Integer(), nullable=False),
+        sa.Column("photos_removed", sa.Integer(), nullable=False),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index(
+        "ix_sync_jobs_gallery_id_started_at", "sync_jobs", ["gallery_id", "started_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sync_jobs_gallery_id_started_at", table_name="sync_jobs")
+    op.drop_table("sync_jobs")
+    sa.Enum(name="sync_job_status").drop(op.get_bind(), checkfirst=True)
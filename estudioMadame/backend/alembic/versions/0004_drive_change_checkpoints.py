@@ -0,0 +1,45 @@
+"""drive change checkpoints
+
+Stores a Google Drive changes feed checkpoint per gallery and the mode
+(full or incremental) of each sync job.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 15:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+sync_job_mode = sa.Enum("full", "incremental", name="sync_job_mode")
+
+
+def upgrade() -> None:
+    sync_job_mode.create(op.get_bind(), checkfirst=True)
+
+    with op.batch_alter_table("galleries") as batch_op:
+        batch_op.add_column(sa.Column("google_drive_change_token", sa.String(), nullable=True))
+
+    with op.batch_alter_table("sync_jobs") as batch_op:
+        batch_op.add_column(
+            sa.Column("mode", sync_job_mode, server_default="full", nullable=False)
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("sync_jobs") as batch_op:
+        batch_op.drop_column("mode")
+
+    with op.batch_alter_table("galleries") as batch_op:
+        batch_op.drop_column("google_drive_change_token")
+
+    sync_job_mode.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,32 @@
+"""gallery photo version
+
+Adds a per-gallery counter bumped on every write to the gallery's photos;
+public gallery ETags are derived from it.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 18:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("galleries") as batch_op:
+        batch_op.add_column(
+            sa.Column("photo_version", sa.Integer(), server_default="0", nullable=False)
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("galleries") as batch_op:
+        batch_op.drop_column("photo_version")
@@ -0,0 +1,30 @@
+"""full text search
+
+Adds the full-text search indexes on galleries, clients and approvals:
+FTS5 tables with sync triggers on SQLite, GIN expression indexes on
+PostgreSQL (see app.core.search).
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 20:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.search import create_search_indexes, drop_search_indexes
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_search_indexes(op.get_bind())
+
+
+def downgrade() -> None:
+    drop_search_indexes(op.get_bind())
@@ -0,0 +1,30 @@
+"""sync job heartbeat
+
+Adds sync_jobs.heartbeat_at, bumped with every committed page, so a job
+whose worker died can be detected and taken over.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 10:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("sync_jobs") as batch_op:
+        batch_op.add_column(sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("sync_jobs") as batch_op:
+        batch_op.drop_column("heartbeat_at")
@@ -0,0 +1,63 @@
+"""search keyed on id
+
+Recreates the SQLite FTS5 search tables with the row's primary key as an
+unindexed id column. The 0006 tables were external-content tables mapped
+back by rowid, which VACUUM may renumber on the UUID-keyed tables.
+PostgreSQL indexes are unchanged.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 12:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.search import SEARCH_COLUMNS, create_search_indexes, drop_search_indexes, fts_table_name
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    drop_search_indexes(bind)
+    create_search_indexes(bind)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    drop_search_indexes(bind)
+    # The 0006 layout: external-content tables synced by rowid
+    for table_name, columns in SEARCH_COLUMNS.items():
+        fts = fts_table_name(table_name)
+        names = ", ".join(columns)
+        new_values = ", ".join(f"new.{name}" for name in columns)
+        old_values = ", ".join(f"old.{name}" for name in columns)
+        op.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5("
+            f"{names}, content='{table_name}', content_rowid='rowid', "
+            f"tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        op.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+            f"INSERT INTO {fts}(rowid, {names}) VALUES (new.rowid, {new_values}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.rowid, {old_values}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {names} ON {table_name} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.rowid, {old_values}); "
+            f"INSERT INTO {fts}(rowid, {names}) VALUES (new.rowid, {new_values}); END"
+        )
@@ -0,0 +1,62 @@
+"""search keys table
+
+Recreates the SQLite FTS5 search tables with an integer rowid taken from a
+<table>_fts_keys table, which maps each row's primary key to it. The 0009
+tables kept the primary key in an unindexed column, so the sync triggers
+scanned the whole FTS table on every delete and indexed update.
+PostgreSQL indexes are unchanged.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-20 12:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.search import SEARCH_COLUMNS, create_search_indexes, drop_search_indexes, fts_table_name
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    drop_search_indexes(bind)
+    create_search_indexes(bind)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    drop_search_indexes(bind)
+    # The 0009 layout: the primary key in an unindexed id column
+    for table_name, columns in SEARCH_COLUMNS.items():
+        fts = fts_table_name(table_name)
+        names = ", ".join(columns)
+        new_values = ", ".join(f"new.{name}" for name in columns)
+        op.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5("
+            f"id UNINDEXED, {names}, tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(f"INSERT INTO {fts}(id, {names}) SELECT id, {names} FROM {table_name}")
+        op.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+            f"INSERT INTO {fts}(id, {names}) VALUES (new.id, {new_values}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+            f"DELETE FROM {fts} WHERE id = old.id; END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE OF id, {names} ON {table_name} BEGIN "
+            f"DELETE FROM {fts} WHERE id = old.id; "
+            f"INSERT INTO {fts}(id, {names}) VALUES (new.id, {new_values}); END"
+        )
@@ -1,33 +1,63 @@
 """
 API Dependencies.
 """
-from typing import Generator, Union
+import hashlib
+import secrets
+import time
+from typing import Generator, Optional, Type, TypeVar, Union
 from uuid import UUID
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, make_transient_to_detached
 
+from app.core.cache import TTLCache, invalidate_on_commit
 from app.core.config import settings
 from app.core.database import get_db
 from app.models.user import User
 from app.models.client import Client
+from app.models.gallery import Gallery
+from app.models.photo import Photo
+from app.services.derivatives import DerivativePool, derivative_pool
+from app.services.jobs import JobRunner, job_runner
+from app.services.sync import SyncDispatcher, sync_dispatcher
 
 # Use HTTPBearer for standard Bearer token extraction
 # auto_error=False allows us to handle missing tokens with a 401 instead of 403
 security = HTTPBearer(auto_error=False)
 
+# Validated token payloads, keyed by token hash; entries never outlive the token
+token_cache = TTLCache(
+    "auth_tokens", ttl=settings.AUTH_CACHE_TTL_SECONDS, maxsize=settings.AUTH_CACHE_MAXSIZE
+)
+# Detached snapshots of authenticated users and clients, keyed by (model, id)
+principal_cache = TTLCache(
+    "auth_principals", ttl=settings.AUTH_CACHE_TTL_SECONDS, maxsize=settings.AUTH_CACHE_MAXSIZE
+)
+invalidate_on_commit(principal_cache, User, Client)
+
+Principal = TypeVar("Principal", User, Client)
+
 
 def get_token_payload(token: str) -> dict:
     """
     Decode and validate JWT token string.
+
+    Valid payloads are cached by token hash until the token expires (or for
+    AUTH_CACHE_TTL_SECONDS, whichever comes first), so repeated requests with
+    the same token skip the signature check.
     """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(
             token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
         )
-        return payload
     except (JWTError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -35,6 +65,50 @@ def get_token_payload(token: str) -> dict:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    ttl = settings.AUTH_CACHE_TTL_SECONDS
+    if isinstance(payload.get("exp"), (int, float)):
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        token_cache.set(key, payload, ttl)
+    return payload
+
+
+def get_principal(db: Session, model: Type[Principal], principal_id: UUID) -> Optional[Principal]:
+    """
+    Load an authenticated user or client through the principal cache.
+
+    Cache hits are merged into the session without a query, so the caller
+    gets an instance attached to db as with db.get. The cache is cleared
+    whenever a transaction writing users or clients commits.
+
+    Args:
+        db: Database session of the request
+        model: User or Client
+        principal_id: ID from the token subject
+
+    Returns:
+        The user or client, None if it does not exist
+    """
+    key = (model.__name__, principal_id)
+    cached = principal_cache.get(key)
+    if cached is not None:
+        return db.merge(cached, load=False)
+
+    principal = db.get(model, principal_id)
+    if principal is not None and settings.AUTH_CACHE_TTL_SECONDS > 0:
+        principal_cache.set(key, _snapshot(principal))
+    return principal
+
+
+def _snapshot(principal: Principal) -> Principal:
+    """Copy the column values of a loaded instance into a detached one."""
+    mapper = type(principal).__mapper__
+    snapshot = type(principal)(**{
+        attr.key: getattr(principal, attr.key) for attr in mapper.column_attrs
+    })
+    make_transient_to_detached(snapshot)
+    return snapshot
+
 
 def get_current_user(
     db: Session = Depends(get_db),
@@ -83,12 +157,26 @@ def get_current_user(
             detail="Invalid user ID format",
         )
 
-    user = db.get(User, user_uuid)
+    user = get_principal(db, User, user_uuid)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
+def get_current_admin(
+    current_user: User = Depends(get_current_user)
+) -> User:
+    """
+    Get the current authenticated user, if an admin.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this resource",
+        )
+    return current_user
+
+
 def get_current_client(
     db: Session = Depends(get_db),
     token_creds: HTTPAuthorizationCredentials | None = Depends(security)
@@ -136,7 +224,7 @@ def get_current_client(
             detail="Invalid client ID format",
         )
 
-    client = db.get(Client, client_uuid)
+    client = get_principal(db, Client, client_uuid)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     return client
@@ -185,13 +273,71 @@ def get_current_user_or_client(
         )
 
     if role == "client":
-        client = db.get(Client, entity_uuid)
+        client = get_principal(db, Client, entity_uuid)
         if not client:
             raise HTTPException(status_code=404, detail="Client not found")
         return client
     else:
         # User (Admin or Photographer)
-        user = db.get(User, entity_uuid)
+        user = get_principal(db, User, entity_uuid)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         return user
+
+
+def get_viewable_photo(
+    id: UUID,
+    access_token: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    token_creds: HTTPAuthorizationCredentials | None = Depends(security)
+) -> Photo:
+    """
+    Get a photo the caller may view.
+
+    The gallery access token in the query string (usable from <img> tags)
+    is checked first. When it is missing or does not match, the bearer
+    token is tried: any logged-in user, or the gallery's client.
+
+    Raises:
+        HTTPException: 404 if the photo does not exist, 403 if neither
+            token grants access
+    """
+    row = db.execute(
+        select(Photo, Gallery.access_token, Gallery.client_id)
+        .join(Gallery, Photo.gallery_id == Gallery.id)
+        .where(Photo.id == id)
+    ).one_or_none()
+    if not row:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    photo, gallery_access_token, gallery_client_id = row
+
+    if access_token and gallery_access_token and secrets.compare_digest(
+        gallery_access_token.encode(), access_token.encode()
+    ):
+        return photo
+    if token_creds:
+        entity = get_current_user_or_client(db, token_creds)
+        if isinstance(entity, User) or entity.id == gallery_client_id:
+            return photo
+    raise HTTPException(status_code=403, detail="Not allowed to view this photo")
+
+
+def get_sync_dispatcher() -> SyncDispatcher:
+    """
+    Get the dispatcher that runs Drive sync jobs in the background.
+    """
+    return sync_dispatcher
+
+
+def get_derivative_pool() -> DerivativePool:
+    """
+    Get the pool that renders photo derivatives (thumbnails).
+    """
+    return derivative_pool
+
+
+def get_job_runner() -> JobRunner:
+    """
+    Get the runner that picks up background jobs.
+    """
+    return job_runner
@@ -9,6 +9,7 @@
 from sqlalchemy import select
 
 from app.core.database import get_db
+from app.core.serialization import envelope_response
 from app.api import deps
 from app.models.approval import Approval
 from app.models.gallery import Gallery
@@ -17,6 +18,7 @@
 from app.schemas.approval import Approval as ApprovalSchema, ApprovalSubmitRequest, ApprovalSubmitResponse
 from app.schemas.common import PaginationMeta
 from app.services.approval import ApprovalService
+from app.services.jobs import JobRunner
 
 router = APIRouter(tags=["Approvals"])
 
@@ -27,6 +29,9 @@ def list_approvals(
     limit: int = Query(20, ge=1, le=100),
     status: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from meta.next_cursor"),
+    include_total: bool = Query(True, description="Skip the total count when false"),
+    live_counts: bool = Query(False, description="Current selection counts instead of the submitted ones"),
     db: Session = Depends(get_db),
     current_entity: Union[User, Client] = Depends(deps.get_current_user_or_client)
 ):
@@ -34,50 +39,33 @@ def list_approvals(
     List approvals. Filter by client if the entity is a client.
     """
     approval_service = ApprovalService(db)
-    
-    # If client, force filter by their client_id
+
+    # Clients only see their own approvals
     client_id_filter = None
     if isinstance(current_entity, Client):
         client_id_filter = current_entity.id
 
-    # We need to update list_approvals in service or handle it here
-    # For now, let's assume the service handles client_id or we filter the query
-    # Looking at approvalService.py, it doesn't have client_id in list_approvals yet.
-    # I should update the service first.
-    
-    approvals, total = approval_service.list_approvals(
-        page=page,
-        limit=limit,
-        status=status,
-        search=search,
-        client_id=client_id_filter
-    )
-
-    total_pages = (total + limit - 1) // limit
-    
-    # We need to include client_avatar, which is not in the model
-    # For listing, we can either join or fetch per item (join is better)
-    # For now, let's use the service's get_with_metadata logic or similar
-    data = []
-    for app in approvals:
-        metadata = approval_service.get_with_metadata(app.id)
-        if metadata:
-            data.append(ApprovalSchema.model_validate(metadata))
-
-    return {
-        "data": data,
-        "meta": PaginationMeta(
+    try:
+        approvals, total, next_cursor = approval_service.list_with_metadata(
             page=page,
             limit=limit,
-            total=total,
-            total_pages=total_pages
-        ).model_dump()
-    }
+            status=status,
+            search=search,
+            client_id=client_id_filter,
+            cursor=cursor,
+            include_total=include_total,
+            live_counts=live_counts
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return envelope_response(ApprovalSchema, approvals, PaginationMeta.build(page, limit, total, next_cursor))
 
 
 @router.get("/api/v1/approvals/{id}", response_model=dict)
 def get_approval(
     id: UUID,
+    live_counts: bool = Query(False, description="Current selection counts instead of the submitted ones"),
     db: Session = Depends(get_db),
     current_entity: Union[User, Client] = Depends(deps.get_current_user_or_client)
 ):
@@ -85,7 +73,7 @@ def get_approval(
     Get approval details.
     """
     approval_service = ApprovalService(db)
-    data = approval_service.get_with_metadata(id)
+    data = approval_service.get_with_metadata(id, live_counts=live_counts)
     
     if not data:
         raise HTTPException(status_code=404, detail="Approval not found")
@@ -104,7 +92,8 @@ def get_approval(
 def submit_approval(
     id: UUID,
     request: ApprovalSubmitRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    job_runner: JobRunner = Depends(deps.get_job_runner)
 ):
     """
     Client submeter aprovação (enviar seleção).
@@ -126,6 +115,7 @@ def submit_approval(
         raise HTTPException(status_code=403, detail="Invalid access token")
 
     updated_approval = approval_service.submit_approval(id)
+    job_runner.notify()
     
     return {
         "data": ApprovalSubmitResponse(
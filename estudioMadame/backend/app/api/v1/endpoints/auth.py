@@ -10,9 +10,10 @@
 from fastapi.responses import JSONResponse
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.core.config import settings
 from app.models.user import User as UserModel
 from app.models.client import Client as ClientModel
@@ -35,6 +36,8 @@
     Gallery as GallerySchema
 )
 from app.services.auth import AuthService
+from app.services.client import AsyncClientService
+from app.services.gallery import GalleryService
 from app.api import deps
 
 router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
@@ -43,13 +46,16 @@
 @router.post("/login", response_model=dict)
 async def login(
     request: LoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     User Login endpoint.
+
+    Runs on the async session and the password check on the password pool,
+    so a login burst holds neither the event loop nor the request threadpool.
     """
     auth_service = AuthService(db)
-    user = auth_service.authenticate_user(request.email, request.password)
+    user = await auth_service.authenticate_user(request.email, request.password)
     if user is None:
         return JSONResponse(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -72,13 +78,15 @@ async def login(
 @router.post("/client/login", response_model=dict)
 async def client_login(
     request: ClientLoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Client Login endpoint.
+
+    Runs on the async session and the password pool, like login.
     """
     auth_service = AuthService(db)
-    client = auth_service.authenticate_client(request.email, request.password)
+    client = await auth_service.authenticate_client(request.email, request.password)
     if client is None:
         return JSONResponse(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -90,9 +98,9 @@ async def client_login(
     expires_in = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
     
     client_data = ClientSchema.model_validate(client)
-    client_data.galleries_count = 0 
-    client_data.last_activity = None
-    
+    stats = await AsyncClientService(db).gallery_stats(client.id)
+    client_data = client_data.model_copy(update=stats)
+
     return {"data": ClientLoginResponse(
         client=client_data,
         access_token=access_token,
@@ -121,7 +129,7 @@ async def logout(
 
 
 @router.post("/gallery-access", response_model=dict)
-async def gallery_access(
+def gallery_access(
     request: GalleryAccessTokenRequest,
     db: Session = Depends(get_db),
     current_entity: Union[UserModel, ClientModel] = Depends(deps.get_current_user_or_client)
@@ -165,7 +173,7 @@ async def gallery_access(
 
 
 @router.post("/verify-gallery-access", response_model=dict)
-async def verify_gallery_access(
+def verify_gallery_access(
     request: dict,
     db: Session = Depends(get_db)
 ):
@@ -183,23 +191,12 @@ async def verify_gallery_access(
     except ValueError:
         raise HTTPException(status_code=422, detail="Invalid gallery ID format")
 
-    stmt = select(Gallery).where(
-        Gallery.id == gallery_id,
-        Gallery.access_token == token
-    )
-    gallery = db.execute(stmt).scalar_one_or_none()
+    # Load the gallery already enriched to satisfy GallerySchema
+    gallery = GalleryService(db).get_with_details(gallery_id)
     
-    if not gallery:
+    if not gallery or gallery.access_token != token:
         raise HTTPException(status_code=403, detail="Invalid token")
         
-    # Enrich to satisfy GallerySchema
-    client = db.get(ClientModel, gallery.client_id)
-    gallery.client_name = client.name if client else "Unknown"
-    
-    from app.services.gallery import GalleryService
-    gallery_service = GalleryService(db)
-    gallery.photo_count = gallery_service.get_photo_count(gallery.id)
-        
     return {
         "data": {
             "valid": True,
@@ -211,7 +208,7 @@ async def verify_gallery_access(
 @router.post("/refresh", response_model=dict)
 async def refresh_token(
     request: RefreshTokenRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Refresh token endpoint.
@@ -261,7 +258,7 @@ async def refresh_token(
     else:
         stmt = select(UserModel).where(UserModel.id == user_uuid)
         
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     entity = result.scalars().first()
 
     if entity is None:
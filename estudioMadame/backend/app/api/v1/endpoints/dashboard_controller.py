@@ -8,7 +8,7 @@
 
 from app.core.database import get_db
 from app.api import deps
-from app.services.dashboard import DashboardService
+from app.services.dashboard import DashboardService, dashboard_cache
 
 router = APIRouter(prefix="/api/v1/dashboard", tags=["Dashboard"])
 
@@ -45,3 +45,15 @@ def get_recent_galleries(
     return {
         "data": galleries
     }
+
+
+@router.get("/cache-stats", response_model=dict)
+def get_cache_stats(
+    current_user: deps.User = Depends(deps.get_current_user)
+):
+    """
+    Obter contadores de acertos/falhas do cache do dashboard.
+    """
+    return {
+        "data": dashboard_cache.stats()
+    }
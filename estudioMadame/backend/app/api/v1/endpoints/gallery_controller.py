@@ -1,16 +1,21 @@
 """
 Gallery controller.
 """
+import secrets
 from uuid import UUID
-from typing import Any, Union
+from typing import Union
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.http_cache import etag_matches, json_response, make_etag, not_modified
+from app.core.serialization import envelope_response
 from app.api import deps
 from app.services.gallery import GalleryService
 from app.services.client import ClientService
+from app.services.public_gallery import PublicGalleryService
+from app.services.sync import SyncDispatcher, SyncService
 from app.models.user import User
 from app.models.client import Client
 from app.schemas.gallery import (
@@ -28,27 +33,6 @@
 router = APIRouter(prefix="/api/v1/galleries", tags=["Galleries"])
 
 
-def _enrich_gallery(gallery: Any, db: Session) -> Any:
-    """
-    Helper to add computed fields (client_name, photo_count) to gallery model.
-    Pydantic from_attributes will use these if they are set as attributes on the object.
-    """
-    # Check if client is loaded
-    if not hasattr(gallery, "client") or gallery.client is None:
-         # Load client if not eager loaded (though list_galleries joins it, get_by_id might not)
-         client = db.get(Client, gallery.client_id)
-         gallery.client_name = client.name if client else "Unknown"
-    else:
-        gallery.client_name = gallery.client.name
-
-    # Get photo count
-    # Ideally this should be optimized with a query, but for now specific service call
-    service = GalleryService(db)
-    gallery.photo_count = service.get_photo_count(gallery.id)
-    
-    return gallery
-
-
 @router.get("", response_model=dict)
 def list_galleries(
     page: int = Query(1, ge=1),
@@ -58,6 +42,8 @@ def list_galleries(
     search: str | None = None,
     sort_by: str = "date_created",
     order: str = "desc",
+    cursor: str | None = Query(None, description="Opaque cursor from meta.next_cursor"),
+    include_total: bool = Query(True, description="Skip the total count when false"),
     db: Session = Depends(get_db),
     current_user: User = Depends(deps.get_current_user)
 ):
@@ -65,27 +51,23 @@ def list_galleries(
     List all galleries with filtering and pagination.
     """
     service = GalleryService(db)
-    galleries, total = service.list_galleries(
-        page=page,
-        limit=limit,
-        status=status.value if status else None,
-        client_id=client_id,
-        search=search,
-        sort_by=sort_by,
-        order=order
-    )
-    
-    # Enrich and convert to schema
-    data = [GallerySchema.model_validate(_enrich_gallery(g, db)) for g in galleries]
-    
-    meta = PaginationMeta(
-        page=page,
-        limit=limit,
-        total=total,
-        total_pages=(total + limit - 1) // limit
-    )
+    try:
+        galleries, total, next_cursor = service.list_galleries(
+            page=page,
+            limit=limit,
+            status=status.value if status else None,
+            client_id=client_id,
+            search=search,
+            sort_by=sort_by,
+            order=order,
+            cursor=cursor,
+            include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return {"data": data, "meta": meta}
+    # Galleries come back enriched with client_name and photo_count
+    return envelope_response(GallerySchema, galleries, PaginationMeta.build(page, limit, total, next_cursor))
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=dict)
@@ -111,8 +93,9 @@ def create_gallery(
         data["settings"] = request.settings.model_dump()
         
     gallery = service.create(data)
+    gallery = service.get_with_details(gallery.id)
     
-    return {"data": GallerySchema.model_validate(_enrich_gallery(gallery, db))}
+    return {"data": GallerySchema.model_validate(gallery)}
 
 
 @router.get("/{id}", response_model=dict)
@@ -138,8 +121,7 @@ def get_gallery(
         if gallery.client_id != current_entity.id:
              raise HTTPException(status_code=403, detail="Not authorized to access this gallery")
 
-    enriched = _enrich_gallery(gallery, db)
-    response_data = GallerySchema.model_validate(enriched).model_dump()
+    response_data = GallerySchema.model_validate(gallery).model_dump()
     
     # Attach client details
     client_service = ClientService(db)
@@ -185,15 +167,14 @@ def update_gallery(
     if request.settings:
         data["settings"] = request.settings.model_dump()
         
-    gallery = service.update(id, data)
-    
-    if not gallery:
+    if not service.update(id, data):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Gallery not found"
         )
-        
-    return {"data": GallerySchema.model_validate(_enrich_gallery(gallery, db))}
+
+    gallery = service.get_with_details(id)
+    return {"data": GallerySchema.model_validate(gallery)}
 
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -223,34 +204,31 @@ def bulk_action(
     Perform bulk actions on galleries.
     """
     service = GalleryService(db)
-    success_count = 0
-    failed_count = 0
     errors = []
     
-    for gallery_id in request.gallery_ids:
+    if request.action == "delete":
+        affected = service.bulk_delete(request.gallery_ids)
+        error = "Not found"
+    elif request.action == "change_status":
+        new_status = request.params.get("status") if request.params else None
+        error = "Update failed"
         try:
-            if request.action == "delete":
-                if service.delete(gallery_id):
-                    success_count += 1
-                else:
-                    failed_count += 1
-                    errors.append({"id": str(gallery_id), "error": "Not found"})
-            elif request.action == "change_status":
-                new_status = request.params.get("status") if request.params else None
-                if new_status and service.update(gallery_id, {"status": new_status}):
-                    success_count += 1
-                else:
-                    failed_count += 1
-                    errors.append({"id": str(gallery_id), "error": "Update failed"})
-            else:
-                 # Other actions not implemented
-                 failed_count += 1
-                 errors.append({"id": str(gallery_id), "error": "Action not supported"})
-                 
-        except Exception as e:
-            failed_count += 1
-            errors.append({"id": str(gallery_id), "error": str(e)})
-            
+            affected = service.bulk_update_status(request.gallery_ids, new_status)
+        except ValueError:
+            affected = set()
+    else:
+        # Other actions not implemented
+        affected = set()
+        error = "Action not supported"
+
+    # Per-id outcome from the rows the set-based statement touched
+    for gallery_id in request.gallery_ids:
+        if gallery_id not in affected:
+            errors.append({"id": str(gallery_id), "error": error})
+
+    success_count = len(request.gallery_ids) - len(errors)
+    failed_count = len(errors)
+
     return {
         "data": {
             "success_count": success_count,
@@ -264,10 +242,14 @@ def bulk_action(
 def sync_gallery(
     id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: User = Depends(deps.get_current_user),
+    full: bool = Query(False, description="Re-list the whole folder instead of applying changes"),
+    dispatcher: SyncDispatcher = Depends(deps.get_sync_dispatcher)
 ):
     """
     Sync gallery with Google Drive.
+    Queues a background sync job, or returns the one already running.
+    Galleries synced before only apply the Drive changes since their last sync.
     """
     service = GalleryService(db)
     gallery = service.get_by_id(id)
@@ -277,18 +259,19 @@ def sync_gallery(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Gallery not found"
         )
-        
-    # Stub implementation - triggering sync would be async task
-    from datetime import datetime
-    import uuid
-    
-    # In real impl, check if already syncing, etc.
-    
-    response = SyncJobResponse(
-        sync_job_id=uuid.uuid4(),
-        status="running",
-        started_at=datetime.utcnow()
+
+    if not gallery.google_drive_folder_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Gallery is not linked to a Google Drive folder"
+        )
+
+    job, created = SyncService(db).start_sync(
+        gallery, requested_by=current_user.id, full=full
     )
+    response = SyncJobResponse.model_validate(job)
+    if created:
+        dispatcher.submit(job.id)
     
     return {"data": response.model_dump()}
 
@@ -300,7 +283,7 @@ def get_sync_status(
     current_user: User = Depends(deps.get_current_user)
 ):
     """
-    Get gallery sync status.
+    Get gallery sync status and the progress of its latest sync job.
     """
     service = GalleryService(db)
     gallery = service.get_by_id(id)
@@ -310,16 +293,12 @@ def get_sync_status(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Gallery not found"
         )
-        
-    from datetime import datetime
-    import uuid
-    
-    # Returning SyncJobResponse for now as fallback
-    response = SyncJobResponse(
-        sync_job_id=uuid.uuid4(),
-        status="idle", # or gallery.sync_status
-        started_at=datetime.utcnow()
-    )
+
+    job = SyncService(db).get_latest_job(id)
+    if job:
+        response = SyncJobResponse.model_validate(job)
+    else:
+        response = SyncJobResponse(status=gallery.sync_status)
     
     return {"data": response.model_dump()}
 
@@ -330,31 +309,40 @@ def get_sync_status(
 def get_public_gallery(
     id: UUID,
     access_token: str | None = Query(None),
+    if_none_match: str | None = Header(None),
     db: Session = Depends(get_db)
 ):
     """
     Get public gallery details (for client view).
     Validates the access_token.
+
+    Responses carry an ETag; a matching If-None-Match gets 304 straight
+    from the public gallery cache.
     """
     if not access_token:
         # Match test expectation: 403 if missing
         raise HTTPException(status_code=403, detail="Access token required")
 
-    service = GalleryService(db)
-    gallery = service.get_by_id(id)
-    
-    if not gallery:
+    service = PublicGalleryService(db)
+    access = service.get_access(id)
+
+    if not access:
         raise HTTPException(status_code=404, detail="Gallery not found")
-        
+
     # Validate token
-    if not gallery.access_token:
+    if not access["access_token"]:
          # If no token set on gallery, forbid access via this method
          raise HTTPException(status_code=403, detail="Gallery not shared")
 
-    if gallery.access_token != access_token:
+    if not secrets.compare_digest(access["access_token"].encode(), access_token.encode()):
          raise HTTPException(status_code=403, detail="Invalid access token")
-         
+
+    etag = make_etag(id, access["version"])
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
     # Return limited public data
-    _enrich_gallery(gallery, db)
-    
-    return {"data": GalleryPublic.model_validate(gallery)}
\ No newline at end of file
+    body = service.render_gallery(id, access["version"])
+    if body is None:
+        raise HTTPException(status_code=404, detail="Gallery not found")
+    return json_response(body, etag)
@@ -11,6 +11,7 @@
 from app.api import deps
 from app.models.google_drive_integration import GoogleDriveIntegration
 from app.services.google_drive import GoogleDriveService
+from app.services.jobs import JobRunner
 
 router = APIRouter(prefix="/api/v1/integrations/google-drive", tags=["Integrations"])
 
@@ -115,7 +116,8 @@ def get_status(
 @router.delete("/disconnect", status_code=status.HTTP_204_NO_CONTENT)
 def disconnect(
     db: Session = Depends(get_db),
-    current_user: deps.User = Depends(deps.get_current_user)
+    current_user: deps.User = Depends(deps.get_current_user),
+    job_runner: JobRunner = Depends(deps.get_job_runner)
 ):
     """
     Desconectar Google Drive.
@@ -127,6 +129,9 @@ def disconnect(
         # Handle gracefully if not found
         return
 
+    # Tokens are revoked at Google by a background job
+    job_runner.notify()
+
 
 @router.get("/folders", response_model=dict)
 def list_folders(
@@ -138,7 +143,7 @@ def list_folders(
     """
     Listar pastas do Google Drive.
     """
-    drive_service = GoogleDriveService(db)
+    drive_service = GoogleDriveService(db, user_id=current_user.id)
     integration = drive_service.get_user_integration(current_user.id)
     
     if not integration:
@@ -0,0 +1,29 @@
+"""
+Background jobs controller.
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.api import deps
+from app.services.jobs import JobRunner, JobService
+
+router = APIRouter(prefix="/api/v1/jobs", tags=["Jobs"])
+
+
+@router.get("/stats", response_model=dict)
+def get_job_stats(
+    window: int = Query(3600, ge=60, le=7 * 24 * 3600, description="Seconds of finished jobs the latency covers"),
+    db: Session = Depends(get_db),
+    current_user: deps.User = Depends(deps.get_current_admin),
+    job_runner: JobRunner = Depends(deps.get_job_runner)
+):
+    """
+    Obter profundidade da fila e latência dos jobs em segundo plano (somente admin).
+    """
+    stats = JobService(db).queue_stats(window=window)
+    stats["workers"] = job_runner.stats()
+
+    return {
+        "data": stats
+    }
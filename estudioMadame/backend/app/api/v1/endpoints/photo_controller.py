@@ -1,20 +1,43 @@
 """
 Photo controller.
 """
+import secrets
 from uuid import UUID
-from typing import Optional
+from typing import AsyncIterator, Iterator, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import anyio
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from app.core.database import get_db
+from app.core.export import EXPORT_ENCODERS, EXPORT_MEDIA_TYPES
+from app.core.http_cache import MEDIA_CACHE_CONTROL, etag_matches, json_response, make_etag, not_modified
+from app.core.serialization import envelope_response
+from app.core.streaming import iter_json_records
 from app.api import deps
 from app.models.gallery import Gallery
 from app.models.photo import Photo
-from app.schemas.photo import Photo as PhotoSchema, PhotoSelectRequest, PhotoSelectResponse
-from app.schemas.common import PaginationMeta
-from app.services.photo import PhotoService
+from app.schemas.photo import (
+    Photo as PhotoSchema,
+    PhotoSelectRequest,
+    PhotoSelectResponse,
+    PhotoBatchSelectRequest,
+    PhotoBatchSelectResponse
+)
+from app.schemas.common import DerivativeSize, ImageFormat, PaginationMeta
+from app.services.derivatives import (
+    DERIVATIVE_MEDIA_TYPES,
+    DerivativeError,
+    DerivativePool,
+    DerivativesUnavailable
+)
+from app.services.image_source import ImageSourceError
+from app.services.photo import EXPORT_COLUMNS, PhotoService
+from app.services.public_gallery import PublicGalleryService
 
 router = APIRouter(tags=["Photos"])
 
@@ -25,6 +48,8 @@ def list_photos(
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=200),
     selected_by_client: Optional[bool] = Query(None),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from meta.next_cursor"),
+    include_total: bool = Query(True, description="Skip the total count when false"),
     db: Session = Depends(get_db),
     current_user: deps.User = Depends(deps.get_current_user)
 ):
@@ -37,24 +62,104 @@ def list_photos(
         raise HTTPException(status_code=404, detail="Gallery not found")
 
     photo_service = PhotoService(db)
-    photos, total = photo_service.list_photos(
-        gallery_id=gallery_id,
-        page=page,
-        limit=limit,
-        selected_by_client=selected_by_client
+    try:
+        photos, total, next_cursor = photo_service.list_photos(
+            gallery_id=gallery_id,
+            page=page,
+            limit=limit,
+            selected_by_client=selected_by_client,
+            cursor=cursor,
+            include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return envelope_response(PhotoSchema, photos, PaginationMeta.build(page, limit, total, next_cursor))
+
+
+@router.get("/api/v1/galleries/{gallery_id}/photos/export")
+def export_photos(
+    gallery_id: UUID,
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    selected_by_client: Optional[bool] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: deps.User = Depends(deps.get_current_user)
+):
+    """
+    Export a gallery's photos as CSV or NDJSON (Admin/Photographer).
+
+    The file is streamed from a server-side cursor, without a count query
+    or pagination; use selected_by_client=true for the client's selection.
+    """
+    if not db.get(Gallery, gallery_id):
+        raise HTTPException(status_code=404, detail="Gallery not found")
+
+    suffix = "selection" if selected_by_client else "photos"
+    return StreamingResponse(
+        _stream_export(db.get_bind(), gallery_id, selected_by_client, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="gallery-{gallery_id}-{suffix}.{export_format}"'
+        }
     )
 
-    total_pages = (total + limit - 1) // limit
 
-    return {
-        "data": [PhotoSchema.model_validate(p) for p in photos],
-        "meta": PaginationMeta(
-            page=page,
-            limit=limit,
-            total=total,
-            total_pages=total_pages
-        ).model_dump()
-    }
+def _stream_export(
+    bind: Union[Engine, Connection],
+    gallery_id: UUID,
+    selected_by_client: Optional[bool],
+    export_format: str
+) -> Iterator[bytes]:
+    """Encode the export rows; runs in the threadpool while the body streams."""
+    # Own session: the request's is closed before the body is sent
+    db = Session(bind=bind)
+    try:
+        rows = PhotoService(db).iter_export_rows(gallery_id, selected_by_client)
+        yield from EXPORT_ENCODERS[export_format](EXPORT_COLUMNS, rows)
+    finally:
+        db.close()
+
+
+@router.post(
+    "/api/v1/galleries/{gallery_id}/photos/bulk",
+    status_code=status.HTTP_201_CREATED,
+    response_model=dict
+)
+async def bulk_ingest_photos(
+    gallery_id: UUID,
+    request: Request,
+    batch_size: Optional[int] = Query(None, ge=1, le=10000, description="Photos per insert batch"),
+    db: Session = Depends(get_db),
+    current_user: deps.User = Depends(deps.get_current_user)
+):
+    """
+    Bulk ingest photos into a gallery (Admin/Photographer).
+
+    The body is a JSON array of photos or NDJSON (one photo per line). It is
+    parsed as it arrives and inserted in batches in one transaction.
+    """
+    gallery = await run_in_threadpool(db.get, Gallery, gallery_id)
+    if not gallery:
+        raise HTTPException(status_code=404, detail="Gallery not found")
+
+    photos = iter_json_records(_iter_body(request.stream()))
+    try:
+        inserted = await run_in_threadpool(
+            PhotoService(db).bulk_ingest, gallery_id, photos, batch_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"data": {"gallery_id": gallery_id, "inserted": inserted}}
+
+
+def _iter_body(chunks: AsyncIterator[bytes]) -> Iterator[bytes]:
+    """Read an async request body from a worker thread, one chunk at a time."""
+    while True:
+        try:
+            yield anyio.from_thread.run(chunks.__anext__)
+        except StopAsyncIteration:
+            return
 
 
 @router.get("/api/v1/galleries/{gallery_id}/photos/public", response_model=dict)
@@ -63,42 +168,39 @@ def list_public_photos(
     access_token: str = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from meta.next_cursor"),
+    include_total: bool = Query(True, description="Skip the total count when false"),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
     List photos in a public gallery (Client).
+
+    Pages carry an ETag; a matching If-None-Match gets 304 straight from
+    the public gallery cache.
     """
     if not access_token:
         raise HTTPException(status_code=403, detail="Access token required")
 
     # Verify gallery and access token
-    stmt = select(Gallery).where(
-        Gallery.id == gallery_id,
-        Gallery.access_token == access_token
-    )
-    gallery = db.execute(stmt).scalar_one_or_none()
-    
-    if not gallery:
+    service = PublicGalleryService(db)
+    access = service.get_access(gallery_id)
+
+    if not access or not access["access_token"] or not secrets.compare_digest(
+        access["access_token"].encode(), access_token.encode()
+    ):
         raise HTTPException(status_code=403, detail="Invalid access token")
 
-    photo_service = PhotoService(db)
-    photos, total = photo_service.list_photos(
-        gallery_id=gallery_id,
-        page=page,
-        limit=limit
-    )
+    etag = make_etag(gallery_id, access["version"], page, limit, cursor, include_total)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
 
-    total_pages = (total + limit - 1) // limit
+    try:
+        body = service.render_photos(gallery_id, access["version"], page, limit, cursor, include_total)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return {
-        "data": [PhotoSchema.model_validate(p) for p in photos],
-        "meta": PaginationMeta(
-            page=page,
-            limit=limit,
-            total=total,
-            total_pages=total_pages
-        ).model_dump()
-    }
+    return json_response(body, etag)
 
 
 @router.post("/api/v1/photos/{id}/select", response_model=dict)
@@ -110,48 +212,123 @@ def select_photo(
     """
     Select or deselect a photo (Client).
     """
-    # Find photo and its gallery
-    photo = db.get(Photo, id)
-    if not photo:
+    # Find the photo's gallery and verify its access token in one query
+    gallery = db.execute(
+        select(Gallery.id, Gallery.access_token, Gallery.settings)
+        .join(Photo, Photo.gallery_id == Gallery.id)
+        .where(Photo.id == id)
+    ).one_or_none()
+    if not gallery:
         raise HTTPException(status_code=404, detail="Photo not found")
 
-    gallery_id = photo.gallery_id
-    
-    # Verify gallery access token
-    stmt = select(Gallery).where(
-        Gallery.id == gallery_id,
-        Gallery.access_token == request.gallery_access_token
-    )
-    gallery = db.execute(stmt).scalar_one_or_none()
-    
-    if not gallery:
+    if gallery.access_token != request.gallery_access_token:
         raise HTTPException(status_code=403, detail="Invalid access token")
 
     photo_service = PhotoService(db)
     
-    updated_photo = photo_service.toggle_selection(
+    current_selection_count = photo_service.toggle_selection(
         photo_id=id,
         selected=request.selected,
-        gallery_id=gallery_id
+        gallery_id=gallery.id,
+        max_selection=(gallery.settings or {}).get("max_client_selection")
     )
     
-    if not updated_photo:
-        # If toggle_selection returns None, it might be due to selection limit
+    if current_selection_count is None:
+        # The photo exists, so only the selection limit can refuse a select
         if request.selected:
              raise HTTPException(
                 status_code=403, 
                 detail="Selection limit reached"
             )
         else:
-            # Should not happen if photo exists, but for safety:
+            # Deleted concurrently
             raise HTTPException(status_code=404, detail="Photo not found in this gallery")
 
-    current_selection_count = photo_service.get_selected_count(gallery_id)
-
     return {
         "data": PhotoSelectResponse(
             photo_id=id,
-            selected=updated_photo.selected_by_client,
+            selected=request.selected,
             current_selection_count=current_selection_count
         ).model_dump()
     }
+
+
+@router.post("/api/v1/galleries/{gallery_id}/selections", response_model=dict)
+def batch_select_photos(
+    gallery_id: UUID,
+    request: PhotoBatchSelectRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Select and deselect many photos at once (Client).
+
+    Operations are applied all together or not at all; when a photo appears
+    more than once, its last operation wins.
+    """
+    gallery = db.execute(
+        select(Gallery.access_token, Gallery.settings).where(Gallery.id == gallery_id)
+    ).one_or_none()
+    if not gallery or gallery.access_token != request.gallery_access_token:
+        raise HTTPException(status_code=403, detail="Invalid access token")
+
+    selections = {op.photo_id: op.selected for op in request.operations}
+    result = PhotoService(db).apply_selections(
+        gallery_id,
+        selections,
+        max_selection=(gallery.settings or {}).get("max_client_selection")
+    )
+    if result is None:
+        raise HTTPException(status_code=403, detail="Selection limit reached")
+
+    changed, current_selection_count = result
+    return {
+        "data": PhotoBatchSelectResponse(
+            gallery_id=gallery_id,
+            changed=changed,
+            current_selection_count=current_selection_count
+        ).model_dump()
+    }
+
+
+@router.get("/api/v1/photos/{id}/image/{size}")
+def get_photo_image(
+    size: DerivativeSize,
+    image_format: ImageFormat = Query(ImageFormat.webp, alias="format"),
+    if_none_match: Optional[str] = Header(None),
+    photo: Photo = Depends(deps.get_viewable_photo),
+    derivative_pool: DerivativePool = Depends(deps.get_derivative_pool)
+):
+    """
+    Serve a resized copy of a photo (thumbnail or display size).
+
+    Readable with the gallery access token in the query string (usable from
+    <img> tags) or as a logged-in user or the gallery's client, see
+    deps.get_viewable_photo. Derivatives are rendered on first use;
+    responses carry an ETag and support Range.
+    """
+    try:
+        key, path = derivative_pool.get(photo, size.value, image_format.value)
+    except DerivativesUnavailable:
+        # Without Pillow, fall back to Drive's own thumbnail
+        if photo.google_drive_thumbnail_link:
+            return RedirectResponse(photo.google_drive_thumbnail_link, status_code=307)
+        raise HTTPException(status_code=503, detail="Image resizing is not available")
+    except ImageSourceError:
+        raise HTTPException(status_code=404, detail="Original image not available")
+    except DerivativeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except TimeoutError:
+        raise HTTPException(
+            status_code=503,
+            detail="Image is still being rendered",
+            headers={"Retry-After": "1"}
+        )
+
+    etag = f'"{key}"'
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, MEDIA_CACHE_CONTROL)
+    return FileResponse(
+        path,
+        media_type=DERIVATIVE_MEDIA_TYPES[image_format.value],
+        headers={"ETag": etag, "Cache-Control": MEDIA_CACHE_CONTROL}
+    )
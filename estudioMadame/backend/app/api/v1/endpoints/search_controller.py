@@ -0,0 +1,35 @@
+"""
+Search controller.
+"""
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.api import deps
+from app.models.user import User
+from app.schemas.search import SearchResultType
+from app.services.search import SearchService
+
+router = APIRouter(prefix="/api/v1/search", tags=["Search"])
+
+
+@router.get("", response_model=dict)
+def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: List[SearchResultType] = Query(
+        default_factory=list, alias="type", description="Kinds to search, all by default"
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """
+    Search galleries, clients and approvals, best matches first.
+    """
+    results = SearchService(db).search(q, types=types, limit=limit)
+    return {
+        "data": [result.model_dump(mode="json") for result in results],
+        "meta": {"query": q, "count": len(results)}
+    }
@@ -0,0 +1,186 @@
+"""
+In-process TTL caches.
+
+Caches here are per process: each worker keeps its own copy, so entries are
+invalidated on commit in the process that made the write and otherwise
+expire after their TTL.
+"""
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, ORMExecuteState
+
+
+_caches: "weakref.WeakSet[TTLCache]" = weakref.WeakSet()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a TTL."""
+
+    def __init__(self, name: str, ttl: float, maxsize: int = 256):
+        """
+        Initialize the cache.
+
+        Args:
+            name: Name reported in the cache statistics
+            ttl: Default time to live of an entry, in seconds
+            maxsize: Maximum number of entries before the least recently used is evicted
+        """
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        # Bumped by clear, so values computed before it are not stored after it
+        self._generation = 0
+        self._lock = threading.Lock()
+        _caches.add(self)
+
+    def get_or_set(
+        self,
+        key: Hashable,
+        factory: Callable[[], Any],
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Return the cached value for key, computing and storing it on a miss.
+
+        Cached values are shared between callers and must not be mutated.
+        A value whose computation overlapped a clear is returned but not
+        stored, as it may predate the write that caused the clear.
+
+        Args:
+            key: Cache key
+            factory: Computes the value on a miss
+            ttl: Time to live override for this entry, in seconds
+
+        Returns:
+            Cached or freshly computed value
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        # Compute outside the lock so a slow query does not block other keys
+        value = factory()
+
+        with self._lock:
+            if self._generation == generation:
+                self._store(key, value, now + (self.ttl if ttl is None else ttl))
+        return value
+
+    def _store(self, key: Hashable, value: Any, expires_at: float) -> None:
+        """Insert an entry as the most recently used; the lock must be held."""
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Return the cached value for key.
+
+        Returns:
+            Cached value, or None on a miss or if the entry expired
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, evicting the least recently used entries over maxsize.
+
+        Args:
+            key: Cache key
+            value: Value to cache; it is shared between callers and must not be mutated
+            ttl: Time to live override for this entry, in seconds
+        """
+        with self._lock:
+            self._store(key, value, time.monotonic() + (self.ttl if ttl is None else ttl))
+
+    def clear(self) -> None:
+        """Drop every entry, keeping the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the cache hit/miss counters.
+
+        Returns:
+            Dict with name, size, hits, misses and hit ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def clear_all_caches() -> None:
+    """Drop the entries of every cache in the process."""
+    for cache in list(_caches):
+        cache.clear()
+
+
+def invalidate_on_commit(cache: TTLCache, *models: type) -> None:
+    """
+    Clear a cache whenever a transaction writing to one of the models commits.
+
+    ORM flushes and INSERT/UPDATE/DELETE statements run through the session
+    (ORM-enabled or on the model's table) are both tracked;
+    the cache is only cleared once the transaction actually commits.
+
+    Args:
+        cache: Cache to clear
+        models: Mapped classes whose writes make the cache stale
+    """
+    flag = f"invalidate:{cache.name}"
+    tables = {model.__table__.name for model in models}
+
+    @event.listens_for(Session, "after_flush")
+    def _track_flush(session: Session, flush_context: Any) -> None:
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            if isinstance(obj, models):
+                session.info[flag] = True
+                return
+
+    @event.listens_for(Session, "do_orm_execute")
+    def _track_bulk(state: ORMExecuteState) -> None:
+        if state.is_update or state.is_delete or state.is_insert:
+            # Matched by table so Core statements on a mapped table count too
+            table = getattr(state.statement, "table", None)
+            if getattr(table, "name", None) in tables:
+                state.session.info[flag] = True
+
+    @event.listens_for(Session, "after_commit")
+    def _clear(session: Session) -> None:
+        if session.info.pop(flag, False):
+            cache.clear()
+
+    @event.listens_for(Session, "after_rollback")
+    def _discard(session: Session) -> None:
+        session.info.pop(flag, None)
@@ -16,6 +16,22 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "sqlite:///./test.db"
+    ASYNC_DATABASE_URL: str = ""  # get_async_db; defaults to DATABASE_URL with its asyncio driver
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10.0  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 15000  # Postgres only, 0 disables
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+
+    # Cache
+    DASHBOARD_CACHE_TTL_SECONDS: int = 30
+    AUTH_CACHE_TTL_SECONDS: int = 60  # 0 disables the token/principal cache
+    AUTH_CACHE_MAXSIZE: int = 10000
+    PUBLIC_GALLERY_CACHE_TTL_SECONDS: int = 30
+    PUBLIC_GALLERY_CACHE_MAXSIZE: int = 2048
 
     # JWT
     JWT_SECRET_KEY: str = "jwt-secret-key-change-in-production"
@@ -23,11 +39,47 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
 
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12  # hashes with another cost are upgraded on login
+    PASSWORD_HASH_WORKERS: int = 0  # 0 for half the CPUs
+    PASSWORD_HASH_MAX_QUEUE: int = 256  # 0 for no limit
+
     # Google Drive
     GOOGLE_CLIENT_ID: str = ""
     GOOGLE_CLIENT_SECRET: str = ""
     GOOGLE_REDIRECT_URI: str = "http://localhost:3000/api/v1/integrations/google-drive/callback"
 
+    # Drive sync
+    DRIVE_ADAPTER: str = "google"  # google, fake (in-memory, for local development)
+    SYNC_WORKERS: int = 2
+    SYNC_PAGE_SIZE: int = 1000
+    SYNC_STALE_SECONDS: float = 600.0  # a running job without a heartbeat for this long is failed
+
+    # Bulk photo ingestion and export
+    PHOTO_INGEST_BATCH_SIZE: int = 1000
+    PHOTO_EXPORT_BATCH_SIZE: int = 1000
+
+    # Image derivatives (thumbnails)
+    IMAGE_SOURCE: str = "drive"  # drive, local (files named by Drive file ID in IMAGE_SOURCE_DIR)
+    IMAGE_SOURCE_DIR: str = "./originals"
+    DERIVATIVE_CACHE_DIR: str = "./derivative_cache"
+    DERIVATIVE_CACHE_MAX_BYTES: int = 2 * 1024 ** 3
+    DERIVATIVE_WORKERS: int = 2
+    DERIVATIVE_TIMEOUT_SECONDS: float = 30.0
+
+    # Background jobs
+    JOB_WORKERS: int = 2
+    JOB_POLL_SECONDS: float = 1.0  # how often the queue is checked for due and retried jobs
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BACKOFF_SECONDS: float = 2.0  # doubled on every retry
+    JOB_RETRY_MAX_SECONDS: float = 600.0
+    JOB_STALE_SECONDS: float = 900.0  # running jobs older than this are requeued (checked every minute)
+    JOB_RETENTION_HOURS: float = 168.0  # completed jobs are deleted after this; failed ones are kept
+
+    # Request instrumentation
+    SERVER_TIMING_ENABLED: bool = True  # Server-Timing header on every response
+    SLOW_REQUEST_LOG_MS: float = 0  # log slower requests with their SQL, 0 disables
+
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:5173", "http://localhost:3000"]
 
@@ -1,19 +1,242 @@
 """
 Database configuration and session management.
+
+Most endpoints use the synchronous engine through get_db and are declared
+with plain def, so FastAPI runs them in its threadpool. The client and auth
+endpoints are async def on get_async_db instead, an AsyncSession on the
+same database through an asyncio driver (asyncpg or aiosqlite).
 """
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.core.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-)
+
+class PoolStats:
+    """Connection pool counters, updated by pool events."""
+
+    def __init__(self):
+        """Initialize zeroed counters."""
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def increment(self, counter: str) -> None:
+        """Add one to a counter."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_wait(self, seconds: float) -> None:
+        """Record the time a checkout waited for a connection."""
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get a consistent copy of the counters."""
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "waits": self.waits,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a free connection."""
+
+    stats: Optional[PoolStats] = None
+
+    def _exhausted(self) -> bool:
+        """Whether every connection, overflow included, is checked out."""
+        return self._max_overflow > -1 and self.checkedout() >= self.size() + self._max_overflow
+
+    def _do_get(self):
+        # Only a checkout finding the pool exhausted blocks; the others are
+        # served at once and are not counted as waits
+        blocked = self._exhausted()
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.stats.increment("timeouts")
+            raise
+        finally:
+            if blocked:
+                self.stats.record_wait(time.perf_counter() - started)
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """InstrumentedQueuePool for asyncio engines."""
+
+
+def _is_in_memory(url: str) -> bool:
+    """Whether url is an in-memory SQLite database."""
+    return url.startswith("sqlite") and (
+        ":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite+pysqlite:", "sqlite+aiosqlite:")
+    )
+
+
+def _pool_options(url: str, pool_class: type, stats: PoolStats) -> Dict[str, Any]:
+    """Pool arguments from the DB_* settings; none for in-memory SQLite."""
+    if _is_in_memory(url):
+        return {}
+    # Per-engine subclass: pools recreated on dispose keep the same stats
+    return dict(
+        poolclass=type(pool_class.__name__, (pool_class,), {"stats": stats}),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+
+def _instrument(new_engine: Engine, url: str, stats: PoolStats) -> None:
+    """Count pool events into stats and set the SQLite pragmas on connect."""
+    for name, counter in (
+        ("connect", "connects"),
+        ("checkout", "checkouts"),
+        ("checkin", "checkins"),
+        ("invalidate", "invalidations"),
+    ):
+        event.listen(new_engine, name, lambda *args, counter=counter: stats.increment(counter))
+
+    if url.startswith("sqlite") and not _is_in_memory(url):
+        @event.listens_for(new_engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+            cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+            cursor.close()
+
+    new_engine.pool_stats = stats
+
+
+def build_engine(url: str, **overrides: Any) -> Engine:
+    """
+    Create an engine configured from the DB_* and SQLITE_* settings.
+
+    Args:
+        url: Database URL
+        overrides: create_engine keyword arguments taking precedence
+
+    Returns:
+        Engine whose pool counters are available as engine.pool_stats
+    """
+    stats = PoolStats()
+    connect_args: Dict[str, Any] = {}
+
+    if url.startswith("sqlite"):
+        connect_args["check_same_thread"] = False
+    elif settings.DB_STATEMENT_TIMEOUT_MS and url.startswith("postgresql"):
+        # Server-side limit; long queries fail instead of piling up connections
+        connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+    options = _pool_options(url, InstrumentedQueuePool, stats)
+    options.update(overrides)
+    options["connect_args"] = {**connect_args, **options.get("connect_args", {})}
+    new_engine = create_engine(url, **options)
+    _instrument(new_engine, url, stats)
+    return new_engine
+
+
+def async_database_url(url: str) -> str:
+    """
+    Map a database URL to its asyncio driver.
+
+    Args:
+        url: SQLAlchemy URL, with or without a driver
+
+    Returns:
+        The URL using asyncpg for Postgres and aiosqlite for SQLite
+    """
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+")[0]
+    if dialect in ("postgres", "postgresql"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    return url
+
+
+def build_async_engine(url: str, **overrides: Any) -> AsyncEngine:
+    """
+    Create an asyncio engine tuned like build_engine.
+
+    Args:
+        url: Database URL, mapped to its asyncio driver (see async_database_url)
+        overrides: create_async_engine keyword arguments taking precedence
+
+    Returns:
+        Engine whose pool counters are available as engine.sync_engine.pool_stats
+    """
+    url = async_database_url(url)
+    stats = PoolStats()
+    connect_args: Dict[str, Any] = {}
+
+    if settings.DB_STATEMENT_TIMEOUT_MS and url.startswith("postgresql"):
+        connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+
+    options = _pool_options(url, InstrumentedAsyncQueuePool, stats)
+    options.update(overrides)
+    options["connect_args"] = {**connect_args, **options.get("connect_args", {})}
+    new_engine = create_async_engine(url, **options)
+    _instrument(new_engine.sync_engine, url, stats)
+    return new_engine
+
+
+def pool_status(target: Optional[Engine] = None) -> Dict[str, Any]:
+    """
+    Get the current state and counters of an engine's connection pool.
+
+    Args:
+        target: Engine to inspect (default: the application engine)
+
+    Returns:
+        Dict of pool size, checked out and overflow connections and counters
+    """
+    target = target or engine
+    pool = target.pool
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size() if isinstance(pool, QueuePool) else None,
+        "checked_out": pool.checkedout() if isinstance(pool, QueuePool) else None,
+        "overflow": max(pool.overflow(), 0) if isinstance(pool, QueuePool) else None,
+        **target.pool_stats.snapshot()
+    }
+
+
+engine = build_engine(settings.DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = build_async_engine(settings.ASYNC_DATABASE_URL or settings.DATABASE_URL)
+
+# Attributes stay loaded after commit: an async session cannot lazy load
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
@@ -26,3 +249,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for getting an async database session.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,166 @@
+"""
+Content-addressed disk cache for image derivatives.
+
+Each derivative is stored once under a key derived from the content of its
+original and the rendering parameters, as ``<root>/<key[:2]>/<key>.<ext>``.
+The cache is bounded in bytes: when a write takes it over the limit, the
+least recently used files are deleted. Recency is kept in memory and in the
+files' mtime, so it survives restarts.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def derivative_key(*parts: Any) -> str:
+    """
+    Build the cache key of a derivative.
+
+    Args:
+        parts: Digest of the original and every rendering parameter
+
+    Returns:
+        Hex digest, also used as the file name
+    """
+    return hashlib.sha256("\x1f".join(str(part) for part in parts).encode()).hexdigest()
+
+
+class DerivativeCache:
+    """Size-bounded LRU cache of files on disk, safe to share between threads."""
+
+    def __init__(self, root: str, max_bytes: int):
+        """
+        Initialize the cache and index the files already on disk.
+
+        Args:
+            root: Cache directory, created if missing
+            max_bytes: Total size above which old files are evicted
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # (key, ext) -> size, least recently used first
+        self._entries: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load()
+
+    def _load(self) -> None:
+        """Index existing files, oldest mtime first."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        found = []
+        for path in self.root.glob("??/*.*"):
+            if path.name.startswith("."):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            key, ext = path.name.split(".", 1)
+            found.append((stat.st_mtime, key, ext, stat.st_size))
+        for _, key, ext, size in sorted(found):
+            self._entries[(key, ext)] = size
+            self._bytes += size
+
+    def path_for(self, key: str, ext: str) -> Path:
+        """Location of a derivative, whether or not it is cached."""
+        return self.root / key[:2] / f"{key}.{ext}"
+
+    def get(self, key: str, ext: str) -> Optional[Path]:
+        """
+        Look up a derivative and mark it as recently used.
+
+        Returns:
+            Path of the file, or None if it is not cached
+        """
+        path = self.path_for(key, ext)
+        try:
+            # Refreshes the mtime and checks the file still exists: other
+            # processes may share the directory and store or evict files
+            os.utime(path)
+            size = path.stat().st_size
+        except FileNotFoundError:
+            with self._lock:
+                self._bytes -= self._entries.pop((key, ext), 0)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            if (key, ext) in self._entries:
+                self._entries.move_to_end((key, ext))
+            else:
+                self._entries[(key, ext)] = size
+                self._bytes += size
+            self.hits += 1
+        return path
+
+    def put(self, key: str, ext: str, data: bytes) -> Path:
+        """
+        Store a derivative, evicting old ones if the cache grows too large.
+
+        The file is written under a temporary name and renamed, so readers
+        never see a partial file.
+
+        Returns:
+            Path of the stored file
+        """
+        path = self.path_for(key, ext)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            self._bytes += len(data) - self._entries.pop((key, ext), 0)
+            self._entries[(key, ext)] = len(data)
+            victims = []
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                victim, size = self._entries.popitem(last=False)
+                self._bytes -= size
+                self.evictions += 1
+                victims.append(victim)
+
+        for victim_key, victim_ext in victims:
+            try:
+                os.unlink(self.path_for(victim_key, victim_ext))
+            except FileNotFoundError:
+                pass
+        return path
+
+    def clear(self) -> None:
+        """Delete every cached file."""
+        with self._lock:
+            entries = list(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+        for key, ext in entries:
+            try:
+                os.unlink(self.path_for(key, ext))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """Return size and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "files": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
@@ -0,0 +1,96 @@
+"""
+Streaming CSV and NDJSON encoders for exports.
+
+Rows are encoded as they are read and flushed in chunks of a few hundred
+rows, so the memory used by an export does not grow with its size.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, Sequence
+from uuid import UUID
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson"
+}
+
+# Rows encoded before a chunk is handed to the response
+_CHUNK_ROWS = 500
+
+
+def iter_csv(columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    """
+    Encode rows as CSV with a header line.
+
+    Args:
+        columns: Header names, in row order
+        rows: Row tuples
+
+    Yields:
+        UTF-8 encoded chunks
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    for i, row in enumerate(rows, start=1):
+        writer.writerow([_csv_value(value) for value in row])
+        if i % _CHUNK_ROWS == 0:
+            yield _drain(buffer)
+    yield _drain(buffer)
+
+
+def iter_ndjson(columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    """
+    Encode rows as NDJSON, one object per line keyed by column name.
+
+    Args:
+        columns: Object keys, in row order
+        rows: Row tuples
+
+    Yields:
+        UTF-8 encoded chunks
+    """
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(columns, row)), default=_json_value, ensure_ascii=False))
+        if len(lines) == _CHUNK_ROWS:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines.clear()
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+EXPORT_ENCODERS: Dict[str, Callable[[Sequence[str], Iterable[Sequence[Any]]], Iterator[bytes]]] = {
+    "csv": iter_csv,
+    "ndjson": iter_ndjson
+}
+
+
+def _drain(buffer: io.StringIO) -> bytes:
+    """Return the buffered text as bytes and empty the buffer."""
+    chunk = buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+    return chunk
+
+
+def _csv_value(value: Any) -> Any:
+    """Format a value for a CSV cell."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _json_value(value: Any) -> Any:
+    """Serialize the values json does not handle natively."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
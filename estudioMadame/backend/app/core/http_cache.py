@@ -0,0 +1,56 @@
+"""
+HTTP validation caching (ETag / If-None-Match).
+"""
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response
+
+# Clients may keep the response but must revalidate it on every use
+CACHE_CONTROL = "private, no-cache"
+
+# Images rarely change: reused for a day, then revalidated with the ETag
+MEDIA_CACHE_CONTROL = "private, max-age=86400"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a strong ETag from the values identifying a representation.
+
+    Args:
+        parts: Content version and anything else the body depends on
+
+    Returns:
+        Quoted entity tag
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against the current ETag.
+
+    Uses the weak comparison required for If-None-Match, so "W/" prefixes
+    added by proxies do not defeat the match.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def not_modified(etag: str, cache_control: str = CACHE_CONTROL) -> Response:
+    """Build a 304 response for a matching If-None-Match."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def json_response(body: bytes, etag: str) -> Response:
+    """Build a 200 response from an already rendered JSON body."""
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
@@ -0,0 +1,255 @@
+"""
+Per-request performance instrumentation.
+
+InstrumentationMiddleware times every HTTP request, and SQLAlchemy cursor
+events and the JSON encoders report how much of that time went to SQL and
+to serializing the response. The figures are:
+
+- sent back in a Server-Timing header (total, db, serialize), shown by the
+  browser devtools next to each request;
+- aggregated per route in histograms exposed at /metrics;
+- logged together with the request's SQL statements when the request takes
+  longer than SLOW_REQUEST_LOG_MS.
+
+The figures of the request being served are kept in a context variable,
+which FastAPI copies into the threadpool running sync endpoints and
+dependencies. Work done by the background pools (sync, derivatives) is not
+attributed to any request.
+"""
+import functools
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import Histogram, LabeledCounter
+
+logger = logging.getLogger(__name__)
+
+# Statements kept per request for the slow request log
+MAX_LOGGED_STATEMENTS = 50
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SERIALIZATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Label of requests that matched no route, so unknown paths do not add series
+UNMATCHED_ROUTE = "unmatched"
+
+_ROUTE_LABELS = ("method", "route")
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class RequestTimings:
+    """SQL and serialization figures of one request."""
+
+    def __init__(self, capture_statements: bool = False):
+        """
+        Initialize zeroed figures.
+
+        Args:
+            capture_statements: Keep the SQL text of the statements (slow request log)
+        """
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.serialization_seconds = 0.0
+        # (seconds, statement), in execution order
+        self.statements: Optional[List[Tuple[float, str]]] = [] if capture_statements else None
+
+    def record_statement(self, statement: str, seconds: float) -> None:
+        """Record one SQL statement run for the request."""
+        self.sql_count += 1
+        self.sql_seconds += seconds
+        if self.statements is not None and len(self.statements) < MAX_LOGGED_STATEMENTS:
+            self.statements.append((seconds, statement))
+
+    def elapsed(self) -> float:
+        """Seconds since the request started."""
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Server-Timing header value of the figures so far."""
+        return (
+            f"total;dur={self.elapsed() * 1000:.1f}, "
+            f'db;dur={self.sql_seconds * 1000:.1f};desc="{self.sql_count} queries", '
+            f"serialize;dur={self.serialization_seconds * 1000:.1f}"
+        )
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Figures of the request being served, or None outside a request."""
+    return _current.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._instrumentation_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current.get()
+    started = getattr(context, "_instrumentation_started", None)
+    if timings is not None and started is not None:
+        timings.record_statement(statement, time.perf_counter() - started)
+
+
+def timed_serialization(fn: F) -> F:
+    """Decorate an encoder so its run time counts as serialization time."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        timings = _current.get()
+        if timings is None:
+            return fn(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            timings.serialization_seconds += time.perf_counter() - started
+    return wrapper  # type: ignore[return-value]
+
+
+class RequestMetrics:
+    """Per-route request metrics."""
+
+    def __init__(self):
+        """Initialize empty metric families."""
+        self.requests = LabeledCounter(
+            "estudio_http_requests_total", "HTTP requests served", ("method", "route", "status")
+        )
+        self.duration = Histogram(
+            "estudio_http_request_duration_seconds", "Time to serve HTTP requests",
+            _ROUTE_LABELS, LATENCY_BUCKETS
+        )
+        self.sql_statements = Histogram(
+            "estudio_http_request_sql_statements", "SQL statements run per HTTP request",
+            _ROUTE_LABELS, STATEMENT_BUCKETS
+        )
+        self.sql_seconds = Histogram(
+            "estudio_http_request_sql_seconds", "Time spent running SQL per HTTP request",
+            _ROUTE_LABELS, LATENCY_BUCKETS
+        )
+        self.serialization_seconds = Histogram(
+            "estudio_http_request_serialization_seconds", "Time spent encoding response bodies per HTTP request",
+            _ROUTE_LABELS, SERIALIZATION_BUCKETS
+        )
+        self.response_bytes = Histogram(
+            "estudio_http_response_size_bytes", "Size of HTTP response bodies",
+            _ROUTE_LABELS, SIZE_BUCKETS
+        )
+
+    def record(self, method: str, route: str, status: int, timings: RequestTimings, duration: float, size: int) -> None:
+        """Record a finished request."""
+        labels = (method, route)
+        self.requests.inc((method, route, str(status)))
+        self.duration.observe(labels, duration)
+        self.sql_statements.observe(labels, timings.sql_count)
+        self.sql_seconds.observe(labels, timings.sql_seconds)
+        self.serialization_seconds.observe(labels, timings.serialization_seconds)
+        self.response_bytes.observe(labels, size)
+
+    def render(self) -> str:
+        """Render every family in the Prometheus text format."""
+        return "".join(
+            family.render()
+            for family in (
+                self.requests,
+                self.duration,
+                self.sql_statements,
+                self.sql_seconds,
+                self.serialization_seconds,
+                self.response_bytes,
+            )
+        )
+
+
+def route_label(scope: Scope) -> str:
+    """
+    Route template of a served request, e.g. /api/v1/galleries/{gallery_id}.
+
+    Available once the router has matched the request.
+    """
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    # Plain Starlette routes (docs, OpenAPI schema) have no parameters
+    return scope["path"] if "endpoint" in scope else UNMATCHED_ROUTE
+
+
+def log_slow_request(method: str, route: str, duration: float, timings: RequestTimings) -> None:
+    """Log a slow request with the SQL statements it ran."""
+    lines = [
+        f"Slow request: {method} {route} took {duration * 1000:.1f} ms "
+        f"(sql {timings.sql_seconds * 1000:.1f} ms in {timings.sql_count} statements, "
+        f"serialize {timings.serialization_seconds * 1000:.1f} ms)"
+    ]
+    for seconds, statement in timings.statements or ():
+        lines.append(f"  {seconds * 1000:8.1f} ms  {' '.join(statement.split())}")
+    if timings.sql_count > len(timings.statements or ()):
+        lines.append(f"  ... {timings.sql_count - len(timings.statements or ())} more statements")
+    logger.warning("\n".join(lines))
+
+
+class InstrumentationMiddleware:
+    """ASGI middleware recording the timings of every HTTP request."""
+
+    def __init__(self, app: ASGIApp, metrics: Optional[RequestMetrics] = None):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: Application to wrap
+            metrics: Where requests are recorded (default the process-wide request_metrics)
+        """
+        self.app = app
+        self.metrics = metrics or request_metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        slow_threshold_ms = settings.SLOW_REQUEST_LOG_MS
+        timings = RequestTimings(capture_statements=slow_threshold_ms > 0)
+        token = _current.set(timings)
+        status = 500
+        size = 0
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # Streamed bodies are still being produced: the header has the
+                # figures up to the first byte
+                if settings.SERVER_TIMING_ENABLED:
+                    MutableHeaders(scope=message).append("Server-Timing", timings.server_timing())
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            duration = timings.elapsed()
+            route = route_label(scope)
+            self.metrics.record(scope["method"], route, status, timings, duration, size)
+            if slow_threshold_ms > 0 and duration * 1000 >= slow_threshold_ms:
+                log_slow_request(scope["method"], route, duration, timings)
+
+
+# Process-wide metrics rendered at /metrics
+request_metrics = RequestMetrics()
@@ -0,0 +1,189 @@
+"""
+Prometheus text exposition of the application metrics.
+"""
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.database import pool_status
+from app.core.security import password_pool
+
+# (name, type, help, value)
+Metric = Tuple[str, str, str, Optional[float]]
+
+
+def render_metrics(metrics: Iterable[Metric]) -> str:
+    """
+    Render metrics in the Prometheus text format.
+
+    Metrics without a value (not applicable to the current setup) are skipped.
+    """
+    lines: List[str] = []
+    for name, kind, help_text, value in metrics:
+        if value is None:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    """Escape a label value for the text format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], le: Optional[str] = None) -> str:
+    """Render a label set, with the le label of histogram buckets if given."""
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class LabeledCounter:
+    """Counter with one series per label set, safe to share between threads."""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str]):
+        """
+        Initialize the counter.
+
+        Args:
+            name: Metric name
+            help_text: HELP line
+            label_names: Names of the labels every series has
+        """
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1) -> None:
+        """Add amount to the series of a label set."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: Tuple[str, ...]) -> float:
+        """Current value of the series of a label set."""
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def render(self) -> str:
+        """Render the counter in the Prometheus text format."""
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in values:
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class Histogram:
+    """Histogram with one series per label set, safe to share between threads."""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], buckets: Sequence[float]):
+        """
+        Initialize the histogram.
+
+        Args:
+            name: Metric name
+            help_text: HELP line
+            label_names: Names of the labels every series has
+            buckets: Upper bounds of the buckets, ascending (+Inf is implied)
+        """
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # label set -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        """Record one observation in the series of a label set."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, labels: Tuple[str, ...]) -> int:
+        """Number of observations in the series of a label set."""
+        with self._lock:
+            series = self._series.get(labels)
+            return sum(series[0]) if series else 0
+
+    def render(self) -> str:
+        """Render the histogram (cumulative buckets, sum and count)."""
+        with self._lock:
+            series = sorted((labels, list(counts), total) for labels, (counts, total) in self._series.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = bound if bound == "+Inf" else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {round(total, 6)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def database_pool_metrics() -> List[Metric]:
+    """Collect the connection pool metrics of the application engine."""
+    status = pool_status()
+    return [
+        ("estudio_db_pool_size", "gauge", "Connections kept in the pool", status["size"]),
+        ("estudio_db_pool_checked_out", "gauge", "Connections currently in use", status["checked_out"]),
+        ("estudio_db_pool_overflow", "gauge", "Connections open beyond the pool size", status["overflow"]),
+        ("estudio_db_pool_connects_total", "counter", "New database connections opened", status["connects"]),
+        ("estudio_db_pool_checkouts_total", "counter", "Connections handed out by the pool", status["checkouts"]),
+        ("estudio_db_pool_invalidations_total", "counter", "Connections discarded as broken", status["invalidations"]),
+        ("estudio_db_pool_timeouts_total", "counter", "Checkouts that gave up waiting", status["timeouts"]),
+        ("estudio_db_pool_waits_total", "counter", "Checkouts that waited for a free connection", status["waits"]),
+        (
+            "estudio_db_pool_wait_seconds_total",
+            "counter",
+            "Time checkouts spent waiting for a free connection",
+            status["wait_seconds_total"]
+        ),
+        (
+            "estudio_db_pool_wait_seconds_max",
+            "gauge",
+            "Longest time a checkout waited for a free connection",
+            status["wait_seconds_max"]
+        ),
+    ]
+
+
+def password_pool_metrics() -> List[Metric]:
+    """Collect the password hashing pool metrics."""
+    stats = password_pool.stats()
+    return [
+        ("estudio_password_pool_workers", "gauge", "Password hashing worker threads", stats["workers"]),
+        ("estudio_password_pool_queued", "gauge", "Password checks waiting for a worker", stats["queued"]),
+        ("estudio_password_pool_active", "gauge", "Password checks running", stats["active"]),
+        ("estudio_password_pool_completed_total", "counter", "Password checks and hashes run", stats["completed"]),
+        ("estudio_password_pool_rejected_total", "counter", "Password checks refused with a full queue", stats["rejected"]),
+        (
+            "estudio_password_pool_wait_seconds_total",
+            "counter",
+            "Time password checks spent waiting for a worker",
+            stats["wait_seconds_total"]
+        ),
+        (
+            "estudio_password_pool_wait_seconds_max",
+            "gauge",
+            "Longest time a password check waited for a worker",
+            stats["wait_seconds_max"]
+        ),
+        (
+            "estudio_password_pool_work_seconds_total",
+            "counter",
+            "Time spent hashing and verifying passwords",
+            stats["work_seconds_total"]
+        ),
+    ]
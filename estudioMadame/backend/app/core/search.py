@@ -0,0 +1,268 @@
+"""
+Full-text search indexes.
+
+Galleries, clients and approvals are indexed on their text columns:
+
+- SQLite: an FTS5 table per indexed table (``<table>_fts``), kept in sync
+  by triggers and ranked with bm25. Its rowid is an integer key assigned
+  to the row's primary key in ``<table>_fts_keys``; matches are mapped back
+  through that table, never through the indexed table's rowid, which VACUUM
+  may renumber on tables without an integer primary key. The triggers find
+  a row's FTS entry by key, so writes never scan the FTS table.
+- PostgreSQL: a GIN expression index on ``to_tsvector('simple', ...)`` per
+  indexed table, ranked with ts_rank.
+
+The indexes are created with the schema (metadata create_all) and by the
+0006, 0009 and 0010 migrations. Search terms are matched as word prefixes, every term must
+match (AND).
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Table, column, event, func, literal_column, select, table as table_clause
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Select
+
+from app.core.database import Base
+
+# Indexed text columns per table
+SEARCH_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "galleries": ("title", "description", "location"),
+    "clients": ("name", "email", "phone"),
+    "approvals": ("gallery_name", "client_name"),
+}
+
+# Terms beyond this are ignored, they only make the match slower
+MAX_SEARCH_TERMS = 8
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(text: Optional[str]) -> List[str]:
+    """
+    Split user input into lowercase search terms.
+
+    Punctuation separates terms, so "john@example.com" gives john, example
+    and com, matching how both index backends tokenize e-mails.
+    """
+    return _TERM.findall((text or "").lower())[:MAX_SEARCH_TERMS]
+
+
+def fts_table_name(table_name: str) -> str:
+    """Name of the FTS5 table indexing table_name on SQLite."""
+    return f"{table_name}_fts"
+
+
+def fts_keys_table_name(table_name: str) -> str:
+    """Name of the table mapping the primary keys of table_name to FTS5 rowids."""
+    return f"{fts_table_name(table_name)}_keys"
+
+
+def is_search_table(name: str) -> bool:
+    """Whether name is an FTS5 table, one of its shadow tables or its keys table."""
+    return any(name == fts_table_name(t) or name.startswith(f"{fts_table_name(t)}_") for t in SEARCH_COLUMNS)
+
+
+def _tsvector_sql(table_name: str, qualified: bool = False) -> str:
+    """
+    Document expression of the Postgres expression index.
+
+    Queries must use this expression (qualifying the columns does not
+    matter) for the index to be picked. '@' and '.' become spaces so
+    e-mails are indexed word by word.
+    """
+    prefix = f"{table_name}." if qualified else ""
+    fields = " || ' ' || ".join(
+        f"translate(coalesce({prefix}{name}, ''), '@.', '  ')" for name in SEARCH_COLUMNS[table_name]
+    )
+    return f"to_tsvector('simple', {fields})"
+
+
+def create_search_indexes(connection: Connection) -> None:
+    """
+    Create the search indexes that do not exist yet.
+
+    New FTS5 tables are filled from their content table, so this can run
+    against a populated database.
+    """
+    dialect = connection.dialect.name
+    for table_name, columns in SEARCH_COLUMNS.items():
+        if dialect == "sqlite":
+            _create_fts5(connection, table_name, columns)
+        elif dialect == "postgresql":
+            connection.exec_driver_sql(
+                f"CREATE INDEX IF NOT EXISTS ix_{table_name}_search "
+                f"ON {table_name} USING gin (({_tsvector_sql(table_name)}))"
+            )
+
+
+def _create_fts5(connection: Connection, table_name: str, columns: Tuple[str, ...]) -> None:
+    """Create the FTS5 table, its keys table and their sync triggers for table_name."""
+    fts = fts_table_name(table_name)
+    keys = fts_keys_table_name(table_name)
+    names = ", ".join(columns)
+    new_values = ", ".join(f"new.{name}" for name in columns)
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)
+    ).first()
+
+    if not exists:
+        # key is the rowid (INTEGER PRIMARY KEY), which VACUUM keeps
+        connection.exec_driver_sql(f"CREATE TABLE {keys} (key INTEGER PRIMARY KEY, id UNIQUE NOT NULL)")
+        connection.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5("
+            f"{names}, tokenize='unicode61 remove_diacritics 2')"
+        )
+        _fill_fts5(connection, table_name, columns)
+
+    # Triggers go away with their table (e.g. batch migrations), recreate them
+    key_of = f"(SELECT key FROM {keys} WHERE id = {{}}.id)"
+    connection.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+        f"INSERT INTO {keys}(id) VALUES (new.id); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES ({key_of.format('new')}, {new_values}); END"
+    )
+    connection.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+        f"DELETE FROM {fts} WHERE rowid = {key_of.format('old')}; "
+        f"DELETE FROM {keys} WHERE id = old.id; END"
+    )
+    connection.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF id, {names} ON {table_name} BEGIN "
+        f"DELETE FROM {fts} WHERE rowid = {key_of.format('old')}; "
+        f"UPDATE {keys} SET id = new.id WHERE id = old.id; "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES ({key_of.format('new')}, {new_values}); END"
+    )
+
+
+def _fill_fts5(connection: Connection, table_name: str, columns: Tuple[str, ...]) -> None:
+    """Index every row of table_name into its empty FTS5 and keys tables."""
+    fts = fts_table_name(table_name)
+    keys = fts_keys_table_name(table_name)
+    names = ", ".join(columns)
+    connection.exec_driver_sql(f"INSERT INTO {keys}(id) SELECT id FROM {table_name}")
+    connection.exec_driver_sql(
+        f"INSERT INTO {fts}(rowid, {names}) "
+        f"SELECT k.key, {', '.join(f't.{name}' for name in columns)} "
+        f"FROM {table_name} t JOIN {keys} k ON k.id = t.id"
+    )
+
+
+def drop_search_indexes(connection: Connection) -> None:
+    """Drop the search indexes and, on SQLite, their triggers."""
+    dialect = connection.dialect.name
+    for table_name in SEARCH_COLUMNS:
+        if dialect == "sqlite":
+            fts = fts_table_name(table_name)
+            for suffix in ("ai", "ad", "au"):
+                connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            connection.exec_driver_sql(f"DROP TABLE IF EXISTS {fts}")
+            connection.exec_driver_sql(f"DROP TABLE IF EXISTS {fts_keys_table_name(table_name)}")
+        elif dialect == "postgresql":
+            connection.exec_driver_sql(f"DROP INDEX IF EXISTS ix_{table_name}_search")
+
+
+def rebuild_search_indexes(connection: Connection) -> None:
+    """
+    Refill the FTS5 tables from their indexed tables.
+
+    Only needed on SQLite after rows were written with the triggers missing,
+    e.g. by a batch migration that recreated an indexed table. Postgres
+    indexes need no rebuild.
+    """
+    if connection.dialect.name == "sqlite":
+        for table_name, columns in SEARCH_COLUMNS.items():
+            connection.exec_driver_sql(f"DELETE FROM {fts_table_name(table_name)}")
+            connection.exec_driver_sql(f"DELETE FROM {fts_keys_table_name(table_name)}")
+            _fill_fts5(connection, table_name, columns)
+
+
+def _tsquery(terms: List[str]) -> Any:
+    """Postgres query matching every term as a prefix."""
+    return func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+
+
+def _fts_match(table_name: str, terms: List[str]) -> Tuple[Any, Any, Any]:
+    """The FTS5 and keys tables of table_name and the MATCH clause for terms."""
+    fts = table_clause(fts_table_name(table_name), column("rowid"), column("rank"))
+    keys = table_clause(fts_keys_table_name(table_name), column("key"), column("id"))
+    match = " ".join(f'"{term}"*' for term in terms)
+    return fts, keys, literal_column(fts.name).op("MATCH")(match)
+
+
+def search_filter(table: Table, text: Optional[str], dialect: str) -> Optional[Any]:
+    """
+    Build a WHERE clause keeping the rows of table matching text.
+
+    On SQLite the matching primary keys are read from the keys table, by
+    the rowids the FTS5 table matched.
+
+    Args:
+        table: One of the indexed tables
+        text: User search input
+        dialect: Name of the database dialect
+
+    Returns:
+        The clause, or None if text holds no search terms (nothing to filter on)
+    """
+    terms = search_terms(text)
+    if not terms:
+        return None
+
+    if dialect == "postgresql":
+        return literal_column(_tsvector_sql(table.name, qualified=True)).op("@@")(_tsquery(terms))
+
+    fts, keys, match = _fts_match(table.name, terms)
+    return table.c.id.in_(
+        select(keys.c.id).join_from(keys, fts, fts.c.rowid == keys.c.key).where(match)
+    )
+
+
+def ranked_search(table: Table, text: Optional[str], dialect: str, limit: int) -> Optional[Select]:
+    """
+    Build a SELECT of the ids of the best matches of text in table.
+
+    Args:
+        table: One of the indexed tables
+        text: User search input
+        dialect: Name of the database dialect
+        limit: Maximum number of rows
+
+    Returns:
+        select(id, score), best match (highest score) first, or None if
+        text holds no search terms
+    """
+    terms = search_terms(text)
+    if not terms:
+        return None
+
+    if dialect == "postgresql":
+        document = literal_column(_tsvector_sql(table.name, qualified=True))
+        query = _tsquery(terms)
+        score = func.ts_rank(document, query).label("score")
+        return (
+            select(table.c.id, score)
+            .where(document.op("@@")(query))
+            .order_by(score.desc())
+            .limit(limit)
+        )
+
+    # FTS5 stops at the limit when ordering by rank on the FTS table itself
+    fts, keys, match = _fts_match(table.name, terms)
+    best = (
+        select(fts.c.rowid.label("key"), (-fts.c.rank).label("score"))
+        .where(match)
+        .order_by(fts.c.rank)
+        .limit(limit)
+        .subquery()
+    )
+    return (
+        select(table.c.id, best.c.score)
+        .join_from(best, keys, keys.c.key == best.c.key)
+        .join(table, table.c.id == keys.c.id)
+        .order_by(best.c.score.desc())
+    )
+
+
+event.listen(Base.metadata, "after_create", lambda target, connection, **kw: create_search_indexes(connection))
+event.listen(Base.metadata, "before_drop", lambda target, connection, **kw: drop_search_indexes(connection))
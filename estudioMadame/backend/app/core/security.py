@@ -1,29 +1,181 @@
 """
 Security utilities for password hashing and JWT tokens.
 """
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, TypeVar
 
 import bcrypt
 from jose import JWTError, jwt
 
 from app.core.config import settings
 
+T = TypeVar("T")
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+class PasswordHashPool:
+    """
+    Bounded worker pool running the bcrypt work.
+
+    bcrypt releases the GIL while hashing, so a small thread pool spreads the
+    work over cores without the pickling and start-up cost of processes. The
+    pool caps how many CPUs a login burst can take and how many requests may
+    queue behind it; the queue and timings are reported by stats().
+    """
+
+    def __init__(self, workers: int, max_queue: int = 0):
+        """
+        Initialize the pool; threads are started on first use.
+
+        Args:
+            workers: Number of worker threads, 0 for half the CPUs
+            max_queue: Maximum number of jobs waiting for a worker, 0 for no limit
+        """
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._work_total = 0.0
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        """
+        Queue a call on the pool.
+
+        Raises:
+            PasswordHasherBusy: If max_queue jobs are already waiting
+        """
+        with self._lock:
+            if self.max_queue and self._queued >= self.max_queue:
+                self._rejected += 1
+                raise PasswordHasherBusy("Too many password checks in progress")
+            self._queued += 1
+            self._submitted += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hash"
+                )
+        return self._executor.submit(self._run, time.perf_counter(), fn, *args)
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a call on the pool, blocking the calling thread until it is done."""
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a call on the pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def _run(self, enqueued: float, fn: Callable[..., T], *args: Any) -> T:
+        """Run one job on a worker thread, recording its wait and run time."""
+        started = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+            self._wait_total += started - enqueued
+            self._wait_max = max(self._wait_max, started - enqueued)
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+                self._work_total += time.perf_counter() - started
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads; the pool starts new ones if used again."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the pool counters.
+
+        Returns:
+            Dict with workers, queued, active, submitted, completed, rejected
+            and wait/work times in seconds
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self._queued,
+                "active": self._active,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "wait_seconds_total": round(self._wait_total, 6),
+                "wait_seconds_max": round(self._wait_max, 6),
+                "work_seconds_total": round(self._work_total, 6)
+            }
+
+
+password_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
+
+
+def _checkpw(plain_password: str, hashed_password: str) -> bool:
+    """Check a password with bcrypt."""
+    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+
+def _hashpw(password: str) -> str:
+    """Hash a password with bcrypt at the configured cost."""
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    password_byte_enc = plain_password.encode('utf-8')
-    # hashed_password might be string, need bytes
-    hashed_password_byte_enc = hashed_password.encode('utf-8')
-    return bcrypt.checkpw(password_byte_enc, hashed_password_byte_enc)
+    """Verify a password against its hash on the password pool."""
+    return password_pool.run(_checkpw, plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password."""
-    pwd_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(pwd_bytes, salt)
-    return hashed_password.decode('utf-8')
+    """Hash a password on the password pool."""
+    return password_pool.run(_hashpw, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash without blocking the event loop."""
+    return await password_pool.run_async(_checkpw, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop."""
+    return await password_pool.run_async(_hashpw, password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Check whether a hash was made with a cost other than BCRYPT_ROUNDS.
+
+    Args:
+        hashed_password: bcrypt hash ("$2b$<cost>$<salt and digest>")
+
+    Returns:
+        True if the password should be hashed again
+    """
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
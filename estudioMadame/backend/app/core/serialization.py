@@ -0,0 +1,112 @@
+"""
+Bulk JSON serialization of API responses.
+
+List endpoints validate their rows with a single TypeAdapter call and encode
+them to JSON in pydantic-core, instead of validating each item in Python and
+having FastAPI walk the result again with jsonable_encoder.
+
+The encoders, and TimedJSONResponse used for every other endpoint, report
+their run time to the request instrumentation as serialization time.
+"""
+from functools import lru_cache
+from typing import Any, Iterable, Optional, Type
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.instrumentation import timed_serialization
+
+_any_adapter = TypeAdapter(Any)
+
+
+class JSONBytesResponse(Response):
+    """Response whose body is already encoded JSON."""
+
+    media_type = "application/json"
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse whose encoding counts as serialization time."""
+
+    @timed_serialization
+    def render(self, content: Any) -> bytes:
+        return super().render(content)
+
+
+@lru_cache(maxsize=None)
+def _model_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter of one schema, built once per schema."""
+    return TypeAdapter(schema)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter of a list of a schema, built once per schema."""
+    return TypeAdapter(list[schema])
+
+
+@timed_serialization
+def encode_model(schema: Type[BaseModel], obj: Any) -> bytes:
+    """
+    Validate an object (ORM instance or dict) against a schema and encode it.
+
+    Returns:
+        JSON bytes, with field aliases as FastAPI would render them
+    """
+    adapter = _model_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(obj, from_attributes=True), by_alias=True)
+
+
+@timed_serialization
+def encode_list(schema: Type[BaseModel], items: Iterable[Any]) -> bytes:
+    """
+    Validate and encode a list of objects in one pydantic-core call.
+
+    Returns:
+        JSON array bytes
+    """
+    adapter = _list_adapter(schema)
+    return adapter.dump_json(
+        adapter.validate_python(list(items), from_attributes=True), by_alias=True
+    )
+
+
+@timed_serialization
+def encode_envelope(data: bytes, meta: Optional[Any] = None) -> bytes:
+    """
+    Wrap encoded data in the API envelope ({"data": ..., "meta": ...}).
+
+    Args:
+        data: Encoded JSON of the data member
+        meta: Meta model or dict, omitted when None
+
+    Returns:
+        JSON bytes
+    """
+    if meta is None:
+        return b'{"data":' + data + b"}"
+    if isinstance(meta, BaseModel):
+        encoded_meta = meta.__pydantic_serializer__.to_json(meta, by_alias=True)
+    else:
+        encoded_meta = _any_adapter.dump_json(meta)
+    return b'{"data":' + data + b',"meta":' + encoded_meta + b"}"
+
+
+def envelope_response(
+    schema: Type[BaseModel],
+    items: Iterable[Any],
+    meta: Optional[Any] = None
+) -> JSONBytesResponse:
+    """
+    Build a list response in the API envelope.
+
+    Args:
+        schema: Schema of each item
+        items: ORM instances or dicts
+        meta: Pagination meta
+
+    Returns:
+        Response with the pre-encoded body
+    """
+    return JSONBytesResponse(encode_envelope(encode_list(schema, items), meta))
@@ -0,0 +1,141 @@
+"""
+Incremental JSON parsing of request bodies.
+
+Large payloads are parsed record by record as their chunks arrive, so the
+whole body never has to be held in memory as text and as parsed objects.
+"""
+import codecs
+import json
+from typing import Iterable, Iterator
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+def iter_json_records(chunks: Iterable[bytes]) -> Iterator[dict]:
+    """
+    Parse a stream of JSON objects.
+
+    The body is either a JSON array of objects or NDJSON (one object per
+    line); the format is detected from its first character.
+
+    Args:
+        chunks: UTF-8 encoded body chunks, of any size
+
+    Yields:
+        Each object in order
+
+    Raises:
+        ValueError: If the body is not valid JSON or holds something other than objects
+    """
+    text = _iter_text(chunks)
+    buffer = ""
+    for piece in text:
+        buffer += piece
+        stripped = buffer.lstrip(_WHITESPACE)
+        if stripped:
+            buffer = stripped
+            break
+    else:
+        return
+
+    if buffer[0] == "[":
+        yield from _iter_array(buffer[1:], text)
+    else:
+        yield from _iter_lines(buffer, text)
+
+
+def _iter_text(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Decode UTF-8 chunks, keeping multi-byte characters split across chunks intact."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        for chunk in chunks:
+            if chunk:
+                yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+    except UnicodeDecodeError as e:
+        raise ValueError(f"Body is not valid UTF-8: {e}") from e
+
+
+def _iter_lines(buffer: str, text: Iterator[str]) -> Iterator[dict]:
+    """Parse NDJSON, one object per non-blank line."""
+    index = 0
+    while True:
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if line.strip():
+                yield _record(_loads(line, index), index)
+                index += 1
+        piece = next(text, None)
+        if piece is None:
+            break
+        buffer += piece
+
+    if buffer.strip():
+        yield _record(_loads(buffer, index), index)
+
+
+def _iter_array(buffer: str, text: Iterator[str]) -> Iterator[dict]:
+    """Parse the items of a JSON array whose opening bracket was consumed."""
+    index = 0
+    position = 0
+    expect_comma = False
+    exhausted = False
+    while True:
+        position = _skip_whitespace(buffer, position)
+        if position < len(buffer):
+            if buffer[position] == "]" and (index == 0 or expect_comma):
+                rest = buffer[position + 1:] + ("" if exhausted else "".join(text))
+                if rest.strip(_WHITESPACE):
+                    raise ValueError("Unexpected data after the JSON array")
+                return
+
+            if expect_comma:
+                if buffer[position] != ",":
+                    raise ValueError(f"Expected ',' or ']' after record {index - 1}")
+                position += 1
+                expect_comma = False
+                continue
+
+            try:
+                value, position = _decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                # The record may just be cut at the end of the buffer
+                if exhausted:
+                    raise ValueError(f"Invalid JSON in record {index}: {e.msg}") from e
+            else:
+                yield _record(value, index)
+                index += 1
+                expect_comma = True
+                continue
+
+        if exhausted:
+            raise ValueError("Unterminated JSON array")
+        piece = next(text, None)
+        if piece is None:
+            exhausted = True
+        else:
+            # Drop consumed text so the buffer only holds the current record
+            buffer, position = buffer[position:] + piece, 0
+
+
+def _skip_whitespace(buffer: str, position: int) -> int:
+    """Return the position of the next non-whitespace character."""
+    while position < len(buffer) and buffer[position] in _WHITESPACE:
+        position += 1
+    return position
+
+
+def _loads(line: str, index: int) -> object:
+    """Parse one NDJSON line."""
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in record {index}: {e.msg}") from e
+
+
+def _record(value: object, index: int) -> dict:
+    """Check a parsed value is a JSON object."""
+    if not isinstance(value, dict):
+        raise ValueError(f"Record {index} is not a JSON object")
+    return value
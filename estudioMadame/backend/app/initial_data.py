@@ -16,6 +16,11 @@
 from app.models.photo import Photo
 from app.models.approval import Approval
 from app.models.google_drive_integration import GoogleDriveIntegration
+from app.models.sync_job import SyncJob
+from app.models.job import Job
+
+# Full-text search indexes are created along with the tables
+import app.core.search  # noqa: F401
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -2,10 +2,16 @@
 FastAPI main application.
 """
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.core.config import settings
+from app.core.database import async_engine
+from app.core.instrumentation import InstrumentationMiddleware, request_metrics
+from app.core.metrics import database_pool_metrics, password_pool_metrics, render_metrics
+from app.core.security import PasswordHasherBusy, password_pool
+from app.core.serialization import TimedJSONResponse
 from app.api.v1.endpoints import (
     auth, 
     client_controller, 
@@ -13,9 +19,14 @@
     photo_controller, 
     approval_controller,
     integration_controller,
-    dashboard_controller
+    dashboard_controller,
+    search_controller,
+    job_controller
 )
 from app.initial_data import main as init_data
+from app.services.derivatives import derivative_pool
+from app.services.jobs import job_metrics, job_runner
+from app.services.sync import sync_dispatcher
 
 
 @asynccontextmanager
@@ -29,16 +40,28 @@ async def lifespan(app: FastAPI):
         init_data()
     except Exception as e:
         print(f"Error during startup data initialization: {e}")
-    
+
+    # Fails sync jobs whose worker died, now and periodically
+    sync_dispatcher.start()
+
+    # Picks up the jobs queued before a restart
+    job_runner.start()
+
     yield
-    # Shutdown logic (if any) could go here
+    # Shutdown: stop sync workers, running jobs are failed once stale
+    sync_dispatcher.shutdown(wait=False)
+    password_pool.shutdown(wait=False)
+    derivative_pool.shutdown(wait=False)
+    job_runner.shutdown(wait=False)
+    await async_engine.dispose()
 
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     debug=settings.DEBUG,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse
 )
 
 # CORS
@@ -50,6 +73,19 @@ async def lifespan(app: FastAPI):
     allow_headers=["*"],
 )
 
+# Added last so it wraps the other middleware and times the whole request
+app.add_middleware(InstrumentationMiddleware)
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """Ask clients to retry when the password hashing queue is full"""
+    return JSONResponse(
+        status_code=503,
+        content={"error": str(exc)},
+        headers={"Retry-After": "1"}
+    )
+
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(client_controller.router)
@@ -58,6 +94,8 @@ async def lifespan(app: FastAPI):
 app.include_router(approval_controller.router)
 app.include_router(integration_controller.router)
 app.include_router(dashboard_controller.router)
+app.include_router(search_controller.router)
+app.include_router(job_controller.router)
 
 
 @app.get("/")
@@ -74,3 +112,13 @@ async def root():
 async def health():
     """Health check endpoint"""
     return {"status": "healthy"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics endpoint"""
+    return (
+        render_metrics([*database_pool_metrics(), *password_pool_metrics(), *job_runner.metrics()])
+        + request_metrics.render()
+        + job_metrics.render()
+    )
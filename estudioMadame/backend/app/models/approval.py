@@ -4,7 +4,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, String, DateTime, Integer, Enum, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, Enum, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.core.database import Base
@@ -12,9 +12,15 @@
 
 class Approval(Base):
     __tablename__ = "approvals"
+    __table_args__ = (
+        # A client's approvals, most recently updated first
+        Index("ix_approvals_client_id_updated_at", "client_id", "updated_at", "id"),
+        # Default listing order, id breaks ties for keyset pagination
+        Index("ix_approvals_updated_at_id", "updated_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    gallery_id = Column(UUID(as_uuid=True), ForeignKey("galleries.id"), nullable=False)
+    gallery_id = Column(UUID(as_uuid=True), ForeignKey("galleries.id"), nullable=False, index=True)
     gallery_name = Column(String, nullable=False)
     client_id = Column(UUID(as_uuid=True), ForeignKey("clients.id"), nullable=False)
     client_name = Column(String, nullable=False)
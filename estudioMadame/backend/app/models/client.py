@@ -4,7 +4,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.core.database import Base
@@ -12,6 +12,10 @@
 
 class Client(Base):
     __tablename__ = "clients"
+    __table_args__ = (
+        # Listing order, id breaks ties for keyset pagination
+        Index("ix_clients_created_at_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
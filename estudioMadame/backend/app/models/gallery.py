@@ -3,8 +3,11 @@
 """
 import uuid
 from datetime import datetime
+from typing import Union
 
-from sqlalchemy import Column, String, DateTime, Integer, Boolean, Enum, ForeignKey, JSON, Date
+from sqlalchemy import Column, String, DateTime, Integer, BigInteger, Boolean, Enum, ForeignKey, JSON, Date, Index, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.core.database import Base
@@ -12,6 +15,14 @@
 
 class Gallery(Base):
     __tablename__ = "galleries"
+    __table_args__ = (
+        # Status tabs sorted by creation date
+        Index("ix_galleries_status_date_created", "status", "date_created", "id"),
+        # A client's galleries, newest first
+        Index("ix_galleries_client_id_date_created", "client_id", "date_created", "id"),
+        # Default listing order, id breaks ties for keyset pagination
+        Index("ix_galleries_date_created_id", "date_created", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String, nullable=False)
@@ -32,15 +43,55 @@ class Gallery(Base):
     google_drive_folder_name = Column(String, nullable=True)
     auto_sync_enabled = Column(Boolean, default=False, nullable=False)
     last_sync_at = Column(DateTime, nullable=True)
+    # Drive changes feed checkpoint; incremental syncs resume from it
+    google_drive_change_token = Column(String, nullable=True)
     sync_status = Column(
         Enum("idle", "syncing", "error", name="sync_status"),
         nullable=False,
         default="idle"
     )
 
+    # Denormalized photo counters, kept in sync with the photos table
+    # (see adjust_photo_counters and the Photo mapper events)
+    photo_count = Column(Integer, default=0, server_default="0", nullable=False, index=True)
+    selected_count = Column(Integer, default=0, server_default="0", nullable=False)
+    total_bytes = Column(BigInteger, default=0, server_default="0", nullable=False)
+    # Bumped on every write to the gallery's photos; part of the public ETags
+    photo_version = Column(Integer, default=0, server_default="0", nullable=False)
+
     # Settings stored as JSON
     settings = Column(JSON, nullable=True)
 
     # Timestamps
     date_created = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+def adjust_photo_counters(
+    connection: Union[Connection, Session],
+    gallery_id: uuid.UUID,
+    photos: int = 0,
+    selected: int = 0,
+    total_bytes: int = 0
+) -> None:
+    """
+    Apply a relative change to a gallery's photo counters.
+
+    Runs as a single UPDATE on the given connection so it joins the caller's
+    transaction; concurrent writers increment instead of overwriting each other.
+    Outside a flush, pass the session itself: its commit hooks then see the
+    write (e.g. to invalidate caches, see app.core.cache).
+    The gallery's photo_version is bumped even when every delta is zero, so
+    callers report photo updates that leave the counters unchanged too.
+    """
+    table = Gallery.__table__
+    connection.execute(
+        update(table)
+        .where(table.c.id == gallery_id)
+        .values(
+            photo_count=table.c.photo_count + photos,
+            selected_count=table.c.selected_count + selected,
+            total_bytes=table.c.total_bytes + total_bytes,
+            photo_version=table.c.photo_version + 1
+        )
+    )
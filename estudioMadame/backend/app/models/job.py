@@ -0,0 +1,40 @@
+"""
+Background job model.
+"""
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, String, DateTime, Integer, Enum, JSON, Index
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Due jobs, oldest first: what the workers poll
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+        # Recently finished jobs, for the latency stats
+        Index("ix_jobs_finished_at", "finished_at"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(
+        Enum("queued", "running", "completed", "failed", name="job_status"),
+        nullable=False,
+        default="queued"
+    )
+
+    # Retries
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=5, nullable=False)
+    error = Column(String, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    run_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # not before
+    started_at = Column(DateTime, nullable=True)  # of the latest attempt
+    finished_at = Column(DateTime, nullable=True)
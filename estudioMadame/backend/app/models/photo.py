@@ -4,14 +4,21 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, String, DateTime, Integer, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, String, DateTime, Integer, Boolean, ForeignKey, JSON, Index, event, inspect
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.core.database import Base
+from app.models.gallery import adjust_photo_counters
 
 
 class Photo(Base):
     __tablename__ = "photos"
+    __table_args__ = (
+        # Selection filters and counts within a gallery
+        Index("ix_photos_gallery_id_selected_by_client", "gallery_id", "selected_by_client"),
+        # Gallery photo listing order, also used for keyset pagination
+        Index("ix_photos_gallery_id_file_name_id", "gallery_id", "file_name", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     gallery_id = Column(UUID(as_uuid=True), ForeignKey("galleries.id"), nullable=False)
@@ -38,3 +45,67 @@ class Photo(Base):
     # Timestamps
     created_in_drive = Column(DateTime, nullable=True)
     synced_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+@event.listens_for(Photo, "after_insert")
+def _count_inserted_photo(mapper, connection, target: Photo) -> None:
+    """Add a newly inserted photo to its gallery counters."""
+    adjust_photo_counters(
+        connection,
+        target.gallery_id,
+        photos=1,
+        selected=1 if target.selected_by_client else 0,
+        total_bytes=target.file_size or 0
+    )
+
+
+@event.listens_for(Photo, "after_update")
+def _count_updated_photo(mapper, connection, target: Photo) -> None:
+    """Move counters when a photo changes selection, size or gallery."""
+    state = inspect(target)
+    if not any(attr.history.has_changes() for attr in state.attrs):
+        return
+
+    gallery_history = state.attrs.gallery_id.history
+    selected_history = state.attrs.selected_by_client.history
+    size_history = state.attrs.file_size.history
+
+    old_gallery_id = gallery_history.deleted[0] if gallery_history.deleted else target.gallery_id
+    old_selected = selected_history.deleted[0] if selected_history.deleted else target.selected_by_client
+    old_size = size_history.deleted[0] if size_history.deleted else target.file_size
+
+    if old_gallery_id != target.gallery_id:
+        adjust_photo_counters(
+            connection,
+            old_gallery_id,
+            photos=-1,
+            selected=-1 if old_selected else 0,
+            total_bytes=-(old_size or 0)
+        )
+        adjust_photo_counters(
+            connection,
+            target.gallery_id,
+            photos=1,
+            selected=1 if target.selected_by_client else 0,
+            total_bytes=target.file_size or 0
+        )
+        return
+
+    adjust_photo_counters(
+        connection,
+        target.gallery_id,
+        selected=int(bool(target.selected_by_client)) - int(bool(old_selected)),
+        total_bytes=(target.file_size or 0) - (old_size or 0)
+    )
+
+
+@event.listens_for(Photo, "after_delete")
+def _count_deleted_photo(mapper, connection, target: Photo) -> None:
+    """Remove a deleted photo from its gallery counters."""
+    adjust_photo_counters(
+        connection,
+        target.gallery_id,
+        photos=-1,
+        selected=-1 if target.selected_by_client else 0,
+        total_bytes=-(target.file_size or 0)
+    )
@@ -0,0 +1,46 @@
+"""
+Sync job model.
+"""
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, String, DateTime, Integer, Enum, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
+
+class SyncJob(Base):
+    __tablename__ = "sync_jobs"
+    __table_args__ = (
+        # Latest / running job of a gallery
+        Index("ix_sync_jobs_gallery_id_started_at", "gallery_id", "started_at"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    gallery_id = Column(UUID(as_uuid=True), ForeignKey("galleries.id"), nullable=False)
+    requested_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
+    status = Column(
+        Enum("running", "completed", "failed", name="sync_job_status"),
+        nullable=False,
+        default="running"
+    )
+    mode = Column(
+        Enum("full", "incremental", name="sync_job_mode"),
+        nullable=False,
+        default="full"
+    )
+
+    # Progress
+    files_seen = Column(Integer, default=0, nullable=False)
+    photos_added = Column(Integer, default=0, nullable=False)
+    photos_updated = Column(Integer, default=0, nullable=False)
+    photos_removed = Column(Integer, default=0, nullable=False)
+    error = Column(String, nullable=True)
+
+    # Timestamps
+    started_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Bumped with every committed page; a running job without a recent
+    # heartbeat has lost its worker (see SyncService.start_sync)
+    heartbeat_at = Column(DateTime, default=datetime.utcnow, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
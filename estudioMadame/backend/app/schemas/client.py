@@ -35,6 +35,7 @@ class Client(ClientBase):
     phone: str | None = None
     avatar: str | None = None
     galleries_count: int = 0
+    photos_count: int = 0
     last_activity: datetime | None = None
     created_at: datetime
     updated_at: datetime
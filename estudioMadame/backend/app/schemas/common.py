@@ -1,6 +1,7 @@
 """
 Common schemas and enums.
 """
+import math
 from enum import Enum
 from pydantic import BaseModel, ConfigDict
 
@@ -54,15 +55,53 @@ class SortOrder(str, Enum):
     az = "az"
 
 
+class DerivativeSize(str, Enum):
+    """Photo derivative size enumeration."""
+    thumb = "thumb"
+    small = "small"
+    medium = "medium"
+    large = "large"
+
+
+class ImageFormat(str, Enum):
+    """Photo derivative format enumeration."""
+    webp = "webp"
+    jpeg = "jpeg"
+
+
 class PaginationMeta(BaseModel):
-    """Pagination metadata."""
+    """
+    Pagination metadata.
+
+    total and total_pages are None when the count was skipped
+    (include_total=false). next_cursor is set when more rows follow and can
+    be passed back as ?cursor= to fetch the next page at constant cost.
+    """
     page: int
     limit: int
-    total: int
-    total_pages: int
+    total: int | None = None
+    total_pages: int | None = None
+    next_cursor: str | None = None
 
     model_config = ConfigDict(from_attributes=True)
 
+    @classmethod
+    def build(
+        cls,
+        page: int,
+        limit: int,
+        total: int | None,
+        next_cursor: str | None = None
+    ) -> "PaginationMeta":
+        """Build pagination metadata, deriving total_pages from total."""
+        return cls(
+            page=page,
+            limit=limit,
+            total=total,
+            total_pages=math.ceil(total / limit) if total is not None else None,
+            next_cursor=next_cursor
+        )
+
 
 class ErrorDetail(BaseModel):
     """Error detail schema."""
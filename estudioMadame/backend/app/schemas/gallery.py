@@ -4,7 +4,7 @@
 from datetime import datetime, date
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 
 from app.schemas.common import GalleryStatus, SyncStatus, PrivacyLevel, GalleryLayout, SortOrder
 
@@ -132,10 +132,27 @@ class BulkActionResponse(BaseModel):
 
 
 class SyncJobResponse(BaseModel):
-    """Sync job response schema."""
-    sync_job_id: UUID
+    """
+    Sync job response schema.
+
+    status is the job status (running, completed, failed); when the gallery
+    has never been synced it falls back to the gallery sync_status and the
+    job fields are empty.
+    """
+    sync_job_id: UUID | None = Field(
+        default=None, validation_alias=AliasChoices("sync_job_id", "id")
+    )
     status: str
-    started_at: datetime
+    mode: str | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    files_seen: int = 0
+    photos_added: int = 0
+    photos_updated: int = 0
+    photos_removed: int = 0
+    error: str | None = None
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class GalleryAccessTokenRequest(BaseModel):
@@ -36,6 +36,20 @@ class PhotoCreate(PhotoBase):
     metadata: PhotoMetadata | None = None
 
 
+class PhotoIngest(PhotoBase):
+    """Schema of one photo in a bulk ingestion payload."""
+    google_drive_web_view_link: str | None = None
+    google_drive_thumbnail_link: str | None = None
+    google_drive_download_link: str | None = None
+    file_size: int = Field(ge=0)
+    mime_type: str
+    width: int | None = None
+    height: int | None = None
+    selected_by_client: bool = False
+    created_in_drive: datetime | None = None
+    metadata: PhotoMetadata | None = None
+
+
 class PhotoUpdate(BaseModel):
     """Schema for updating a photo."""
     google_drive_web_view_link: str | None = None
@@ -94,3 +108,22 @@ class PhotoSelectResponse(BaseModel):
     photo_id: UUID
     selected: bool
     current_selection_count: int
+
+
+class PhotoSelectionOperation(BaseModel):
+    """One select/deselect operation of a batch."""
+    photo_id: UUID
+    selected: bool
+
+
+class PhotoBatchSelectRequest(BaseModel):
+    """Batch photo selection request schema."""
+    gallery_access_token: str
+    operations: list[PhotoSelectionOperation] = Field(min_length=1, max_length=5000)
+
+
+class PhotoBatchSelectResponse(BaseModel):
+    """Batch photo selection response schema."""
+    gallery_id: UUID
+    changed: int
+    current_selection_count: int
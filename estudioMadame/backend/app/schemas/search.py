@@ -0,0 +1,23 @@
+"""
+Search schemas.
+"""
+from enum import Enum
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class SearchResultType(str, Enum):
+    """Kind of record a search result points to."""
+    gallery = "gallery"
+    client = "client"
+    approval = "approval"
+
+
+class SearchResult(BaseModel):
+    """One search hit, best matches have the highest score."""
+    type: SearchResultType
+    id: UUID
+    title: str
+    subtitle: str | None = None
+    score: float
@@ -1,17 +1,21 @@
 """
 Approval service.
 """
-from typing import List, Optional, Tuple
+from typing import Any, List, Optional, Tuple
 from uuid import UUID
 from datetime import datetime
 
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
 
 from app.services.base import BaseService
 from app.models.approval import Approval
-from app.models.photo import Photo
+from app.models.gallery import Gallery
 from app.models.client import Client
+from app.services.jobs import JobService
+from app.services.pagination import decode_cursor, keyset_filter, split_page
+from app.services.search import SearchService
 
 
 class ApprovalService(BaseService[Approval]):
@@ -26,47 +30,155 @@ def __init__(self, db: Session):
         """
         super().__init__(db, Approval)
 
+    def _metadata_select(self, live_counts: bool = False) -> Select:
+        """
+        Build a SELECT of approvals as schema-ready rows, with the client avatar.
+
+        Args:
+            live_counts: Take selected_count and total_count from the gallery
+                photo counters (the selection as it is now) instead of the
+                values stored on the approval (the selection when submitted)
+        """
+        selected_count, total_count = Approval.selected_count, Approval.total_count
+        if live_counts:
+            selected_count = func.coalesce(Gallery.selected_count, selected_count)
+            total_count = func.coalesce(Gallery.photo_count, total_count)
+
+        stmt = (
+            select(
+                Approval.id,
+                Approval.gallery_id,
+                Approval.gallery_name,
+                Approval.client_id,
+                Approval.client_name,
+                Client.avatar.label("client_avatar"),
+                Approval.status,
+                selected_count.label("selected_count"),
+                total_count.label("total_count"),
+                Approval.submitted_at,
+                Approval.updated_at
+            )
+            .outerjoin(Client, Client.id == Approval.client_id)
+        )
+        if live_counts:
+            stmt = stmt.outerjoin(Gallery, Gallery.id == Approval.gallery_id)
+        return stmt
+
+    def _filters(
+        self,
+        status: Optional[str],
+        search: Optional[str],
+        client_id: Optional[UUID]
+    ) -> List[Any]:
+        """Build the WHERE clauses of an approval listing."""
+        filters = []
+        if status:
+            filters.append(Approval.status == status)
+
+        if client_id:
+            filters.append(Approval.client_id == client_id)
+
+        matches = SearchService(self.db).filter(Approval, search)
+        if matches is not None:
+            filters.append(matches)
+        return filters
+
+    def _count(self, filters: List[Any]) -> int:
+        """Count the approvals matching filters."""
+        return self.db.execute(
+            select(func.count()).select_from(Approval).where(*filters)
+        ).scalar() or 0
+
+    def _paginate(self, stmt: Select, page: int, limit: int, cursor: Optional[str]) -> Select:
+        """
+        Order a listing by most recently updated and restrict it to one page.
+
+        One extra row is fetched so split_page can tell whether more follow.
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        stmt = stmt.order_by(Approval.updated_at.desc(), Approval.id.desc())
+        if cursor:
+            updated_at, last_id = decode_cursor(cursor, Approval.updated_at)
+            stmt = stmt.where(
+                keyset_filter(Approval.updated_at, Approval.id, updated_at, last_id, descending=True)
+            )
+        else:
+            stmt = stmt.offset((page - 1) * limit)
+        return stmt.limit(limit + 1)
+
     def list_approvals(
         self,
         page: int = 1,
         limit: int = 20,
         status: Optional[str] = None,
         search: Optional[str] = None,
-        client_id: Optional[UUID] = None
-    ) -> Tuple[List[Approval], int]:
+        client_id: Optional[UUID] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> Tuple[List[Approval], Optional[int], Optional[str]]:
         """
         List approvals with filters and pagination.
-        """
-        stmt = select(Approval)
 
-        if status:
-            stmt = stmt.where(Approval.status == status)
+        Approvals are ordered by most recently updated. When a cursor is
+        given, page is ignored and the approvals after the cursor are
+        returned (keyset).
 
-        if client_id:
-            stmt = stmt.where(Approval.client_id == client_id)
+        Returns:
+            Tuple of (approvals, total or None if skipped, next cursor or None)
 
-        if search:
-            search_term = f"%{search}%"
-            stmt = stmt.where(
-                or_(
-                    Approval.client_name.ilike(search_term),
-                    Approval.gallery_name.ilike(search_term)
-                )
-            )
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        filters = self._filters(status, search, client_id)
+        total = self._count(filters) if include_total else None
+
+        stmt = self._paginate(select(Approval).where(*filters), page, limit, cursor)
+        approvals, next_cursor = split_page(
+            self.db.execute(stmt).scalars().all(),
+            limit,
+            key=lambda approval: (approval.updated_at, approval.id)
+        )
+        return approvals, total, next_cursor
+
+    def list_with_metadata(
+        self,
+        page: int = 1,
+        limit: int = 20,
+        status: Optional[str] = None,
+        search: Optional[str] = None,
+        client_id: Optional[UUID] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        live_counts: bool = False
+    ) -> Tuple[List[dict], Optional[int], Optional[str]]:
+        """
+        List approvals as schema-ready dicts, client avatar included.
 
-        # Count total
-        count_stmt = select(func.count()).select_from(stmt.subquery())
-        total = self.db.execute(count_stmt).scalar() or 0
+        Same filters and order as list_approvals. The page comes from a
+        single query joining the clients (and the galleries for live
+        counts), plus one for the total, whatever the page size.
 
-        # Pagination
-        offset = (page - 1) * limit
-        stmt = stmt.offset(offset).limit(limit).order_by(Approval.updated_at.desc())
+        Args:
+            live_counts: See _metadata_select
+
+        Returns:
+            Tuple of (approval dicts, total or None if skipped, next cursor or None)
 
-        # Execute
-        result = self.db.execute(stmt)
-        approvals = result.scalars().all()
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        filters = self._filters(status, search, client_id)
+        total = self._count(filters) if include_total else None
 
-        return list(approvals), total
+        stmt = self._paginate(self._metadata_select(live_counts).where(*filters), page, limit, cursor)
+        rows, next_cursor = split_page(
+            [dict(row) for row in self.db.execute(stmt).mappings()],
+            limit,
+            key=lambda row: (row["updated_at"], row["id"])
+        )
+        return rows, total, next_cursor
 
     def submit_approval(
         self,
@@ -75,24 +187,23 @@ def submit_approval(
         """
         Submit an approval.
         Updates status based on selection and set submitted_at.
+
+        The counts are a snapshot of the gallery photo counters at submit
+        time and are not changed afterwards. A gallery.repair_counters job
+        is queued to rebuild the counters from the photos, so a drift does
+        not carry over to the live counts.
         """
         approval = self.get_by_id(approval_id)
         if not approval:
             return None
 
-        # Update counts from photos
-        selected_count = self.db.execute(
-            select(func.count(Photo.id)).where(
-                Photo.gallery_id == approval.gallery_id,
-                Photo.selected_by_client == True
-            )
-        ).scalar() or 0
-        
-        total_count = self.db.execute(
-            select(func.count(Photo.id)).where(
-                Photo.gallery_id == approval.gallery_id
+        # Update counts from the gallery photo counters
+        counts = self.db.execute(
+            select(Gallery.selected_count, Gallery.photo_count).where(
+                Gallery.id == approval.gallery_id
             )
-        ).scalar() or 0
+        ).first()
+        selected_count, total_count = counts if counts else (0, 0)
 
         approval.selected_count = selected_count
         approval.total_count = total_count
@@ -104,33 +215,24 @@ def submit_approval(
         # Usually it's complete if they finished selecting.
         approval.status = "complete" 
 
+        JobService(self.db).enqueue("gallery.repair_counters", {"gallery_id": str(approval.gallery_id)})
         self.db.commit()
         self.db.refresh(approval)
         return approval
 
-    def get_with_metadata(self, id: UUID) -> Optional[dict]:
+    def get_with_metadata(self, id: UUID, live_counts: bool = False) -> Optional[dict]:
         """
-        Get approval with extra metadata like client avatar.
+        Get an approval as a schema-ready dict, client avatar included.
+
+        Args:
+            id: Approval ID
+            live_counts: See _metadata_select
+
+        Returns:
+            Approval dict, or None if not found
         """
-        approval = self.get_by_id(id)
-        if not approval:
-            return None
-            
-        # Get client for avatar
-        client = self.db.get(Client, approval.client_id)
-        
-        # Return as dict for easy schema population
-        data = {
-            "id": approval.id,
-            "gallery_id": approval.gallery_id,
-            "gallery_name": approval.gallery_name,
-            "client_id": approval.client_id,
-            "client_name": approval.client_name,
-            "client_avatar": client.avatar if client else None,
-            "status": approval.status,
-            "selected_count": approval.selected_count,
-            "total_count": approval.total_count,
-            "submitted_at": approval.submitted_at,
-            "updated_at": approval.updated_at
-        }
-        return data
+        row = self.db.execute(
+            self._metadata_select(live_counts).where(Approval.id == id)
+        ).mappings().first()
+        return dict(row) if row else None
+
@@ -1,55 +1,82 @@
 """
 Authentication service for user login and token management.
+
+Runs on an AsyncSession (get_async_db); bcrypt work goes to the password pool.
 """
 from datetime import datetime, timedelta
 from uuid import UUID
 
 from jose import jwt, JWTError, ExpiredSignatureError
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.models.user import User
 from app.models.client import Client
-from app.core.security import verify_password, get_password_hash
+from app.core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    password_needs_rehash,
+    verify_password,
+    verify_password_async
+)
 
 
 class AuthService:
     """Service for authentication operations."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         """
         Initialize the authentication service.
 
         Args:
-            db: Database session
+            db: Async database session
         """
         self.db = db
 
-    def authenticate_user(self, email: str, password: str) -> User | None:
+    async def get_user_by_email(self, email: str) -> User | None:
         """
-        Authenticate a user with email and password.
+        Get a user by email.
 
         Args:
             email: User email
-            password: Plain text password
 
         Returns:
-            User if credentials are valid, None otherwise
+            User if found, None otherwise
         """
         stmt = select(User).where(User.email == email)
-        result = self.db.execute(stmt)
-        user = result.scalars().first()
+        return (await self.db.execute(stmt)).scalars().first()
 
-        if user is None:
-            return None
+    async def get_client_by_email(self, email: str) -> Client | None:
+        """
+        Get a client by email.
 
-        if not self.verify_password(password, user.hashed_password):
-            return None
+        Args:
+            email: Client email
+
+        Returns:
+            Client if found, None otherwise
+        """
+        stmt = select(Client).where(Client.email == email)
+        return (await self.db.execute(stmt)).scalars().first()
+
+    async def authenticate_user(self, email: str, password: str) -> User | None:
+        """
+        Authenticate a user with email and password.
+
+        Args:
+            email: User email
+            password: Plain text password
 
+        Returns:
+            User if credentials are valid, None otherwise
+        """
+        user = await self.get_user_by_email(email)
+        if user is None or not await self.check_password(user, password):
+            return None
         return user
 
-    def authenticate_client(self, email: str, password: str) -> Client | None:
+    async def authenticate_client(self, email: str, password: str) -> Client | None:
         """
         Authenticate a client with email and password.
 
@@ -60,17 +87,39 @@ def authenticate_client(self, email: str, password: str) -> Client | None:
         Returns:
             Client if credentials are valid, None otherwise
         """
-        stmt = select(Client).where(Client.email == email)
-        result = self.db.execute(stmt)
-        client = result.scalars().first()
-
-        if client is None:
+        client = await self.get_client_by_email(email)
+        if client is None or not await self.check_password(client, password):
             return None
+        return client
 
-        if not self.verify_password(password, client.hashed_password):
-            return None
+    async def check_password(self, principal: User | Client, password: str) -> bool:
+        """
+        Verify a password, upgrading its hash if BCRYPT_ROUNDS changed.
 
-        return client
+        Args:
+            principal: User or client whose password to check
+            password: Plain text password
+
+        Returns:
+            True if the password is valid
+        """
+        if not await verify_password_async(password, principal.hashed_password):
+            return False
+        if password_needs_rehash(principal.hashed_password):
+            await self.store_password_hash(principal, await get_password_hash_async(password))
+        return True
+
+    async def store_password_hash(self, principal: User | Client, hashed_password: str) -> None:
+        """
+        Save a new password hash.
+
+        Args:
+            principal: User or client to update
+            hashed_password: New bcrypt hash
+        """
+        principal.hashed_password = hashed_password
+        await self.db.commit()
+        await self.db.refresh(principal)
 
     def create_access_token(
         self,
@@ -1,10 +1,11 @@
 """
-Base service class for all services.
+Base service classes for all services.
 """
 from typing import Generic, TypeVar, Type
 from uuid import UUID
 
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.database import Base
@@ -107,3 +108,99 @@ def delete(self, id: UUID) -> bool:
         self.db.delete(instance)
         self.db.commit()
         return True
+
+
+class AsyncBaseService(Generic[T]):
+    """Generic base service class for CRUD operations on an AsyncSession."""
+
+    def __init__(self, db: AsyncSession, model: Type[T]):
+        """
+        Initialize the service.
+
+        Args:
+            db: Async database session
+            model: SQLAlchemy model class
+        """
+        self.db = db
+        self.model = model
+
+    async def get_by_id(self, id: UUID) -> T | None:
+        """
+        Get a record by ID.
+
+        Args:
+            id: Record ID
+
+        Returns:
+            Record if found, None otherwise
+        """
+        stmt = select(self.model).where(self.model.id == id)
+        result = await self.db.execute(stmt)
+        return result.scalars().first()
+
+    async def get_all(self) -> list[T]:
+        """
+        Get all records.
+
+        Returns:
+            List of all records
+        """
+        stmt = select(self.model)
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all())
+
+    async def create(self, data: dict) -> T:
+        """
+        Create a new record.
+
+        Args:
+            data: Record data
+
+        Returns:
+            Created record
+        """
+        instance = self.model(**data)
+        self.db.add(instance)
+        await self.db.commit()
+        await self.db.refresh(instance)
+        return instance
+
+    async def update(self, id: UUID, data: dict) -> T | None:
+        """
+        Update an existing record.
+
+        Args:
+            id: Record ID
+            data: Updated data
+
+        Returns:
+            Updated record if found, None otherwise
+        """
+        instance = await self.get_by_id(id)
+        if instance is None:
+            return None
+
+        for key, value in data.items():
+            setattr(instance, key, value)
+
+        await self.db.commit()
+        await self.db.refresh(instance)
+        return instance
+
+    async def delete(self, id: UUID) -> bool:
+        """
+        Delete a record.
+
+        Args:
+            id: Record ID
+
+        Returns:
+            True if deleted, False if not found
+        """
+        instance = await self.get_by_id(id)
+        if instance is None:
+            return False
+
+        await self.db.delete(instance)
+        await self.db.commit()
+        return True
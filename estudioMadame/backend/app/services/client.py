@@ -1,11 +1,116 @@
 """
 Client service.
+
+ClientService works on a sync Session; AsyncClientService serves the async
+client endpoints (get_async_db). Both build the same statements.
 """
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
 
-from app.services.base import BaseService
+from app.core.search import search_filter
+from app.services.base import AsyncBaseService, BaseService
 from app.models.client import Client
-from app.core.security import get_password_hash
+from app.models.gallery import Gallery
+from app.core.security import get_password_hash, get_password_hash_async
+from app.services.gallery import GalleryService
+from app.services.pagination import decode_cursor, keyset_filter, split_page
+
+
+def _stats_columns() -> List[Any]:
+    """Aggregates of a client's galleries, as exposed by the Client schema."""
+    return [
+        func.count(Gallery.id).label("galleries_count"),
+        func.coalesce(func.sum(Gallery.photo_count), 0).label("photos_count"),
+        func.max(Gallery.updated_at).label("last_activity")
+    ]
+
+
+def _with_stats(clients: Select) -> Select:
+    """
+    Wrap a SELECT of client columns with their gallery statistics.
+
+    The clients (already filtered and paginated) go in a subquery,
+    grouped with a LEFT JOIN on their galleries, so the aggregates only
+    cover the clients returned and clients without galleries still
+    appear, with zeros.
+
+    Args:
+        clients: SELECT of the client columns of the Client schema
+
+    Returns:
+        SELECT of schema-ready rows with galleries_count, photos_count
+        and last_activity, newest client first
+    """
+    page = clients.subquery()
+    return (
+        select(*page.c, *_stats_columns())
+        .outerjoin(Gallery, Gallery.client_id == page.c.id)
+        .group_by(*page.c)
+        .order_by(page.c.created_at.desc(), page.c.id.desc())
+    )
+
+
+def _profile_select() -> Select:
+    """Build a SELECT of the client columns exposed by the API."""
+    return select(
+        Client.id,
+        Client.name,
+        Client.email,
+        Client.phone,
+        Client.avatar,
+        Client.created_at,
+        Client.updated_at
+    )
+
+
+def _list_queries(
+    dialect: str,
+    page: int,
+    limit: int,
+    search: Optional[str],
+    cursor: Optional[str]
+) -> Tuple[Select, Select]:
+    """
+    Build the statements of a client listing.
+
+    Returns:
+        Tuple of (total count query, query of the page with statistics),
+        the page holding one extra row to tell if another follows
+
+    Raises:
+        ValueError: If the cursor is invalid
+    """
+    stmt = _profile_select()
+
+    matches = search_filter(Client.__table__, search, dialect)
+    if matches is not None:
+        stmt = stmt.where(matches)
+
+    count_stmt = select(func.count()).select_from(stmt.subquery())
+
+    stmt = stmt.order_by(Client.created_at.desc(), Client.id.desc())
+    if cursor:
+        created_at, last_id = decode_cursor(cursor, Client.created_at)
+        stmt = stmt.where(
+            keyset_filter(Client.created_at, Client.id, created_at, last_id, descending=True)
+        )
+    else:
+        stmt = stmt.offset((page - 1) * limit)
+    return count_stmt, _with_stats(stmt.limit(limit + 1))
+
+
+def _split_clients(rows: Any, limit: int) -> Tuple[List[dict], Optional[str]]:
+    """Split listing rows into the page of client dicts and the next cursor."""
+    return split_page(
+        [dict(row) for row in rows],
+        limit,
+        key=lambda client: (client["created_at"], client["id"])
+    )
 
 
 class ClientService(BaseService[Client]):
@@ -20,6 +125,68 @@ def __init__(self, db: Session):
         """
         super().__init__(db, Client)
 
+    def list_with_stats(
+        self,
+        page: int = 1,
+        limit: int = 10,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> Tuple[List[dict], Optional[int], Optional[str]]:
+        """
+        List clients as schema-ready dicts, with their gallery statistics.
+
+        Clients matching search, newest first. When a cursor is given, page
+        is ignored and the clients after the cursor are returned (keyset).
+        The page and its gallery counts, photo totals and last activity come
+        from a single grouped query, plus one for the total, whatever the
+        page size.
+
+        Returns:
+            Tuple of (client dicts, total or None if skipped, next cursor or None)
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        count_stmt, stmt = _list_queries(self.db.get_bind().dialect.name, page, limit, search, cursor)
+
+        total = None
+        if include_total:
+            total = self.db.execute(count_stmt).scalar() or 0
+
+        clients, next_cursor = _split_clients(self.db.execute(stmt).mappings(), limit)
+        return clients, total, next_cursor
+
+    def get_with_stats(self, id: UUID) -> Optional[dict]:
+        """
+        Get a client as a schema-ready dict, with its gallery statistics.
+
+        Args:
+            id: Client ID
+
+        Returns:
+            Client dict, or None if not found
+        """
+        stmt = _with_stats(_profile_select().where(Client.id == id))
+        row = self.db.execute(stmt).mappings().first()
+        return dict(row) if row else None
+
+    def gallery_stats(self, client_id: UUID) -> dict:
+        """
+        Get the gallery statistics of a client without reading the client row.
+
+        For callers that already hold the client, such as the authenticated
+        principal.
+
+        Args:
+            client_id: Client ID
+
+        Returns:
+            Dict with galleries_count, photos_count and last_activity
+        """
+        stmt = select(*_stats_columns()).where(Gallery.client_id == client_id)
+        return dict(self.db.execute(stmt).mappings().one())
+
     def create(self, data: dict) -> Client:
         """
         Create a new client with hashed password.
@@ -44,4 +211,121 @@ def update(self, id, data: dict) -> Client | None:
              password = data.pop("password")
              data["hashed_password"] = get_password_hash(password)
              
-        return super().update(id, data)
\ No newline at end of file
+        return super().update(id, data)
+
+
+class AsyncClientService(AsyncBaseService[Client]):
+    """Client operations on an AsyncSession, as ClientService."""
+
+    def __init__(self, db: AsyncSession):
+        """
+        Initialize the client service.
+
+        Args:
+            db: Async database session
+        """
+        super().__init__(db, Client)
+
+    async def list_with_stats(
+        self,
+        page: int = 1,
+        limit: int = 10,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> Tuple[List[dict], Optional[int], Optional[str]]:
+        """
+        List clients as schema-ready dicts, with their gallery statistics.
+
+        See ClientService.list_with_stats.
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        count_stmt, stmt = _list_queries(self.db.get_bind().dialect.name, page, limit, search, cursor)
+
+        total = None
+        if include_total:
+            total = (await self.db.execute(count_stmt)).scalar() or 0
+
+        clients, next_cursor = _split_clients((await self.db.execute(stmt)).mappings(), limit)
+        return clients, total, next_cursor
+
+    async def get_with_stats(self, id: UUID) -> Optional[dict]:
+        """
+        Get a client as a schema-ready dict, with its gallery statistics.
+
+        Args:
+            id: Client ID
+
+        Returns:
+            Client dict, or None if not found
+        """
+        stmt = _with_stats(_profile_select().where(Client.id == id))
+        row = (await self.db.execute(stmt)).mappings().first()
+        return dict(row) if row else None
+
+    async def gallery_stats(self, client_id: UUID) -> dict:
+        """
+        Get the gallery statistics of a client without reading the client row.
+
+        Args:
+            client_id: Client ID
+
+        Returns:
+            Dict with galleries_count, photos_count and last_activity
+        """
+        stmt = select(*_stats_columns()).where(Gallery.client_id == client_id)
+        return dict((await self.db.execute(stmt)).mappings().one())
+
+    async def list_galleries(self, client_id: UUID) -> List[Gallery]:
+        """
+        List all galleries of a client, enriched with client_name.
+
+        Args:
+            client_id: Client ID
+
+        Returns:
+            Galleries, newest first (see GalleryService.list_by_client)
+        """
+        return await self.db.run_sync(lambda session: GalleryService(session).list_by_client(client_id))
+
+    async def email_taken(self, email: str, exclude_id: Optional[UUID] = None) -> bool:
+        """
+        Check whether another client already uses an email.
+
+        Args:
+            email: Email to look up
+            exclude_id: Client allowed to hold it (the one being updated)
+
+        Returns:
+            True if the email belongs to another client
+        """
+        stmt = select(Client.id).where(Client.email == email)
+        if exclude_id is not None:
+            stmt = stmt.where(Client.id != exclude_id)
+        return (await self.db.execute(stmt.limit(1))).first() is not None
+
+    async def create(self, data: dict) -> Client:
+        """
+        Create a new client with hashed password.
+
+        Args:
+            data: Client data
+
+        Returns:
+            Created client
+        """
+        if "password" in data:
+            data["hashed_password"] = await get_password_hash_async(data.pop("password"))
+
+        return await super().create(data)
+
+    async def update(self, id: UUID, data: dict) -> Client | None:
+        """
+        Update a client, hashing password if provided.
+        """
+        if "password" in data:
+            data["hashed_password"] = await get_password_hash_async(data.pop("password"))
+
+        return await super().update(id, data)
@@ -1,17 +1,26 @@
 """
 Dashboard service.
 """
+import math
 from typing import List, Any
 from datetime import datetime
 
 from sqlalchemy import select, func, or_
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache, invalidate_on_commit
+from app.core.config import settings
 from app.models.gallery import Gallery
 from app.models.client import Client
 from app.models.photo import Photo
 
 
+# Per-process cache of dashboard results, cleared when a transaction that
+# writes galleries, photos or clients commits
+dashboard_cache = TTLCache("dashboard", ttl=settings.DASHBOARD_CACHE_TTL_SECONDS)
+invalidate_on_commit(dashboard_cache, Gallery, Photo, Client)
+
+
 class DashboardService:
     """Service for dashboard operations."""
 
@@ -26,24 +35,27 @@ def __init__(self, db: Session):
 
     def get_stats(self) -> dict:
         """
-        Get dashboard statistics.
+        Get dashboard statistics, served from the dashboard cache.
         """
-        # Active galleries: published or client_selection
-        active_galleries = self.db.execute(
-            select(func.count(Gallery.id)).where(
-                Gallery.status.in_(["published", "client_selection"])
-            )
-        ).scalar() or 0
+        return dashboard_cache.get_or_set(("stats",), self._compute_stats)
 
-        # Total clients
-        total_clients = self.db.execute(
-            select(func.count(Client.id))
-        ).scalar() or 0
-
-        # Storage used (sum of photo sizes)
-        storage_used = self.db.execute(
-            select(func.sum(Photo.file_size))
-        ).scalar() or 0
+    def _compute_stats(self) -> dict:
+        """
+        Compute dashboard statistics in a single query.
+        """
+        total_clients = select(func.count(Client.id)).scalar_subquery()
+        stmt = select(
+            # Active galleries: published or client_selection
+            func.count(Gallery.id).filter(
+                Gallery.status.in_(["published", "client_selection"])
+            ),
+            # Storage used (sum of the per-gallery byte counters)
+            func.coalesce(func.sum(Gallery.total_bytes), 0),
+            total_clients
+        )
+        active_galleries, storage_used, total_clients = self.db.execute(stmt).one()
+        active_galleries = active_galleries or 0
+        total_clients = total_clients or 0
 
         # Total storage (hardcoded limit for now, e.g., 100GB)
         storage_total = 100 * 1024 * 1024 * 1024 # 100 GB
@@ -62,7 +74,16 @@ def get_stats(self) -> dict:
 
     def get_recent_galleries(self, limit: int = 10, status_filter: str = "all") -> List[dict]:
         """
-        Get recent galleries for dashboard.
+        Get recent galleries for dashboard, served from the dashboard cache.
+        """
+        return dashboard_cache.get_or_set(
+            ("recent_galleries", limit, status_filter),
+            lambda: self._compute_recent_galleries(limit, status_filter)
+        )
+
+    def _compute_recent_galleries(self, limit: int, status_filter: str) -> List[dict]:
+        """
+        Load recent galleries with their counters in a single query.
         """
         stmt = select(Gallery)
 
@@ -89,23 +110,14 @@ def get_recent_galleries(self, limit: int = 10, status_filter: str = "all") -> L
             elif g.status == "draft":
                 dashboard_status = "Editing"
 
-            # Photo count and size
-            photo_stats = self.db.execute(
-                select(func.count(Photo.id), func.sum(Photo.file_size))
-                .where(Photo.gallery_id == g.id)
-            ).first()
-            
-            photo_count = photo_stats[0] or 0
-            total_size = photo_stats[1] or 0
-
             result.append({
                 "id": g.id,
                 "title": g.title,
                 "date": g.date_created.strftime("%Y-%m-%d"),
                 "image": g.cover_image,
                 "status": dashboard_status,
-                "photos": photo_count,
-                "size": self._format_size(total_size)
+                "photos": g.photo_count,
+                "size": self._format_size(g.total_bytes)
             })
             
         return result
@@ -115,7 +127,6 @@ def _format_size(self, size_bytes: int) -> str:
         if size_bytes == 0:
             return "0 B"
         size_name = ("B", "KB", "MB", "GB", "TB")
-        import math
         i = int(math.floor(math.log(size_bytes, 1024)))
         p = math.pow(1024, i)
         s = round(size_bytes / p, 1)
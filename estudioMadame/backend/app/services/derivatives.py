@@ -0,0 +1,370 @@
+"""
+Image derivatives (thumbnails and display sizes) of photos.
+
+The first request for a derivative of a photo fetches the original through
+an ImageSource, decodes it once and renders every size in the requested
+format with Pillow. The files go to the content-addressed DerivativeCache,
+keyed on the SHA-256 of the original, and the photo's width, height and
+photo_metadata (EXIF fields and the original's digest) are filled in on the
+way. Later requests are served from disk without fetching the original.
+
+Rendering runs on a bounded worker pool; concurrent requests for the same
+photo and format share one job.
+"""
+import hashlib
+import io
+import math
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.derivative_cache import DerivativeCache, derivative_key
+from app.models.photo import Photo
+from app.services.image_source import ImageSource, get_image_source
+
+# Longest edge in pixels of each derivative size; originals are never upscaled
+DERIVATIVE_SIZES = {"thumb": 320, "small": 640, "medium": 1280, "large": 2048}
+
+DERIVATIVE_MEDIA_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+_QUALITY = {"webp": 80, "jpeg": 82}
+
+# Part of every cache key; bump it when the rendering changes
+PIPELINE_VERSION = 1
+
+SourceFactory = Callable[[Session], ImageSource]
+
+# EXIF tags copied to photo_metadata
+_EXIF_IFD = 0x8769
+_ORIENTATION = 0x0112
+_MAKE, _MODEL = 0x010F, 0x0110
+_EXIF_FIELDS = {
+    "lens": 0xA434,
+    "iso": 0x8827,
+    "f_number": 0x829D,
+    "exposure_time": 0x829A,
+    "focal_length": 0x920A,
+    "taken_at": 0x9003,
+}
+
+
+class DerivativesUnavailable(Exception):
+    """Raised when derivatives cannot be rendered because Pillow is not installed."""
+
+
+class DerivativeError(Exception):
+    """Raised when the original of a photo cannot be decoded."""
+
+
+def render_derivatives(data: bytes, image_format: str) -> Tuple[dict, Dict[str, bytes]]:
+    """
+    Decode an original and render every derivative size.
+
+    Args:
+        data: Original image file
+        image_format: Output format, a key of DERIVATIVE_MEDIA_TYPES
+
+    Returns:
+        Tuple of (info with width, height and EXIF metadata, size name -> encoded file)
+
+    Raises:
+        DerivativesUnavailable: If Pillow is not installed
+        DerivativeError: If the original is not a readable image
+    """
+    try:
+        # Imported lazily so the app starts without Pillow
+        from PIL import Image, ImageOps
+    except ImportError as e:
+        raise DerivativesUnavailable("Pillow is not installed") from e
+
+    try:
+        with Image.open(io.BytesIO(data)) as original:
+            info = _image_info(original)
+
+            # JPEGs can decode at 1/2, 1/4 or 1/8 scale, much cheaper than
+            # full size when even the largest derivative is smaller
+            scale = max(DERIVATIVE_SIZES.values()) / max(original.size)
+            if scale < 1:
+                original.draft("RGB", (math.ceil(original.width * scale), math.ceil(original.height * scale)))
+
+            image = ImageOps.exif_transpose(original)
+            if image.mode not in ("RGB", "RGBA"):
+                has_alpha = "A" in image.getbands() or "transparency" in image.info
+                image = image.convert("RGBA" if has_alpha else "RGB")
+            resized = image
+
+            # Largest first, each size resized from the previous (cheaper)
+            # to dimensions computed from the full image (no rounding drift)
+            outputs = {}
+            for name, edge in sorted(DERIVATIVE_SIZES.items(), key=lambda item: -item[1]):
+                scale = min(1.0, edge / max(image.size))
+                target = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+                if resized.size != target:
+                    resized = resized.resize(target, Image.Resampling.LANCZOS, reducing_gap=2.0)
+                outputs[name] = _encode(resized, image_format)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise DerivativeError(f"Cannot decode image: {e}") from e
+
+    return info, outputs
+
+
+def _encode(image: Any, image_format: str) -> bytes:
+    """Encode an image as WebP or JPEG."""
+    buffer = io.BytesIO()
+    if image_format == "jpeg":
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        image.save(buffer, "JPEG", quality=_QUALITY["jpeg"], optimize=True, progressive=True)
+    else:
+        image.save(buffer, "WEBP", quality=_QUALITY["webp"], method=4)
+    return buffer.getvalue()
+
+
+def _image_info(image: Any) -> dict:
+    """Read the displayed size and the EXIF fields of an opened image."""
+    exif = image.getexif()
+    width, height = image.size
+    if exif.get(_ORIENTATION) in (5, 6, 7, 8):
+        # Rotated a quarter turn when displayed
+        width, height = height, width
+
+    metadata: Dict[str, Any] = {}
+    make, model = (str(exif.get(tag) or "").strip(" \x00") for tag in (_MAKE, _MODEL))
+    camera = model if model.startswith(make) else f"{make} {model}".strip()
+    if camera:
+        metadata["camera"] = camera
+
+    exif_ifd = exif.get_ifd(_EXIF_IFD)
+    for name, tag in _EXIF_FIELDS.items():
+        value = exif_ifd.get(tag)
+        if value is None or value == "":
+            continue
+        if name == "taken_at":
+            try:
+                value = datetime.strptime(str(value).strip(" \x00"), "%Y:%m:%d %H:%M:%S").isoformat()
+            except ValueError:
+                continue
+        elif name == "iso":
+            value = int(value[0] if isinstance(value, tuple) else value)
+        elif name in ("f_number", "focal_length"):
+            value = round(float(value), 2)
+        elif name == "exposure_time":
+            value = float(value)
+            value = f"1/{round(1 / value)}" if 0 < value < 1 else f"{value:g}"
+        else:
+            value = str(value).strip(" \x00")
+        metadata[name] = value
+
+    return {"width": width, "height": height, "metadata": metadata}
+
+
+def original_digest(photo: Photo) -> Optional[str]:
+    """
+    Digest of the original the photo's derivatives were rendered from.
+
+    Returns:
+        SHA-256 hex digest, or None if the photo was never rendered or its
+        Drive file changed since (its size differs)
+    """
+    original = (photo.photo_metadata or {}).get("original") or {}
+    if original.get("sha256") and original.get("file_size") == photo.file_size:
+        return original["sha256"]
+    return None
+
+
+class DerivativeService:
+    """Service rendering and storing the derivatives of a photo."""
+
+    def __init__(self, db: Session, source: ImageSource, cache: DerivativeCache):
+        """
+        Initialize the derivative service.
+
+        Args:
+            db: Database session
+            source: Store of the original images
+            cache: Disk cache the derivatives are written to
+        """
+        self.db = db
+        self.source = source
+        self.cache = cache
+
+    def generate(self, photo: Photo, image_format: str) -> str:
+        """
+        Render every size of a photo in one format and store them.
+
+        Also sets the photo's width, height and photo_metadata, and commits.
+
+        Returns:
+            SHA-256 digest of the original
+
+        Raises:
+            ImageSourceError: If the original cannot be fetched
+            DerivativesUnavailable: If Pillow is not installed
+            DerivativeError: If the original cannot be decoded
+        """
+        data = self.source.fetch(photo)
+        digest = hashlib.sha256(data).hexdigest()
+        info, outputs = render_derivatives(data, image_format)
+        for size, encoded in outputs.items():
+            self.cache.put(derivative_key(digest, size, image_format, PIPELINE_VERSION), image_format, encoded)
+
+        photo.width = info["width"]
+        photo.height = info["height"]
+        photo.photo_metadata = {
+            **(photo.photo_metadata or {}),
+            **info["metadata"],
+            "original": {"sha256": digest, "file_size": photo.file_size}
+        }
+        self.db.commit()
+        return digest
+
+
+class DerivativePool:
+    """Bounded pool of worker threads rendering derivatives."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        source_factory: SourceFactory = get_image_source,
+        cache: Optional[DerivativeCache] = None,
+        max_workers: Optional[int] = None,
+        inline: bool = False
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            session_factory: Creates the session each job runs in
+            source_factory: Builds the image source for a job
+            cache: Derivative cache (default one under DERIVATIVE_CACHE_DIR, created on first use)
+            max_workers: Worker threads (default DERIVATIVE_WORKERS)
+            inline: Run jobs synchronously in the caller's thread (tests)
+        """
+        self.session_factory = session_factory
+        self.source_factory = source_factory
+        self.max_workers = max_workers or settings.DERIVATIVE_WORKERS
+        self.inline = inline
+        self._cache = cache
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # (photo_id, format) -> job in progress
+        self._pending: Dict[Tuple[UUID, str], Future] = {}
+
+    @property
+    def cache(self) -> DerivativeCache:
+        """The derivative cache, created on first use."""
+        with self._lock:
+            if self._cache is None:
+                self._cache = DerivativeCache(
+                    settings.DERIVATIVE_CACHE_DIR, settings.DERIVATIVE_CACHE_MAX_BYTES
+                )
+            return self._cache
+
+    def lookup(self, photo: Photo, size: str, image_format: str) -> Optional[Tuple[str, Path]]:
+        """
+        Find an already rendered derivative.
+
+        Returns:
+            Tuple of (cache key, file path), or None if it must be rendered
+        """
+        digest = original_digest(photo)
+        if digest is None:
+            return None
+        key = derivative_key(digest, size, image_format, PIPELINE_VERSION)
+        path = self.cache.get(key, image_format)
+        return (key, path) if path is not None else None
+
+    def get(self, photo: Photo, size: str, image_format: str, timeout: Optional[float] = None) -> Tuple[str, Path]:
+        """
+        Get a derivative, rendering it on the pool if needed.
+
+        Args:
+            photo: Photo to render
+            size: Key of DERIVATIVE_SIZES
+            image_format: Key of DERIVATIVE_MEDIA_TYPES
+            timeout: Seconds to wait for the render (default DERIVATIVE_TIMEOUT_SECONDS)
+
+        Returns:
+            Tuple of (cache key, file path)
+
+        Raises:
+            TimeoutError: If the render takes longer than timeout
+            ImageSourceError, DerivativesUnavailable, DerivativeError: See DerivativeService.generate
+        """
+        found = self.lookup(photo, size, image_format)
+        if found is not None:
+            return found
+
+        digest = self.submit(photo.id, image_format).result(
+            timeout=timeout or settings.DERIVATIVE_TIMEOUT_SECONDS
+        )
+        key = derivative_key(digest, size, image_format, PIPELINE_VERSION)
+        path = self.cache.get(key, image_format)
+        if path is None:
+            raise DerivativeError("Derivative was evicted right after rendering, cache is too small")
+        return key, path
+
+    def submit(self, photo_id: UUID, image_format: str) -> Future:
+        """
+        Queue the rendering of a photo's derivatives in one format.
+
+        A render already queued or running for the same photo and format is
+        shared rather than started again.
+
+        Returns:
+            Future of the original's digest
+        """
+        if self.inline:
+            future: Future = Future()
+            try:
+                future.set_result(self.run(photo_id, image_format))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        job = (photo_id, image_format)
+        with self._lock:
+            if job in self._pending:
+                return self._pending[job]
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="derivatives"
+                )
+            future = self._executor.submit(self.run, photo_id, image_format)
+            self._pending[job] = future
+        future.add_done_callback(lambda _: self._forget(job))
+        return future
+
+    def _forget(self, job: Tuple[UUID, str]) -> None:
+        """Drop a finished job from the pending jobs."""
+        with self._lock:
+            self._pending.pop(job, None)
+
+    def run(self, photo_id: UUID, image_format: str) -> str:
+        """Render a photo's derivatives in a fresh session."""
+        db = self.session_factory()
+        try:
+            photo = db.get(Photo, photo_id)
+            if photo is None:
+                raise DerivativeError(f"Photo not found: {photo_id}")
+            return DerivativeService(db, self.source_factory(db), self.cache).generate(photo, image_format)
+        finally:
+            db.close()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+# Process-wide pool used by the API
+derivative_pool = DerivativePool()
@@ -0,0 +1,413 @@
+"""
+Google Drive adapters.
+
+Sync code talks to Drive through a DriveAdapter so it can run against the
+real API or against an in-memory fake (tests, local development and
+offline benchmarks). Files are plain dicts using the Drive v3 field names
+(id, name, mimeType, size, webViewLink, thumbnailLink, webContentLink,
+imageMediaMetadata, createdTime, parents, trashed) and changes follow the
+Drive changes feed (fileId, removed, file).
+"""
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.models.google_drive_integration import GoogleDriveIntegration
+
+
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+
+GOOGLE_REVOKE_URL = "https://oauth2.googleapis.com/revoke"
+
+FILE_FIELDS = (
+    "id, name, mimeType, size, webViewLink, thumbnailLink, webContentLink, "
+    "imageMediaMetadata(width, height), createdTime, parents, trashed"
+)
+
+
+class DriveError(Exception):
+    """Raised when Google Drive cannot be reached or refuses a request."""
+
+
+class DriveAdapter:
+    """Interface of the Drive operations used by the application."""
+
+    def list_files(
+        self,
+        folder_id: str,
+        page_token: Optional[str] = None,
+        page_size: int = 1000
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        List one page of the image files in a folder.
+
+        Args:
+            folder_id: Drive folder ID
+            page_token: Token returned by the previous page, None for the first
+            page_size: Maximum number of files in the page
+
+        Returns:
+            Tuple of (files, token of the next page or None)
+        """
+        raise NotImplementedError
+
+    def list_folders(
+        self,
+        parent_id: Optional[str] = None,
+        search: Optional[str] = None
+    ) -> List[dict]:
+        """
+        List folders, optionally inside a parent or matching a name.
+
+        Returns:
+            Folders with id, name, web_view_link and created_time
+        """
+        raise NotImplementedError
+
+    def get_start_page_token(self) -> str:
+        """
+        Get the changes feed token marking "now".
+
+        Changes made after this call are returned by list_changes(token).
+        """
+        raise NotImplementedError
+
+    def list_changes(
+        self,
+        page_token: str,
+        page_size: int = 1000
+    ) -> Tuple[List[dict], Optional[str], Optional[str]]:
+        """
+        List one page of the changes feed.
+
+        Args:
+            page_token: Checkpoint or next page token
+            page_size: Maximum number of changes in the page
+
+        Returns:
+            Tuple of (changes, next page token, new start token); exactly one
+            of the tokens is set, the new start token on the last page
+
+        Raises:
+            DriveError: If the token is invalid or expired
+        """
+        raise NotImplementedError
+
+    def download_file(self, file_id: str) -> bytes:
+        """
+        Download the content of a file.
+
+        Raises:
+            DriveError: If the file does not exist or cannot be read
+        """
+        raise NotImplementedError
+
+    def revoke(self, token: str) -> None:
+        """
+        Revoke an OAuth token, ending the access it grants to Drive.
+
+        Revoking a refresh token also revokes the access tokens issued from
+        it. A token rejected as invalid (already revoked or expired) counts
+        as revoked.
+
+        Args:
+            token: Refresh or access token
+
+        Raises:
+            DriveError: If the revocation cannot be confirmed
+        """
+        raise NotImplementedError
+
+
+class GoogleDriveAdapter(DriveAdapter):
+    """Adapter backed by the Google Drive v3 API."""
+
+    def __init__(self, integration: GoogleDriveIntegration):
+        """
+        Build a Drive client from a user's stored OAuth tokens.
+
+        Args:
+            integration: Google Drive integration of the user
+        """
+        # Imported lazily so the app starts without the Google client libraries
+        from google.oauth2.credentials import Credentials
+        from googleapiclient.discovery import build
+
+        credentials = Credentials(
+            token=integration.access_token,
+            refresh_token=integration.refresh_token,
+            token_uri="https://oauth2.googleapis.com/token",
+            client_id=settings.GOOGLE_CLIENT_ID,
+            client_secret=settings.GOOGLE_CLIENT_SECRET
+        )
+        self._service = build("drive", "v3", credentials=credentials, cache_discovery=False)
+        self._files = self._service.files()
+
+    def _execute(self, request) -> dict:
+        """Run a Drive request, turning API errors into DriveError."""
+        from googleapiclient.errors import HttpError
+
+        try:
+            return request.execute()
+        except HttpError as e:
+            raise DriveError(str(e)) from e
+
+    def list_files(
+        self,
+        folder_id: str,
+        page_token: Optional[str] = None,
+        page_size: int = 1000
+    ) -> Tuple[List[dict], Optional[str]]:
+        response = self._execute(self._files.list(
+            q=f"'{_quote(folder_id)}' in parents and trashed = false and mimeType contains 'image/'",
+            fields=f"nextPageToken, files({FILE_FIELDS})",
+            pageSize=page_size,
+            pageToken=page_token
+        ))
+        return response.get("files", []), response.get("nextPageToken")
+
+    def list_folders(
+        self,
+        parent_id: Optional[str] = None,
+        search: Optional[str] = None
+    ) -> List[dict]:
+        query = [f"mimeType = '{FOLDER_MIME_TYPE}'", "trashed = false"]
+        if parent_id:
+            query.append(f"'{_quote(parent_id)}' in parents")
+        if search:
+            query.append(f"name contains '{_quote(search)}'")
+
+        response = self._execute(self._files.list(
+            q=" and ".join(query),
+            fields="files(id, name, webViewLink, createdTime)",
+            orderBy="name",
+            pageSize=1000
+        ))
+        return [_folder(f) for f in response.get("files", [])]
+
+    def get_start_page_token(self) -> str:
+        response = self._execute(self._service.changes().getStartPageToken())
+        return response["startPageToken"]
+
+    def list_changes(
+        self,
+        page_token: str,
+        page_size: int = 1000
+    ) -> Tuple[List[dict], Optional[str], Optional[str]]:
+        response = self._execute(self._service.changes().list(
+            pageToken=page_token,
+            pageSize=page_size,
+            fields=f"nextPageToken, newStartPageToken, changes(fileId, removed, file({FILE_FIELDS}))"
+        ))
+        return (
+            response.get("changes", []),
+            response.get("nextPageToken"),
+            response.get("newStartPageToken")
+        )
+
+    def download_file(self, file_id: str) -> bytes:
+        return self._execute(self._files.get_media(fileId=file_id))
+
+    def revoke(self, token: str) -> None:
+        _revoke_at_google(token)
+
+
+class FakeDriveAdapter(DriveAdapter):
+    """In-memory Drive used by tests, local development and benchmarks."""
+
+    def __init__(self):
+        """Initialize an empty fake Drive."""
+        self._lock = threading.Lock()
+        self._folders: Dict[str, dict] = {}
+        self._files: Dict[str, Dict[str, dict]] = {}
+        self._changes: List[dict] = []
+        self._content: Dict[str, bytes] = {}
+        self.list_calls = 0
+        self.download_calls = 0
+        self.revoked_tokens: List[str] = []
+
+    def add_folder(self, folder_id: str, name: Optional[str] = None, parent_id: Optional[str] = None) -> None:
+        """Create an empty folder."""
+        with self._lock:
+            self._folders[folder_id] = {
+                "id": folder_id,
+                "name": name or folder_id,
+                "parent_id": parent_id,
+                "webViewLink": f"https://drive.google.com/drive/folders/{folder_id}",
+                "createdTime": "2024-01-01T00:00:00Z"
+            }
+            self._files.setdefault(folder_id, {})
+
+    def add_files(self, folder_id: str, files: Iterable[dict]) -> None:
+        """Add or replace files in a folder, creating the folder if needed."""
+        if folder_id not in self._folders:
+            self.add_folder(folder_id)
+        with self._lock:
+            for file in files:
+                file = {**file, "parents": [folder_id]}
+                self._files[folder_id][file["id"]] = file
+                self._changes.append({"fileId": file["id"], "removed": False, "file": file})
+
+    def set_content(self, file_id: str, data: bytes) -> None:
+        """Set the bytes returned when downloading a file."""
+        with self._lock:
+            self._content[file_id] = data
+
+    def remove_file(self, folder_id: str, file_id: str) -> None:
+        """Remove a file from a folder."""
+        with self._lock:
+            self._files[folder_id].pop(file_id, None)
+            self._changes.append({"fileId": file_id, "removed": True})
+
+    def generate_files(self, folder_id: str, count: int, prefix: str = "IMG") -> List[dict]:
+        """
+        Fill a folder with synthetic image files.
+
+        Returns:
+            The generated files
+        """
+        files = [
+            {
+                "id": f"{folder_id}-{prefix}-{i:06d}",
+                "name": f"{prefix}_{i:06d}.jpg",
+                "mimeType": "image/jpeg",
+                "size": str(2_000_000 + i),
+                "webViewLink": f"https://drive.google.com/file/d/{folder_id}-{i}/view",
+                "thumbnailLink": f"https://drive.google.com/thumbnail?id={folder_id}-{i}",
+                "webContentLink": f"https://drive.google.com/uc?id={folder_id}-{i}",
+                "imageMediaMetadata": {"width": 6000, "height": 4000},
+                "createdTime": "2024-01-01T12:00:00Z"
+            }
+            for i in range(count)
+        ]
+        self.add_files(folder_id, files)
+        return files
+
+    def list_files(
+        self,
+        folder_id: str,
+        page_token: Optional[str] = None,
+        page_size: int = 1000
+    ) -> Tuple[List[dict], Optional[str]]:
+        with self._lock:
+            self.list_calls += 1
+            if folder_id not in self._files:
+                raise DriveError(f"File not found: {folder_id}")
+            files = sorted(self._files[folder_id].values(), key=lambda f: f["id"])
+
+        start = int(page_token or 0)
+        end = start + page_size
+        return files[start:end], str(end) if end < len(files) else None
+
+    def list_folders(
+        self,
+        parent_id: Optional[str] = None,
+        search: Optional[str] = None
+    ) -> List[dict]:
+        with self._lock:
+            folders = list(self._folders.values())
+        if parent_id:
+            folders = [f for f in folders if f["parent_id"] == parent_id]
+        if search:
+            folders = [f for f in folders if search.lower() in f["name"].lower()]
+        return [_folder(f) for f in sorted(folders, key=lambda f: f["name"])]
+
+    def get_start_page_token(self) -> str:
+        with self._lock:
+            return str(len(self._changes))
+
+    def list_changes(
+        self,
+        page_token: str,
+        page_size: int = 1000
+    ) -> Tuple[List[dict], Optional[str], Optional[str]]:
+        with self._lock:
+            if not page_token.isdigit() or int(page_token) > len(self._changes):
+                raise DriveError(f"Invalid page token: {page_token}")
+            start = int(page_token)
+            end = min(start + page_size, len(self._changes))
+            changes = self._changes[start:end]
+            if end < len(self._changes):
+                return changes, str(end), None
+            return changes, None, str(end)
+
+    def download_file(self, file_id: str) -> bytes:
+        with self._lock:
+            self.download_calls += 1
+            if file_id not in self._content:
+                raise DriveError(f"File not found: {file_id}")
+            return self._content[file_id]
+
+    def revoke(self, token: str) -> None:
+        """Record a revoked OAuth token."""
+        with self._lock:
+            self.revoked_tokens.append(token)
+
+
+# Shared fake used when DRIVE_ADAPTER is "fake"
+fake_drive = FakeDriveAdapter()
+
+
+def get_drive_adapter(integration: Optional[GoogleDriveIntegration]) -> DriveAdapter:
+    """
+    Build the Drive adapter configured by DRIVE_ADAPTER.
+
+    Args:
+        integration: Google Drive integration whose tokens to use
+
+    Raises:
+        DriveError: If the Google adapter is configured and Drive is not connected
+    """
+    if settings.DRIVE_ADAPTER == "fake":
+        return fake_drive
+    if integration is None or integration.status != "active":
+        raise DriveError("Google Drive not connected")
+    return GoogleDriveAdapter(integration)
+
+
+def _quote(value: str) -> str:
+    """Escape a value for a Drive query string literal."""
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+
+def _folder(file: dict) -> dict:
+    """Map a Drive folder resource to the API folder shape."""
+    return {
+        "id": file["id"],
+        "name": file["name"],
+        "web_view_link": file.get("webViewLink"),
+        "created_time": file.get("createdTime")
+    }
+
+
+def revoke_token(token: str) -> None:
+    """
+    Revoke an OAuth token with the adapter configured by DRIVE_ADAPTER.
+
+    Unlike get_drive_adapter this needs no active integration, so it can
+    run after the integration was disconnected (see DriveAdapter.revoke).
+    """
+    if settings.DRIVE_ADAPTER == "fake":
+        fake_drive.revoke(token)
+    else:
+        _revoke_at_google(token)
+
+
+def _revoke_at_google(token: str) -> None:
+    """POST a token to Google's revocation endpoint."""
+    request = urllib.request.Request(
+        GOOGLE_REVOKE_URL,
+        data=urllib.parse.urlencode({"token": token}).encode(),
+        headers={"Content-Type": "application/x-www-form-urlencoded"}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10):
+            pass
+    except urllib.error.HTTPError as e:
+        if e.code != 400:
+            raise DriveError(f"Token revocation failed: HTTP {e.code}") from e
+    except urllib.error.URLError as e:
+        raise DriveError(f"Token revocation failed: {e.reason}") from e
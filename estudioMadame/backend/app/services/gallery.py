@@ -1,16 +1,21 @@
 """
 Gallery service.
 """
-from typing import List, Optional, Tuple, Any
+from typing import Iterable, List, Optional, Set, Tuple, Any
 from uuid import UUID
 
-from sqlalchemy import select, func, desc, asc, or_
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select, func, desc, asc, or_, update, delete
+from sqlalchemy.orm import Session
 
 from app.services.base import BaseService
+from app.services.jobs import job_handler
 from app.models.gallery import Gallery
 from app.models.client import Client
 from app.models.photo import Photo
+from app.models.approval import Approval
+from app.models.sync_job import SyncJob
+from app.services.pagination import decode_cursor, ensure_cursor_column, keyset_filter, split_page
+from app.services.search import SearchService
 
 
 class GalleryService(BaseService[Gallery]):
@@ -25,6 +30,26 @@ def __init__(self, db: Session):
         """
         super().__init__(db, Gallery)
 
+    def _enriched_select(self) -> Any:
+        """
+        Build a SELECT returning each gallery with its client name.
+        """
+        return (
+            select(Gallery, Client.name)
+            .outerjoin(Client, Gallery.client_id == Client.id)
+        )
+
+    def _hydrate(self, rows: Any) -> List[Gallery]:
+        """
+        Attach the computed client_name to each gallery.
+        Pydantic from_attributes will use it when building GallerySchema.
+        """
+        galleries = []
+        for gallery, client_name, *_ in rows:
+            gallery.client_name = client_name or "Unknown"
+            galleries.append(gallery)
+        return galleries
+
     def list_galleries(
         self,
         page: int = 1,
@@ -33,78 +58,259 @@ def list_galleries(
         client_id: Optional[UUID] = None,
         search: Optional[str] = None,
         sort_by: str = "date_created",
-        order: str = "desc"
-    ) -> Tuple[List[Gallery], int]:
+        order: str = "desc",
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> Tuple[List[Gallery], Optional[int], Optional[str]]:
         """
         List galleries with filters and pagination.
+
+        Galleries are returned with client_name already set, using a single
+        query for the page plus one for the total. When a cursor is given,
+        page is ignored and rows after the cursor are returned (keyset).
+
+        Returns:
+            Tuple of (galleries, total or None if skipped, next cursor or None)
+
+        Raises:
+            ValueError: If the cursor is invalid for this sort
         """
-        # Base query
-        stmt = select(Gallery).join(Client, Gallery.client_id == Client.id)
-        
         # Filters
+        filters = []
         if status:
-            stmt = stmt.where(Gallery.status == status)
-        
+            filters.append(Gallery.status == status)
+
         if client_id:
-            stmt = stmt.where(Gallery.client_id == client_id)
-            
+            filters.append(Gallery.client_id == client_id)
+
         if search:
-            search_term = f"%{search}%"
-            stmt = stmt.where(
-                or_(
-                    Gallery.title.ilike(search_term),
-                    Client.name.ilike(search_term)
+            # Full-text match on the gallery or on its client
+            search_service = SearchService(self.db)
+            gallery_match = search_service.filter(Gallery, search)
+            if gallery_match is not None:
+                client_match = search_service.filter(Client, search)
+                filters.append(
+                    or_(
+                        gallery_match,
+                        # Not correlated with the outer join on clients
+                        Gallery.client_id.in_(
+                            select(Client.id).where(client_match).correlate(None)
+                        )
+                    )
                 )
-            )
-            
+
         # Sorting
         sort_column = getattr(Gallery, sort_by, Gallery.date_created)
-        # Handle special sort fields if necessary (e.g., client_name)
         if sort_by == "client_name":
             sort_column = Client.name
-        elif sort_by == "photo_count":
-             # This is complex to sort by computed field in SQL efficiently without subquery
-             # For now, let's fallback to date_created if photo_count requested, 
-             # or implement subquery count.
-             # Implementing subquery for robust sorting:
-             photo_count_subq = (
-                select(func.count(Photo.id))
-                .where(Photo.gallery_id == Gallery.id)
-                .scalar_subquery()
+        descending = order != "asc"
+
+        # Count total
+        total = None
+        if include_total:
+            count_stmt = (
+                select(func.count(Gallery.id))
+                .outerjoin(Client, Gallery.client_id == Client.id)
+                .where(*filters)
             )
-             sort_column = photo_count_subq
+            total = self.db.execute(count_stmt).scalar() or 0
 
-        if order == "asc":
-            stmt = stmt.order_by(asc(sort_column))
-        else:
-            stmt = stmt.order_by(desc(sort_column))
+        stmt = (
+            self._enriched_select()
+            .add_columns(sort_column)
+            .where(*filters)
+        )
+        direction = desc if descending else asc
+        stmt = stmt.order_by(direction(sort_column), direction(Gallery.id))
 
-        # Count total
-        # We need a separate count query or use window function (but separate is portable)
-        count_stmt = select(func.count()).select_from(stmt.subquery())
-        total = self.db.execute(count_stmt).scalar() or 0
-        
         # Pagination
-        offset = (page - 1) * limit
-        stmt = stmt.offset(offset).limit(limit)
-        
+        if cursor:
+            ensure_cursor_column(sort_column)
+            sort_value, last_id = decode_cursor(cursor, sort_column)
+            stmt = stmt.where(
+                keyset_filter(sort_column, Gallery.id, sort_value, last_id, descending)
+            )
+        else:
+            stmt = stmt.offset((page - 1) * limit)
+        stmt = stmt.limit(limit + 1)
+
         # Execute
-        result = self.db.execute(stmt)
-        galleries = result.scalars().all()
-        
-        return list(galleries), total
+        rows, next_cursor = split_page(
+            self.db.execute(stmt).all(),
+            limit,
+            key=lambda row: (row[2], row[0].id)
+        )
+        return self._hydrate(rows), total, next_cursor
+
+    def list_by_client(self, client_id: UUID) -> List[Gallery]:
+        """
+        List all galleries of a client, enriched with client_name.
+        """
+        stmt = (
+            self._enriched_select()
+            .where(Gallery.client_id == client_id)
+            .order_by(desc(Gallery.date_created))
+        )
+        return self._hydrate(self.db.execute(stmt).all())
 
     def get_with_details(self, id: UUID) -> Optional[Gallery]:
         """
-        Get gallery with extra details (e.g. client loaded).
+        Get gallery with extra details (client_name) in one query.
+        """
+        stmt = self._enriched_select().where(Gallery.id == id)
+        galleries = self._hydrate(self.db.execute(stmt).all())
+        return galleries[0] if galleries else None
+
+    def update(self, id: UUID, data: dict) -> Optional[Gallery]:
+        """
+        Update a gallery.
+
+        Relinking the gallery to another Drive folder drops its changes feed
+        checkpoint, so the next sync re-lists the new folder in full.
+
+        Args:
+            id: Gallery ID
+            data: Updated data
+
+        Returns:
+            Updated gallery if found, None otherwise
+        """
+        gallery = self.get_by_id(id)
+        if gallery is None:
+            return None
+
+        folder_id = data.get("google_drive_folder_id", gallery.google_drive_folder_id)
+        if folder_id != gallery.google_drive_folder_id:
+            data = {**data, "google_drive_change_token": None}
+        return super().update(id, data)
+
+    def delete(self, id: UUID) -> bool:
+        """
+        Delete a gallery together with its photos and approvals.
+
+        Args:
+            id: Gallery ID
+
+        Returns:
+            True if deleted, False if not found
+        """
+        return id in self.bulk_delete([id])
+
+    def bulk_update_status(self, gallery_ids: Iterable[UUID], status: str) -> Set[UUID]:
+        """
+        Set the status of many galleries with a single UPDATE.
+
+        Args:
+            gallery_ids: Galleries to update
+            status: New gallery status
+
+        Returns:
+            IDs of the galleries that were updated
+
+        Raises:
+            ValueError: If status is not a valid gallery status
+        """
+        if status not in Gallery.__table__.c.status.type.enums:
+            raise ValueError(f"Invalid status: {status}")
+
+        ids = set(gallery_ids)
+        if not ids:
+            return set()
+
+        stmt = (
+            update(Gallery)
+            .where(Gallery.id.in_(ids))
+            .values(status=status)
+            .returning(Gallery.id)
+        )
+        updated = set(self.db.execute(stmt).scalars().all())
+        self.db.commit()
+        return updated
+
+    def bulk_delete(self, gallery_ids: Iterable[UUID]) -> Set[UUID]:
         """
-        stmt = select(Gallery).where(Gallery.id == id)
-        result = self.db.execute(stmt)
-        return result.scalars().first()
+        Delete many galleries, their photos, approvals and sync jobs in one transaction.
+
+        Args:
+            gallery_ids: Galleries to delete
+
+        Returns:
+            IDs of the galleries that were deleted
+        """
+        ids = set(gallery_ids)
+        if not ids:
+            return set()
+
+        existing = set(
+            self.db.execute(select(Gallery.id).where(Gallery.id.in_(ids))).scalars().all()
+        )
+        if existing:
+            # Children first; photo counters go away with the galleries
+            self.db.execute(delete(Photo).where(Photo.gallery_id.in_(existing)))
+            self.db.execute(delete(Approval).where(Approval.gallery_id.in_(existing)))
+            self.db.execute(delete(SyncJob).where(SyncJob.gallery_id.in_(existing)))
+            self.db.execute(delete(Gallery).where(Gallery.id.in_(existing)))
+        self.db.commit()
+        return existing
 
     def get_photo_count(self, gallery_id: UUID) -> int:
         """
         Get number of photos in a gallery.
         """
-        stmt = select(func.count(Photo.id)).where(Photo.gallery_id == gallery_id)
-        return self.db.execute(stmt).scalar() or 0
\ No newline at end of file
+        stmt = select(Gallery.photo_count).where(Gallery.id == gallery_id)
+        return self.db.execute(stmt).scalar() or 0
+
+    def recompute_counters(self, gallery_id: Optional[UUID] = None) -> int:
+        """
+        Rebuild the denormalized photo counters from the photos table.
+
+        Args:
+            gallery_id: Only repair this gallery; all galleries when omitted
+
+        Returns:
+            Number of galleries whose counters were rewritten
+        """
+        photo_count = (
+            select(func.count(Photo.id))
+            .where(Photo.gallery_id == Gallery.id)
+            .scalar_subquery()
+        )
+        selected_count = (
+            select(func.count(Photo.id))
+            .where(Photo.gallery_id == Gallery.id, Photo.selected_by_client == True)
+            .scalar_subquery()
+        )
+        total_bytes = (
+            select(func.coalesce(func.sum(Photo.file_size), 0))
+            .where(Photo.gallery_id == Gallery.id)
+            .scalar_subquery()
+        )
+
+        # A repair is not a content change, so keep updated_at as it is
+        stmt = update(Gallery).values(
+            photo_count=photo_count,
+            selected_count=selected_count,
+            total_bytes=total_bytes,
+            updated_at=Gallery.updated_at
+        )
+        if gallery_id:
+            stmt = stmt.where(Gallery.id == gallery_id)
+
+        result = self.db.execute(stmt.execution_options(synchronize_session=False))
+        self.db.commit()
+        return result.rowcount
+
+
+@job_handler("gallery.repair_counters")
+def repair_gallery_counters(db: Session, payload: dict) -> None:
+    """
+    Rebuild one gallery's photo counters from its photos.
+
+    Idempotent, and never touches the gallery's approvals. The gallery row
+    is locked before counting, so a concurrent toggle_selection either
+    commits before the count (and is included in it) or applies its
+    counter delta after the repair (on top of a count that excluded it).
+    """
+    gallery_id = UUID(payload["gallery_id"])
+    db.execute(select(Gallery.id).where(Gallery.id == gallery_id).with_for_update())
+    GalleryService(db).recompute_counters(gallery_id)
@@ -9,19 +9,23 @@
 
 from app.services.base import BaseService
 from app.models.google_drive_integration import GoogleDriveIntegration
+from app.services.drive import get_drive_adapter, revoke_token
+from app.services.jobs import JobService, job_handler
 
 
 class GoogleDriveService(BaseService[GoogleDriveIntegration]):
     """Service for Google Drive integration operations."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, user_id: Optional[UUID] = None):
         """
         Initialize the Google Drive service.
 
         Args:
             db: Database session
+            user_id: User whose Drive is browsed by list_folders
         """
         super().__init__(db, GoogleDriveIntegration)
+        self.user_id = user_id
 
     def get_user_integration(self, user_id: UUID) -> Optional[GoogleDriveIntegration]:
         """
@@ -45,26 +49,36 @@ def exchange_code_for_tokens(self, code: str) -> dict:
 
     def revoke_tokens(self, user_id: UUID) -> bool:
         """
-        Revoke Google Drive tokens.
+        Disconnect Google Drive and revoke its tokens.
+
+        The integration is marked disconnected right away; the call to Google
+        runs as a background job (drive.revoke), retried if Google cannot be
+        reached, which then deletes the integration. The job only carries the
+        integration id, so the tokens never leave the integrations table.
         """
         integration = self.get_user_integration(user_id)
         if not integration:
             return False
-            
-        # Actual revocation logic would go here (calling Google API)
-        
-        # Delete from DB
-        self.db.delete(integration)
+
+        if integration.status != "disconnected":
+            integration.status = "disconnected"
+            JobService(self.db).enqueue("drive.revoke", {"integration_id": str(integration.id)})
         self.db.commit()
         return True
 
     def list_folders(self, parent_id: Optional[str] = None, search: Optional[str] = None) -> List[dict]:
         """
-        List folders from Google Drive.
-        Stub for now, will be implemented with googleapiclient.
+        List folders from the Google Drive of the service's user.
+
+        Args:
+            parent_id: Only list folders inside this folder
+            search: Only list folders whose name contains this text
+
+        Raises:
+            DriveError: If Drive is not connected or the request fails
         """
-        # This is expected to be patched in tests
-        return []
+        integration = self.get_user_integration(self.user_id) if self.user_id else None
+        return get_drive_adapter(integration).list_folders(parent_id=parent_id, search=search)
 
     def get_auth_url(self) -> str:
         """
@@ -72,3 +86,20 @@ def get_auth_url(self) -> str:
         """
         # Stub for now
         return "https://accounts.google.com/o/oauth2/v2/auth?client_id=stub&response_type=code&scope=https://www.googleapis.com/auth/drive.readonly&redirect_uri=stub"
+
+
+@job_handler("drive.revoke")
+def revoke_drive_token(db: Session, payload: dict) -> None:
+    """
+    Revoke the tokens of a disconnected Google Drive integration, then delete it.
+
+    Skipped if the integration is already gone or was reconnected since.
+    """
+    integration = db.get(GoogleDriveIntegration, UUID(payload["integration_id"]))
+    if integration is None or integration.status != "disconnected":
+        return
+
+    token = integration.refresh_token or integration.access_token
+    if token:
+        revoke_token(token)
+    db.delete(integration)
@@ -0,0 +1,109 @@
+"""
+Sources of original images.
+
+The derivative pipeline reads originals through an ImageSource, so it can
+fetch them from Google Drive or from a local directory (tests, local
+development and offline benchmarks).
+"""
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.google_drive_integration import GoogleDriveIntegration
+from app.models.photo import Photo
+from app.services.drive import DriveAdapter, DriveError, get_drive_adapter
+
+
+class ImageSourceError(Exception):
+    """Raised when the original of a photo cannot be read."""
+
+
+class ImageSource:
+    """Interface of a store of original images."""
+
+    def fetch(self, photo: Photo) -> bytes:
+        """
+        Read the original image of a photo.
+
+        Raises:
+            ImageSourceError: If the original does not exist or cannot be read
+        """
+        raise NotImplementedError
+
+
+class LocalImageSource(ImageSource):
+    """Originals stored as files named after their Drive file ID."""
+
+    def __init__(self, root: str):
+        """
+        Initialize the source.
+
+        Args:
+            root: Directory holding the originals
+        """
+        self.root = Path(root)
+
+    def fetch(self, photo: Photo) -> bytes:
+        file_id = photo.google_drive_file_id
+        if not file_id or "/" in file_id or "\\" in file_id or file_id.startswith("."):
+            raise ImageSourceError(f"Invalid file ID: {file_id!r}")
+        try:
+            return (self.root / file_id).read_bytes()
+        except OSError as e:
+            raise ImageSourceError(f"Original not found: {file_id}") from e
+
+
+class DriveImageSource(ImageSource):
+    """Originals downloaded from Google Drive."""
+
+    def __init__(self, adapter: DriveAdapter):
+        """
+        Initialize the source.
+
+        Args:
+            adapter: Drive adapter to download with
+        """
+        self.adapter = adapter
+
+    def fetch(self, photo: Photo) -> bytes:
+        try:
+            return self.adapter.download_file(photo.google_drive_file_id)
+        except DriveError as e:
+            raise ImageSourceError(str(e)) from e
+
+
+class _UnavailableSource(ImageSource):
+    """Source used when Drive is not connected; every fetch fails."""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+
+    def fetch(self, photo: Photo) -> bytes:
+        raise ImageSourceError(self.reason)
+
+
+def get_image_source(db: Session) -> ImageSource:
+    """
+    Build the image source configured by IMAGE_SOURCE.
+
+    The Drive source downloads with the most recently connected active
+    integration.
+
+    Args:
+        db: Database session used to find the Drive integration
+    """
+    if settings.IMAGE_SOURCE == "local":
+        return LocalImageSource(settings.IMAGE_SOURCE_DIR)
+
+    integration = db.execute(
+        select(GoogleDriveIntegration)
+        .where(GoogleDriveIntegration.status == "active")
+        .order_by(GoogleDriveIntegration.connected_at.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+    try:
+        return DriveImageSource(get_drive_adapter(integration))
+    except DriveError as e:
+        return _UnavailableSource(str(e))
@@ -0,0 +1,547 @@
+"""
+Background jobs.
+
+Work that does not have to finish before the response (repairing a
+gallery's photo counters, revoking Drive tokens) is queued as a row of the
+jobs table. The row is added in the caller's transaction, so a job is never
+lost when the process stops and never runs for a change that was rolled
+back.
+
+A JobRunner polls the table for due jobs and runs them on a thread pool,
+each in its own session. Jobs are claimed with a conditional UPDATE, so
+several processes can share the table. A job that raises is retried with
+exponential backoff (JOB_RETRY_BACKOFF_SECONDS, doubled per attempt) until
+max_attempts, then left as failed with its error.
+
+Handlers are registered per job kind with @job_handler and are called with
+a session and the job payload. They must be safe to run more than once: a
+job whose process dies mid-run is requeued by the runners once it has been
+running for JOB_STALE_SECONDS.
+"""
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import Histogram, LabeledCounter, Metric
+from app.models.job import Job
+from app.services.base import BaseService
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Session, dict], None]
+
+# kind -> handler
+_handlers: Dict[str, JobHandler] = {}
+
+# Finished jobs looked at for the latency stats
+LATENCY_SAMPLE = 1000
+# How often the runner deletes old completed jobs
+PURGE_INTERVAL_SECONDS = 3600.0
+# How often the runner requeues jobs whose runner died
+REQUEUE_INTERVAL_SECONDS = 60.0
+
+JOB_LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900)
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """
+    Register the function running the jobs of a kind.
+
+    Args:
+        kind: Job kind, e.g. "gallery.repair_counters"
+    """
+    def register(handler: JobHandler) -> JobHandler:
+        _handlers[kind] = handler
+        return handler
+    return register
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before retrying a job that failed attempts times."""
+    return min(settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_SECONDS)
+
+
+def _percentiles(values: Sequence[float]) -> Dict[str, Optional[float]]:
+    """p50, p95 and max of values, rounded to milliseconds."""
+    if not values:
+        return {"p50": None, "p95": None, "max": None}
+    ordered = sorted(values)
+
+    def at(fraction: float) -> float:
+        return round(ordered[max(0, math.ceil(fraction * len(ordered)) - 1)], 3)
+
+    return {"p50": at(0.5), "p95": at(0.95), "max": round(ordered[-1], 3)}
+
+
+class JobMetrics:
+    """Per-kind job metrics."""
+
+    def __init__(self):
+        """Initialize empty metric families."""
+        self.jobs = LabeledCounter(
+            "estudio_jobs_total", "Background job attempts by outcome", ("kind", "outcome")
+        )
+        self.wait_seconds = Histogram(
+            "estudio_job_wait_seconds", "Time background jobs waited for a worker once due",
+            ("kind",), JOB_LATENCY_BUCKETS
+        )
+        self.run_seconds = Histogram(
+            "estudio_job_run_seconds", "Time spent running background jobs",
+            ("kind",), JOB_LATENCY_BUCKETS
+        )
+
+    def record(self, kind: str, outcome: str, wait: float, duration: float) -> None:
+        """Record a finished attempt."""
+        self.jobs.inc((kind, outcome))
+        self.wait_seconds.observe((kind,), wait)
+        self.run_seconds.observe((kind,), duration)
+
+    def render(self) -> str:
+        """Render every family in the Prometheus text format."""
+        return "".join(family.render() for family in (self.jobs, self.wait_seconds, self.run_seconds))
+
+
+job_metrics = JobMetrics()
+
+
+class JobService(BaseService[Job]):
+    """Service for background jobs."""
+
+    def __init__(self, db: Session):
+        """
+        Initialize the job service.
+
+        Args:
+            db: Database session
+        """
+        super().__init__(db, Job)
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Optional[dict] = None,
+        delay: float = 0,
+        max_attempts: Optional[int] = None
+    ) -> Job:
+        """
+        Queue a job in the current transaction.
+
+        The job is not committed here: it is saved, and becomes visible to
+        the workers, when the caller commits. Call JobRunner.notify after
+        the commit to have it picked up without waiting for the next poll.
+
+        Args:
+            kind: Kind of a registered handler
+            payload: JSON-serializable arguments of the handler
+            delay: Seconds before the job may run
+            max_attempts: Attempts before giving up (default JOB_MAX_ATTEMPTS)
+
+        Returns:
+            The pending job
+
+        Raises:
+            ValueError: If no handler is registered for kind
+        """
+        if kind not in _handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        now = datetime.utcnow()
+        job = Job(
+            kind=kind,
+            payload=payload or {},
+            status="queued",
+            attempts=0,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            created_at=now,
+            run_at=now + timedelta(seconds=delay)
+        )
+        self.db.add(job)
+        return job
+
+    def claim(self, limit: int) -> List[UUID]:
+        """
+        Mark up to limit due jobs as running, oldest first.
+
+        A job is only claimed if it is still queued when the UPDATE runs, so
+        concurrent runners never start the same job twice.
+
+        Returns:
+            IDs of the claimed jobs
+        """
+        now = datetime.utcnow()
+        candidates = self.db.execute(
+            select(Job.id)
+            .where(Job.status == "queued", Job.run_at <= now)
+            .order_by(Job.run_at)
+            .limit(limit)
+        ).scalars().all()
+
+        claimed = []
+        for job_id in candidates:
+            result = self.db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == "queued")
+                .values(status="running", started_at=now, attempts=Job.attempts + 1)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                claimed.append(job_id)
+        self.db.commit()
+        return claimed
+
+    def run(self, job_id: UUID) -> Optional[Job]:
+        """
+        Run a claimed job and record its outcome.
+
+        Handler errors are not raised: the job is requeued with a backoff
+        delay, or marked failed once it has used all its attempts.
+
+        Returns:
+            The job, or None if it does not exist
+        """
+        job = self.db.get(Job, job_id, populate_existing=True)
+        if job is None:
+            return None
+
+        kind, payload = job.kind, dict(job.payload or {})
+        wait = max(0.0, ((job.started_at or job.run_at) - job.run_at).total_seconds())
+        started = time.perf_counter()
+        handler = _handlers.get(kind)
+        error: Optional[Exception] = None
+        try:
+            if handler is None:
+                raise LookupError(f"No handler for job kind {kind}")
+            handler(self.db, payload)
+        except Exception as e:
+            logger.exception(f"Job {job_id} ({kind}) failed")
+            self.db.rollback()
+            error = e
+        duration = time.perf_counter() - started
+
+        job = self.db.get(Job, job_id, populate_existing=True)
+        now = datetime.utcnow()
+        if error is None:
+            job.status = "completed"
+            job.error = None
+            job.finished_at = now
+            outcome = "completed"
+        elif handler is not None and job.attempts < job.max_attempts:
+            job.status = "queued"
+            job.error = str(error) or type(error).__name__
+            job.run_at = now + timedelta(seconds=retry_delay(job.attempts))
+            outcome = "retried"
+        else:
+            job.status = "failed"
+            job.error = str(error) or type(error).__name__
+            job.finished_at = now
+            outcome = "failed"
+        self.db.commit()
+
+        job_metrics.record(kind, outcome, wait, duration)
+        return job
+
+    def requeue_stale(self, older_than: float) -> int:
+        """
+        Requeue running jobs started more than older_than seconds ago.
+
+        Their runner is assumed dead (the process stopped mid-job).
+
+        Returns:
+            Number of jobs requeued
+        """
+        now = datetime.utcnow()
+        result = self.db.execute(
+            update(Job)
+            .where(Job.status == "running", Job.started_at < now - timedelta(seconds=older_than))
+            .values(status="queued", run_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount
+
+    def purge(self, older_than: float) -> int:
+        """
+        Delete completed jobs that finished more than older_than seconds ago.
+
+        Failed jobs are kept for inspection.
+
+        Returns:
+            Number of jobs deleted
+        """
+        result = self.db.execute(
+            delete(Job)
+            .where(
+                Job.status == "completed",
+                Job.finished_at < datetime.utcnow() - timedelta(seconds=older_than)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount
+
+    def queue_stats(self, window: float = 3600) -> Dict[str, Any]:
+        """
+        Get the queue depth and job latency, per kind.
+
+        Args:
+            window: Seconds of finished jobs the latency is computed over
+
+        Returns:
+            Dict with the queued and running totals, the oldest due job's
+            age, and per kind: jobs by status, and p50/p95/max of the wait
+            for a worker, the run time and the total time from enqueue to
+            finish of recently finished jobs
+        """
+        now = datetime.utcnow()
+        kinds: Dict[str, Dict[str, Any]] = {}
+
+        def entry(kind: str) -> Dict[str, Any]:
+            return kinds.setdefault(kind, {
+                "kind": kind,
+                "queued": 0,
+                "running": 0,
+                "completed": 0,
+                "failed": 0,
+                "oldest_queued_seconds": None
+            })
+
+        rows = self.db.execute(
+            select(Job.kind, Job.status, func.count(), func.min(Job.run_at))
+            .group_by(Job.kind, Job.status)
+        ).all()
+        for kind, status, count, oldest_run_at in rows:
+            stats = entry(kind)
+            stats[status] = count
+            if status == "queued" and oldest_run_at is not None:
+                stats["oldest_queued_seconds"] = round(max(0.0, (now - oldest_run_at).total_seconds()), 3)
+
+        finished = self.db.execute(
+            select(Job.kind, Job.created_at, Job.run_at, Job.started_at, Job.finished_at)
+            .where(Job.finished_at >= now - timedelta(seconds=window))
+            .order_by(Job.finished_at.desc())
+            .limit(LATENCY_SAMPLE)
+        ).all()
+        samples: Dict[str, Dict[str, List[float]]] = {}
+        for kind, created_at, run_at, started_at, finished_at in finished:
+            sample = samples.setdefault(kind, {"wait": [], "run": [], "total": []})
+            sample["wait"].append(max(0.0, (started_at - run_at).total_seconds()))
+            sample["run"].append((finished_at - started_at).total_seconds())
+            sample["total"].append((finished_at - created_at).total_seconds())
+        for kind, sample in samples.items():
+            entry(kind)["latency"] = {
+                "jobs": len(sample["run"]),
+                "wait_seconds": _percentiles(sample["wait"]),
+                "run_seconds": _percentiles(sample["run"]),
+                "total_seconds": _percentiles(sample["total"])
+            }
+
+        oldest = [stats["oldest_queued_seconds"] for stats in kinds.values() if stats["oldest_queued_seconds"] is not None]
+        return {
+            "queued": sum(stats["queued"] for stats in kinds.values()),
+            "running": sum(stats["running"] for stats in kinds.values()),
+            "failed": sum(stats["failed"] for stats in kinds.values()),
+            "oldest_queued_seconds": max(oldest) if oldest else None,
+            "latency_window_seconds": window,
+            "kinds": sorted(kinds.values(), key=lambda stats: stats["kind"])
+        }
+
+
+class JobRunner:
+    """Polls the jobs table and runs due jobs on a background thread pool."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_workers: Optional[int] = None,
+        poll_seconds: Optional[float] = None,
+        inline: bool = False
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            session_factory: Creates the session each job runs in
+            max_workers: Worker threads (default JOB_WORKERS)
+            poll_seconds: Time between checks of the queue (default JOB_POLL_SECONDS)
+            inline: Run due jobs synchronously in the caller's thread on
+                notify, with no poller (tests)
+        """
+        self.session_factory = session_factory
+        self.max_workers = max_workers or settings.JOB_WORKERS
+        self.poll_seconds = poll_seconds or settings.JOB_POLL_SECONDS
+        self.inline = inline
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._poller: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._active = 0
+        self._last_purge = 0.0
+        self._last_requeue = 0.0
+
+    def start(self) -> None:
+        """
+        Start the poller and the worker threads, if not running yet.
+
+        The poller also requeues stale jobs, on its first poll and then
+        periodically, so jobs of a process that died are picked up while
+        this one keeps running.
+        """
+        if self.inline:
+            return
+        with self._lock:
+            if self._poller is not None:
+                return
+            self._stop = threading.Event()
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="job-worker"
+            )
+            self._poller = threading.Thread(target=self._poll, name="job-poller", daemon=True)
+        self._poller.start()
+
+    def notify(self) -> None:
+        """Have newly committed jobs picked up now rather than at the next poll."""
+        if self.inline:
+            self.run_pending()
+            return
+        self.start()
+        self._wake.set()
+
+    def run_pending(self) -> int:
+        """
+        Run every due job in the caller's thread.
+
+        Returns:
+            Number of job attempts run
+        """
+        count = 0
+        while True:
+            job_ids = self._with_service(lambda service: service.claim(self.max_workers))
+            if not job_ids:
+                return count
+            for job_id in job_ids:
+                self.run(job_id)
+                count += 1
+
+    def run(self, job_id: UUID) -> Optional[Job]:
+        """Run a claimed job in a fresh session."""
+        return self._with_service(lambda service: service.run(job_id))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the worker counts of this process."""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "active": self._active,
+                "running": self._poller is not None or self.inline
+            }
+
+    def metrics(self) -> List[Metric]:
+        """Collect the worker metrics of this process."""
+        stats = self.stats()
+        return [
+            ("estudio_job_workers", "gauge", "Background job worker threads", stats["workers"]),
+            ("estudio_job_workers_active", "gauge", "Background jobs running in this process", stats["active"]),
+        ]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the poller and the worker threads.
+
+        Jobs still running are left as they are and requeued by a runner
+        once stale.
+        """
+        with self._lock:
+            poller, executor = self._poller, self._executor
+            self._poller = self._executor = None
+        if poller is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        if wait:
+            poller.join()
+        executor.shutdown(wait=wait)
+
+    def _with_service(self, action: Callable[[JobService], Any]) -> Any:
+        """Call action with a JobService on a fresh session."""
+        db = self.session_factory()
+        try:
+            return action(JobService(db))
+        finally:
+            db.close()
+
+    def _poll(self) -> None:
+        """Claim due jobs while workers are free, until stopped."""
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self._requeue_stale()
+                with self._lock:
+                    free = self.max_workers - self._active
+                if free > 0:
+                    job_ids = self._with_service(lambda service: service.claim(free))
+                    for job_id in job_ids:
+                        self._submit(job_id)
+                self._purge()
+            except Exception:
+                logger.exception("Job poller failed, retrying at the next poll")
+            # Woken early by notify and by workers finishing a job
+            self._wake.wait(self.poll_seconds)
+
+    def _submit(self, job_id: UUID) -> None:
+        """Run a claimed job on a worker thread."""
+        with self._lock:
+            executor = self._executor
+            self._active += 1
+        if executor is None:
+            # Shut down between the claim and here: the job is requeued once stale
+            with self._lock:
+                self._active -= 1
+            return
+        executor.submit(self._work, job_id)
+
+    def _work(self, job_id: UUID) -> None:
+        """Worker thread body: run the job, then wake the poller for the next one."""
+        try:
+            self.run(job_id)
+        except Exception:
+            logger.exception(f"Job {job_id} could not be recorded")
+        finally:
+            with self._lock:
+                self._active -= 1
+            self._wake.set()
+
+    def _requeue_stale(self) -> None:
+        """Requeue jobs whose runner died, at most once per REQUEUE_INTERVAL_SECONDS."""
+        now = time.monotonic()
+        if self._last_requeue and now - self._last_requeue < REQUEUE_INTERVAL_SECONDS:
+            return
+        self._last_requeue = now
+        requeued = self._with_service(lambda service: service.requeue_stale(settings.JOB_STALE_SECONDS))
+        if requeued:
+            logger.warning(f"Requeued {requeued} jobs left running by a dead runner")
+
+    def _purge(self) -> None:
+        """Delete old completed jobs, at most once per PURGE_INTERVAL_SECONDS."""
+        now = time.monotonic()
+        if now - self._last_purge < PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = now
+        retention = settings.JOB_RETENTION_HOURS * 3600
+        deleted = self._with_service(lambda service: service.purge(retention))
+        if deleted:
+            logger.info(f"Deleted {deleted} completed jobs")
+
+
+# Process-wide runner used by the API
+job_runner = JobRunner()
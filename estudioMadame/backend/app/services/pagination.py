@@ -0,0 +1,130 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is an opaque, URL-safe token encoding the (sort key, id) of the last
+row of a page. The next page is fetched with a WHERE clause on that pair
+instead of an OFFSET, so every page costs the same no matter how deep it is.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(sort_value: Any, id: UUID) -> str:
+    """
+    Encode the (sort key, id) of a row into an opaque cursor.
+
+    Args:
+        sort_value: Value of the sort column for the row
+        id: Primary key of the row
+
+    Returns:
+        URL-safe cursor string
+    """
+    if isinstance(sort_value, (datetime, date)):
+        sort_value = sort_value.isoformat()
+    elif isinstance(sort_value, UUID):
+        sort_value = str(sort_value)
+
+    raw = json.dumps([sort_value, str(id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_column: Any) -> Tuple[Any, UUID]:
+    """
+    Decode a cursor back into a (sort key, id) pair.
+
+    Args:
+        cursor: Cursor produced by encode_cursor
+        sort_column: Column the cursor was built for, used to restore the value type
+
+    Returns:
+        Tuple of (sort value, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, raw_id = json.loads(base64.urlsafe_b64decode(padded))
+        last_id = UUID(raw_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    try:
+        python_type = sort_column.type.python_type
+    except (AttributeError, NotImplementedError):
+        python_type = None
+
+    if sort_value is not None:
+        if python_type is datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+        elif python_type is date:
+            sort_value = date.fromisoformat(sort_value)
+        elif python_type is UUID:
+            sort_value = UUID(sort_value)
+
+    return sort_value, last_id
+
+
+def keyset_filter(
+    sort_column: Any,
+    id_column: Any,
+    sort_value: Any,
+    last_id: UUID,
+    descending: bool
+) -> Any:
+    """
+    Build the WHERE clause selecting rows after (sort_value, last_id).
+
+    The id column breaks ties, so it must be part of the ORDER BY in the
+    same direction as the sort column.
+    """
+    if descending:
+        return or_(
+            sort_column < sort_value,
+            and_(sort_column == sort_value, id_column < last_id)
+        )
+    return or_(
+        sort_column > sort_value,
+        and_(sort_column == sort_value, id_column > last_id)
+    )
+
+
+def ensure_cursor_column(sort_column: Any) -> None:
+    """
+    Reject sort columns that cannot be paginated by cursor.
+
+    NULLs do not compare, so a nullable sort key would silently drop rows.
+
+    Raises:
+        ValueError: If the column is nullable
+    """
+    if getattr(sort_column, "nullable", False):
+        raise ValueError("Cursor pagination is not supported for this sort field")
+
+
+def split_page(
+    rows: List[Any],
+    limit: int,
+    key: Callable[[Any], Tuple[Any, UUID]]
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Split a result fetched with LIMIT limit + 1 into the page and next cursor.
+
+    Args:
+        rows: Rows fetched with one extra row to detect a following page
+        limit: Page size
+        key: Returns the (sort value, id) of a row
+
+    Returns:
+        Tuple of (rows of this page, cursor for the next page or None)
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(*key(rows[-1])) if has_more and rows else None
+    return rows, next_cursor
@@ -1,15 +1,60 @@
 """
 Photo service.
 """
-from typing import List, Optional, Tuple
+import io
+import json
+import uuid
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import select, func, and_
+from pydantic import ValidationError
+from sqlalchemy import select, func, insert, update, case, true, false
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.services.base import BaseService
 from app.models.photo import Photo
-from app.models.gallery import Gallery
+from app.models.gallery import Gallery, adjust_photo_counters
+from app.schemas.photo import PhotoIngest
+from app.services.pagination import decode_cursor, keyset_filter, split_page
+
+# Columns of the photo export, in output order
+EXPORT_COLUMNS = (
+    "id",
+    "file_name",
+    "google_drive_file_id",
+    "file_size",
+    "mime_type",
+    "width",
+    "height",
+    "selected_by_client",
+    "created_in_drive",
+    "synced_at",
+    "google_drive_web_view_link",
+    "google_drive_download_link",
+)
+
+# Column order of the Postgres COPY used by bulk ingestion
+_COPY_COLUMNS = (
+    "id",
+    "gallery_id",
+    "google_drive_file_id",
+    "google_drive_web_view_link",
+    "google_drive_thumbnail_link",
+    "google_drive_download_link",
+    "file_name",
+    "file_size",
+    "mime_type",
+    "width",
+    "height",
+    "selected_by_client",
+    "photo_metadata",
+    "created_in_drive",
+    "synced_at",
+)
 
 
 class PhotoService(BaseService[Photo]):
@@ -29,10 +74,21 @@ def list_photos(
         gallery_id: UUID,
         page: int = 1,
         limit: int = 50,
-        selected_by_client: Optional[bool] = None
-    ) -> Tuple[List[Photo], int]:
+        selected_by_client: Optional[bool] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> Tuple[List[Photo], Optional[int], Optional[str]]:
         """
         List photos in a gallery with filters and pagination.
+
+        Photos are ordered by file name. When a cursor is given, page is
+        ignored and the photos after the cursor are returned (keyset).
+
+        Returns:
+            Tuple of (photos, total or None if skipped, next cursor or None)
+
+        Raises:
+            ValueError: If the cursor is invalid
         """
         stmt = select(Photo).where(Photo.gallery_id == gallery_id)
 
@@ -40,66 +96,332 @@ def list_photos(
             stmt = stmt.where(Photo.selected_by_client == selected_by_client)
 
         # Count total
-        count_stmt = select(func.count()).select_from(stmt.subquery())
-        total = self.db.execute(count_stmt).scalar() or 0
+        total = None
+        if include_total:
+            count_stmt = select(func.count()).select_from(stmt.subquery())
+            total = self.db.execute(count_stmt).scalar() or 0
 
         # Pagination
-        offset = (page - 1) * limit
-        stmt = stmt.offset(offset).limit(limit)
+        stmt = stmt.order_by(Photo.file_name, Photo.id)
+        if cursor:
+            file_name, last_id = decode_cursor(cursor, Photo.file_name)
+            stmt = stmt.where(
+                keyset_filter(Photo.file_name, Photo.id, file_name, last_id, descending=False)
+            )
+        else:
+            stmt = stmt.offset((page - 1) * limit)
+        stmt = stmt.limit(limit + 1)
 
         # Execute
+        photos, next_cursor = split_page(
+            self.db.execute(stmt).scalars().all(),
+            limit,
+            key=lambda photo: (photo.file_name, photo.id)
+        )
+        return photos, total, next_cursor
+
+    def iter_export_rows(
+        self,
+        gallery_id: UUID,
+        selected_by_client: Optional[bool] = None,
+        batch_size: Optional[int] = None
+    ) -> Iterator[tuple]:
+        """
+        Stream a gallery's photos as EXPORT_COLUMNS tuples, ordered by file name.
+
+        Rows are fetched batch_size at a time (yield_per; a server-side cursor
+        on Postgres), so memory stays flat however many photos there are.
+
+        Args:
+            gallery_id: Gallery ID
+            selected_by_client: Only selected (True) or unselected (False) photos
+            batch_size: Rows fetched per round trip, PHOTO_EXPORT_BATCH_SIZE by default
+
+        Yields:
+            One tuple per photo
+        """
+        stmt = select(*(getattr(Photo, column) for column in EXPORT_COLUMNS)).where(
+            Photo.gallery_id == gallery_id
+        )
+        if selected_by_client is not None:
+            stmt = stmt.where(Photo.selected_by_client == selected_by_client)
+        stmt = stmt.order_by(Photo.file_name, Photo.id).execution_options(
+            yield_per=batch_size or settings.PHOTO_EXPORT_BATCH_SIZE
+        )
+
         result = self.db.execute(stmt)
-        photos = result.scalars().all()
+        try:
+            for row in result:
+                yield tuple(row)
+        finally:
+            result.close()
+
+    def bulk_ingest(
+        self,
+        gallery_id: UUID,
+        photos: Iterable[dict],
+        batch_size: Optional[int] = None
+    ) -> int:
+        """
+        Insert many photos into a gallery in one transaction.
+
+        The photos are consumed lazily and written in batches: COPY on
+        Postgres with psycopg2, a multi-row INSERT elsewhere. Gallery
+        counters are adjusted once per batch. Nothing is kept if any photo
+        is invalid or already exists.
 
-        return list(photos), total
+        Args:
+            gallery_id: Gallery ID
+            photos: Photo payloads (PhotoIngest fields)
+            batch_size: Photos per batch (default PHOTO_INGEST_BATCH_SIZE)
+
+        Returns:
+            Number of photos inserted
+
+        Raises:
+            ValueError: If a photo is invalid or its google_drive_file_id already exists
+        """
+        batch_size = batch_size or settings.PHOTO_INGEST_BATCH_SIZE
+        use_copy = self.db.get_bind().dialect.driver == "psycopg2"
+        synced_at = datetime.utcnow()
+        records = iter(photos)
+        index = 0
+
+        try:
+            while True:
+                batch = []
+                for record in islice(records, batch_size):
+                    batch.append(_ingest_values(record, index, gallery_id, synced_at))
+                    index += 1
+                if not batch:
+                    break
+
+                if use_copy:
+                    self._copy_batch(batch)
+                else:
+                    # Table-level insert: an executemany without ORM bookkeeping
+                    self.db.execute(insert(Photo.__table__), batch)
+                # Batches bypass the Photo mapper events. Run through the
+                # session so cache invalidation sees the write, COPY doesn't
+                adjust_photo_counters(
+                    self.db,
+                    gallery_id,
+                    photos=len(batch),
+                    selected=sum(1 for row in batch if row["selected_by_client"]),
+                    total_bytes=sum(row["file_size"] for row in batch)
+                )
+
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            raise ValueError("Photo already exists (duplicate google_drive_file_id)") from e
+        except Exception:
+            self.db.rollback()
+            raise
+        return index
+
+    def _copy_batch(self, batch: List[dict]) -> None:
+        """Write a batch with COPY FROM STDIN on the session's connection."""
+        buffer = io.StringIO()
+        for row in batch:
+            buffer.write("\t".join(_copy_value(row[column]) for column in _COPY_COLUMNS))
+            buffer.write("\n")
+        buffer.seek(0)
+
+        dbapi = self.db.get_bind().dialect.dbapi
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {Photo.__tablename__} ({', '.join(_COPY_COLUMNS)}) FROM STDIN",
+                buffer
+            )
+        except dbapi.IntegrityError as e:
+            raise IntegrityError("COPY photos", None, e) from e
+        finally:
+            cursor.close()
 
     def toggle_selection(
         self,
         photo_id: UUID,
         selected: bool,
-        gallery_id: UUID
-    ) -> Optional[Photo]:
+        gallery_id: UUID,
+        max_selection: Optional[int] = None
+    ) -> Optional[int]:
         """
-        Toggle client selection for a photo.
+        Select or deselect a photo for the client.
+
+        The photo flag and the gallery's selected_count are changed by two
+        conditional UPDATEs in one transaction: the photo only flips if it
+        is not already in the requested state, and the counter is only
+        incremented while below max_selection. Concurrent requests are
+        serialized by the row locks those UPDATEs take, so the limit holds
+        without counting selected photos.
+
+        Args:
+            photo_id: Photo ID
+            selected: Whether the photo should be selected
+            gallery_id: Gallery the photo must belong to
+            max_selection: Gallery selection limit, None or 0 for no limit
+
+        Returns:
+            The gallery's selected count after the change, or None if the
+            photo is not in the gallery or the limit is reached
         """
-        # Ensure photo belongs to gallery
-        stmt = select(Photo).where(
-            and_(
+        flipped = self.db.execute(
+            update(Photo)
+            .where(
                 Photo.id == photo_id,
-                Photo.gallery_id == gallery_id
+                Photo.gallery_id == gallery_id,
+                Photo.selected_by_client != selected
             )
-        )
-        photo = self.db.execute(stmt).scalar_one_or_none()
-        
-        if not photo:
+            .values(selected_by_client=selected)
+        ).rowcount
+
+        if not flipped:
+            # Already in the requested state, or not in this gallery
+            self.db.rollback()
+            row = self.db.execute(
+                select(Gallery.selected_count)
+                .join(Photo, Photo.gallery_id == Gallery.id)
+                .where(Photo.id == photo_id, Gallery.id == gallery_id)
+            ).one_or_none()
+            return row.selected_count if row else None
+
+        count = self._move_selected_count(gallery_id, 1 if selected else -1, max_selection)
+        if count is None:
+            # Limit reached: undo the flip
+            self.db.rollback()
             return None
 
-        # Check selection limit if selecting
-        if selected:
-            gallery_stmt = select(Gallery).where(Gallery.id == gallery_id)
-            gallery = self.db.execute(gallery_stmt).scalar_one_or_none()
-            
-            if gallery and gallery.settings:
-                max_selection = gallery.settings.get("max_client_selection")
-                if max_selection:
-                    current_count = self.get_selected_count(gallery_id)
-                    if current_count >= max_selection:
-                        # Limit reached
-                        return None
-
-        photo.selected_by_client = selected
         self.db.commit()
-        self.db.refresh(photo)
-        return photo
+        return count
 
-    def get_selected_count(self, gallery_id: UUID) -> int:
+    def apply_selections(
+        self,
+        gallery_id: UUID,
+        selections: Dict[UUID, bool],
+        max_selection: Optional[int] = None
+    ) -> Optional[Tuple[int, int]]:
         """
-        Get count of selected photos in a gallery.
+        Select and deselect many photos of a gallery at once.
+
+        All photos are flipped by one UPDATE and the counter is moved once by
+        the net change, guarded on max_selection, in one transaction: either
+        every operation is applied or none is. Photos already in the
+        requested state or not in the gallery are left alone.
+
+        Args:
+            gallery_id: Gallery ID
+            selections: Requested state by photo ID
+            max_selection: Gallery selection limit, None or 0 for no limit
+
+        Returns:
+            Tuple of (photos changed, selected count after the change), or
+            None if the result would exceed the limit
         """
-        stmt = select(func.count(Photo.id)).where(
-            and_(
+        if not selections:
+            return 0, self.get_selected_count(gallery_id)
+
+        to_select = [photo_id for photo_id, selected in selections.items() if selected]
+        target = case((Photo.id.in_(to_select), true()), else_=false()) if to_select else false()
+        changed = self.db.execute(
+            update(Photo)
+            .where(
                 Photo.gallery_id == gallery_id,
-                Photo.selected_by_client == True
+                Photo.id.in_(list(selections)),
+                Photo.selected_by_client != target
+            )
+            .values(selected_by_client=target)
+            .returning(Photo.selected_by_client)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+
+        delta = sum(1 if selected else -1 for selected in changed)
+        count = self._move_selected_count(gallery_id, delta, max_selection)
+        if count is None:
+            self.db.rollback()
+            return None
+
+        self.db.commit()
+        return len(changed), count
+
+    def _move_selected_count(
+        self,
+        gallery_id: UUID,
+        delta: int,
+        max_selection: Optional[int]
+    ) -> Optional[int]:
+        """
+        Add delta to the gallery's selected_count unless it would pass the limit.
+
+        Returns:
+            The new count, or None if the limit refused the change
+        """
+        stmt = (
+            update(Gallery)
+            .where(Gallery.id == gallery_id)
+            .values(
+                selected_count=Gallery.selected_count + delta,
+                photo_version=Gallery.photo_version + 1
             )
         )
+        if max_selection and delta > 0:
+            stmt = stmt.where(Gallery.selected_count + delta <= max_selection)
+        return self.db.execute(
+            stmt.returning(Gallery.selected_count)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+
+    def get_selected_count(self, gallery_id: UUID) -> int:
+        """
+        Get count of selected photos in a gallery.
+        """
+        stmt = select(Gallery.selected_count).where(Gallery.id == gallery_id)
         return self.db.execute(stmt).scalar() or 0
+
+
+def _ingest_values(record: dict, index: int, gallery_id: UUID, synced_at: datetime) -> dict:
+    """Validate one ingestion payload and map it to Photo column values."""
+    try:
+        photo = PhotoIngest.model_validate(record)
+    except ValidationError as e:
+        error = e.errors()[0]
+        field = ".".join(str(part) for part in error["loc"])
+        raise ValueError(f"Invalid photo {index}: {field}: {error['msg']}") from e
+
+    return {
+        "id": uuid.uuid4(),
+        "gallery_id": gallery_id,
+        "google_drive_file_id": photo.google_drive_file_id,
+        "google_drive_web_view_link": photo.google_drive_web_view_link,
+        "google_drive_thumbnail_link": photo.google_drive_thumbnail_link,
+        "google_drive_download_link": photo.google_drive_download_link,
+        "file_name": photo.file_name,
+        "file_size": photo.file_size,
+        "mime_type": photo.mime_type,
+        "width": photo.width,
+        "height": photo.height,
+        "selected_by_client": photo.selected_by_client,
+        "photo_metadata": photo.metadata.model_dump(exclude_none=True) if photo.metadata else None,
+        "created_in_drive": photo.created_in_drive,
+        "synced_at": synced_at
+    }
+
+
+def _copy_value(value: object) -> str:
+    """Format a value for COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, dict):
+        value = json.dumps(value)
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
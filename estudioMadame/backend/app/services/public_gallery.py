@@ -0,0 +1,134 @@
+"""
+Public gallery service.
+
+Every guest opening a shared link reads the same gallery and photo pages.
+They are rendered once per content version and served from a per-process
+cache; the version is derived from Gallery.updated_at and photo_version,
+so ETags agree between processes even though the cache does not.
+
+The access token and version themselves are read from the gallery row on
+every request (one primary key lookup): a rotated or revoked token must
+stop working at once in every process, not when a cache entry expires.
+"""
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache, invalidate_on_commit
+from app.core.config import settings
+from app.core.serialization import encode_envelope, encode_list, encode_model
+from app.models.gallery import Gallery
+from app.models.photo import Photo
+from app.schemas.common import PaginationMeta
+from app.schemas.gallery import GalleryPublic
+from app.schemas.photo import Photo as PhotoSchema
+from app.services.gallery import GalleryService
+from app.services.photo import PhotoService
+
+
+# Per-process cache of public gallery responses, cleared when a transaction
+# that writes galleries or photos commits
+public_gallery_cache = TTLCache(
+    "public_gallery",
+    ttl=settings.PUBLIC_GALLERY_CACHE_TTL_SECONDS,
+    maxsize=settings.PUBLIC_GALLERY_CACHE_MAXSIZE
+)
+invalidate_on_commit(public_gallery_cache, Gallery, Photo)
+
+
+class PublicGalleryService:
+    """Service for the guest (shared link) views of a gallery."""
+
+    def __init__(self, db: Session):
+        """
+        Initialize the public gallery service.
+
+        Args:
+            db: Database session
+        """
+        self.db = db
+
+    def get_access(self, gallery_id: UUID) -> Optional[dict]:
+        """
+        Get what is needed to authorize and revalidate a public request.
+
+        Not cached, see the module docstring.
+
+        Args:
+            gallery_id: Gallery ID
+
+        Returns:
+            Dict with access_token and content version, None if the gallery does not exist
+        """
+        row = self.db.execute(
+            select(Gallery.access_token, Gallery.updated_at, Gallery.photo_version)
+            .where(Gallery.id == gallery_id)
+        ).one_or_none()
+        if row is None:
+            return None
+        return {
+            "access_token": row.access_token,
+            "version": f"{row.updated_at.isoformat()}:{row.photo_version}"
+        }
+
+    def render_gallery(self, gallery_id: UUID, version: str) -> Optional[bytes]:
+        """
+        Get the rendered public gallery body.
+
+        Args:
+            gallery_id: Gallery ID
+            version: Content version from get_access
+
+        Returns:
+            JSON body, None if the gallery was deleted meanwhile
+        """
+        def render() -> Optional[bytes]:
+            gallery = GalleryService(self.db).get_with_details(gallery_id)
+            if gallery is None:
+                return None
+            return encode_envelope(encode_model(GalleryPublic, gallery))
+
+        return public_gallery_cache.get_or_set(("gallery", gallery_id, version), render)
+
+    def render_photos(
+        self,
+        gallery_id: UUID,
+        version: str,
+        page: int,
+        limit: int,
+        cursor: Optional[str],
+        include_total: bool
+    ) -> bytes:
+        """
+        Get a rendered page of the public photo list.
+
+        Args:
+            gallery_id: Gallery ID
+            version: Content version from get_access
+            page, limit, cursor, include_total: Pagination, as in PhotoService.list_photos
+
+        Returns:
+            JSON body
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        def render() -> bytes:
+            photos, total, next_cursor = PhotoService(self.db).list_photos(
+                gallery_id=gallery_id,
+                page=page,
+                limit=limit,
+                cursor=cursor,
+                include_total=include_total
+            )
+            return encode_envelope(
+                encode_list(PhotoSchema, photos),
+                PaginationMeta.build(page, limit, total, next_cursor)
+            )
+
+        return public_gallery_cache.get_or_set(
+            ("photos", gallery_id, version, page, limit, cursor, include_total), render
+        )
+
@@ -0,0 +1,128 @@
+"""
+Search service.
+"""
+from typing import Any, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.search import ranked_search, search_filter
+from app.models.approval import Approval
+from app.models.client import Client
+from app.models.gallery import Gallery
+from app.schemas.search import SearchResult, SearchResultType
+
+
+class SearchService:
+    """Service for full-text search across galleries, clients and approvals."""
+
+    def __init__(self, db: Session):
+        """
+        Initialize the search service.
+
+        Args:
+            db: Database session
+        """
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    def filter(self, model: Any, text: Optional[str]) -> Optional[Any]:
+        """
+        Build a WHERE clause keeping the model rows matching text.
+
+        Args:
+            model: Gallery, Client or Approval
+            text: User search input
+
+        Returns:
+            The clause, or None if text holds no search terms
+        """
+        return search_filter(model.__table__, text, self.dialect)
+
+    def search(
+        self,
+        text: str,
+        types: Optional[Iterable[SearchResultType]] = None,
+        limit: int = 20
+    ) -> List[SearchResult]:
+        """
+        Search galleries, clients and approvals at once.
+
+        Each kind is ranked by the index, then the hits are merged by score.
+
+        Args:
+            text: User search input
+            types: Kinds to search, all by default
+            limit: Maximum number of results
+
+        Returns:
+            Results, best match first
+        """
+        kinds = set(types or SearchResultType)
+        results: List[SearchResult] = []
+        if SearchResultType.gallery in kinds:
+            results.extend(self._search_galleries(text, limit))
+        if SearchResultType.client in kinds:
+            results.extend(self._search_clients(text, limit))
+        if SearchResultType.approval in kinds:
+            results.extend(self._search_approvals(text, limit))
+
+        results.sort(key=lambda result: result.score, reverse=True)
+        return results[:limit]
+
+    def _ranked(self, model: Any, text: str, limit: int) -> Optional[Any]:
+        """Subquery of (id, score) of the best limit matches of model, or None."""
+        ranked = ranked_search(model.__table__, text, self.dialect, limit)
+        return ranked.subquery() if ranked is not None else None
+
+    def _search_galleries(self, text: str, limit: int) -> List[SearchResult]:
+        """Best matching galleries, with their client name as subtitle."""
+        ranked = self._ranked(Gallery, text, limit)
+        if ranked is None:
+            return []
+        stmt = (
+            select(ranked.c.score, Gallery.id, Gallery.title, Client.name)
+            .select_from(Gallery)
+            .join(ranked, ranked.c.id == Gallery.id)
+            .outerjoin(Client, Gallery.client_id == Client.id)
+        )
+        return [
+            SearchResult(type=SearchResultType.gallery, id=id, title=title, subtitle=client_name, score=score)
+            for score, id, title, client_name in self.db.execute(stmt)
+        ]
+
+    def _search_clients(self, text: str, limit: int) -> List[SearchResult]:
+        """Best matching clients, with their e-mail as subtitle."""
+        ranked = self._ranked(Client, text, limit)
+        if ranked is None:
+            return []
+        stmt = (
+            select(ranked.c.score, Client.id, Client.name, Client.email)
+            .select_from(Client)
+            .join(ranked, ranked.c.id == Client.id)
+        )
+        return [
+            SearchResult(type=SearchResultType.client, id=id, title=name, subtitle=email, score=score)
+            for score, id, name, email in self.db.execute(stmt)
+        ]
+
+    def _search_approvals(self, text: str, limit: int) -> List[SearchResult]:
+        """Best matching approvals, with their client name as subtitle."""
+        ranked = self._ranked(Approval, text, limit)
+        if ranked is None:
+            return []
+        stmt = (
+            select(ranked.c.score, Approval.id, Approval.gallery_name, Approval.client_name)
+            .select_from(Approval)
+            .join(ranked, ranked.c.id == Approval.id)
+        )
+        return [
+            SearchResult(
+                type=SearchResultType.approval,
+                id=id,
+                title=gallery_name,
+                subtitle=client_name,
+                score=score
+            )
+            for score, id, gallery_name, client_name in self.db.execute(stmt)
+        ]
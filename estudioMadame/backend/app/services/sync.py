@@ -0,0 +1,532 @@
+"""
+Google Drive folder sync service.
+
+A gallery's first sync (or a forced one) is a full sync: it pages through
+the Drive listing of the folder and upserts photos in batches keyed on
+google_drive_file_id. Every photo seen in the run is stamped with the run's
+start time in synced_at, so photos no longer in the folder are removed with
+a single DELETE at the end. It also stores a Drive changes feed checkpoint
+on the gallery; later syncs are incremental and only apply the changes made
+since that checkpoint, so their cost follows the size of the change rather
+than the folder.
+
+Gallery counters are adjusted by deltas in the same transaction as each
+batch. Jobs run on a background thread pool, each with its own session.
+"""
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.gallery import Gallery, adjust_photo_counters
+from app.models.photo import Photo
+from app.models.sync_job import SyncJob
+from app.models.google_drive_integration import GoogleDriveIntegration
+from app.services.base import BaseService
+from app.services.drive import DriveAdapter, DriveError, get_drive_adapter
+
+logger = logging.getLogger(__name__)
+
+# How often each process looks for running jobs whose worker died
+RECOVER_INTERVAL_SECONDS = 60.0
+
+AdapterFactory = Callable[[Optional[GoogleDriveIntegration]], DriveAdapter]
+
+# gallery_id -> [photos, selected, total_bytes] changes of one batch
+CounterDeltas = Dict[UUID, List[int]]
+
+
+class SyncService(BaseService[SyncJob]):
+    """Service for Google Drive sync jobs."""
+
+    def __init__(self, db: Session):
+        """
+        Initialize the sync service.
+
+        Args:
+            db: Database session
+        """
+        super().__init__(db, SyncJob)
+
+    def get_latest_job(self, gallery_id: UUID) -> Optional[SyncJob]:
+        """
+        Get the most recently started sync job of a gallery.
+
+        Jobs are written by worker sessions, so the row is always reloaded
+        rather than served from this session's identity map.
+        """
+        stmt = (
+            select(SyncJob)
+            .where(SyncJob.gallery_id == gallery_id)
+            .order_by(SyncJob.started_at.desc())
+            .limit(1)
+            .execution_options(populate_existing=True)
+        )
+        return self.db.execute(stmt).scalar_one_or_none()
+
+    def start_sync(
+        self,
+        gallery: Gallery,
+        requested_by: Optional[UUID] = None,
+        full: bool = False
+    ) -> Tuple[SyncJob, bool]:
+        """
+        Create a running sync job for a gallery, unless one is already running.
+
+        Args:
+            gallery: Gallery linked to a Drive folder
+            requested_by: User whose Drive credentials the job should use
+            full: Re-list the whole folder even if a change checkpoint exists
+
+        Returns:
+            Tuple of (job, whether it was created and must be dispatched)
+        """
+        latest = self.get_latest_job(gallery.id)
+        if latest and latest.status == "running":
+            if not self._is_stale(latest):
+                return latest, False
+            # Its worker died without recording an outcome: take over
+            logger.warning(f"Sync job {latest.id} made no progress, starting a new one")
+            self._fail(latest, "Abandoned: no progress from its worker")
+
+        mode = "incremental" if gallery.google_drive_change_token and not full else "full"
+        job = SyncJob(
+            gallery_id=gallery.id,
+            requested_by=requested_by,
+            status="running",
+            mode=mode
+        )
+        gallery.sync_status = "syncing"
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job, True
+
+    def _stale_before(self) -> datetime:
+        """Heartbeats older than this belong to a dead worker."""
+        return datetime.utcnow() - timedelta(seconds=settings.SYNC_STALE_SECONDS)
+
+    def _is_stale(self, job: SyncJob) -> bool:
+        """Whether a running job has gone SYNC_STALE_SECONDS without a heartbeat."""
+        return (job.heartbeat_at or job.started_at) < self._stale_before()
+
+    def _fail(self, job: SyncJob, error: str) -> None:
+        """Mark a job failed (not committed)."""
+        job.status = "failed"
+        job.error = error[:500]
+        job.finished_at = datetime.utcnow()
+
+    def fail_stale_jobs(self) -> int:
+        """
+        Mark running jobs without a recent heartbeat failed and put their
+        gallery in error.
+
+        Their worker died (a crash, a redeploy or a shutdown that did not
+        wait for it). Jobs still making progress, possibly in another
+        process, are left alone.
+
+        Returns:
+            Number of jobs marked failed
+        """
+        jobs = self.db.execute(
+            select(SyncJob).where(
+                SyncJob.status == "running",
+                func.coalesce(SyncJob.heartbeat_at, SyncJob.started_at) < self._stale_before()
+            )
+        ).scalars().all()
+        for job in jobs:
+            self._fail(job, "Abandoned: no progress from its worker")
+        gallery_ids = {job.gallery_id for job in jobs}
+        if gallery_ids:
+            self.db.execute(
+                update(Gallery)
+                .where(Gallery.id.in_(gallery_ids), Gallery.sync_status == "syncing")
+                .values(sync_status="error")
+                .execution_options(synchronize_session=False)
+            )
+        self.db.commit()
+        return len(jobs)
+
+    def run_job(
+        self,
+        job_id: UUID,
+        adapter_factory: AdapterFactory = get_drive_adapter,
+        page_size: Optional[int] = None
+    ) -> Optional[SyncJob]:
+        """
+        Run a sync job to completion, committing progress after every page.
+
+        An incremental job whose checkpoint Drive rejects falls back to a
+        full sync. Failures are recorded on the job and the gallery instead
+        of raised.
+
+        Args:
+            job_id: Sync job ID
+            adapter_factory: Builds the Drive adapter from the requester's integration
+            page_size: Files or changes per Drive page and batch
+
+        Returns:
+            The finished job, or None if it does not exist
+        """
+        job = self.get_by_id(job_id)
+        if job is None:
+            return None
+        gallery_id = job.gallery_id
+        page_size = page_size or settings.SYNC_PAGE_SIZE
+
+        try:
+            gallery = self.db.get(Gallery, gallery_id)
+            if gallery is None or not gallery.google_drive_folder_id:
+                raise ValueError("Gallery is not linked to a Google Drive folder")
+
+            integration = None
+            if job.requested_by:
+                integration = self.db.execute(
+                    select(GoogleDriveIntegration).where(
+                        GoogleDriveIntegration.user_id == job.requested_by
+                    )
+                ).scalar_one_or_none()
+            adapter = adapter_factory(integration)
+
+            if job.mode == "incremental":
+                try:
+                    self._sync_changes(job, gallery, adapter, page_size)
+                except DriveError as e:
+                    logger.warning(f"Sync job {job_id}: checkpoint rejected ({e}), running a full sync")
+                    self.db.rollback()
+                    job.mode = "full"
+                    self._sync_folder(job, gallery, adapter, page_size)
+            else:
+                self._sync_folder(job, gallery, adapter, page_size)
+
+            job.status = "completed"
+            job.finished_at = datetime.utcnow()
+            gallery.sync_status = "idle"
+            gallery.last_sync_at = job.finished_at
+            self.db.commit()
+        except Exception as e:
+            logger.exception(f"Sync job {job_id} failed")
+            self.db.rollback()
+            job = self.get_by_id(job_id)
+            self._fail(job, str(e))
+            gallery = self.db.get(Gallery, gallery_id)
+            if gallery is not None:
+                gallery.sync_status = "error"
+            self.db.commit()
+
+        self.db.refresh(job)
+        return job
+
+    def _sync_folder(
+        self,
+        job: SyncJob,
+        gallery: Gallery,
+        adapter: DriveAdapter,
+        page_size: int
+    ) -> None:
+        """
+        Full sync: upsert every file of the folder, then drop unseen photos.
+        """
+        # Taken before listing so changes made during the listing are replayed
+        checkpoint = adapter.get_start_page_token()
+        synced_at = datetime.utcnow()
+
+        page_token = None
+        while True:
+            files, page_token = adapter.list_files(
+                gallery.google_drive_folder_id,
+                page_token=page_token,
+                page_size=page_size
+            )
+            deltas: CounterDeltas = defaultdict(lambda: [0, 0, 0])
+            self._upsert_batch(job, gallery.id, files, synced_at, deltas)
+            job.files_seen += len(files)
+            job.heartbeat_at = datetime.utcnow()
+            self._apply_deltas(deltas)
+            self.db.commit()
+            if not page_token:
+                break
+
+        # Anything not stamped by this run is gone from the folder
+        deltas = defaultdict(lambda: [0, 0, 0])
+        self._delete_photos(
+            job,
+            [Photo.gallery_id == gallery.id, Photo.synced_at < synced_at],
+            deltas
+        )
+        self._apply_deltas(deltas)
+        gallery.google_drive_change_token = checkpoint
+
+    def _sync_changes(
+        self,
+        job: SyncJob,
+        gallery: Gallery,
+        adapter: DriveAdapter,
+        page_size: int
+    ) -> None:
+        """
+        Incremental sync: apply the changes feed since the gallery checkpoint.
+
+        The checkpoint advances with every committed page, so an interrupted
+        job resumes where it stopped.
+
+        Raises:
+            DriveError: If Drive rejects the checkpoint
+        """
+        folder_id = gallery.google_drive_folder_id
+        synced_at = datetime.utcnow()
+
+        token = gallery.google_drive_change_token
+        while token:
+            changes, next_token, new_start_token = adapter.list_changes(token, page_size=page_size)
+
+            # Latest change per file wins
+            latest: Dict[str, dict] = {}
+            for change in changes:
+                latest[change["fileId"]] = change
+
+            upserts, removed_ids = [], []
+            for file_id, change in latest.items():
+                file = change.get("file") or {}
+                if (
+                    not change.get("removed")
+                    and not file.get("trashed")
+                    and folder_id in (file.get("parents") or [])
+                    and (file.get("mimeType") or "").startswith("image/")
+                ):
+                    upserts.append(file)
+                else:
+                    # Deleted, trashed or moved out; a no-op for unrelated files
+                    removed_ids.append(file_id)
+
+            deltas: CounterDeltas = defaultdict(lambda: [0, 0, 0])
+            self._upsert_batch(job, gallery.id, upserts, synced_at, deltas)
+            if removed_ids:
+                self._delete_photos(
+                    job,
+                    [Photo.gallery_id == gallery.id, Photo.google_drive_file_id.in_(removed_ids)],
+                    deltas
+                )
+            job.files_seen += len(upserts)
+            self._apply_deltas(deltas)
+
+            token = next_token
+            gallery.google_drive_change_token = next_token or new_start_token
+            job.heartbeat_at = datetime.utcnow()
+            self.db.commit()
+
+    def _upsert_batch(
+        self,
+        job: SyncJob,
+        gallery_id: UUID,
+        files: List[dict],
+        synced_at: datetime,
+        deltas: CounterDeltas
+    ) -> None:
+        """
+        Insert new and update known photos of one batch of Drive files.
+        """
+        if not files:
+            return
+
+        existing = {
+            row.google_drive_file_id: row
+            for row in self.db.execute(
+                select(
+                    Photo.google_drive_file_id,
+                    Photo.id,
+                    Photo.gallery_id,
+                    Photo.file_size,
+                    Photo.selected_by_client
+                ).where(Photo.google_drive_file_id.in_([f["id"] for f in files]))
+            )
+        }
+
+        inserts, updates = [], []
+        for file in files:
+            values = _photo_values(file, gallery_id, synced_at)
+            known = existing.get(file["id"])
+            if known is None:
+                inserts.append({"id": uuid.uuid4(), **values})
+                _add(deltas, gallery_id, 1, 0, values["file_size"])
+                continue
+
+            updates.append({"id": known.id, **values})
+            selected = 1 if known.selected_by_client else 0
+            # A file moved in from another gallery's folder
+            _add(deltas, known.gallery_id, -1, -selected, -known.file_size)
+            _add(deltas, gallery_id, 1, selected, values["file_size"])
+
+        if inserts:
+            self.db.execute(insert(Photo), inserts)
+        if updates:
+            self.db.execute(update(Photo), updates)
+        job.photos_added += len(inserts)
+        job.photos_updated += len(updates)
+
+    def _delete_photos(self, job: SyncJob, criteria: list, deltas: CounterDeltas) -> None:
+        """
+        Delete the photos matching criteria and record their counter deltas.
+        """
+        result = self.db.execute(
+            delete(Photo)
+            .where(*criteria)
+            .returning(Photo.gallery_id, Photo.file_size, Photo.selected_by_client)
+            .execution_options(synchronize_session=False)
+        )
+        for photo_gallery_id, file_size, selected in result:
+            _add(deltas, photo_gallery_id, -1, -1 if selected else 0, -file_size)
+            job.photos_removed += 1
+
+    def _apply_deltas(self, deltas: CounterDeltas) -> None:
+        """Apply a batch's counter changes in the current transaction."""
+        connection = self.db.connection()
+        for gallery_id, (photos, selected, total_bytes) in deltas.items():
+            adjust_photo_counters(connection, gallery_id, photos, selected, total_bytes)
+
+
+def _add(deltas: CounterDeltas, gallery_id: UUID, photos: int, selected: int, total_bytes: int) -> None:
+    """Accumulate a counter change for a gallery."""
+    delta = deltas[gallery_id]
+    delta[0] += photos
+    delta[1] += selected
+    delta[2] += total_bytes
+
+
+def _photo_values(file: dict, gallery_id: UUID, synced_at: datetime) -> dict:
+    """Map a Drive file resource to Photo column values."""
+    metadata = file.get("imageMediaMetadata") or {}
+    created = file.get("createdTime")
+    return {
+        "gallery_id": gallery_id,
+        "google_drive_file_id": file["id"],
+        "google_drive_web_view_link": file.get("webViewLink"),
+        "google_drive_thumbnail_link": file.get("thumbnailLink"),
+        "google_drive_download_link": file.get("webContentLink"),
+        "file_name": file["name"],
+        "file_size": int(file.get("size") or 0),
+        "mime_type": file.get("mimeType") or "application/octet-stream",
+        "width": metadata.get("width"),
+        "height": metadata.get("height"),
+        "created_in_drive": (
+            datetime.fromisoformat(created.replace("Z", "+00:00")).replace(tzinfo=None)
+            if created else None
+        ),
+        "synced_at": synced_at
+    }
+
+
+class SyncDispatcher:
+    """Runs sync jobs on a background thread pool."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        adapter_factory: AdapterFactory = get_drive_adapter,
+        max_workers: Optional[int] = None,
+        inline: bool = False
+    ):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            session_factory: Creates the session each job runs in
+            adapter_factory: Builds the Drive adapter for a job
+            max_workers: Worker threads (default SYNC_WORKERS)
+            inline: Run jobs synchronously in the caller's thread (tests)
+        """
+        self.session_factory = session_factory
+        self.adapter_factory = adapter_factory
+        self.max_workers = max_workers or settings.SYNC_WORKERS
+        self.inline = inline
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._reaper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """
+        Start failing stale jobs every RECOVER_INTERVAL_SECONDS, if not
+        running yet. The first check runs right away.
+        """
+        if self.inline:
+            return
+        with self._lock:
+            if self._reaper is not None:
+                return
+            self._stop = threading.Event()
+            self._reaper = threading.Thread(target=self._reap, name="sync-reaper", daemon=True)
+            self._reaper.start()
+
+    def submit(self, job_id: UUID) -> Optional[Future]:
+        """
+        Queue a sync job.
+
+        Returns:
+            Future of the job, or None when running inline
+        """
+        if self.inline:
+            self.run(job_id)
+            return None
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="drive-sync"
+            )
+        return self._executor.submit(self.run, job_id)
+
+    def run(self, job_id: UUID) -> Optional[SyncJob]:
+        """Run a job in a fresh session."""
+        db = self.session_factory()
+        try:
+            return SyncService(db).run_job(job_id, self.adapter_factory)
+        finally:
+            db.close()
+
+    def recover(self) -> int:
+        """
+        Fail the running jobs whose worker died (see fail_stale_jobs).
+
+        Returns:
+            Number of jobs marked failed
+        """
+        db = self.session_factory()
+        try:
+            return SyncService(db).fail_stale_jobs()
+        finally:
+            db.close()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the stale job checks and the worker threads."""
+        with self._lock:
+            reaper, self._reaper = self._reaper, None
+        if reaper is not None:
+            self._stop.set()
+            if wait:
+                reaper.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def _reap(self) -> None:
+        """Reaper thread body: recover stale jobs until stopped."""
+        while not self._stop.is_set():
+            try:
+                failed = self.recover()
+                if failed:
+                    logger.warning(f"Failed {failed} sync jobs whose worker stopped")
+            except Exception:
+                logger.exception("Could not recover stale sync jobs")
+            self._stop.wait(RECOVER_INTERVAL_SECONDS)
+
+
+# Process-wide dispatcher used by the API
+sync_dispatcher = SyncDispatcher()
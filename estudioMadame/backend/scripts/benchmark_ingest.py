@@ -0,0 +1,135 @@
+"""
+Script to benchmark bulk photo ingestion.
+
+Builds a synthetic NDJSON payload and ingests it into a scratch SQLite
+database (or --database-url) through the same streaming parser and
+PhotoService.bulk_ingest path used by POST /galleries/{id}/photos/bulk,
+then inserts a smaller sample one ORM object at a time for comparison.
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.streaming import iter_json_records
+import app.initial_data  # noqa: F401  (registers every model)
+from app.models.client import Client
+from app.models.gallery import Gallery
+from app.models.photo import Photo
+from app.services.photo import PhotoService
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+def build_payload(count: int, prefix: str) -> bytes:
+    """Build an NDJSON body of synthetic photos."""
+    lines = (
+        json.dumps({
+            "google_drive_file_id": f"{prefix}-{i:07d}",
+            "file_name": f"IMG_{i:07d}.jpg",
+            "file_size": 2_000_000 + i,
+            "mime_type": "image/jpeg",
+            "width": 6000,
+            "height": 4000,
+            "google_drive_web_view_link": f"https://drive.google.com/file/d/{prefix}-{i}/view",
+            "google_drive_thumbnail_link": f"https://drive.google.com/thumbnail?id={prefix}-{i}",
+            "created_in_drive": "2024-01-01T12:00:00",
+            "metadata": {"camera": "Canon EOS R5", "lens": "RF 24-70mm f/2.8"}
+        })
+        for i in range(count)
+    )
+    return "\n".join(lines).encode()
+
+
+def create_gallery(Session, title: str):
+    """Create a client and an empty gallery, returning the gallery ID."""
+    db = Session()
+    try:
+        client = Client(name=title, email=f"{title}-{time.time()}@example.com", hashed_password="x")
+        db.add(client)
+        db.flush()
+        gallery = Gallery(title=title, client_id=client.id)
+        db.add(gallery)
+        db.commit()
+        return gallery.id
+    finally:
+        db.close()
+
+
+def main() -> None:
+    """Main function to benchmark bulk ingestion."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=100_000, help="Photos in the bulk payload")
+    parser.add_argument("--batch-size", type=int, default=None, help="Photos per insert batch")
+    parser.add_argument(
+        "--orm-sample",
+        type=int,
+        default=5_000,
+        help="Photos inserted one ORM object at a time for comparison (0 to skip)"
+    )
+    parser.add_argument("--database-url", default=None, help="Database to use (default: scratch SQLite)")
+    args = parser.parse_args()
+
+    scratch_path = None
+    database_url = args.database_url
+    if database_url is None:
+        fd, scratch_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite:///{scratch_path}"
+
+    engine = create_engine(database_url)
+    Session = sessionmaker(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    try:
+        gallery_id = create_gallery(Session, "bulk")
+        body = build_payload(args.photos, f"bulk-{gallery_id}")
+        chunks = (body[i:i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE))
+        logger.info(f"Ingesting {args.photos:,} photos ({len(body) / 1e6:.1f} MB NDJSON, {database_url})")
+
+        db = Session()
+        try:
+            started = time.perf_counter()
+            inserted = PhotoService(db).bulk_ingest(gallery_id, iter_json_records(chunks), args.batch_size)
+            elapsed = time.perf_counter() - started
+            photo_count = db.get(Gallery, gallery_id).photo_count
+        finally:
+            db.close()
+        logger.info(f"{'bulk_ingest':<16} {elapsed:8.2f}s  {inserted / elapsed:10,.0f} photos/s")
+        if photo_count != inserted:
+            raise SystemExit(f"Gallery counter is {photo_count}, expected {inserted}")
+
+        if args.orm_sample:
+            gallery_id = create_gallery(Session, "orm")
+            db = Session()
+            try:
+                started = time.perf_counter()
+                for record in iter_json_records([build_payload(args.orm_sample, f"orm-{gallery_id}")]):
+                    metadata = record.pop("metadata")
+                    record["created_in_drive"] = None
+                    db.add(Photo(gallery_id=gallery_id, photo_metadata=metadata, **record))
+                db.commit()
+                elapsed = time.perf_counter() - started
+            finally:
+                db.close()
+            logger.info(
+                f"{'ORM, one by one':<16} {elapsed:8.2f}s  {args.orm_sample / elapsed:10,.0f} photos/s "
+                f"({args.orm_sample:,} photos)"
+            )
+    finally:
+        engine.dispose()
+        if scratch_path:
+            os.remove(scratch_path)
+
+
+if __name__ == "__main__":
+    main()
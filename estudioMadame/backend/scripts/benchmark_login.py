@@ -0,0 +1,154 @@
+"""
+Script to benchmark concurrent logins.
+
+Fires a burst of logins at the in-process app while a /health probe and an
+authenticated read (gallery list) run alongside, then reports logins/sec,
+login latency, the latency of the other requests during the burst and the
+password pool counters. With bcrypt on the bounded password pool the probes
+should stay fast however many logins are queued.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from scripts.load_test import percentile
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+async def login_burst(
+    client: httpx.AsyncClient,
+    email: str,
+    password: str,
+    logins: int,
+    concurrency: int,
+    samples: List[float],
+    statuses: Dict[int, int]
+) -> None:
+    """Run logins with at most concurrency in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+            samples.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    await asyncio.gather(*[one() for _ in range(logins)])
+
+
+async def probe(
+    client: httpx.AsyncClient,
+    path: str,
+    headers: Dict[str, str],
+    done: asyncio.Event,
+    samples: List[float]
+) -> None:
+    """Request path back to back until the burst is done."""
+    while not done.is_set():
+        started = time.perf_counter()
+        await client.get(path, headers=headers)
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(0.01)
+
+
+def describe(name: str, samples: List[float]) -> str:
+    """Format the latency percentiles of a sample list."""
+    if not samples:
+        return f"{name:<22} no samples"
+    return (
+        f"{name:<22} {len(samples):>6} reqs  p50 {statistics.median(samples) * 1000:8.1f} ms  "
+        f"p95 {percentile(samples, 95) * 1000:8.1f} ms  max {max(samples) * 1000:8.1f} ms"
+    )
+
+
+async def run(email: str, password: str, logins: int, concurrency: int) -> None:
+    """Log in once for a token, then run the burst with the probes."""
+    from app.core.security import password_pool
+    from app.main import app
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=300
+    ) as client:
+        response = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
+
+        login_samples: List[float] = []
+        health_samples: List[float] = []
+        read_samples: List[float] = []
+        statuses: Dict[int, int] = {}
+        done = asyncio.Event()
+
+        async def burst() -> None:
+            try:
+                await login_burst(client, email, password, logins, concurrency, login_samples, statuses)
+            finally:
+                done.set()
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            burst(),
+            probe(client, "/health", {}, done, health_samples),
+            probe(client, "/api/v1/galleries?limit=20", headers, done, read_samples)
+        )
+        elapsed = time.perf_counter() - started
+
+    stats = password_pool.stats()
+    logger.info(f"{logins} logins in {elapsed:.2f}s: {logins / elapsed:.1f} logins/s, status codes {statuses}")
+    logger.info(describe("login", login_samples))
+    logger.info(describe("/health", health_samples))
+    logger.info(describe("gallery list", read_samples))
+    logger.info(
+        f"password pool: {stats['workers']} workers, {stats['completed']} jobs, "
+        f"{stats['rejected']} rejected, wait max {stats['wait_seconds_max'] * 1000:.1f} ms, "
+        f"work {stats['work_seconds_total']:.2f}s"
+    )
+
+
+def main() -> None:
+    """Main function to run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200, help="Logins in the burst")
+    parser.add_argument("--concurrency", type=int, default=50, help="Logins in flight at once")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost (BCRYPT_ROUNDS)")
+    parser.add_argument("--workers", type=int, default=None, help="Password pool size (PASSWORD_HASH_WORKERS)")
+    parser.add_argument("--max-queue", type=int, default=0, help="Password pool queue limit, 0 for none")
+    args = parser.parse_args()
+
+    fd, scratch_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    # Must be set before the app (and its settings) is imported
+    os.environ["DATABASE_URL"] = f"sqlite:///{scratch_path}"
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ["PASSWORD_HASH_MAX_QUEUE"] = str(args.max_queue)
+    if args.workers:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+
+    from app.core.database import build_engine
+    from scripts.generate_dataset import ADMIN_EMAIL, ADMIN_PASSWORD, DatasetSize, generate
+
+    try:
+        engine = build_engine(os.environ["DATABASE_URL"])
+        try:
+            generate(engine, DatasetSize(clients=10, galleries=20, photos_per_gallery=10))
+        finally:
+            engine.dispose()
+        logger.info(f"Burst: {args.logins} logins, {args.concurrency} in flight, bcrypt cost {args.rounds}")
+        asyncio.run(run(ADMIN_EMAIL, ADMIN_PASSWORD, args.logins, args.concurrency))
+    finally:
+        os.remove(scratch_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Script to benchmark gallery search.
+
+Seeds a scratch SQLite database with many galleries and clients, then
+times the gallery listing search (count plus first page) with the previous
+ilike('%term%') filter and with the full-text indexes, and the mixed
+/api/v1/search query. The full-text filter also covers descriptions,
+locations and client e-mails, so it is checked to find at least the
+galleries the ilike filter found for whole-word terms.
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from sqlalchemy import create_engine, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+import app.initial_data  # noqa: F401  (registers every model and the search indexes)
+from app.core.database import Base
+from app.models.client import Client
+from app.models.gallery import Gallery
+from app.services.gallery import GalleryService
+from app.services.search import SearchService
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+EVENTS = ["Casamento", "Ensaio", "Aniversário", "Batizado", "Formatura", "Gestante", "Corporativo", "Newborn"]
+PLACES = ["Praia", "Fazenda", "Igreja", "Parque", "Estúdio", "Jardim", "Centro", "Serra"]
+FIRST_NAMES = ["Ana", "João", "Maria", "Pedro", "Carla", "Lucas", "Julia", "Rafael", "Beatriz", "Tiago"]
+LAST_NAMES = ["Silva", "Souza", "Oliveira", "Santos", "Lima", "Costa", "Pereira", "Almeida", "Ribeiro", "Gomes"]
+
+
+def seed(engine, galleries: int, clients: int) -> None:
+    """Insert clients and galleries in batches."""
+    rng = random.Random(42)
+    client_ids = [uuid.uuid4() for _ in range(clients)]
+    now = datetime(2026, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(Client.__table__), [
+            {
+                "id": client_id,
+                "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}",
+                "email": f"cliente{i}@example.com",
+                "hashed_password": "x",
+                "created_at": now,
+                "updated_at": now
+            }
+            for i, client_id in enumerate(client_ids)
+        ])
+        batch = []
+        for i in range(galleries):
+            batch.append({
+                "id": uuid.uuid4(),
+                "title": f"{rng.choice(EVENTS)} {rng.choice(FIRST_NAMES)} {i}",
+                "description": f"{rng.choice(EVENTS)} na {rng.choice(PLACES)}",
+                "location": rng.choice(PLACES),
+                "client_id": rng.choice(client_ids),
+                "status": "published",
+                "auto_sync_enabled": False,
+                "sync_status": "idle",
+                "date_created": now - timedelta(minutes=i)
+            })
+            if len(batch) == 5000:
+                conn.execute(insert(Gallery.__table__), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Gallery.__table__), batch)
+
+
+def ilike_ids(db: Session, term: str) -> set:
+    """Gallery ids matched by the previous ilike filter."""
+    pattern = f"%{term}%"
+    stmt = (
+        select(Gallery.id)
+        .outerjoin(Client, Gallery.client_id == Client.id)
+        .where(or_(Gallery.title.ilike(pattern), Client.name.ilike(pattern)))
+    )
+    return set(db.execute(stmt).scalars())
+
+
+def ilike_listing(db: Session, term: str, limit: int) -> int:
+    """Count plus first page with the previous ilike filter."""
+    pattern = f"%{term}%"
+    where = or_(Gallery.title.ilike(pattern), Client.name.ilike(pattern))
+    total = db.execute(
+        select(func.count(Gallery.id)).outerjoin(Client, Gallery.client_id == Client.id).where(where)
+    ).scalar()
+    db.execute(
+        select(Gallery, Client.name)
+        .outerjoin(Client, Gallery.client_id == Client.id)
+        .where(where)
+        .order_by(Gallery.date_created.desc(), Gallery.id.desc())
+        .limit(limit + 1)
+    ).all()
+    return total
+
+
+def measure(fn: Callable[[], object], rounds: int) -> float:
+    """Return the median time of fn in milliseconds."""
+    fn()
+    samples: List[float] = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    """Main function to run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--galleries", type=int, default=100_000, help="Seeded galleries")
+    parser.add_argument("--clients", type=int, default=10_000, help="Seeded clients")
+    parser.add_argument("--rounds", type=int, default=10, help="Timed rounds per query")
+    parser.add_argument("--limit", type=int, default=20, help="Page size")
+    parser.add_argument("--terms", nargs="*", default=["batizado", "rafael", "gomes", "estúdio", "cliente4242"], help="Search terms")
+    args = parser.parse_args()
+
+    fd, scratch_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{scratch_path}")
+    try:
+        started = time.perf_counter()
+        Base.metadata.create_all(engine)
+        seed(engine, args.galleries, args.clients)
+        logger.info(
+            f"Seeded {args.galleries} galleries and {args.clients} clients "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+        with Session(engine) as db:
+            service = GalleryService(db)
+            search = SearchService(db)
+            logger.info(f"{'term':<12} {'matches':>8} {'ilike ms':>10} {'fts ms':>10} {'speedup':>8} {'/search ms':>11}")
+            for term in args.terms:
+                _, total, _ = service.list_galleries(search=term, limit=args.limit)
+                matched = set(db.execute(
+                    select(Gallery.id).where(or_(
+                        search.filter(Gallery, term),
+                        Gallery.client_id.in_(select(Client.id).where(search.filter(Client, term)))
+                    ))
+                ).scalars())
+                # SQLite's LIKE only folds ASCII case, compare on ASCII terms
+                if term.isascii() and not ilike_ids(db, term) <= matched:
+                    raise SystemExit(f"{term}: the full-text search misses ilike matches")
+
+                old = measure(lambda: ilike_listing(db, term, args.limit), args.rounds)
+                new = measure(lambda: service.list_galleries(search=term, limit=args.limit), args.rounds)
+                mixed = measure(lambda: search.search(term, limit=args.limit), args.rounds)
+                logger.info(
+                    f"{term:<12} {total:>8} {old:>10.1f} {new:>10.1f} {old / new:>7.1f}x {mixed:>11.1f}"
+                )
+    finally:
+        engine.dispose()
+        os.remove(scratch_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Script to benchmark response serialization of list endpoints.
+
+Compares, for one page of photos and one page of galleries, the previous
+path (model_validate per item, then FastAPI's jsonable_encoder and
+json.dumps) with the bulk path used by the list endpoints now (one
+TypeAdapter validation and pydantic-core JSON encoding). Both bodies are
+checked to decode to the same JSON.
+"""
+import argparse
+import json
+import logging
+import statistics
+import time
+import uuid
+from datetime import date, datetime
+from typing import Any, Callable, List
+
+from fastapi.encoders import jsonable_encoder
+
+import app.initial_data  # noqa: F401  (registers every model)
+from app.core.serialization import encode_envelope, encode_list
+from app.models.gallery import Gallery
+from app.models.photo import Photo
+from app.schemas.common import PaginationMeta
+from app.schemas.gallery import Gallery as GallerySchema
+from app.schemas.photo import Photo as PhotoSchema
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+
+def make_photos(count: int) -> List[Photo]:
+    """Build transient photos shaped like synced Drive files."""
+    gallery_id = uuid.uuid4()
+    return [
+        Photo(
+            id=uuid.uuid4(),
+            gallery_id=gallery_id,
+            google_drive_file_id=f"drive-{i:06d}",
+            google_drive_web_view_link=f"https://drive.google.com/file/d/{i}/view",
+            google_drive_thumbnail_link=f"https://drive.google.com/thumbnail?id={i}",
+            google_drive_download_link=f"https://drive.google.com/uc?id={i}",
+            file_name=f"IMG_{i:06d}.jpg",
+            file_size=2_000_000 + i,
+            mime_type="image/jpeg",
+            width=6000,
+            height=4000,
+            selected_by_client=i % 3 == 0,
+            created_in_drive=datetime(2024, 1, 1, 12, 0),
+            synced_at=datetime(2024, 1, 2, 8, 30),
+            photo_metadata={"camera": "Canon EOS R5", "lens": "RF 50mm", "iso": 400}
+        )
+        for i in range(count)
+    ]
+
+
+def make_galleries(count: int) -> List[Gallery]:
+    """Build transient galleries enriched like GalleryService listings."""
+    galleries = []
+    for i in range(count):
+        gallery = Gallery(
+            id=uuid.uuid4(),
+            title=f"Gallery {i}",
+            description="Wedding",
+            client_id=uuid.uuid4(),
+            status="published",
+            event_date=date(2024, 5, 1),
+            auto_sync_enabled=False,
+            sync_status="idle",
+            photo_count=200,
+            settings={"privacy": "private", "allow_download": True},
+            date_created=datetime(2024, 1, 1, 12, 0)
+        )
+        gallery.client_name = f"Client {i}"
+        galleries.append(gallery)
+    return galleries
+
+
+def per_item_path(schema: Any, items: list, meta: PaginationMeta) -> bytes:
+    """Previous path: validate each item, then jsonable_encoder and json.dumps."""
+    content = {"data": [schema.model_validate(item) for item in items], "meta": meta.model_dump()}
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def bulk_path(schema: Any, items: list, meta: PaginationMeta) -> bytes:
+    """Current path: one TypeAdapter call and pydantic-core encoding."""
+    return encode_envelope(encode_list(schema, items), meta)
+
+
+def measure(fn: Callable[[], bytes], rounds: int) -> float:
+    """Return the median time of fn in milliseconds."""
+    fn()
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def compare(name: str, schema: Any, items: list, rounds: int) -> None:
+    """Benchmark both paths on one page and log the result."""
+    meta = PaginationMeta.build(1, len(items), len(items) * 10, None)
+    before = per_item_path(schema, items, meta)
+    after = bulk_path(schema, items, meta)
+    if json.loads(before) != json.loads(after):
+        raise SystemExit(f"{name}: bodies differ")
+
+    old = measure(lambda: per_item_path(schema, items, meta), rounds)
+    new = measure(lambda: bulk_path(schema, items, meta), rounds)
+    logger.info(
+        f"{name:<22} per-item {old:7.2f} ms   bulk {new:7.2f} ms   "
+        f"{old / new:5.1f}x   ({len(after) / 1024:.0f} KiB)"
+    )
+
+
+def main() -> None:
+    """Main function to run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=200, help="Photos per page")
+    parser.add_argument("--galleries", type=int, default=100, help="Galleries per page")
+    parser.add_argument("--rounds", type=int, default=200, help="Timed rounds per path")
+    args = parser.parse_args()
+
+    compare(f"{args.photos} photos", PhotoSchema, make_photos(args.photos), args.rounds)
+    compare(f"{args.galleries} galleries", GallerySchema, make_galleries(args.galleries), args.rounds)
+
+
+if __name__ == "__main__":
+    main()
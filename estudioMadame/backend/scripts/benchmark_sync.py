@@ -0,0 +1,120 @@
+"""
+Script to benchmark the Google Drive folder sync offline.
+
+Imports a synthetic folder from the in-memory fake Drive into a scratch
+SQLite database (or --database-url), then syncs it incrementally unchanged
+and after removing and renaming a share of the files, and finally forces a
+full re-sync for comparison, reporting the time of each run.
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+import app.initial_data  # noqa: F401  (registers every model)
+from app.models.client import Client
+from app.models.gallery import Gallery
+from app.services.drive import FakeDriveAdapter
+from app.services.sync import SyncService
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+
+def run_sync(
+    Session,
+    gallery_id,
+    adapter: FakeDriveAdapter,
+    label: str,
+    page_size: int,
+    full: bool = False
+) -> None:
+    """Start and run one sync job, logging its duration and counters."""
+    db = Session()
+    try:
+        service = SyncService(db)
+        job, _ = service.start_sync(db.get(Gallery, gallery_id), full=full)
+        started = time.perf_counter()
+        job = service.run_job(job.id, lambda integration: adapter, page_size=page_size)
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+
+    logger.info(
+        f"{label:<28} {elapsed:8.2f}s  {job.status:<9} {job.mode:<11} seen={job.files_seen} "
+        f"added={job.photos_added} updated={job.photos_updated} removed={job.photos_removed} "
+        f"({job.files_seen / elapsed:,.0f} files/s)"
+    )
+    if job.status != "completed":
+        raise SystemExit(job.error)
+
+
+def main() -> None:
+    """Main function to benchmark the sync engine."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=10_000, help="Files in the folder")
+    parser.add_argument("--page-size", type=int, default=1000, help="Files per Drive page")
+    parser.add_argument(
+        "--churn",
+        type=float,
+        default=0.05,
+        help="Share of files removed and renamed before the last run"
+    )
+    parser.add_argument("--database-url", default=None, help="Database to use (default: scratch SQLite)")
+    args = parser.parse_args()
+
+    scratch_path = None
+    database_url = args.database_url
+    if database_url is None:
+        fd, scratch_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite:///{scratch_path}"
+
+    engine = create_engine(database_url)
+    Session = sessionmaker(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    try:
+        db = Session()
+        client = Client(name="Benchmark", email=f"bench-{time.time()}@example.com", hashed_password="x")
+        db.add(client)
+        db.flush()
+        gallery = Gallery(
+            title="Benchmark",
+            client_id=client.id,
+            google_drive_folder_id=f"bench-{client.id}"
+        )
+        db.add(gallery)
+        db.commit()
+        gallery_id, folder_id = gallery.id, gallery.google_drive_folder_id
+        db.close()
+
+        adapter = FakeDriveAdapter()
+        files = adapter.generate_files(folder_id, args.photos)
+        logger.info(f"Syncing a {args.photos:,}-file folder ({database_url})")
+
+        run_sync(Session, gallery_id, adapter, "initial import", args.page_size)
+        run_sync(Session, gallery_id, adapter, "unchanged, incremental", args.page_size)
+
+        changed = int(len(files) * args.churn)
+        for file in files[:changed]:
+            adapter.remove_file(folder_id, file["id"])
+        adapter.add_files(
+            folder_id,
+            [{**file, "name": f"renamed_{file['name']}"} for file in files[changed:changed * 2]]
+        )
+        run_sync(Session, gallery_id, adapter, f"{args.churn:.0%} churn, incremental", args.page_size)
+        run_sync(Session, gallery_id, adapter, "unchanged, full", args.page_size, full=True)
+    finally:
+        engine.dispose()
+        if scratch_path:
+            os.remove(scratch_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Script to benchmark the photo derivative pipeline.
+
+Writes synthetic camera-sized JPEG originals to a scratch directory, then
+measures for each one the cold path (fetch, decode once, render every size
+and store them in the disk cache) and the warm path (cache lookup), and the
+decode time of the original with and without JPEG draft mode (reduced-scale
+decoding) used by the renderer.
+"""
+import argparse
+import io
+import logging
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from typing import List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.initial_data  # noqa: F401  (registers every model)
+from app.core.database import Base
+from app.core.derivative_cache import DerivativeCache
+from app.models.client import Client
+from app.models.gallery import Gallery
+from app.models.photo import Photo
+from app.services.derivatives import DERIVATIVE_SIZES, DerivativePool
+from app.services.image_source import LocalImageSource
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+
+def make_original(width: int, height: int, seed: int) -> bytes:
+    """Encode a noisy JPEG, which compresses about like a photo."""
+    from PIL import Image
+
+    noise = Image.effect_noise((width // 8, height // 8), 64 + seed % 32).resize((width, height))
+    image = Image.merge("RGB", (noise, noise.rotate(180), noise.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def decode_ms(data: bytes, draft: bool) -> float:
+    """Time one decode of an original, optionally in draft mode."""
+    from PIL import Image
+
+    started = time.perf_counter()
+    with Image.open(io.BytesIO(data)) as image:
+        if draft:
+            edge = max(DERIVATIVE_SIZES.values())
+            image.draft("RGB", (edge, edge * image.height // image.width))
+        image.load()
+    return (time.perf_counter() - started) * 1000
+
+
+def describe(name: str, samples: List[float]) -> str:
+    """Format the median and max of a list of milliseconds."""
+    return f"{name:<28} median {statistics.median(samples):8.1f} ms   max {max(samples):8.1f} ms"
+
+
+def main() -> None:
+    """Main function to run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=10, help="Originals to render")
+    parser.add_argument("--width", type=int, default=6000, help="Original width")
+    parser.add_argument("--height", type=int, default=4000, help="Original height")
+    parser.add_argument("--format", default="webp", choices=["webp", "jpeg"], help="Derivative format")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        originals = os.path.join(scratch, "originals")
+        os.mkdir(originals)
+        engine = create_engine(f"sqlite:///{os.path.join(scratch, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine)
+
+        db = session_factory()
+        client = Client(name="Benchmark", email="bench@example.com", hashed_password="x")
+        db.add(client)
+        db.flush()
+        gallery = Gallery(title="Benchmark", client_id=client.id)
+        db.add(gallery)
+        db.flush()
+        photos, sizes = [], []
+        for i in range(args.photos):
+            data = make_original(args.width, args.height, i)
+            file_id = f"original-{uuid.uuid4().hex}"
+            with open(os.path.join(originals, file_id), "wb") as f:
+                f.write(data)
+            photo = Photo(
+                gallery_id=gallery.id,
+                google_drive_file_id=file_id,
+                file_name=f"IMG_{i:04d}.jpg",
+                file_size=len(data),
+                mime_type="image/jpeg"
+            )
+            db.add(photo)
+            photos.append(photo)
+            sizes.append(len(data))
+        db.commit()
+        logger.info(
+            f"{args.photos} originals of {args.width}x{args.height}, "
+            f"{statistics.mean(sizes) / 1024 ** 2:.1f} MiB on average"
+        )
+
+        sample = open(os.path.join(originals, photos[0].google_drive_file_id), "rb").read()
+        logger.info(describe("decode full size", [decode_ms(sample, draft=False) for _ in range(3)]))
+        logger.info(describe("decode in draft mode", [decode_ms(sample, draft=True) for _ in range(3)]))
+
+        cache = DerivativeCache(os.path.join(scratch, "cache"), max_bytes=1024 ** 3)
+        pool = DerivativePool(
+            session_factory=session_factory,
+            source_factory=lambda session: LocalImageSource(originals),
+            cache=cache,
+            inline=True
+        )
+        cold, warm = [], []
+        for photo in photos:
+            started = time.perf_counter()
+            pool.get(photo, "thumb", args.format)
+            cold.append((time.perf_counter() - started) * 1000)
+            db.refresh(photo)
+            for size in DERIVATIVE_SIZES:
+                started = time.perf_counter()
+                pool.get(photo, size, args.format)
+                warm.append((time.perf_counter() - started) * 1000)
+        db.close()
+        engine.dispose()
+
+        stats = cache.stats()
+        logger.info(describe(f"cold ({len(DERIVATIVE_SIZES)} sizes rendered)", cold))
+        logger.info(describe("warm (disk cache hit)", warm))
+        logger.info(
+            f"cache: {stats['files']} files, {stats['bytes'] / args.photos / 1024:.0f} KiB per photo "
+            f"for every size, {stats['hits']} hits"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Script to audit the query plans of the service layer.
+
+Runs the read paths of the services against a seeded database, captures
+every SELECT they issue and runs EXPLAIN on it, flagging full table scans.
+By default a scratch SQLite database is created and seeded; pass
+--database-url to audit an existing database instead (e.g. a Postgres copy
+of production).
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Callable, List, Tuple
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.database import Base
+from app.models.user import User
+from app.models.client import Client
+from app.models.gallery import Gallery
+from app.models.photo import Photo
+from app.models.approval import Approval
+from app.services.approval import ApprovalService
+from app.services.client import ClientService
+from app.services.dashboard import DashboardService
+from app.services.gallery import GalleryService
+from app.services.photo import PhotoService
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+STATUSES = ["draft", "published", "client_selection", "archived"]
+
+
+def seed(db: Session, clients: int, galleries: int, photos: int) -> None:
+    """Create clients, galleries, photos and approvals for the audit."""
+    logger.info(
+        f"Seeding {clients} clients x {galleries} galleries x {photos} photos..."
+    )
+    now = datetime.utcnow()
+    for c in range(clients):
+        client = Client(
+            name=f"Client {c}",
+            email=f"client{c}@example.com",
+            hashed_password="not-a-real-hash",
+            created_at=now - timedelta(days=c)
+        )
+        db.add(client)
+        db.flush()
+
+        for g in range(galleries):
+            gallery = Gallery(
+                title=f"Gallery {c}-{g}",
+                client_id=client.id,
+                status=STATUSES[g % len(STATUSES)],
+                date_created=now - timedelta(days=c, hours=g)
+            )
+            db.add(gallery)
+            db.flush()
+
+            db.add_all([
+                Photo(
+                    gallery_id=gallery.id,
+                    google_drive_file_id=f"audit-{c}-{g}-{p}",
+                    file_name=f"IMG_{p:05d}.jpg",
+                    file_size=2_000_000,
+                    mime_type="image/jpeg",
+                    selected_by_client=p % 7 == 0
+                )
+                for p in range(photos)
+            ])
+            db.add(Approval(
+                gallery_id=gallery.id,
+                gallery_name=gallery.title,
+                client_id=client.id,
+                client_name=client.name
+            ))
+        db.commit()
+
+
+def audit_paths(db: Session) -> List[Tuple[str, Callable[[], Any]]]:
+    """
+    Build the list of service calls to audit.
+
+    Uses the first client and gallery in the database as sample keys.
+    """
+    client = db.query(Client).order_by(Client.created_at.desc()).first()
+    gallery = db.query(Gallery).order_by(Gallery.date_created.desc()).first()
+    if not client or not gallery:
+        raise SystemExit("Database is empty, run with seeding enabled.")
+
+    galleries = GalleryService(db)
+    photos = PhotoService(db)
+    approvals = ApprovalService(db)
+    clients = ClientService(db)
+    dashboard = DashboardService(db)
+
+    _, _, gallery_cursor = galleries.list_galleries(limit=5, include_total=False)
+    _, _, photo_cursor = photos.list_photos(gallery.id, limit=5, include_total=False)
+    _, _, approval_cursor = approvals.list_approvals(limit=5, include_total=False)
+    _, _, client_cursor = clients.list_with_stats(limit=5, include_total=False)
+
+    return [
+        ("galleries: list", lambda: galleries.list_galleries()),
+        ("galleries: list by status", lambda: galleries.list_galleries(status="published")),
+        ("galleries: list by client", lambda: galleries.list_galleries(client_id=client.id)),
+        ("galleries: list sorted by photo_count", lambda: galleries.list_galleries(sort_by="photo_count")),
+        ("galleries: next page by cursor", lambda: galleries.list_galleries(cursor=gallery_cursor, include_total=False)),
+        ("galleries: client portal", lambda: galleries.list_by_client(client.id)),
+        ("galleries: detail", lambda: galleries.get_with_details(gallery.id)),
+        ("photos: list", lambda: photos.list_photos(gallery.id)),
+        ("photos: list selected", lambda: photos.list_photos(gallery.id, selected_by_client=True)),
+        ("photos: next page by cursor", lambda: photos.list_photos(gallery.id, cursor=photo_cursor, include_total=False)),
+        ("photos: selected count", lambda: photos.get_selected_count(gallery.id)),
+        ("approvals: list", lambda: approvals.list_approvals()),
+        ("approvals: list by client", lambda: approvals.list_approvals(client_id=client.id)),
+        ("approvals: next page by cursor", lambda: approvals.list_approvals(cursor=approval_cursor, include_total=False)),
+        ("clients: list", lambda: clients.list_with_stats()),
+        ("clients: next page by cursor", lambda: clients.list_with_stats(cursor=client_cursor, include_total=False)),
+        ("clients: detail", lambda: clients.get_with_stats(client.id)),
+        ("dashboard: stats", lambda: dashboard.get_stats()),
+        ("dashboard: recent galleries", lambda: dashboard.get_recent_galleries(status_filter="delivered")),
+    ]
+
+
+def explain(connection: Connection, statement: str, parameters: Any) -> List[str]:
+    """
+    Return the query plan of a statement as a list of lines.
+    """
+    if connection.dialect.name == "postgresql":
+        plan = connection.exec_driver_sql(
+            "EXPLAIN (FORMAT JSON) " + statement, parameters
+        ).scalar()
+        lines: List[str] = []
+
+        def walk(node: dict, depth: int) -> None:
+            line = node["Node Type"]
+            if "Relation Name" in node:
+                line += f" on {node['Relation Name']}"
+            if "Index Name" in node:
+                line += f" using {node['Index Name']}"
+            lines.append("  " * depth + line)
+            for child in node.get("Plans", []):
+                walk(child, depth + 1)
+
+        walk(plan[0]["Plan"], 0)
+        return lines
+
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    return [row[-1] for row in rows]
+
+
+def is_full_scan(line: str) -> bool:
+    """Whether a plan line reads a whole table rather than using an index."""
+    line = line.strip()
+    if line.startswith("Seq Scan"):
+        return True
+    # SQLite: "SCAN photos" is a table scan, "SCAN photos USING INDEX ..." walks an index
+    return line.startswith("SCAN ") and " USING " not in line
+
+
+def run_audit(engine: Engine, db: Session) -> int:
+    """
+    Run every audited path, EXPLAIN its queries and log the plans.
+
+    Returns:
+        Number of queries with a full table scan
+    """
+    captured: List[Tuple[str, str, Any]] = []
+    current = {"label": ""}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((current["label"], statement, parameters))
+
+    paths = audit_paths(db)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        for label, call in paths:
+            current["label"] = label
+            call()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    flagged = 0
+    with engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            # Small seeded tables make seq scans the cheapest plan; disable
+            # them so a remaining Seq Scan means no usable index exists.
+            connection.exec_driver_sql("SET enable_seqscan = off")
+
+        for label, statement, parameters in captured:
+            plan = explain(connection, statement, parameters)
+            scans = [line for line in plan if is_full_scan(line)]
+            flagged += bool(scans)
+
+            logger.info(f"{'!! ' if scans else '   '}{label}")
+            logger.info("     " + " ".join(statement.split())[:200])
+            for line in plan:
+                marker = "  <-- full scan" if is_full_scan(line) else ""
+                logger.info(f"       {line}{marker}")
+
+    logger.info(f"\n{flagged} of {len(captured)} queries use a full table scan.")
+    return flagged
+
+
+def main() -> None:
+    """Main function to audit query plans."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="Audit this database instead of a scratch SQLite one (not seeded unless --seed)"
+    )
+    parser.add_argument("--seed", action="store_true", help="Seed the --database-url database")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--galleries", type=int, default=5, help="Galleries per client")
+    parser.add_argument("--photos", type=int, default=40, help="Photos per gallery")
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="Exit with status 1 when any query uses a full table scan"
+    )
+    args = parser.parse_args()
+
+    scratch_path = None
+    database_url = args.database_url
+    if database_url is None:
+        fd, scratch_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite:///{scratch_path}"
+
+    engine = create_engine(database_url)
+    db = sessionmaker(bind=engine)()
+    try:
+        if scratch_path or args.seed:
+            Base.metadata.create_all(bind=engine)
+            seed(db, args.clients, args.galleries, args.photos)
+            with engine.begin() as connection:
+                connection.execute(text("ANALYZE"))
+
+        flagged = run_audit(engine, db)
+    finally:
+        db.close()
+        engine.dispose()
+        if scratch_path:
+            os.remove(scratch_path)
+
+    if args.strict and flagged:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""
+Script to generate a large synthetic studio dataset.
+
+Fills a database with thousands of clients, tens of thousands of galleries
+and millions of photos, shaped like a real studio: most galleries are
+published or archived, a share is waiting on the client's selection (with
+an approval), and photos per gallery follow a long-tailed distribution.
+The output is deterministic for a given --seed.
+
+Rows go in with table-level bulk INSERTs (executemany, batched into
+multi-row statements on Postgres), a few hundred galleries and their photos
+per transaction. Gallery photo counters and approval counts are computed
+while generating, as the Photo mapper events do not run for bulk inserts.
+Every gallery has an access token, so the public pages can be loaded too.
+
+Works on SQLite and Postgres; see load_test.py for the load suite that runs
+against it.
+"""
+import argparse
+import logging
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import func, insert, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+import app.initial_data  # noqa: F401  (registers every model and the search indexes)
+from app.core.config import settings
+from app.core.database import Base, build_engine
+from app.core.security import get_password_hash
+from app.models.approval import Approval
+from app.models.client import Client
+from app.models.gallery import Gallery
+from app.models.photo import Photo
+from app.models.user import User
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+logging.getLogger("app.core.database").setLevel(logging.WARNING)
+
+ADMIN_EMAIL = "load@example.com"
+ADMIN_PASSWORD = "loadtest123"
+CLIENT_PASSWORD = "cliente123"
+
+EVENTS = ["Casamento", "Ensaio", "Aniversário", "Batizado", "Formatura", "Gestante", "Corporativo", "Newborn"]
+PLACES = ["Praia", "Fazenda", "Igreja", "Parque", "Estúdio", "Jardim", "Centro", "Serra"]
+FIRST_NAMES = ["Ana", "João", "Maria", "Pedro", "Carla", "Lucas", "Julia", "Rafael", "Beatriz", "Tiago"]
+LAST_NAMES = ["Silva", "Souza", "Oliveira", "Santos", "Lima", "Costa", "Pereira", "Almeida", "Ribeiro", "Gomes"]
+
+# Gallery status and how often it occurs
+STATUS_WEIGHTS = {"published": 45, "archived": 25, "client_selection": 20, "draft": 10}
+APPROVAL_STATUS_WEIGHTS = {"awaiting": 50, "changes": 20, "complete": 30}
+
+# Rows per INSERT of clients and photos
+ROW_BATCH = 5000
+PHOTO_BATCH = 10_000
+# Galleries written per transaction, with their photos and approvals
+GALLERY_BATCH = 500
+
+
+@dataclass(frozen=True)
+class DatasetSize:
+    """Shape of a generated dataset."""
+
+    clients: int
+    galleries: int
+    photos_per_gallery: float  # mean; the distribution is long-tailed
+
+
+SIZES: Dict[str, DatasetSize] = {
+    "small": DatasetSize(clients=200, galleries=1_000, photos_per_gallery=50),
+    "medium": DatasetSize(clients=2_000, galleries=10_000, photos_per_gallery=100),
+    "large": DatasetSize(clients=5_000, galleries=40_000, photos_per_gallery=100),
+}
+
+# Largest gallery; keeps the lognormal tail in check
+MAX_PHOTOS_PER_GALLERY = 5000
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    """Random UUID drawn from rng, so runs are reproducible."""
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _pick(rng: random.Random, weights: Dict[str, int]) -> str:
+    """Draw a key of weights with its weight as probability."""
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _photo_count(rng: random.Random, mean: float) -> int:
+    """Photos in a gallery: lognormal around mean, at least one."""
+    sigma = 0.8
+    mu = math.log(mean) - sigma ** 2 / 2
+    return max(1, min(MAX_PHOTOS_PER_GALLERY, int(rng.lognormvariate(mu, sigma))))
+
+
+def _gallery_photos(rng: random.Random, gallery: dict, count: int) -> List[dict]:
+    """Photo rows of one gallery, shot on its event date."""
+    # Selections only exist once the client has been asked to pick
+    share = rng.uniform(0.05, 0.3) if gallery["status"] in ("client_selection", "archived") else 0
+    taken_at = datetime.combine(gallery["event_date"], datetime.min.time()) + timedelta(hours=14)
+    synced_at = gallery["date_created"] + timedelta(hours=1)
+    return [
+        {
+            "id": _uuid(rng),
+            "gallery_id": gallery["id"],
+            "google_drive_file_id": f"gen-{gallery['id'].hex}-{p}",
+            "file_name": f"IMG_{p:05d}.jpg",
+            "file_size": rng.randrange(2_000_000, 12_000_000),
+            "mime_type": "image/jpeg",
+            "width": 6000 if p % 5 else 4000,
+            "height": 4000 if p % 5 else 6000,
+            "selected_by_client": rng.random() < share,
+            "created_in_drive": taken_at + timedelta(seconds=p * 7),
+            "synced_at": synced_at
+        }
+        for p in range(count)
+    ]
+
+
+def generate(engine: Engine, size: DatasetSize, seed: int = 42) -> Dict[str, int]:
+    """
+    Create the schema and fill it with a synthetic dataset.
+
+    The database is expected to be empty.
+
+    Args:
+        engine: Target database
+        size: Number of clients, galleries and photos
+        seed: Random seed; the same seed gives the same data
+
+    Returns:
+        Row counts per table
+    """
+    rng = random.Random(seed)
+    Base.metadata.create_all(engine)
+    now = datetime(2026, 1, 1)
+    # Hashed once: bcrypt for every client would take minutes
+    client_hash = get_password_hash(CLIENT_PASSWORD)
+
+    clients = []
+    for i in range(size.clients):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created_at = now - timedelta(days=rng.uniform(0, 3 * 365))
+        clients.append({
+            "id": _uuid(rng),
+            "name": f"{first} {last} {i}",
+            "email": f"cliente{i}@example.com",
+            "hashed_password": client_hash,
+            "phone": f"+55 11 9{rng.randrange(10 ** 8):08d}",
+            "created_at": created_at,
+            "updated_at": created_at
+        })
+
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [{
+            "id": _uuid(rng),
+            "email": ADMIN_EMAIL,
+            "name": "Load Test",
+            "role": "admin",
+            "hashed_password": get_password_hash(ADMIN_PASSWORD),
+            "created_at": now,
+            "updated_at": now
+        }])
+        for start in range(0, len(clients), ROW_BATCH):
+            conn.execute(insert(Client.__table__), clients[start:start + ROW_BATCH])
+
+    photos = 0
+    started = time.perf_counter()
+    for start in range(0, size.galleries, GALLERY_BATCH):
+        galleries: List[dict] = []
+        approval_rows: List[dict] = []
+        photo_rows: List[dict] = []
+        for i in range(start, min(start + GALLERY_BATCH, size.galleries)):
+            client = rng.choice(clients)
+            status = _pick(rng, STATUS_WEIGHTS)
+            event = rng.choice(EVENTS)
+            created_at = client["created_at"] + timedelta(days=rng.uniform(0, 60))
+            gallery = {
+                "id": _uuid(rng),
+                "title": f"{event} {client['name'].split()[0]} {i}",
+                "description": f"{event} na {rng.choice(PLACES)}",
+                "client_id": client["id"],
+                "status": status,
+                "event_date": (created_at - timedelta(days=rng.randrange(30))).date(),
+                "location": rng.choice(PLACES),
+                "access_token": f"{rng.getrandbits(128):032x}",
+                "auto_sync_enabled": False,
+                "sync_status": "idle",
+                "date_created": created_at,
+                "updated_at": created_at
+            }
+            gallery_photos = _gallery_photos(rng, gallery, _photo_count(rng, size.photos_per_gallery))
+            # Rows go in with table-level inserts, which skip the Photo
+            # mapper events: the counters are set here instead
+            gallery.update(
+                photo_count=len(gallery_photos),
+                selected_count=sum(1 for photo in gallery_photos if photo["selected_by_client"]),
+                total_bytes=sum(photo["file_size"] for photo in gallery_photos),
+                photo_version=1
+            )
+            galleries.append(gallery)
+            photo_rows.extend(gallery_photos)
+
+            if status == "client_selection":
+                approval_status = _pick(rng, APPROVAL_STATUS_WEIGHTS)
+                approval_rows.append({
+                    "id": _uuid(rng),
+                    "gallery_id": gallery["id"],
+                    "gallery_name": gallery["title"],
+                    "client_id": client["id"],
+                    "client_name": client["name"],
+                    "status": approval_status,
+                    "selected_count": gallery["selected_count"],
+                    "total_count": gallery["photo_count"],
+                    "submitted_at": created_at + timedelta(days=7) if approval_status != "awaiting" else None,
+                    "updated_at": created_at + timedelta(days=rng.uniform(0, 14))
+                })
+
+        with engine.begin() as conn:
+            conn.execute(insert(Gallery.__table__), galleries)
+            if approval_rows:
+                conn.execute(insert(Approval.__table__), approval_rows)
+            for offset in range(0, len(photo_rows), PHOTO_BATCH):
+                conn.execute(insert(Photo.__table__), photo_rows[offset:offset + PHOTO_BATCH])
+
+        photos += len(photo_rows)
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"  {start + len(galleries)}/{size.galleries} galleries, "
+            f"{photos:,} photos ({photos / elapsed:,.0f} photos/s)"
+        )
+
+    # Fresh planner statistics, as a long-lived database would have
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    with Session(engine) as db:
+        return {
+            model.__tablename__: db.execute(select(func.count()).select_from(model)).scalar()
+            for model in (Client, Gallery, Photo, Approval)
+        }
+
+
+def main() -> None:
+    """Main function to generate the dataset."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL, help="Target database (must be empty)")
+    parser.add_argument("--size", choices=SIZES, default="medium", help="Dataset preset")
+    parser.add_argument("--clients", type=int, default=None, help="Override the preset's clients")
+    parser.add_argument("--galleries", type=int, default=None, help="Override the preset's galleries")
+    parser.add_argument("--photos-per-gallery", type=float, default=None, help="Override the preset's mean photos per gallery")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--drop", action="store_true", help="Drop every table first")
+    args = parser.parse_args()
+
+    preset = SIZES[args.size]
+    size = DatasetSize(
+        clients=args.clients or preset.clients,
+        galleries=args.galleries or preset.galleries,
+        photos_per_gallery=args.photos_per_gallery or preset.photos_per_gallery
+    )
+
+    # Same engine setup as the app (WAL on SQLite)
+    engine = build_engine(args.database_url)
+    try:
+        if args.drop:
+            Base.metadata.drop_all(engine)
+        elif inspect(engine).has_table(Gallery.__tablename__):
+            with engine.connect() as conn:
+                if conn.execute(select(Gallery.id).limit(1)).first():
+                    raise SystemExit("The database already has galleries; use an empty one or --drop")
+        logger.info(
+            f"Generating {size.clients} clients, {size.galleries} galleries, "
+            f"~{size.galleries * size.photos_per_gallery:,.0f} photos into {engine.url.render_as_string()}"
+        )
+        started = time.perf_counter()
+        counts = generate(engine, size, args.seed)
+        logger.info(f"Done in {time.perf_counter() - started:.1f}s: {counts}")
+        logger.info(f"Admin login: {ADMIN_EMAIL} / {ADMIN_PASSWORD}; client logins: cliente<N>@example.com / {CLIENT_PASSWORD}")
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
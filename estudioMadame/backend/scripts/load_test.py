@@ -0,0 +1,454 @@
+"""
+Script to load test the API.
+
+Runs scenarios of requests with N concurrent virtual users and reports
+requests/sec and latency percentiles per route:
+
+- dashboard: stats and recent galleries
+- galleries: gallery list (first page, next keyset page, status tab, search)
+  and gallery details
+- clients: client list and details
+- public: clients paging through public galleries with their access token
+- selection: clients selecting and deselecting photos, one at a time and in
+  batches
+- approvals: approval list and details
+
+A /health probe runs alongside the load: its latency shows whether request
+handlers block the event loop.
+
+By default the app is served in-process (ASGI transport) against a scratch
+SQLite database filled by generate_dataset.py (--size). --database-url
+serves it in-process against a database generate_dataset.py already filled
+(e.g. a local Postgres); --base-url loads a running server instead.
+
+--output stores the results as JSON; --compare checks them against an
+earlier run and fails when a route's p95 latency regressed by more than
+--max-regression percent.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+SCENARIOS = ("dashboard", "galleries", "clients", "public", "selection", "approvals")
+
+# Results file layout; bump when it changes incompatibly
+RESULTS_VERSION = 1
+
+
+class Step(NamedTuple):
+    """One request of a scenario."""
+
+    route: str  # reported name, e.g. "GET /api/v1/galleries/{id}"
+    method: str
+    url: str
+    body: Optional[dict] = None
+
+
+async def _get_json(client: httpx.AsyncClient, url: str, **params: Any) -> dict:
+    """GET a URL and return its JSON body."""
+    # An empty params would replace the query string of url
+    response = await client.get(url, params=params or None)
+    response.raise_for_status()
+    return response.json()
+
+
+async def build_steps(client: httpx.AsyncClient, scenarios: List[str]) -> List[Step]:
+    """
+    Discover resources to request and build the steps of the scenarios.
+
+    Returns:
+        Steps of every scenario, interleaved
+    """
+    per_scenario: Dict[str, List[Step]] = {}
+    listing = await _get_json(client, "/api/v1/galleries", limit=20)
+    galleries = listing["data"]
+
+    if "dashboard" in scenarios:
+        per_scenario["dashboard"] = [
+            Step("GET /api/v1/dashboard/stats", "GET", "/api/v1/dashboard/stats"),
+            Step("GET /api/v1/dashboard/recent-galleries", "GET", "/api/v1/dashboard/recent-galleries?limit=10"),
+        ]
+
+    if "galleries" in scenarios:
+        steps = [
+            Step("GET /api/v1/galleries", "GET", "/api/v1/galleries?limit=20"),
+            Step("GET /api/v1/galleries (status)", "GET", "/api/v1/galleries?limit=20&status=client_selection"),
+            Step("GET /api/v1/galleries (search)", "GET", "/api/v1/galleries?limit=20&search=casamento"),
+        ]
+        if listing["meta"].get("next_cursor"):
+            steps.append(Step(
+                "GET /api/v1/galleries (cursor)", "GET",
+                f"/api/v1/galleries?limit=20&include_total=false&cursor={listing['meta']['next_cursor']}"
+            ))
+        steps.extend(Step("GET /api/v1/galleries/{id}", "GET", f"/api/v1/galleries/{g['id']}") for g in galleries[:5])
+        per_scenario["galleries"] = steps
+
+    if "clients" in scenarios:
+        clients = (await _get_json(client, "/api/v1/clients/", limit=20))["data"]
+        per_scenario["clients"] = [
+            Step("GET /api/v1/clients/", "GET", "/api/v1/clients/?limit=20"),
+            *[Step("GET /api/v1/clients/{id}", "GET", f"/api/v1/clients/{c['id']}") for c in clients[:5]],
+        ]
+
+    if "public" in scenarios:
+        steps = []
+        published = (await _get_json(client, "/api/v1/galleries", limit=5, status="published"))["data"]
+        for gallery in published:
+            # Follow the cursors the way the public gallery page scrolls
+            url = f"/api/v1/galleries/{gallery['id']}/photos/public?limit=50&access_token={gallery['access_token']}"
+            steps.append(Step("GET /api/v1/galleries/{id}/photos/public", "GET", url))
+            page = await _get_json(client, url)
+            for _ in range(4):
+                if not page["meta"].get("next_cursor"):
+                    break
+                url = (
+                    f"/api/v1/galleries/{gallery['id']}/photos/public?limit=50&include_total=false"
+                    f"&access_token={gallery['access_token']}&cursor={page['meta']['next_cursor']}"
+                )
+                steps.append(Step("GET /api/v1/galleries/{id}/photos/public (cursor)", "GET", url))
+                page = await _get_json(client, url)
+        per_scenario["public"] = steps
+
+    if "selection" in scenarios:
+        steps = []
+        selecting = (await _get_json(client, "/api/v1/galleries", limit=5, status="client_selection"))["data"]
+        for gallery in selecting:
+            photos = (await _get_json(client, f"/api/v1/galleries/{gallery['id']}/photos", limit=20))["data"]
+            if not photos:
+                continue
+            token = gallery["access_token"]
+            # Select then deselect, so the selection state stays the same
+            for selected in (True, False):
+                steps.append(Step(
+                    "POST /api/v1/photos/{id}/select", "POST", f"/api/v1/photos/{photos[0]['id']}/select",
+                    {"gallery_access_token": token, "selected": selected}
+                ))
+                steps.append(Step(
+                    "POST /api/v1/galleries/{id}/selections", "POST", f"/api/v1/galleries/{gallery['id']}/selections",
+                    {
+                        "gallery_access_token": token,
+                        "operations": [{"photo_id": p["id"], "selected": selected} for p in photos[1:11]]
+                    }
+                ))
+        per_scenario["selection"] = steps
+
+    if "approvals" in scenarios:
+        approvals = (await _get_json(client, "/api/v1/approvals", limit=20))["data"]
+        per_scenario["approvals"] = [
+            Step("GET /api/v1/approvals", "GET", "/api/v1/approvals?limit=20"),
+            *[Step("GET /api/v1/approvals/{id}", "GET", f"/api/v1/approvals/{a['id']}") for a in approvals[:5]],
+        ]
+
+    for name in scenarios:
+        if not per_scenario.get(name):
+            logger.warning(f"Scenario {name}: nothing to request in this dataset, skipped")
+
+    # Round-robin across scenarios so each user mixes them
+    mixed: List[Step] = []
+    queues = [list(s) for s in per_scenario.values() if s]
+    while any(queues):
+        for queue in queues:
+            if queue:
+                mixed.append(queue.pop(0))
+    return mixed
+
+
+async def virtual_user(
+    client: httpx.AsyncClient,
+    steps: List[Step],
+    deadline: float,
+    samples: Dict[str, List[float]],
+    errors: Dict[str, int],
+    offset: int
+) -> None:
+    """Run the steps round-robin until the deadline."""
+    i = offset
+    while time.perf_counter() < deadline:
+        step = steps[i % len(steps)]
+        i += 1
+        started = time.perf_counter()
+        response = await client.request(step.method, step.url, json=step.body)
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            errors[step.route] += 1
+        samples[step.route].append(elapsed)
+
+
+async def health_probe(
+    client: httpx.AsyncClient,
+    deadline: float,
+    samples: List[float],
+    interval: float
+) -> None:
+    """Measure /health latency at a fixed interval during the load."""
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.get("/health")
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Return the pct-th percentile of values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def latency_stats(values: List[float], elapsed: float) -> Dict[str, float]:
+    """Request count, throughput and latency percentiles in milliseconds."""
+    return {
+        "requests": len(values),
+        "rps": round(len(values) / elapsed, 2),
+        "mean_ms": round(statistics.fmean(values) * 1000, 2),
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(max(values) * 1000, 2),
+    }
+
+
+async def run(
+    client: httpx.AsyncClient,
+    email: str,
+    password: str,
+    scenarios: List[str],
+    users: int,
+    duration: float
+) -> Tuple[Dict[str, List[float]], Dict[str, int], List[float], float]:
+    """Log in, build the scenario steps and run the load."""
+    response = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    client.headers["Authorization"] = f"Bearer {response.json()['data']['access_token']}"
+
+    steps = await build_steps(client, scenarios)
+    if not steps:
+        raise SystemExit("Nothing to request; is the database empty?")
+
+    samples: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    probe: List[float] = []
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(
+        health_probe(client, deadline, probe, interval=0.05),
+        *[virtual_user(client, steps, deadline, samples, errors, offset=u) for u in range(users)]
+    )
+    return samples, errors, probe, time.perf_counter() - started
+
+
+def summarize(
+    samples: Dict[str, List[float]],
+    errors: Dict[str, int],
+    probe: List[float],
+    elapsed: float
+) -> Dict[str, Any]:
+    """Build the per-route and total statistics of a run."""
+    routes = {
+        route: {**latency_stats(values, elapsed), "errors": errors.get(route, 0)}
+        for route, values in sorted(samples.items())
+    }
+    every = [value for values in samples.values() for value in values]
+    return {
+        "elapsed_seconds": round(elapsed, 2),
+        "routes": routes,
+        "total": {**latency_stats(every, elapsed), "errors": sum(errors.values())},
+        "health_probe": latency_stats(probe, elapsed) if probe else None,
+    }
+
+
+def report(summary: Dict[str, Any]) -> None:
+    """Log throughput and latency per route."""
+    logger.info(
+        f"{'route':<56} {'reqs':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+    )
+    for route, stats in [*summary["routes"].items(), ("total", summary["total"])]:
+        logger.info(
+            f"{route:<56} {stats['requests']:>7} {stats['rps']:>8.1f} {stats['p50_ms']:>8.1f} "
+            f"{stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['errors']:>7}"
+        )
+    probe = summary["health_probe"]
+    if probe:
+        logger.info(
+            f"/health probe during load: p50 {probe['p50_ms']:.1f} ms, "
+            f"p95 {probe['p95_ms']:.1f} ms, max {probe['max_ms']:.1f} ms"
+        )
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], max_regression: float) -> List[str]:
+    """
+    Compare the p95 latency and throughput of each route with a baseline run.
+
+    Returns:
+        Routes whose p95 grew by more than max_regression percent
+    """
+    regressions = []
+    logger.info(f"{'route':<56} {'base p95':>9} {'p95':>9} {'change':>8} {'base r/s':>9} {'req/s':>8}")
+    for route, stats in current["routes"].items():
+        base = baseline["routes"].get(route)
+        if not base:
+            logger.info(f"{route:<56} {'-':>9} {stats['p95_ms']:>9.1f} {'new':>8}")
+            continue
+        change = (stats["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100 if base["p95_ms"] else 0.0
+        flag = "  REGRESSION" if change > max_regression else ""
+        logger.info(
+            f"{route:<56} {base['p95_ms']:>9.1f} {stats['p95_ms']:>9.1f} {change:>+7.0f}% "
+            f"{base['rps']:>9.1f} {stats['rps']:>8.1f}{flag}"
+        )
+        if flag:
+            regressions.append(route)
+    return regressions
+
+
+def git_commit() -> Optional[str]:
+    """Commit of the working tree, if it is a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def dataset_counts(database_url: str) -> Dict[str, int]:
+    """Row counts of the main tables of the target database."""
+    from sqlalchemy import create_engine, func, select
+
+    from app.models.approval import Approval
+    from app.models.client import Client
+    from app.models.gallery import Gallery
+    from app.models.photo import Photo
+
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as conn:
+            return {
+                model.__tablename__: conn.execute(select(func.count()).select_from(model.__table__)).scalar()
+                for model in (Client, Gallery, Photo, Approval)
+            }
+    finally:
+        engine.dispose()
+
+
+def main() -> None:
+    """Main function to run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=32, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS), help="Scenarios to run")
+    parser.add_argument("--base-url", default=None, help="Load a running server instead of the in-process app")
+    parser.add_argument("--database-url", default=None, help="Serve the app in-process on this generated database")
+    parser.add_argument("--size", choices=("small", "medium", "large"), default="small", help="generate_dataset.py preset of the scratch database")
+    parser.add_argument("--email", default=None, help="Admin email (default: the generated admin)")
+    parser.add_argument("--password", default=None, help="Admin password (default: the generated admin's)")
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="JSON results of an earlier run to compare with")
+    parser.add_argument("--max-regression", type=float, default=20.0, help="Allowed p95 growth per route, in percent")
+    args = parser.parse_args()
+
+    scratch_path: Optional[str] = None
+    database_url = args.database_url
+    if not args.base_url and not database_url:
+        fd, scratch_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite:///{scratch_path}"
+    if database_url:
+        # Must be set before the app (and its engine) is imported
+        os.environ["DATABASE_URL"] = database_url
+
+    from app.core.database import build_engine
+    from scripts.generate_dataset import ADMIN_EMAIL, ADMIN_PASSWORD, SIZES, generate
+
+    try:
+        if scratch_path:
+            engine = build_engine(database_url)
+            try:
+                started = time.perf_counter()
+                counts = generate(engine, SIZES[args.size])
+                logger.info(f"Generated {args.size} dataset in {time.perf_counter() - started:.1f}s: {counts}")
+            finally:
+                engine.dispose()
+
+        if args.base_url:
+            transport = None
+            base_url = args.base_url
+            target = {"base_url": base_url, "database": None, "dataset": None}
+        else:
+            from app.main import app
+            transport = httpx.ASGITransport(app=app)
+            base_url = "http://loadtest"
+            target = {
+                "base_url": None,
+                "database": database_url.split(":", 1)[0].split("+", 1)[0],
+                "dataset": dataset_counts(database_url),
+            }
+
+        async def go():
+            limits = httpx.Limits(max_connections=args.users + 1)
+            async with httpx.AsyncClient(
+                transport=transport, base_url=base_url, limits=limits, timeout=60
+            ) as client:
+                return await run(
+                    client,
+                    args.email or ADMIN_EMAIL,
+                    args.password or ADMIN_PASSWORD,
+                    args.scenarios,
+                    args.users,
+                    args.duration
+                )
+
+        logger.info(f"Load: {args.users} users for {args.duration:.0f}s against {base_url} ({', '.join(args.scenarios)})")
+        started_at = datetime.now(timezone.utc)
+        summary = summarize(*asyncio.run(go()))
+        report(summary)
+    finally:
+        if scratch_path:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(scratch_path + suffix):
+                    os.remove(scratch_path + suffix)
+
+    results = {
+        "version": RESULTS_VERSION,
+        "started_at": started_at.isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "target": target,
+        "users": args.users,
+        "duration_seconds": args.duration,
+        "scenarios": args.scenarios,
+        **summary,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("target", {}).get("dataset") != target["dataset"]:
+            logger.warning("The baseline ran against a different dataset; latencies may not be comparable")
+        regressions = compare(baseline, results, args.max_regression)
+        if regressions:
+            logger.error(f"p95 regressed more than {args.max_regression:.0f}% on: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
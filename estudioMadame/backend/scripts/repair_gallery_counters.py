@@ -0,0 +1,39 @@
+"""
+Script to rebuild the denormalized gallery photo counters.
+
+Recomputes photo_count, selected_count and total_bytes from the photos
+table. Use it after the counters migration, after bulk edits made outside
+the API, or whenever the counters are suspected to have drifted.
+"""
+import argparse
+import logging
+from uuid import UUID
+
+from app.core.database import SessionLocal
+from app.services.gallery import GalleryService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    """Main function to repair gallery counters."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--gallery-id",
+        type=UUID,
+        default=None,
+        help="Only repair this gallery (default: all galleries)"
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        repaired = GalleryService(db).recompute_counters(args.gallery_id)
+        logger.info(f"Recomputed photo counters for {repaired} galleries.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
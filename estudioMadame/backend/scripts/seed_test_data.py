@@ -15,6 +15,7 @@
 from app.models.gallery import Gallery
 from app.models.photo import Photo
 from app.models.approval import Approval
+from app.services.photo import PhotoService
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -206,7 +207,7 @@ def create_test_galleries(db: Session, clients: list[Client]) -> list[Gallery]:
     return galleries
 
 
-def create_test_photos(db: Session, galleries: list[Gallery]) -> list[Photo]:
+def create_test_photos(db: Session, galleries: list[Gallery]) -> int:
     """Create test photos for galleries."""
     logger.info("Creating test photos...")
 
@@ -224,44 +225,47 @@ def create_test_photos(db: Session, galleries: list[Gallery]) -> list[Photo]:
         "https://images.unsplash.com/photo-1469371670807-013ccf25f16a",
     ]
 
-    photos = []
+    total = 0
+    photo_service = PhotoService(db)
 
     # Add photos to each gallery
     for i, gallery in enumerate(galleries):
         photo_count = 8 if i < 2 else 5  # More photos for first two galleries
 
+        photos = []
         for j in range(photo_count):
             url = photo_urls[j % len(photo_urls)]
             # Generate fake Google Drive file ID (since Google Drive is disabled)
             fake_drive_id = f"FAKE_{str(uuid4())}"
 
-            photo = Photo(
-                gallery_id=gallery.id,
-                google_drive_file_id=fake_drive_id,  # Required field, using fake ID
-                google_drive_web_view_link=url,
-                google_drive_thumbnail_link=f"{url}?w=400&h=400&fit=crop",
-                google_drive_download_link=url,
-                file_name=f"photo_{j+1}.jpg",
-                file_size=1024 * 1024 * 2,  # 2MB mock size
-                mime_type="image/jpeg",
-                width=1920,
-                height=1280,
-                selected_by_client=(j % 3 == 0) if gallery.status == "client_selection" else False,
-                photo_metadata={
+            photos.append({
+                "google_drive_file_id": fake_drive_id,  # Required field, using fake ID
+                "google_drive_web_view_link": url,
+                "google_drive_thumbnail_link": f"{url}?w=400&h=400&fit=crop",
+                "google_drive_download_link": url,
+                "file_name": f"photo_{j+1}.jpg",
+                "file_size": 1024 * 1024 * 2,  # 2MB mock size
+                "mime_type": "image/jpeg",
+                "width": 1920,
+                "height": 1280,
+                "selected_by_client": (j % 3 == 0) if gallery.status == "client_selection" else False,
+                "metadata": {
                     "camera": "Canon EOS R5",
                     "lens": "RF 24-70mm f/2.8",
-                    "iso": 400,
-                    "aperture": "f/2.8",
-                    "shutter_speed": "1/200"
+                    "exif": {
+                        "iso": 400,
+                        "aperture": "f/2.8",
+                        "shutter_speed": "1/200"
+                    }
                 }
-            )
-            db.add(photo)
-            photos.append(photo)
+            })
 
-    db.commit()
-    logger.info(f"✓ Created {len(photos)} test photos across all galleries")
+        # One batched insert per gallery, counters included
+        total += photo_service.bulk_ingest(gallery.id, photos)
+
+    logger.info(f"✓ Created {total} test photos across all galleries")
 
-    return photos
+    return total
 
 
 def create_test_approvals(db: Session, galleries: list[Gallery], clients: list[Client]) -> list[Approval]:
@@ -1,21 +1,32 @@
 """
 Pytest configuration and shared fixtures for all tests.
 """
+import aiosqlite
 import pytest
-from typing import Generator, AsyncGenerator
+from pathlib import Path
+from typing import Any, Generator, AsyncGenerator
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
 from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
-from app.core.database import Base, get_db
+from app.core.cache import clear_all_caches
+from app.core.database import Base, get_async_db, get_db
+from app.core.derivative_cache import DerivativeCache
+from app.api.deps import get_derivative_pool, get_job_runner, get_sync_dispatcher
 from app.main import app
 from app.core.config import settings
 from app.models.user import User
 from app.models.client import Client
 from app.models.gallery import Gallery
 from app.core.security import get_password_hash, create_access_token
+from app.services.derivatives import DerivativePool
+from app.services.drive import FakeDriveAdapter
+from app.services.image_source import LocalImageSource
+from app.services.jobs import JobRunner
+from app.services.sync import SyncDispatcher
 
 
 # Test database setup
@@ -30,12 +41,53 @@
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+class SharedConnection:
+    """The in-memory database connection, which aiosqlite may not close."""
+
+    def __init__(self, connection: Any):
+        self._connection = connection
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+
+    def close(self) -> None:
+        pass
+
+
+# Held for the whole run: checking it back in would roll back the database
+_shared_connection = engine.raw_connection()
+
+
+async def _connect_shared() -> aiosqlite.Connection:
+    """Open an aiosqlite connection onto the connection of the sync engine."""
+    connection = SharedConnection(_shared_connection.driver_connection)
+    return await aiosqlite.Connection(lambda: connection, iter_chunk_size=64)
+
+
+# Same database as engine: get_async_db routes see the rows the db fixture wrote.
+# No reset on return, which would roll back the db session's transaction.
+async_engine = create_async_engine(
+    "sqlite+aiosqlite://",
+    async_creator=_connect_shared,
+    poolclass=NullPool,
+    pool_reset_on_return=None,
+)
+
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def override_get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with TestingAsyncSessionLocal() as session:
+        yield session
+
+
 @pytest.fixture(scope="function")
 def db() -> Generator[Session, None, None]:
     """
     Create a fresh database for each test.
     """
     Base.metadata.create_all(bind=engine)
+    clear_all_caches()
     session = TestingSessionLocal()
 
     try:
@@ -46,7 +98,63 @@ def db() -> Generator[Session, None, None]:
 
 
 @pytest.fixture(scope="function")
-def client(db: Session) -> Generator[TestClient, None, None]:
+def fake_drive() -> FakeDriveAdapter:
+    """
+    In-memory Google Drive used by sync jobs started through the API.
+    """
+    return FakeDriveAdapter()
+
+
+@pytest.fixture(scope="function")
+def sync_dispatcher(fake_drive: FakeDriveAdapter) -> SyncDispatcher:
+    """
+    Dispatcher running sync jobs inline against the fake Drive.
+    """
+    return SyncDispatcher(
+        session_factory=TestingSessionLocal,
+        adapter_factory=lambda integration: fake_drive,
+        inline=True
+    )
+
+
+@pytest.fixture(scope="function")
+def job_runner() -> JobRunner:
+    """
+    Runner running due background jobs inline when notified.
+    """
+    return JobRunner(session_factory=TestingSessionLocal, inline=True)
+
+
+@pytest.fixture(scope="function")
+def originals_dir(tmp_path) -> Path:
+    """
+    Directory of original images, named by Drive file ID.
+    """
+    path = tmp_path / "originals"
+    path.mkdir()
+    return path
+
+
+@pytest.fixture(scope="function")
+def derivative_pool(tmp_path, originals_dir: Path) -> DerivativePool:
+    """
+    Pool rendering derivatives inline from originals_dir into a scratch cache.
+    """
+    return DerivativePool(
+        session_factory=TestingSessionLocal,
+        source_factory=lambda db: LocalImageSource(str(originals_dir)),
+        cache=DerivativeCache(str(tmp_path / "derivatives"), max_bytes=64 * 1024 ** 2),
+        inline=True
+    )
+
+
+@pytest.fixture(scope="function")
+def client(
+    db: Session,
+    sync_dispatcher: SyncDispatcher,
+    derivative_pool: DerivativePool,
+    job_runner: JobRunner
+) -> Generator[TestClient, None, None]:
     """
     Create a TestClient with the test database.
     """
@@ -57,6 +165,10 @@ def override_get_db():
             pass
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_sync_dispatcher] = lambda: sync_dispatcher
+    app.dependency_overrides[get_derivative_pool] = lambda: derivative_pool
+    app.dependency_overrides[get_job_runner] = lambda: job_runner
 
     with TestClient(app) as test_client:
         yield test_client
@@ -65,7 +177,12 @@ def override_get_db():
 
 
 @pytest.fixture(scope="function")
-async def async_client(db: Session) -> AsyncGenerator[AsyncClient, None]:
+async def async_client(
+    db: Session,
+    sync_dispatcher: SyncDispatcher,
+    derivative_pool: DerivativePool,
+    job_runner: JobRunner
+) -> AsyncGenerator[AsyncClient, None]:
     """
     Create an AsyncClient for async tests.
     """
@@ -76,6 +193,10 @@ def override_get_db():
             pass
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_sync_dispatcher] = lambda: sync_dispatcher
+    app.dependency_overrides[get_derivative_pool] = lambda: derivative_pool
+    app.dependency_overrides[get_job_runner] = lambda: job_runner
 
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
@@ -83,6 +204,44 @@ def override_get_db():
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def query_counter(db: Session) -> Generator[list, None, None]:
+    """
+    Record every SQL statement sent to the test database.
+    """
+    statements: list = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    for target in (engine, async_engine.sync_engine):
+        event.listen(target, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        for target in (engine, async_engine.sync_engine):
+            event.remove(target, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def file_session_factory(tmp_path) -> Generator[sessionmaker, None, None]:
+    """
+    Session factory of a file-backed SQLite database.
+
+    Unlike the shared in-memory database, every session gets its own
+    connection, so threads really run concurrently against it.
+    """
+    file_engine = create_engine(
+        f"sqlite:///{tmp_path / 'concurrency.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    Base.metadata.create_all(bind=file_engine)
+    try:
+        yield sessionmaker(autocommit=False, autoflush=False, bind=file_engine)
+    finally:
+        file_engine.dispose()
+
+
 @pytest.fixture
 def test_user(db: Session) -> User:
     """
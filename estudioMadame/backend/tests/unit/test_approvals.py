@@ -9,6 +9,11 @@
 from app.models.approval import Approval
 from app.models.gallery import Gallery
 from app.models.client import Client
+from app.models.job import Job
+from app.models.photo import Photo
+from app.services.approval import ApprovalService
+from app.services.jobs import JobRunner
+from app.services.photo import PhotoService
 
 
 @pytest.fixture
@@ -109,6 +114,75 @@ def test_list_approvals_unauthorized(self, client: TestClient):
 
         assert response.status_code == 401
 
+    def test_list_approvals_no_n_plus_one(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery,
+        test_client_model: Client,
+        query_counter: list
+    ):
+        """Test listing approvals does not issue queries per row (N+1)"""
+        def count_list_queries(params: str) -> int:
+            query_counter.clear()
+            response = client.get(f"/api/v1/approvals?limit=100{params}", headers=auth_headers)
+            assert response.status_code == 200
+            return len(query_counter)
+
+        def add_approvals(count: int) -> None:
+            for _ in range(count):
+                db.add(Approval(
+                    gallery_id=test_gallery.id,
+                    gallery_name=test_gallery.title,
+                    client_id=test_client_model.id,
+                    client_name=test_client_model.name
+                ))
+            db.commit()
+
+        add_approvals(1)
+        count_list_queries("")  # warm the principal cache
+        single = count_list_queries("")
+        single_live = count_list_queries("&live_counts=true")
+
+        add_approvals(24)
+
+        assert count_list_queries("") == single
+        assert count_list_queries("&live_counts=true") == single_live
+
+    def test_list_approvals_live_counts(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_approval: Approval,
+        test_gallery: Gallery,
+        test_client_model: Client
+    ):
+        """Test live_counts reports the gallery's current selection"""
+        test_client_model.avatar = "https://example.com/avatar.jpg"
+        for i in range(3):
+            db.add(Photo(
+                gallery_id=test_gallery.id,
+                google_drive_file_id=f"live_count_{i}",
+                file_name=f"photo_{i}.jpg",
+                file_size=1000,
+                mime_type="image/jpeg",
+                selected_by_client=i == 0
+            ))
+        db.commit()
+
+        stored = client.get("/api/v1/approvals", headers=auth_headers).json()["data"][0]
+        live = client.get("/api/v1/approvals?live_counts=true", headers=auth_headers).json()["data"][0]
+        detail = client.get(
+            f"/api/v1/approvals/{test_approval.id}?live_counts=true", headers=auth_headers
+        ).json()["data"]
+
+        assert (stored["selected_count"], stored["total_count"]) == (0, 100)
+        assert (live["selected_count"], live["total_count"]) == (1, 3)
+        assert (detail["selected_count"], detail["total_count"]) == (1, 3)
+        assert live["client_avatar"] == "https://example.com/avatar.jpg"
+
 
 @pytest.mark.unit
 class TestGetApproval:
@@ -224,6 +298,74 @@ def test_submit_approval_updates_status(
         data = get_response.json()
         assert data["data"]["status"] in ["changes", "complete"]
 
+    def test_submit_approval_repairs_counters_in_background(
+        self,
+        client: TestClient,
+        db: Session,
+        test_gallery: Gallery,
+        test_approval: Approval
+    ):
+        """Test submitting queues a counter repair that leaves the approval alone"""
+        for i in range(4):
+            db.add(Photo(
+                gallery_id=test_gallery.id,
+                google_drive_file_id=f"recount_{i}",
+                file_name=f"photo_{i}.jpg",
+                file_size=1000,
+                mime_type="image/jpeg",
+                selected_by_client=i < 3
+            ))
+        db.commit()
+        # Counters out of step with the photos
+        test_gallery.selected_count = 1
+        test_gallery.access_token = "recount-token"
+        db.commit()
+
+        response = client.post(
+            f"/api/v1/approvals/{test_approval.id}/submit",
+            json={"gallery_access_token": "recount-token"}
+        )
+
+        assert response.status_code == 200
+        job = db.query(Job).one()
+        assert (job.kind, job.status, job.attempts) == ("gallery.repair_counters", "completed", 1)
+        db.refresh(test_approval)
+        db.refresh(test_gallery)
+        assert (test_approval.selected_count, test_approval.total_count) == (1, 4)
+        assert test_gallery.selected_count == 3
+
+    def test_submit_snapshot_survives_later_selection(
+        self,
+        db: Session,
+        test_gallery: Gallery,
+        test_approval: Approval,
+        job_runner: JobRunner
+    ):
+        """Test a selection made between submit and the repair job is not folded into the approval"""
+        photos = [
+            Photo(
+                gallery_id=test_gallery.id,
+                google_drive_file_id=f"snapshot_{i}",
+                file_name=f"photo_{i}.jpg",
+                file_size=1000,
+                mime_type="image/jpeg",
+                selected_by_client=i < 2
+            )
+            for i in range(4)
+        ]
+        db.add_all(photos)
+        db.commit()
+
+        ApprovalService(db).submit_approval(test_approval.id)
+        assert PhotoService(db).toggle_selection(photos[3].id, True, test_gallery.id) == 3
+
+        assert job_runner.run_pending() == 1
+
+        db.refresh(test_approval)
+        db.refresh(test_gallery)
+        assert (test_approval.selected_count, test_approval.total_count) == (2, 4)
+        assert (test_gallery.selected_count, test_gallery.photo_count) == (3, 4)
+
     def test_submit_approval_invalid_token(
         self,
         client: TestClient,
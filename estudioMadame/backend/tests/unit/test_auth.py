@@ -1,10 +1,20 @@
 """
 Unit tests for Authentication endpoints.
 """
+import threading
+import time
+from datetime import timedelta
+
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from app.api import deps
+from app.core import security
+from app.core.config import settings
+from app.core.security import PasswordHashPool, create_access_token
+from app.models.client import Client
 from app.models.user import User
 
 
@@ -80,6 +90,24 @@ def test_login_invalid_email_format(self, client: TestClient):
 
         assert response.status_code == 422
 
+    def test_client_login_includes_gallery_stats(
+        self,
+        client: TestClient,
+        test_client_model: Client,
+        test_gallery
+    ):
+        """Test the client in the login response carries its real gallery statistics"""
+        response = client.post(
+            "/api/v1/auth/client/login",
+            json={"email": "john@example.com", "password": "client123"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()["data"]["client"]
+        assert data["id"] == str(test_client_model.id)
+        assert data["galleries_count"] == 1
+        assert data["last_activity"] is not None
+
 
 @pytest.mark.unit
 class TestAuthRefresh:
@@ -314,3 +342,158 @@ def test_verify_gallery_access_expired_token(
         )
 
         assert response.status_code == 403
+
+
+@pytest.mark.unit
+class TestTokenCache:
+    """Tests for the token payload and principal caches"""
+
+    @pytest.fixture
+    def client_headers(self, test_client_model: Client) -> dict:
+        token = create_access_token(data={"sub": str(test_client_model.id), "role": "client"})
+        return {"Authorization": f"Bearer {token}"}
+
+    def test_repeated_requests_skip_decode_and_lookup(
+        self,
+        client: TestClient,
+        db: Session,
+        client_headers: dict,
+        query_counter: list,
+        monkeypatch
+    ):
+        """Test a reused token is decoded once and its client is not read again"""
+        decodes = []
+        decode = deps.jwt.decode
+        monkeypatch.setattr(deps.jwt, "decode", lambda *a, **kw: decodes.append(1) or decode(*a, **kw))
+
+        assert client.get("/api/v1/clients/me", headers=client_headers).status_code == 200
+        db.expire_all()
+        query_counter.clear()
+        response = client.get("/api/v1/clients/me", headers=client_headers)
+
+        assert response.status_code == 200
+        assert response.json()["data"]["name"] == "John Doe"
+        assert len(decodes) == 1
+        assert not [s for s in query_counter if "FROM clients" in s]
+
+    def test_cached_payload_expires_with_token(self, test_user: User):
+        """Test a cached payload is not served after the token expires"""
+        token = create_access_token(
+            data={"sub": str(test_user.id), "role": "admin"},
+            expires_delta=timedelta(seconds=1)
+        )
+        assert deps.get_token_payload(token)["sub"] == str(test_user.id)
+
+        # exp has one second resolution
+        time.sleep(2.1)
+        with pytest.raises(HTTPException) as exc:
+            deps.get_token_payload(token)
+        assert exc.value.status_code == 401
+
+    def test_update_invalidates_principal(
+        self,
+        client: TestClient,
+        db: Session,
+        test_client_model: Client,
+        client_headers: dict
+    ):
+        """Test a committed client update is visible on the next request"""
+        client.get("/api/v1/clients/me", headers=client_headers)
+
+        test_client_model.name = "Jane Doe"
+        db.commit()
+
+        response = client.get("/api/v1/clients/me", headers=client_headers)
+        assert response.json()["data"]["name"] == "Jane Doe"
+
+    def test_delete_invalidates_principal(
+        self,
+        client: TestClient,
+        db: Session,
+        test_client_model: Client,
+        client_headers: dict
+    ):
+        """Test a deleted client is rejected even with a cached token"""
+        assert client.get("/api/v1/clients/me", headers=client_headers).status_code == 200
+
+        db.delete(test_client_model)
+        db.commit()
+
+        response = client.get("/api/v1/clients/me", headers=client_headers)
+        assert response.status_code == 404
+
+
+@pytest.mark.unit
+class TestPasswordHashing:
+    """Tests for the password hashing pool and cost upgrades"""
+
+    def test_login_rehashes_when_cost_changes(
+        self,
+        client: TestClient,
+        db: Session,
+        test_user: User,
+        monkeypatch
+    ):
+        """Test a login with an outdated bcrypt cost stores a hash with the new cost"""
+        assert test_user.hashed_password.startswith("$2b$12$")
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+
+        credentials = {"email": "admin@test.com", "password": "test123"}
+        assert client.post("/api/v1/auth/login", json=credentials).status_code == 200
+
+        db.refresh(test_user)
+        assert test_user.hashed_password.startswith("$2b$04$")
+        assert client.post("/api/v1/auth/login", json=credentials).status_code == 200
+
+    def test_wrong_password_keeps_hash(
+        self,
+        client: TestClient,
+        db: Session,
+        test_client_model: Client,
+        monkeypatch
+    ):
+        """Test a failed login never rewrites the stored hash"""
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+        response = client.post(
+            "/api/v1/auth/client/login",
+            json={"email": "john@example.com", "password": "wrong"}
+        )
+
+        assert response.status_code == 401
+        db.refresh(test_client_model)
+        assert test_client_model.hashed_password.startswith("$2b$12$")
+
+    def test_full_queue_returns_503(self, client: TestClient, test_user: User, monkeypatch):
+        """Test logins are refused with 503 while the hashing queue is full"""
+        pool = PasswordHashPool(workers=1, max_queue=1)
+        monkeypatch.setattr(security, "password_pool", pool)
+        started, release = threading.Event(), threading.Event()
+        running = pool.submit(lambda: started.set() or release.wait(5))
+        started.wait(5)
+        queued = pool.submit(lambda: None)
+
+        try:
+            response = client.post(
+                "/api/v1/auth/login",
+                json={"email": "admin@test.com", "password": "test123"}
+            )
+            assert response.status_code == 503
+            assert response.headers["retry-after"] == "1"
+        finally:
+            release.set()
+            running.result(5)
+            queued.result(5)
+            pool.shutdown()
+
+        stats = pool.stats()
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 2
+        assert stats["queued"] == 0
+        assert stats["wait_seconds_max"] > 0
+
+    def test_pool_metrics_exposed(self, client: TestClient):
+        """Test /metrics reports the password pool"""
+        response = client.get("/metrics")
+
+        assert "# TYPE estudio_password_pool_completed_total counter" in response.text
+        assert "estudio_password_pool_wait_seconds_total" in response.text
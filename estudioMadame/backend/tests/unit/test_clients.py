@@ -7,6 +7,8 @@
 from uuid import uuid4
 
 from app.models.client import Client
+from app.models.gallery import Gallery
+from app.models.photo import Photo
 
 
 @pytest.mark.unit
@@ -86,6 +88,76 @@ def test_list_clients_unauthorized(self, client: TestClient):
 
         assert response.status_code == 401
 
+    def test_list_clients_gallery_stats(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_client_model: Client,
+        test_gallery: Gallery
+    ):
+        """Test each client reports its galleries, photos and last activity"""
+        second = Gallery(title="Second Gallery", client_id=test_client_model.id, status="draft")
+        db.add(second)
+        db.commit()
+        for i in range(3):
+            db.add(Photo(
+                gallery_id=test_gallery.id if i else second.id,
+                google_drive_file_id=f"client_stats_{i}",
+                file_name=f"photo_{i}.jpg",
+                file_size=1000,
+                mime_type="image/jpeg"
+            ))
+        idle = Client(name="Idle Client", email="idle@example.com", hashed_password="x")
+        db.add(idle)
+        db.commit()
+
+        response = client.get("/api/v1/clients", headers=auth_headers)
+
+        assert response.status_code == 200
+        rows = {row["id"]: row for row in response.json()["data"]}
+        stats = rows[str(test_client_model.id)]
+        assert (stats["galleries_count"], stats["photos_count"]) == (2, 3)
+        assert stats["last_activity"] is not None
+        assert "hashed_password" not in stats
+        assert (rows[str(idle.id)]["galleries_count"], rows[str(idle.id)]["photos_count"]) == (0, 0)
+        assert rows[str(idle.id)]["last_activity"] is None
+
+        detail = client.get(f"/api/v1/clients/{test_client_model.id}", headers=auth_headers).json()["data"]
+        assert (detail["galleries_count"], detail["photos_count"]) == (2, 3)
+
+    def test_list_clients_no_n_plus_one(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_client_model: Client,
+        query_counter: list
+    ):
+        """Test listing clients does not issue queries per row (N+1)"""
+        def count_list_queries() -> int:
+            query_counter.clear()
+            response = client.get("/api/v1/clients?limit=100", headers=auth_headers)
+            assert response.status_code == 200
+            return len(query_counter)
+
+        def add_clients(count: int, offset: int) -> None:
+            for i in range(offset, offset + count):
+                new_client = Client(name=f"Client {i}", email=f"n1_{i}@example.com", hashed_password="x")
+                db.add(new_client)
+                db.flush()
+                db.add(Gallery(title=f"Gallery {i}", client_id=new_client.id, status="draft"))
+            db.commit()
+
+        add_clients(1, 0)
+        count_list_queries()  # warm the principal cache
+        single = count_list_queries()
+
+        add_clients(24, 1)
+        count_list_queries()
+
+        assert count_list_queries() == single
+
 
 @pytest.mark.unit
 class TestCreateClient:
@@ -113,6 +185,8 @@ def test_create_client_success(
         assert data["data"]["name"] == "Jane Smith"
         assert data["data"]["email"] == "jane.smith@example.com"
         assert "id" in data["data"]
+        assert (data["data"]["galleries_count"], data["data"]["photos_count"]) == (0, 0)
+        assert data["data"]["last_activity"] is None
 
     def test_create_client_minimal_fields(
         self,
@@ -5,8 +5,10 @@
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
 from app.models.gallery import Gallery
 from app.models.client import Client
+from app.models.photo import Photo
 
 
 @pytest.mark.unit
@@ -387,3 +389,94 @@ def test_dashboard_gallery_size_format(
             # Size should be a string like "2.4 GB", "1.1 MB", etc.
             assert isinstance(size, str)
             assert any(unit in size for unit in ["B", "GB", "MB", "KB", "TB"])
+
+
+@pytest.mark.unit
+class TestDashboardCache:
+    """Tests for the dashboard result cache"""
+
+    def test_stats_single_query_and_cached(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        test_gallery: Gallery,
+        query_counter: list
+    ):
+        """Test stats are computed in one query and then served from cache"""
+        client.get("/api/v1/dashboard/stats", headers=auth_headers)
+        stats_queries = [q for q in query_counter if "galleries" in q]
+        assert len(stats_queries) == 1
+
+        query_counter.clear()
+        response = client.get("/api/v1/dashboard/stats", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert not [q for q in query_counter if "galleries" in q]
+
+        cache_stats = client.get(
+            "/api/v1/dashboard/cache-stats", headers=auth_headers
+        ).json()["data"]
+        assert cache_stats["hits"] >= 1
+        assert cache_stats["misses"] >= 1
+
+    def test_stats_invalidated_by_photo_write(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery
+    ):
+        """Test committing a photo clears cached stats and recent galleries"""
+        stats = client.get("/api/v1/dashboard/stats", headers=auth_headers).json()["data"]
+        recent = client.get(
+            "/api/v1/dashboard/recent-galleries", headers=auth_headers
+        ).json()["data"]
+        assert stats["storage_used_bytes"] == 0
+        assert recent[0]["photos"] == 0
+
+        db.add(Photo(
+            gallery_id=test_gallery.id,
+            google_drive_file_id="cache_photo",
+            file_name="cache.jpg",
+            file_size=4096,
+            mime_type="image/jpeg"
+        ))
+        db.commit()
+
+        stats = client.get("/api/v1/dashboard/stats", headers=auth_headers).json()["data"]
+        recent = client.get(
+            "/api/v1/dashboard/recent-galleries", headers=auth_headers
+        ).json()["data"]
+        assert stats["storage_used_bytes"] == 4096
+        assert recent[0]["photos"] == 1
+
+    def test_stats_invalidated_by_gallery_status_update(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        test_gallery: Gallery
+    ):
+        """Test updating a gallery through the API clears cached stats"""
+        before = client.get("/api/v1/dashboard/stats", headers=auth_headers).json()["data"]
+
+        response = client.patch(
+            f"/api/v1/galleries/{test_gallery.id}",
+            headers=auth_headers,
+            json={"status": "archived"}
+        )
+        assert response.status_code == 200
+
+        after = client.get("/api/v1/dashboard/stats", headers=auth_headers).json()["data"]
+        assert after["active_galleries"] == before["active_galleries"] - 1
+
+    def test_clear_during_compute_drops_the_value(self):
+        """Test a value computed across a clear is returned but not cached"""
+        cache = TTLCache("test", ttl=60)
+
+        def factory():
+            cache.clear()  # a commit invalidating the cache mid-query
+            return "stale"
+
+        assert cache.get_or_set("key", factory) == "stale"
+        assert cache.get_or_set("key", lambda: "fresh") == "fresh"
+        assert cache.get("key") == "fresh"
@@ -0,0 +1,215 @@
+"""
+Unit tests for the database layer.
+"""
+import asyncio
+import threading
+
+import pytest
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import (
+    Base,
+    async_database_url,
+    build_async_engine,
+    build_engine,
+    get_async_db,
+    get_db,
+    pool_status,
+)
+from app.main import app
+from app.models.client import Client
+from app.services.base import AsyncBaseService
+
+# Async endpoints that hand their sync session to the threadpool themselves
+THREADPOOL_OFFLOADING_ENDPOINTS = {"bulk_ingest_photos"}
+
+
+@pytest.mark.unit
+class TestEndpointConcurrency:
+    """Tests for how endpoints reach the database"""
+
+    def test_async_endpoints_do_not_use_sync_session(self):
+        """Test no async def endpoint blocks the event loop with the sync Session"""
+        offenders = [
+            route.path
+            for route in app.routes
+            if isinstance(route, APIRoute)
+            and asyncio.iscoroutinefunction(route.endpoint)
+            and route.endpoint.__name__ not in THREADPOOL_OFFLOADING_ENDPOINTS
+            and any(dep.call is get_db for dep in route.dependant.dependencies)
+        ]
+
+        assert offenders == []
+
+    def test_client_and_auth_endpoints_use_async_session(self):
+        """Test the client endpoints and the logins are async def on get_async_db"""
+        routes = [
+            route
+            for route in app.routes
+            if isinstance(route, APIRoute)
+            and (
+                route.path.startswith("/api/v1/clients")
+                or route.endpoint.__name__ in ("login", "client_login", "refresh_token")
+            )
+        ]
+
+        assert len(routes) == 11
+        for route in routes:
+            assert asyncio.iscoroutinefunction(route.endpoint), route.path
+            assert [dep.call for dep in route.dependant.dependencies if dep.call in (get_db, get_async_db)] == [
+                get_async_db
+            ], route.path
+
+
+@pytest.mark.unit
+class TestAsyncDatabase:
+    """Tests for the async engine"""
+
+    @pytest.mark.parametrize("url, expected", [
+        ("postgresql://u:p@db/estudio", "postgresql+asyncpg://u:p@db/estudio"),
+        ("postgresql+psycopg2://u:p@db/estudio", "postgresql+asyncpg://u:p@db/estudio"),
+        ("sqlite:///./test.db", "sqlite+aiosqlite:///./test.db"),
+        ("sqlite+aiosqlite:///:memory:", "sqlite+aiosqlite:///:memory:"),
+    ])
+    def test_async_database_url(self, url: str, expected: str):
+        """Test sync URLs are mapped to their asyncio driver"""
+        assert async_database_url(url) == expected
+
+    async def test_async_engine_tuned_like_sync_engine(self, tmp_path, monkeypatch):
+        """Test the async engine gets the pool settings, pragmas and pool counters"""
+        monkeypatch.setattr(settings, "DB_POOL_SIZE", 3)
+        engine = build_async_engine(f"sqlite:///{tmp_path / 'async.db'}")
+
+        try:
+            assert engine.url.drivername == "sqlite+aiosqlite"
+            assert engine.pool.size() == 3
+            async with engine.connect() as conn:
+                assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+                assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1
+
+            status = pool_status(engine.sync_engine)
+            assert status["connects"] == 1
+            assert status["checkouts"] == status["checkins"] == 1
+        finally:
+            await engine.dispose()
+
+    async def test_async_base_service_crud(self, tmp_path):
+        """Test AsyncBaseService CRUD on an aiosqlite database"""
+        engine = build_async_engine(f"sqlite:///{tmp_path / 'crud.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+                service = AsyncBaseService(session, Client)
+                created = await service.create({
+                    "name": "Async Client",
+                    "email": "async@example.com",
+                    "hashed_password": "x"
+                })
+
+                assert (await service.get_by_id(created.id)).name == "Async Client"
+                updated = await service.update(created.id, {"name": "Renamed"})
+                assert updated.name == "Renamed"
+                assert len(await service.get_all()) == 1
+                assert await service.delete(created.id) is True
+                assert await service.get_by_id(created.id) is None
+        finally:
+            await engine.dispose()
+
+
+@pytest.mark.unit
+class TestConnectionPool:
+    """Tests for engine tuning and pool metrics"""
+
+    def test_pool_settings_applied(self, tmp_path, monkeypatch):
+        """Test the pool is sized and tuned from Settings"""
+        monkeypatch.setattr(settings, "DB_POOL_SIZE", 3)
+        monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 2)
+        monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 4.0)
+        monkeypatch.setattr(settings, "DB_POOL_RECYCLE", 60)
+        engine = build_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+
+        try:
+            assert engine.pool.size() == 3
+            assert engine.pool._max_overflow == 2
+            assert engine.pool._timeout == 4.0
+            assert engine.pool._recycle == 60
+            assert engine.pool._pre_ping is True
+        finally:
+            engine.dispose()
+
+    def test_sqlite_pragmas(self, tmp_path):
+        """Test file SQLite databases run in WAL mode with synchronous=NORMAL"""
+        engine = build_engine(f"sqlite:///{tmp_path / 'wal.db'}")
+
+        try:
+            with engine.connect() as conn:
+                assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+                assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+        finally:
+            engine.dispose()
+
+    def test_pool_counts_checkouts_overflow_and_timeouts(self, tmp_path):
+        """Test pool status reports checkouts, overflow and timed out waits"""
+        engine = build_engine(
+            f"sqlite:///{tmp_path / 'busy.db'}",
+            pool_size=1,
+            max_overflow=1,
+            pool_timeout=0.05
+        )
+
+        try:
+            first, second = engine.connect(), engine.connect()
+            status = pool_status(engine)
+            assert status["checked_out"] == 2
+            assert status["overflow"] == 1
+            assert status["waits"] == 0
+
+            with pytest.raises(PoolTimeoutError):
+                engine.connect()
+            first.close()
+            second.close()
+
+            status = pool_status(engine)
+            assert status["checkouts"] == 2
+            assert status["checked_out"] == 0
+            assert status["timeouts"] == 1
+            assert status["waits"] == 1
+            assert status["wait_seconds_max"] >= 0.05
+        finally:
+            engine.dispose()
+
+    def test_pool_counts_only_blocked_checkouts_as_waits(self, tmp_path):
+        """Test a checkout is a wait only when it had to queue for a connection"""
+        engine = build_engine(f"sqlite:///{tmp_path / 'wait.db'}", pool_size=1, max_overflow=0, pool_timeout=5)
+
+        try:
+            for _ in range(3):
+                engine.connect().close()
+            assert pool_status(engine)["waits"] == 0
+
+            held = engine.connect()
+            threading.Timer(0.1, held.close).start()
+            engine.connect().close()
+
+            status = pool_status(engine)
+            assert status["checkouts"] == 5
+            assert status["waits"] == 1
+            assert status["wait_seconds_total"] >= 0.05
+        finally:
+            engine.dispose()
+
+    def test_metrics_endpoint(self, client: TestClient):
+        """Test /metrics exposes the pool in the Prometheus text format"""
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE estudio_db_pool_checkouts_total counter" in response.text
+        assert "estudio_db_pool_wait_seconds_total" in response.text
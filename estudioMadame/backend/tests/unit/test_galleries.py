@@ -1,13 +1,36 @@
 """
 Unit tests for Galleries endpoints.
 """
+import time
+
 import pytest
+from datetime import datetime, timedelta
 from fastapi.testclient import TestClient
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session
 from uuid import uuid4
 
 from app.models.gallery import Gallery
 from app.models.client import Client
+from app.models.photo import Photo
+from app.models.approval import Approval
+from app.models.sync_job import SyncJob
+from app.services.drive import FakeDriveAdapter
+from app.services.gallery import GalleryService
+from app.services.sync import SyncDispatcher
+
+
+class _SmallPages:
+    """Drive adapter wrapper forcing 10-file pages."""
+
+    def __init__(self, adapter: FakeDriveAdapter):
+        self.adapter = adapter
+
+    def __getattr__(self, name):
+        return getattr(self.adapter, name)
+
+    def list_files(self, folder_id, page_token=None, page_size=1000):
+        return self.adapter.list_files(folder_id, page_token, page_size=10)
 
 
 @pytest.mark.unit
@@ -102,6 +125,117 @@ def test_list_galleries_unauthorized(self, client: TestClient):
 
         assert response.status_code == 401
 
+    def test_list_galleries_includes_photo_count(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery
+    ):
+        """Test that listed galleries carry client name and photo count"""
+        for i in range(3):
+            db.add(Photo(
+                gallery_id=test_gallery.id,
+                google_drive_file_id=f"count_{i}",
+                file_name=f"count_{i}.jpg",
+                file_size=1000,
+                mime_type="image/jpeg"
+            ))
+        db.commit()
+
+        response = client.get(
+            "/api/v1/galleries",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        gallery = response.json()["data"][0]
+        assert gallery["client_name"] == "John Doe"
+        assert gallery["photo_count"] == 3
+
+    def test_list_galleries_query_count_is_constant(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_client_model: Client,
+        query_counter: list
+    ):
+        """Test that listing galleries does not issue queries per row (N+1)"""
+        def count_list_queries() -> int:
+            query_counter.clear()
+            response = client.get(
+                "/api/v1/galleries?limit=100",
+                headers=auth_headers
+            )
+            assert response.status_code == 200
+            return len(query_counter)
+
+        db.add(Gallery(title="Gallery 0", client_id=test_client_model.id))
+        db.commit()
+        count_list_queries()  # warm the principal cache
+        single = count_list_queries()
+
+        for i in range(1, 25):
+            gallery = Gallery(title=f"Gallery {i}", client_id=test_client_model.id)
+            db.add(gallery)
+            db.flush()
+            db.add(Photo(
+                gallery_id=gallery.id,
+                google_drive_file_id=f"n_plus_one_{i}",
+                file_name=f"photo_{i}.jpg",
+                file_size=1000,
+                mime_type="image/jpeg"
+            ))
+        db.commit()
+        many = count_list_queries()
+
+        assert many == single
+
+    def test_list_galleries_cursor_pagination(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_client_model: Client
+    ):
+        """Test walking galleries with next_cursor matches offset order"""
+        for i in range(5):
+            db.add(Gallery(title=f"Cursor {i}", client_id=test_client_model.id))
+        db.commit()
+
+        expected = client.get(
+            "/api/v1/galleries?limit=100", headers=auth_headers
+        ).json()["data"]
+
+        seen = []
+        params = {"limit": 2}
+        while True:
+            response = client.get("/api/v1/galleries", params=params, headers=auth_headers)
+            assert response.status_code == 200
+            data = response.json()
+            seen.extend(g["id"] for g in data["data"])
+            if not data["meta"]["next_cursor"]:
+                break
+            params["cursor"] = data["meta"]["next_cursor"]
+
+        assert seen == [g["id"] for g in expected]
+
+    def test_list_galleries_cursor_rejects_nullable_sort(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        test_gallery: Gallery
+    ):
+        """Test cursors are refused for sort fields that may be NULL"""
+        response = client.get(
+            "/api/v1/galleries",
+            params={"sort_by": "event_date", "cursor": "W251bGwsIjAiXQ"},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 400
+
 
 @pytest.mark.unit
 class TestCreateGallery:
@@ -468,6 +602,105 @@ def test_bulk_change_status(
 
         assert response.status_code == 200
 
+    def test_bulk_delete_removes_photos_and_reports_missing(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery,
+        test_client_model: Client
+    ):
+        """Test bulk delete cascades to photos/approvals and reports unknown ids"""
+        db.add(Photo(
+            gallery_id=test_gallery.id,
+            google_drive_file_id="bulk_delete_photo",
+            file_name="bulk.jpg",
+            file_size=1000,
+            mime_type="image/jpeg"
+        ))
+        db.add(Approval(
+            gallery_id=test_gallery.id,
+            gallery_name=test_gallery.title,
+            client_id=test_client_model.id,
+            client_name=test_client_model.name
+        ))
+        db.commit()
+        gallery_id = test_gallery.id
+        missing_id = uuid4()
+
+        response = client.post(
+            "/api/v1/galleries/bulk-action",
+            headers=auth_headers,
+            json={
+                "action": "delete",
+                "gallery_ids": [str(gallery_id), str(missing_id)]
+            }
+        )
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["success_count"] == 1
+        assert data["failed_count"] == 1
+        assert data["errors"] == [{"id": str(missing_id), "error": "Not found"}]
+        assert db.query(Gallery).filter(Gallery.id == gallery_id).count() == 0
+        assert db.query(Photo).filter(Photo.gallery_id == gallery_id).count() == 0
+        assert db.query(Approval).filter(Approval.gallery_id == gallery_id).count() == 0
+
+    def test_bulk_change_status_is_set_based(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_client_model: Client,
+        query_counter: list
+    ):
+        """Test bulk status change uses one UPDATE regardless of the id count"""
+        galleries = [
+            Gallery(title=f"Gallery {i}", client_id=test_client_model.id, status="draft")
+            for i in range(20)
+        ]
+        db.add_all(galleries)
+        db.commit()
+        gallery_ids = [str(g.id) for g in galleries]
+
+        query_counter.clear()
+        response = client.post(
+            "/api/v1/galleries/bulk-action",
+            headers=auth_headers,
+            json={
+                "action": "change_status",
+                "gallery_ids": gallery_ids,
+                "params": {"status": "published"}
+            }
+        )
+
+        assert response.status_code == 200
+        assert response.json()["data"]["success_count"] == 20
+        updates = [q for q in query_counter if q.lstrip().upper().startswith("UPDATE")]
+        assert len(updates) == 1
+        db.expire_all()
+        assert all(g.status == "published" for g in galleries)
+
+    def test_bulk_change_status_invalid_status(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        test_gallery: Gallery
+    ):
+        """Test an unknown status fails every id without touching the galleries"""
+        response = client.post(
+            "/api/v1/galleries/bulk-action",
+            headers=auth_headers,
+            json={
+                "action": "change_status",
+                "gallery_ids": [str(test_gallery.id)],
+                "params": {"status": "bogus"}
+            }
+        )
+
+        assert response.status_code == 200
+        assert response.json()["data"]["failed_count"] == 1
+
     def test_bulk_action_unauthorized(self, client: TestClient):
         """Test bulk action without authentication"""
         response = client.post(
@@ -522,6 +755,294 @@ def test_get_sync_status(
         data = response.json()
         assert "status" in data["data"]
 
+    def test_sync_imports_folder_in_pages(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery,
+        fake_drive: FakeDriveAdapter,
+        sync_dispatcher: SyncDispatcher
+    ):
+        """Test a sync job pages through the folder and upserts every photo"""
+        fake_drive.generate_files("folder_sync", 25)
+        test_gallery.google_drive_folder_id = "folder_sync"
+        db.commit()
+        sync_dispatcher.adapter_factory = lambda integration: _SmallPages(fake_drive)
+
+        response = client.post(
+            f"/api/v1/galleries/{test_gallery.id}/sync",
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+
+        status_data = client.get(
+            f"/api/v1/galleries/{test_gallery.id}/sync-status",
+            headers=auth_headers
+        ).json()["data"]
+        assert status_data["sync_job_id"] == response.json()["data"]["sync_job_id"]
+        assert status_data["status"] == "completed"
+        assert status_data["files_seen"] == 25
+        assert status_data["photos_added"] == 25
+        assert fake_drive.list_calls == 3
+
+        db.expire_all()
+        assert test_gallery.photo_count == 25
+        assert test_gallery.sync_status == "idle"
+        assert test_gallery.last_sync_at is not None
+
+    def test_resync_updates_and_removes_photos(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery,
+        fake_drive: FakeDriveAdapter
+    ):
+        """Test a full re-sync keeps selections, applies renames and drops removed files"""
+        files = fake_drive.generate_files("folder_resync", 5)
+        test_gallery.google_drive_folder_id = "folder_resync"
+        db.commit()
+        client.post(f"/api/v1/galleries/{test_gallery.id}/sync", headers=auth_headers)
+
+        kept = db.query(Photo).filter(Photo.google_drive_file_id == files[0]["id"]).one()
+        kept.selected_by_client = True
+        db.commit()
+
+        fake_drive.remove_file("folder_resync", files[1]["id"])
+        fake_drive.add_files("folder_resync", [{**files[0], "name": "renamed.jpg"}])
+        client.post(
+            f"/api/v1/galleries/{test_gallery.id}/sync",
+            headers=auth_headers,
+            params={"full": True}
+        )
+
+        job = client.get(
+            f"/api/v1/galleries/{test_gallery.id}/sync-status",
+            headers=auth_headers
+        ).json()["data"]
+        assert job["photos_added"] == 0
+        assert job["photos_updated"] == 4
+        assert job["photos_removed"] == 1
+
+        db.expire_all()
+        assert kept.file_name == "renamed.jpg"
+        assert kept.selected_by_client is True
+        assert test_gallery.photo_count == 4
+        assert test_gallery.selected_count == 1
+
+    def test_incremental_sync_applies_changes_only(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery,
+        fake_drive: FakeDriveAdapter
+    ):
+        """Test a sync after the first one reads the changes feed instead of the folder"""
+        files = fake_drive.generate_files("folder_incremental", 20)
+        fake_drive.generate_files("folder_other", 3)
+        test_gallery.google_drive_folder_id = "folder_incremental"
+        db.commit()
+        client.post(f"/api/v1/galleries/{test_gallery.id}/sync", headers=auth_headers)
+
+        kept = db.query(Photo).filter(Photo.google_drive_file_id == files[0]["id"]).one()
+        kept.selected_by_client = True
+        db.commit()
+
+        list_calls = fake_drive.list_calls
+        fake_drive.remove_file("folder_incremental", files[1]["id"])
+        fake_drive.add_files("folder_incremental", [{**files[0], "name": "renamed.jpg"}])
+        fake_drive.generate_files("folder_incremental", 2, prefix="NEW")
+        client.post(f"/api/v1/galleries/{test_gallery.id}/sync", headers=auth_headers)
+
+        job = client.get(
+            f"/api/v1/galleries/{test_gallery.id}/sync-status",
+            headers=auth_headers
+        ).json()["data"]
+        assert job["status"] == "completed"
+        assert job["mode"] == "incremental"
+        assert job["files_seen"] == 3
+        assert job["photos_added"] == 2
+        assert job["photos_updated"] == 1
+        assert job["photos_removed"] == 1
+        assert fake_drive.list_calls == list_calls
+
+        db.expire_all()
+        assert kept.file_name == "renamed.jpg"
+        assert kept.selected_by_client is True
+        assert test_gallery.photo_count == 21
+        assert test_gallery.selected_count == 1
+        assert test_gallery.total_bytes == db.query(func.sum(Photo.file_size)).filter(
+            Photo.gallery_id == test_gallery.id
+        ).scalar()
+
+    def test_incremental_sync_falls_back_to_full(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery,
+        fake_drive: FakeDriveAdapter
+    ):
+        """Test an expired checkpoint triggers a full sync that stores a fresh one"""
+        fake_drive.generate_files("folder_expired", 4)
+        test_gallery.google_drive_folder_id = "folder_expired"
+        test_gallery.google_drive_change_token = "expired"
+        db.commit()
+
+        client.post(f"/api/v1/galleries/{test_gallery.id}/sync", headers=auth_headers)
+
+        job = client.get(
+            f"/api/v1/galleries/{test_gallery.id}/sync-status",
+            headers=auth_headers
+        ).json()["data"]
+        assert job["status"] == "completed"
+        assert job["mode"] == "full"
+        assert job["photos_added"] == 4
+        db.expire_all()
+        assert test_gallery.google_drive_change_token == fake_drive.get_start_page_token()
+
+    def test_relinking_folder_resets_checkpoint(self, db: Session, test_gallery: Gallery):
+        """Test changing the Drive folder forces the next sync to be full"""
+        test_gallery.google_drive_folder_id = "folder_a"
+        test_gallery.google_drive_change_token = "42"
+        db.commit()
+        service = GalleryService(db)
+
+        service.update(test_gallery.id, {"title": "Renamed"})
+        assert test_gallery.google_drive_change_token == "42"
+
+        service.update(test_gallery.id, {"google_drive_folder_id": "folder_b"})
+        assert test_gallery.google_drive_change_token is None
+
+    def test_sync_failure_is_recorded(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery
+    ):
+        """Test a Drive error marks the job failed and the gallery in error"""
+        test_gallery.google_drive_folder_id = "missing_folder"
+        db.commit()
+
+        client.post(f"/api/v1/galleries/{test_gallery.id}/sync", headers=auth_headers)
+
+        job = client.get(
+            f"/api/v1/galleries/{test_gallery.id}/sync-status",
+            headers=auth_headers
+        ).json()["data"]
+        assert job["status"] == "failed"
+        assert "missing_folder" in job["error"]
+        db.expire_all()
+        assert test_gallery.sync_status == "error"
+
+    def test_recover_fails_only_stale_sync_jobs(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery,
+        test_client_model: Client,
+        fake_drive: FakeDriveAdapter,
+        sync_dispatcher: SyncDispatcher
+    ):
+        """Test recovery fails a job whose worker died, not one still running elsewhere"""
+        fake_drive.generate_files("folder_restart", 3)
+        test_gallery.google_drive_folder_id = "folder_restart"
+        test_gallery.sync_status = "syncing"
+        busy = Gallery(title="Busy", client_id=test_client_model.id, sync_status="syncing")
+        db.add(busy)
+        db.flush()
+        last_seen = datetime.utcnow() - timedelta(hours=1)
+        orphan = SyncJob(gallery_id=test_gallery.id, status="running", started_at=last_seen, heartbeat_at=last_seen)
+        live = SyncJob(gallery_id=busy.id, status="running")
+        db.add_all([orphan, live])
+        db.commit()
+
+        assert sync_dispatcher.recover() == 1
+
+        db.expire_all()
+        assert (orphan.status, orphan.error) == ("failed", "Abandoned: no progress from its worker")
+        assert test_gallery.sync_status == "error"
+        assert (live.status, busy.sync_status) == ("running", "syncing")
+
+        response = client.post(f"/api/v1/galleries/{test_gallery.id}/sync", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json()["data"]["sync_job_id"] != str(orphan.id)
+        db.expire_all()
+        assert test_gallery.sync_status == "idle"
+        assert test_gallery.photo_count == 3
+
+    def test_reaper_fails_stale_sync_jobs(
+        self,
+        db: Session,
+        test_gallery: Gallery,
+        sync_dispatcher: SyncDispatcher
+    ):
+        """Test the dispatcher's background check fails stale jobs without a restart"""
+        last_seen = datetime.utcnow() - timedelta(hours=1)
+        orphan = SyncJob(gallery_id=test_gallery.id, status="running", started_at=last_seen, heartbeat_at=last_seen)
+        db.add(orphan)
+        db.commit()
+
+        dispatcher = SyncDispatcher(session_factory=sync_dispatcher.session_factory)
+        dispatcher.start()
+        try:
+            deadline = time.monotonic() + 5
+            while orphan.status == "running" and time.monotonic() < deadline:
+                time.sleep(0.01)
+                db.expire_all()
+        finally:
+            dispatcher.shutdown()
+
+        assert orphan.status == "failed"
+
+    def test_stale_running_job_taken_over(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery,
+        fake_drive: FakeDriveAdapter
+    ):
+        """Test a running job without a recent heartbeat no longer blocks new syncs"""
+        fake_drive.generate_files("folder_stale", 2)
+        test_gallery.google_drive_folder_id = "folder_stale"
+        live = SyncJob(gallery_id=test_gallery.id, status="running")
+        db.add(live)
+        db.commit()
+
+        response = client.post(f"/api/v1/galleries/{test_gallery.id}/sync", headers=auth_headers)
+        assert response.json()["data"]["sync_job_id"] == str(live.id)
+
+        live.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+        live.started_at = live.heartbeat_at
+        db.commit()
+
+        response = client.post(f"/api/v1/galleries/{test_gallery.id}/sync", headers=auth_headers)
+
+        assert response.json()["data"]["sync_job_id"] != str(live.id)
+        db.expire_all()
+        assert live.status == "failed"
+        assert test_gallery.photo_count == 2
+
+    def test_sync_requires_drive_folder(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        test_gallery: Gallery
+    ):
+        """Test syncing a gallery that is not linked to a Drive folder"""
+        response = client.post(
+            f"/api/v1/galleries/{test_gallery.id}/sync",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 400
+
 
 @pytest.mark.unit
 class TestPublicGalleryAccess:
@@ -576,3 +1097,189 @@ def test_get_public_gallery_no_token(
         )
 
         assert response.status_code == 403
+
+    def test_public_gallery_etag_revalidation(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        test_gallery: Gallery,
+        query_counter: list
+    ):
+        """Test repeat views get 304 until the gallery changes"""
+        access_token = client.post(
+            "/api/v1/auth/gallery-access",
+            headers=auth_headers,
+            json={"gallery_id": str(test_gallery.id)}
+        ).json()["data"]["gallery_access_token"]
+        url = f"/api/v1/galleries/{test_gallery.id}/public?access_token={access_token}"
+        etag = client.get(url).headers["etag"]
+
+        query_counter.clear()
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+        assert len(query_counter) == 1  # the access token check
+
+        client.patch(
+            f"/api/v1/galleries/{test_gallery.id}",
+            headers=auth_headers,
+            json={"title": "Renamed Gallery"}
+        )
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["data"]["title"] == "Renamed Gallery"
+        assert response.headers["etag"] != etag
+
+    def test_public_gallery_rotated_token_rejected_at_once(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery
+    ):
+        """Test a token rotated by another process stops working before any cache expires"""
+        access_token = client.post(
+            "/api/v1/auth/gallery-access",
+            headers=auth_headers,
+            json={"gallery_id": str(test_gallery.id)}
+        ).json()["data"]["gallery_access_token"]
+        url = f"/api/v1/galleries/{test_gallery.id}/public?access_token={access_token}"
+        assert client.get(url).status_code == 200
+
+        # Written on the connection, so no commit hook clears this process's cache
+        db.connection().execute(
+            update(Gallery).where(Gallery.id == test_gallery.id).values(access_token="rotated")
+        )
+        db.commit()
+
+        assert client.get(url).status_code == 403
+        assert client.get(
+            f"/api/v1/galleries/{test_gallery.id}/photos/public?access_token={access_token}"
+        ).status_code == 403
+
+
+@pytest.mark.unit
+class TestGalleryPhotoCounters:
+    """Tests for the denormalized photo counters on Gallery"""
+
+    def _add_photo(self, db: Session, gallery: Gallery, name: str, **kwargs) -> Photo:
+        photo = Photo(
+            gallery_id=gallery.id,
+            google_drive_file_id=f"counter_{name}",
+            file_name=f"{name}.jpg",
+            file_size=kwargs.pop("file_size", 1000),
+            mime_type="image/jpeg",
+            **kwargs
+        )
+        db.add(photo)
+        db.commit()
+        return photo
+
+    def test_counters_follow_insert_and_delete(
+        self,
+        db: Session,
+        test_gallery: Gallery
+    ):
+        """Test that inserting and deleting photos updates the counters"""
+        self._add_photo(db, test_gallery, "a", file_size=1500)
+        self._add_photo(db, test_gallery, "b", file_size=500, selected_by_client=True)
+
+        db.refresh(test_gallery)
+        assert test_gallery.photo_count == 2
+        assert test_gallery.selected_count == 1
+        assert test_gallery.total_bytes == 2000
+
+        photo = db.query(Photo).filter(Photo.google_drive_file_id == "counter_b").one()
+        db.delete(photo)
+        db.commit()
+
+        db.refresh(test_gallery)
+        assert test_gallery.photo_count == 1
+        assert test_gallery.selected_count == 0
+        assert test_gallery.total_bytes == 1500
+
+    def test_photo_version_follows_every_photo_write(
+        self,
+        db: Session,
+        test_gallery: Gallery
+    ):
+        """Test that photo writes bump photo_version, even without a counter change"""
+        photo = self._add_photo(db, test_gallery, "version")
+        db.refresh(test_gallery)
+        version = test_gallery.photo_version
+
+        photo.file_name = "renamed.jpg"
+        db.commit()
+        db.refresh(test_gallery)
+        assert test_gallery.photo_version == version + 1
+        assert test_gallery.photo_count == 1
+
+    def test_counters_follow_selection_toggle(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery
+    ):
+        """Test that selecting a photo through the API updates selected_count"""
+        photo = self._add_photo(db, test_gallery, "toggle")
+        token_response = client.post(
+            "/api/v1/auth/gallery-access",
+            headers=auth_headers,
+            json={"gallery_id": str(test_gallery.id)}
+        )
+        access_token = token_response.json()["data"]["gallery_access_token"]
+
+        response = client.post(
+            f"/api/v1/photos/{photo.id}/select",
+            json={"gallery_access_token": access_token, "selected": True}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["data"]["current_selection_count"] == 1
+        db.refresh(test_gallery)
+        assert test_gallery.selected_count == 1
+
+    def test_recompute_counters_repairs_drift(
+        self,
+        db: Session,
+        test_gallery: Gallery
+    ):
+        """Test that recompute_counters rebuilds counters from the photos table"""
+        from app.services.gallery import GalleryService
+
+        self._add_photo(db, test_gallery, "drift", file_size=700, selected_by_client=True)
+        test_gallery.photo_count = 42
+        test_gallery.selected_count = 0
+        test_gallery.total_bytes = 0
+        db.commit()
+
+        repaired = GalleryService(db).recompute_counters(test_gallery.id)
+
+        assert repaired == 1
+        db.refresh(test_gallery)
+        assert test_gallery.photo_count == 1
+        assert test_gallery.selected_count == 1
+        assert test_gallery.total_bytes == 700
+
+    def test_sort_by_photo_count(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_client_model: Client,
+        test_gallery: Gallery
+    ):
+        """Test sorting galleries by the photo_count column"""
+        empty = Gallery(title="Empty Gallery", client_id=test_client_model.id)
+        db.add(empty)
+        db.commit()
+        self._add_photo(db, test_gallery, "sorted")
+
+        response = client.get(
+            "/api/v1/galleries?sort_by=photo_count&order=desc",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        counts = [g["photo_count"] for g in response.json()["data"]]
+        assert counts == sorted(counts, reverse=True)
+        assert counts[0] == 1
@@ -0,0 +1,94 @@
+"""
+Unit tests for the request instrumentation.
+"""
+import logging
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.instrumentation import UNMATCHED_ROUTE, request_metrics
+from app.core.metrics import Histogram
+from app.models.gallery import Gallery
+
+SERVER_TIMING = re.compile(
+    r'total;dur=[\d.]+, db;dur=[\d.]+;desc="(\d+) queries", serialize;dur=([\d.]+)'
+)
+
+
+@pytest.mark.unit
+class TestRequestInstrumentation:
+    """Tests for the Server-Timing header, the request metrics and the slow request log"""
+
+    def test_server_timing_header(self, client: TestClient, auth_headers: dict, test_gallery: Gallery):
+        """Test API responses report their SQL and serialization time"""
+        response = client.get("/api/v1/galleries", headers=auth_headers)
+
+        assert response.status_code == 200
+        match = SERVER_TIMING.fullmatch(response.headers["server-timing"])
+        assert match is not None
+        assert int(match.group(1)) >= 2  # principal, count and page at least
+        assert float(match.group(2)) >= 0
+
+    def test_server_timing_disabled(self, client: TestClient, monkeypatch):
+        """Test the header can be turned off"""
+        monkeypatch.setattr(settings, "SERVER_TIMING_ENABLED", False)
+
+        response = client.get("/health")
+
+        assert "server-timing" not in response.headers
+
+    def test_request_metrics_per_route(self, client: TestClient, auth_headers: dict, test_gallery: Gallery):
+        """Test requests are recorded under their route template, not their path"""
+        labels = ("GET", "/api/v1/galleries/{id}")
+        before = request_metrics.duration.count(labels)
+
+        response = client.get(f"/api/v1/galleries/{test_gallery.id}", headers=auth_headers)
+        client.get("/no/such/path")
+
+        assert response.status_code == 200
+        assert request_metrics.duration.count(labels) == before + 1
+        assert request_metrics.sql_statements.count(labels) == before + 1
+        assert request_metrics.requests.value((*labels, "200")) >= 1
+        assert request_metrics.requests.value(("GET", UNMATCHED_ROUTE, "404")) >= 1
+
+        text = client.get("/metrics").text
+        assert "# TYPE estudio_http_request_duration_seconds histogram" in text
+        assert 'estudio_http_request_sql_statements_count{method="GET",route="/api/v1/galleries/{id}"}' in text
+        assert 'estudio_http_response_size_bytes_bucket{method="GET",route="/api/v1/galleries/{id}",le="+Inf"}' in text
+        assert str(test_gallery.id) not in text
+
+    def test_slow_request_log(self, client: TestClient, auth_headers: dict, test_gallery: Gallery, monkeypatch, caplog):
+        """Test requests over the threshold are logged with their SQL"""
+        monkeypatch.setattr(settings, "SLOW_REQUEST_LOG_MS", 0.001)
+
+        with caplog.at_level(logging.WARNING, logger="app.core.instrumentation"):
+            client.get("/api/v1/galleries", headers=auth_headers)
+
+        messages = [record.getMessage() for record in caplog.records]
+        assert any(
+            message.startswith("Slow request: GET /api/v1/galleries took") and "SELECT" in message and "galleries" in message
+            for message in messages
+        )
+
+    def test_slow_request_log_disabled(self, client: TestClient, auth_headers: dict, caplog):
+        """Test nothing is logged with the default threshold"""
+        with caplog.at_level(logging.WARNING, logger="app.core.instrumentation"):
+            client.get("/api/v1/galleries", headers=auth_headers)
+
+        assert not [record for record in caplog.records if record.name == "app.core.instrumentation"]
+
+    def test_histogram_render(self):
+        """Test histograms render cumulative buckets with escaped labels"""
+        histogram = Histogram("test_seconds", "Test", ("route",), (0.1, 1))
+        for value in (0.05, 0.5, 5):
+            histogram.observe(('/a"b',), value)
+
+        assert histogram.render().splitlines()[2:] == [
+            'test_seconds_bucket{route="/a\\"b",le="0.1"} 1',
+            'test_seconds_bucket{route="/a\\"b",le="1"} 2',
+            'test_seconds_bucket{route="/a\\"b",le="+Inf"} 3',
+            'test_seconds_sum{route="/a\\"b"} 5.55',
+            'test_seconds_count{route="/a\\"b"} 3',
+        ]
@@ -6,8 +6,12 @@
 from sqlalchemy.orm import Session
 from unittest.mock import Mock, patch
 
+from app.core.config import settings
+from app.models.job import Job
 from app.models.user import User
 from app.models.google_drive_integration import GoogleDriveIntegration
+from app.services.drive import fake_drive
+from app.services.google_drive import GoogleDriveService, revoke_drive_token
 
 
 @pytest.fixture
@@ -223,6 +227,49 @@ def test_disconnect_success(
         assert response.status_code == 204
         mock_revoke.assert_called_once()
 
+    def test_disconnect_revokes_tokens_in_background(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_drive_integration: GoogleDriveIntegration,
+        monkeypatch
+    ):
+        """Test disconnecting revokes the refresh token through a background job"""
+        monkeypatch.setattr(settings, "DRIVE_ADAPTER", "fake")
+        monkeypatch.setattr(fake_drive, "revoked_tokens", [])
+        integration_id = str(test_drive_integration.id)
+
+        response = client.delete(
+            "/api/v1/integrations/google-drive/disconnect",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 204
+        assert db.query(GoogleDriveIntegration).count() == 0
+        job = db.query(Job).one()
+        assert (job.kind, job.status) == ("drive.revoke", "completed")
+        assert job.payload == {"integration_id": integration_id}
+        assert fake_drive.revoked_tokens == ["enc_refresh_token"]
+
+    def test_revoke_job_skips_reconnected_integration(
+        self,
+        db: Session,
+        test_drive_integration: GoogleDriveIntegration,
+        monkeypatch
+    ):
+        """Test a revoke job queued before a reconnect leaves the new tokens alone"""
+        monkeypatch.setattr(settings, "DRIVE_ADAPTER", "fake")
+        monkeypatch.setattr(fake_drive, "revoked_tokens", [])
+        GoogleDriveService(db).revoke_tokens(test_drive_integration.user_id)
+        test_drive_integration.status = "active"
+        db.commit()
+
+        revoke_drive_token(db, db.query(Job).one().payload)
+
+        assert fake_drive.revoked_tokens == []
+        assert db.query(GoogleDriveIntegration).count() == 1
+
     def test_disconnect_not_connected(
         self,
         client: TestClient,
@@ -0,0 +1,228 @@
+"""
+Unit tests for the background job queue and runner.
+"""
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.job import Job
+from app.services import jobs
+from app.services.jobs import JobRunner, JobService, job_handler, retry_delay
+
+# Payload of every test.record job run, in order
+recorded: list = []
+
+
+@job_handler("test.record")
+def record_job(db: Session, payload: dict) -> None:
+    """Remember the payload."""
+    recorded.append(payload)
+
+
+@job_handler("test.fail")
+def failing_job(db: Session, payload: dict) -> None:
+    """Always fail."""
+    raise RuntimeError("boom")
+
+
+@pytest.fixture(autouse=True)
+def clear_recorded():
+    """Start every test with no recorded jobs."""
+    recorded.clear()
+
+
+@pytest.mark.unit
+class TestJobQueue:
+    """Tests for JobService and the inline JobRunner"""
+
+    def test_enqueued_job_runs_after_commit(self, db: Session, job_runner: JobRunner):
+        """Test a job is only visible to the runner once its transaction commits"""
+        JobService(db).enqueue("test.record", {"n": 1})
+
+        assert job_runner.run_pending() == 0
+
+        db.commit()
+
+        assert job_runner.run_pending() == 1
+        assert recorded == [{"n": 1}]
+        job = db.query(Job).populate_existing().one()
+        assert (job.status, job.attempts, job.error) == ("completed", 1, None)
+        assert job.finished_at is not None
+
+    def test_rolled_back_job_never_runs(self, db: Session, job_runner: JobRunner):
+        """Test a job queued in a rolled back transaction is dropped"""
+        JobService(db).enqueue("test.record", {"n": 1})
+        db.rollback()
+
+        assert job_runner.run_pending() == 0
+        assert db.query(Job).count() == 0
+
+    def test_unknown_kind_rejected(self, db: Session):
+        """Test jobs can only be queued for registered handlers"""
+        with pytest.raises(ValueError):
+            JobService(db).enqueue("test.missing")
+
+    def test_delayed_job_waits(self, db: Session, job_runner: JobRunner):
+        """Test a delayed job is not run before its time"""
+        JobService(db).enqueue("test.record", delay=60)
+        db.commit()
+
+        assert job_runner.run_pending() == 0
+        assert recorded == []
+
+    def test_failed_job_retried_with_backoff(self, db: Session, job_runner: JobRunner):
+        """Test a failing job is requeued for later with its error"""
+        JobService(db).enqueue("test.fail", max_attempts=3)
+        db.commit()
+
+        before = datetime.utcnow()
+        assert job_runner.run_pending() == 1
+
+        job = db.query(Job).populate_existing().one()
+        assert (job.status, job.attempts, job.error) == ("queued", 1, "boom")
+        assert job.run_at >= before + timedelta(seconds=retry_delay(1))
+        assert job.finished_at is None
+
+    def test_failed_job_gives_up_after_max_attempts(self, db: Session, job_runner: JobRunner, monkeypatch):
+        """Test a job is marked failed once it used all its attempts"""
+        monkeypatch.setattr(settings, "JOB_RETRY_BACKOFF_SECONDS", 0)
+        JobService(db).enqueue("test.fail", max_attempts=3)
+        db.commit()
+
+        assert job_runner.run_pending() == 3
+
+        job = db.query(Job).populate_existing().one()
+        assert (job.status, job.attempts, job.error) == ("failed", 3, "boom")
+
+    def test_retry_delay_doubles_up_to_the_limit(self, monkeypatch):
+        """Test the backoff is exponential and capped"""
+        monkeypatch.setattr(settings, "JOB_RETRY_BACKOFF_SECONDS", 2)
+        monkeypatch.setattr(settings, "JOB_RETRY_MAX_SECONDS", 10)
+
+        assert [retry_delay(attempts) for attempts in range(1, 5)] == [2, 4, 8, 10]
+
+    def test_stale_running_jobs_requeued(self, db: Session, job_runner: JobRunner):
+        """Test jobs left running by a dead process are picked up again"""
+        service = JobService(db)
+        service.enqueue("test.record", {"n": 1})
+        db.commit()
+        service.claim(1)
+        db.query(Job).update({"started_at": datetime.utcnow() - timedelta(hours=1)})
+        db.commit()
+
+        assert service.requeue_stale(60) == 1
+        assert job_runner.run_pending() == 1
+        assert db.query(Job).populate_existing().one().attempts == 2
+
+    def test_purge_keeps_failed_jobs(self, db: Session, job_runner: JobRunner, monkeypatch):
+        """Test purging deletes old completed jobs only"""
+        monkeypatch.setattr(settings, "JOB_RETRY_BACKOFF_SECONDS", 0)
+        service = JobService(db)
+        service.enqueue("test.record")
+        service.enqueue("test.fail", max_attempts=1)
+        db.commit()
+        job_runner.run_pending()
+        db.query(Job).update({"finished_at": datetime.utcnow() - timedelta(days=30)})
+        db.commit()
+
+        assert service.purge(3600) == 1
+        assert [job.kind for job in db.query(Job).all()] == ["test.fail"]
+
+
+@pytest.mark.unit
+class TestJobRunnerThreads:
+    """Tests for the polling JobRunner"""
+
+    def test_runner_picks_up_jobs(self, db: Session, job_runner: JobRunner):
+        """Test notified jobs run on the worker threads"""
+        runner = JobRunner(session_factory=job_runner.session_factory, max_workers=1, poll_seconds=0.05)
+        JobService(db).enqueue("test.record", {"n": 1})
+        db.commit()
+        try:
+            runner.notify()
+            deadline = time.monotonic() + 5
+            while not recorded and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            runner.shutdown()
+
+        assert recorded == [{"n": 1}]
+        assert runner.stats()["running"] is False
+
+    def test_runner_requeues_stale_jobs_periodically(self, db: Session, job_runner: JobRunner, monkeypatch):
+        """Test a running poller picks up jobs whose runner died after it started"""
+        monkeypatch.setattr(jobs, "REQUEUE_INTERVAL_SECONDS", 0.05)
+        runner = JobRunner(session_factory=job_runner.session_factory, max_workers=1, poll_seconds=0.05)
+        runner.start()
+        try:
+            service = JobService(db)
+            service.enqueue("test.record", {"n": 1})
+            db.commit()
+            # Claimed by a runner that then died
+            service.claim(1)
+            db.query(Job).update({"started_at": datetime.utcnow() - timedelta(hours=1)})
+            db.commit()
+            deadline = time.monotonic() + 5
+            while not recorded and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            runner.shutdown()
+
+        assert recorded == [{"n": 1}]
+
+
+@pytest.mark.unit
+class TestJobStats:
+    """Tests for GET /api/v1/jobs/stats"""
+
+    def test_job_stats(self, client: TestClient, auth_headers: dict, db: Session, job_runner: JobRunner):
+        """Test the stats report queue depth and latency per kind"""
+        service = JobService(db)
+        service.enqueue("test.record")
+        db.commit()
+        job_runner.run_pending()
+        service.enqueue("test.record")
+        service.enqueue("test.fail", delay=-5)
+        db.commit()
+
+        response = client.get("/api/v1/jobs/stats", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert (data["queued"], data["running"], data["failed"]) == (2, 0, 0)
+        assert data["oldest_queued_seconds"] >= 5
+        kinds = {stats["kind"]: stats for stats in data["kinds"]}
+        assert (kinds["test.record"]["queued"], kinds["test.record"]["completed"]) == (1, 1)
+        latency = kinds["test.record"]["latency"]
+        assert latency["jobs"] == 1
+        assert latency["run_seconds"]["p95"] >= 0
+        assert "latency" not in kinds["test.fail"]
+        assert data["workers"]["workers"] >= 1
+
+    def test_job_stats_unauthorized(self, client: TestClient):
+        """Test the stats require authentication"""
+        response = client.get("/api/v1/jobs/stats")
+
+        assert response.status_code == 401
+
+    def test_job_stats_admin_only(self, client: TestClient, photographer_headers: dict):
+        """Test photographers may not read the stats"""
+        response = client.get("/api/v1/jobs/stats", headers=photographer_headers)
+
+        assert response.status_code == 403
+
+    def test_job_metrics(self, client: TestClient, db: Session, job_runner: JobRunner):
+        """Test job attempts show up in the metrics endpoint"""
+        JobService(db).enqueue("test.record")
+        db.commit()
+        job_runner.run_pending()
+
+        text = client.get("/metrics").text
+
+        assert 'estudio_jobs_total{kind="test.record",outcome="completed"}' in text
+        assert "# TYPE estudio_job_run_seconds histogram" in text
+        assert "estudio_job_workers " in text
@@ -1,13 +1,24 @@
 """
 Unit tests for Photos endpoints.
 """
+import csv
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+from fastapi.encoders import jsonable_encoder
 from fastapi.testclient import TestClient
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, sessionmaker
 from uuid import uuid4
 
+from app.models.client import Client
 from app.models.gallery import Gallery
 from app.models.photo import Photo
+from app.schemas.photo import Photo as PhotoSchema
+from app.core.export import iter_csv
+from app.services.photo import EXPORT_COLUMNS, PhotoService
 
 
 @pytest.fixture
@@ -56,6 +67,30 @@ def test_list_photos_success(
         assert isinstance(data["data"], list)
         assert len(data["data"]) >= 1
 
+    def test_list_photos_body_matches_schema(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery,
+        test_photo: Photo
+    ):
+        """Test the bulk-encoded page renders photos exactly like the schema"""
+        test_photo.photo_metadata = {"camera": "Canon EOS R5", "iso": 400}
+        db.commit()
+
+        response = client.get(
+            f"/api/v1/galleries/{test_gallery.id}/photos",
+            headers=auth_headers
+        )
+
+        assert response.headers["content-type"] == "application/json"
+        db.refresh(test_photo)
+        assert response.json()["data"] == [
+            jsonable_encoder(PhotoSchema.model_validate(test_photo))
+        ]
+        assert response.json()["meta"]["total"] == 1
+
     def test_list_photos_with_pagination(
         self,
         client: TestClient,
@@ -73,6 +108,59 @@ def test_list_photos_with_pagination(
         assert data["meta"]["page"] == 1
         assert data["meta"]["limit"] == 50
 
+    def test_list_photos_cursor_walks_every_photo_once(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        test_gallery: Gallery,
+        db: Session
+    ):
+        """Test following next_cursor returns every photo exactly once"""
+        # Duplicate file names exercise the id tiebreaker
+        for i in range(7):
+            db.add(Photo(
+                gallery_id=test_gallery.id,
+                google_drive_file_id=f"cursor_{i}",
+                file_name=f"photo_{i // 2}.jpg",
+                file_size=1000,
+                mime_type="image/jpeg"
+            ))
+        db.commit()
+
+        seen = []
+        params = {"limit": 3, "include_total": "false"}
+        while True:
+            response = client.get(
+                f"/api/v1/galleries/{test_gallery.id}/photos",
+                params=params,
+                headers=auth_headers
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert data["meta"]["total"] is None
+            assert data["meta"]["total_pages"] is None
+            seen.extend(p["id"] for p in data["data"])
+            if not data["meta"]["next_cursor"]:
+                break
+            params["cursor"] = data["meta"]["next_cursor"]
+
+        assert len(seen) == 7
+        assert len(set(seen)) == 7
+
+    def test_list_photos_invalid_cursor(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        test_gallery: Gallery
+    ):
+        """Test a malformed cursor is rejected"""
+        response = client.get(
+            f"/api/v1/galleries/{test_gallery.id}/photos?cursor=not-a-cursor",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 400
+
     def test_list_photos_filter_by_client_selection(
         self,
         client: TestClient,
@@ -212,6 +300,70 @@ def test_list_public_photos_with_pagination(
         data = response.json()
         assert data["meta"]["limit"] == 20
 
+    def test_public_photos_etag_revalidation(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery,
+        test_photo: Photo,
+        query_counter: list
+    ):
+        """Test a matching If-None-Match gets 304 after only checking the access token"""
+        access_token = client.post(
+            "/api/v1/auth/gallery-access",
+            headers=auth_headers,
+            json={"gallery_id": str(test_gallery.id)}
+        ).json()["data"]["gallery_access_token"]
+        url = f"/api/v1/galleries/{test_gallery.id}/photos/public?access_token={access_token}"
+
+        first = client.get(url)
+        etag = first.headers["etag"]
+        assert first.status_code == 200
+        assert first.headers["cache-control"] == "private, no-cache"
+        assert client.get(f"{url}&limit=20").headers["etag"] != etag
+
+        query_counter.clear()
+        cached = client.get(url, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+        assert cached.content == b""
+        assert len(query_counter) == 1
+        assert "photos" not in query_counter[0]
+
+        assert client.get(url, headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+
+    def test_public_photos_etag_changes_with_photos(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery,
+        test_photo: Photo
+    ):
+        """Test selections and bulk ingestion change the ETag of the photo pages"""
+        access_token = client.post(
+            "/api/v1/auth/gallery-access",
+            headers=auth_headers,
+            json={"gallery_id": str(test_gallery.id)}
+        ).json()["data"]["gallery_access_token"]
+        url = f"/api/v1/galleries/{test_gallery.id}/photos/public?access_token={access_token}"
+        etag = client.get(url).headers["etag"]
+
+        client.post(
+            f"/api/v1/photos/{test_photo.id}/select",
+            json={"gallery_access_token": access_token, "selected": True}
+        )
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["data"][0]["selected_by_client"] is True
+        etag = response.headers["etag"]
+
+        PhotoService(db).bulk_ingest(test_gallery.id, _ingest_payload(3))
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert len(response.json()["data"]) == 4
+
 
 @pytest.mark.unit
 class TestSelectPhoto:
@@ -353,6 +505,33 @@ def test_select_photo_exceeds_limit(
 
         assert response.status_code == 403
 
+    def test_select_photo_returns_counter_without_counting(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery,
+        test_photo: Photo,
+        query_counter: list
+    ):
+        """Test the new selection count comes from the counter row, not count(*)"""
+        access_token = client.post(
+            "/api/v1/auth/gallery-access",
+            headers=auth_headers,
+            json={"gallery_id": str(test_gallery.id)}
+        ).json()["data"]["gallery_access_token"]
+        query_counter.clear()
+
+        payload = {"gallery_access_token": access_token, "selected": True}
+        first = client.post(f"/api/v1/photos/{test_photo.id}/select", json=payload)
+        again = client.post(f"/api/v1/photos/{test_photo.id}/select", json=payload)
+
+        assert first.json()["data"]["current_selection_count"] == 1
+        assert again.json()["data"]["current_selection_count"] == 1
+        assert not [q for q in query_counter if "count(" in q.lower()]
+        db.expire_all()
+        assert test_gallery.selected_count == 1
+
     def test_select_photo_invalid_token(
         self,
         client: TestClient,
@@ -407,6 +586,233 @@ def test_select_photo_missing_fields(
         assert response.status_code == 422
 
 
+@pytest.mark.unit
+class TestBatchSelectPhotos:
+    """Tests for POST /api/v1/galleries/{id}/selections"""
+
+    @pytest.fixture
+    def gallery_photos(self, db: Session, test_gallery: Gallery) -> list:
+        """Ingest 300 unselected photos into the test gallery"""
+        payload = [{**p, "selected_by_client": False} for p in _ingest_payload(300, "batch")]
+        PhotoService(db).bulk_ingest(test_gallery.id, payload)
+        return [
+            row.id for row in db.query(Photo.id)
+            .filter(Photo.gallery_id == test_gallery.id)
+            .order_by(Photo.file_name)
+        ]
+
+    @pytest.fixture
+    def access_token(self, client: TestClient, auth_headers: dict, test_gallery: Gallery) -> str:
+        """Gallery access token for the client"""
+        return client.post(
+            "/api/v1/auth/gallery-access",
+            headers=auth_headers,
+            json={"gallery_id": str(test_gallery.id)}
+        ).json()["data"]["gallery_access_token"]
+
+    def test_select_many_photos_in_one_update(
+        self,
+        client: TestClient,
+        db: Session,
+        test_gallery: Gallery,
+        gallery_photos: list,
+        access_token: str,
+        query_counter: list
+    ):
+        """Test 300 selections are applied by a single UPDATE"""
+        query_counter.clear()
+
+        response = client.post(
+            f"/api/v1/galleries/{test_gallery.id}/selections",
+            json={
+                "gallery_access_token": access_token,
+                "operations": [{"photo_id": str(i), "selected": True} for i in gallery_photos]
+            }
+        )
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["changed"] == 300
+        assert data["current_selection_count"] == 300
+        assert len([q for q in query_counter if q.startswith("UPDATE photos")]) == 1
+        db.expire_all()
+        assert test_gallery.selected_count == 300
+        assert db.query(Photo).filter(Photo.selected_by_client.is_(True)).count() == 300
+
+    def test_mixed_operations_last_one_wins(
+        self,
+        client: TestClient,
+        db: Session,
+        test_gallery: Gallery,
+        gallery_photos: list,
+        access_token: str
+    ):
+        """Test selects and deselects are netted, repeated photos use the last operation"""
+        url = f"/api/v1/galleries/{test_gallery.id}/selections"
+        client.post(url, json={
+            "gallery_access_token": access_token,
+            "operations": [{"photo_id": str(i), "selected": True} for i in gallery_photos[:10]]
+        })
+
+        response = client.post(url, json={
+            "gallery_access_token": access_token,
+            "operations": [
+                {"photo_id": str(gallery_photos[0]), "selected": False},
+                {"photo_id": str(gallery_photos[1]), "selected": False},
+                {"photo_id": str(gallery_photos[1]), "selected": True},
+                {"photo_id": str(gallery_photos[2]), "selected": True},
+                {"photo_id": str(gallery_photos[20]), "selected": True},
+                {"photo_id": str(uuid4()), "selected": True}
+            ]
+        })
+
+        data = response.json()["data"]
+        assert data["changed"] == 2
+        assert data["current_selection_count"] == 10
+        db.expire_all()
+        assert test_gallery.selected_count == 10
+
+    def test_batch_over_limit_applies_nothing(
+        self,
+        client: TestClient,
+        db: Session,
+        test_gallery: Gallery,
+        gallery_photos: list,
+        access_token: str
+    ):
+        """Test a batch that would pass max_client_selection is rejected as a whole"""
+        test_gallery.settings = {"max_client_selection": 50}
+        db.commit()
+
+        response = client.post(
+            f"/api/v1/galleries/{test_gallery.id}/selections",
+            json={
+                "gallery_access_token": access_token,
+                "operations": [{"photo_id": str(i), "selected": True} for i in gallery_photos[:51]]
+            }
+        )
+
+        assert response.status_code == 403
+        db.expire_all()
+        assert test_gallery.selected_count == 0
+        assert db.query(Photo).filter(Photo.selected_by_client.is_(True)).count() == 0
+
+    def test_batch_invalid_token(
+        self,
+        client: TestClient,
+        test_gallery: Gallery,
+        gallery_photos: list
+    ):
+        """Test the gallery access token is required"""
+        response = client.post(
+            f"/api/v1/galleries/{test_gallery.id}/selections",
+            json={
+                "gallery_access_token": "invalid_token",
+                "operations": [{"photo_id": str(gallery_photos[0]), "selected": True}]
+            }
+        )
+
+        assert response.status_code == 403
+
+    def test_batch_requires_operations(
+        self,
+        client: TestClient,
+        test_gallery: Gallery,
+        access_token: str
+    ):
+        """Test an empty batch is rejected"""
+        response = client.post(
+            f"/api/v1/galleries/{test_gallery.id}/selections",
+            json={"gallery_access_token": access_token, "operations": []}
+        )
+
+        assert response.status_code == 422
+
+
+@pytest.mark.unit
+class TestSelectionConcurrency:
+    """Tests for PhotoService.toggle_selection under concurrent requests"""
+
+    @staticmethod
+    def _seed(session_factory, photos: int, max_selection: int):
+        """Create a gallery with unselected photos in a file database."""
+        session = session_factory()
+        client_model = Client(name="Race", email="race@example.com", hashed_password="x")
+        session.add(client_model)
+        session.flush()
+        gallery = Gallery(
+            title="Race",
+            client_id=client_model.id,
+            settings={"max_client_selection": max_selection}
+        )
+        session.add(gallery)
+        session.flush()
+        session.add_all(
+            Photo(
+                gallery_id=gallery.id,
+                google_drive_file_id=f"race_{i}",
+                file_name=f"race_{i}.jpg",
+                file_size=1000,
+                mime_type="image/jpeg"
+            )
+            for i in range(photos)
+        )
+        session.commit()
+        photo_ids = [row.id for row in session.query(Photo.id).filter(Photo.gallery_id == gallery.id)]
+        gallery_id = gallery.id
+        session.close()
+        return gallery_id, photo_ids
+
+    @staticmethod
+    def _run(session_factory, tasks):
+        """Run (photo_id, selected, gallery_id, max) selections on a thread pool."""
+        def select(task):
+            session = session_factory()
+            try:
+                return PhotoService(session).toggle_selection(*task)
+            finally:
+                session.close()
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            return list(pool.map(select, tasks))
+
+    def test_concurrent_selects_respect_limit(self, file_session_factory):
+        """Test many simultaneous selections never exceed max_client_selection"""
+        gallery_id, photo_ids = self._seed(file_session_factory, photos=40, max_selection=10)
+
+        results = self._run(
+            file_session_factory,
+            [(photo_id, True, gallery_id, 10) for photo_id in photo_ids]
+        )
+
+        accepted = [count for count in results if count is not None]
+        assert len(accepted) == 10
+        assert sorted(accepted) == list(range(1, 11))
+        session = file_session_factory()
+        try:
+            assert session.get(Gallery, gallery_id).selected_count == 10
+            assert session.query(Photo).filter(Photo.selected_by_client.is_(True)).count() == 10
+        finally:
+            session.close()
+
+    def test_concurrent_toggles_keep_counter_exact(self, file_session_factory):
+        """Test repeated select/deselect of the same photos keeps the counter exact"""
+        gallery_id, photo_ids = self._seed(file_session_factory, photos=4, max_selection=0)
+
+        tasks = [
+            (photo_ids[i % 4], i % 3 != 0, gallery_id, None)
+            for i in range(120)
+        ]
+        self._run(file_session_factory, tasks)
+
+        session = file_session_factory()
+        try:
+            selected = session.query(Photo).filter(Photo.selected_by_client.is_(True)).count()
+            assert session.get(Gallery, gallery_id).selected_count == selected
+        finally:
+            session.close()
+
+
 @pytest.mark.unit
 class TestPhotoMetadata:
     """Tests for photo metadata and Google Drive fields"""
@@ -455,3 +861,450 @@ def test_photo_has_dimensions(
         assert "height" in photo
         assert photo["width"] == 1920
         assert photo["height"] == 1080
+
+
+def _ingest_payload(count: int, prefix: str = "bulk") -> list:
+    """Build bulk ingestion records."""
+    return [
+        {
+            "google_drive_file_id": f"{prefix}_{i}",
+            "file_name": f"{prefix}_{i:04d}.jpg",
+            "file_size": 1000 + i,
+            "mime_type": "image/jpeg",
+            "selected_by_client": i % 2 == 0,
+            "metadata": {"camera": "Canon EOS R5"}
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.unit
+class TestBulkIngestPhotos:
+    """Tests for POST /api/v1/galleries/{id}/photos/bulk"""
+
+    def test_bulk_ingest_json_array(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery
+    ):
+        """Test a JSON array is inserted in batches and counters follow"""
+        payload = _ingest_payload(25)
+
+        response = client.post(
+            f"/api/v1/galleries/{test_gallery.id}/photos/bulk",
+            headers=auth_headers,
+            params={"batch_size": 10},
+            json=payload
+        )
+
+        assert response.status_code == 201
+        assert response.json()["data"]["inserted"] == 25
+        db.expire_all()
+        assert test_gallery.photo_count == 25
+        assert test_gallery.selected_count == 13
+        assert test_gallery.total_bytes == sum(p["file_size"] for p in payload)
+        photo = db.query(Photo).filter(Photo.google_drive_file_id == "bulk_3").one()
+        assert photo.photo_metadata == {"camera": "Canon EOS R5"}
+
+    def test_bulk_ingest_invalidates_dashboard_stats(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery,
+        monkeypatch
+    ):
+        """Test the cached dashboard stats are dropped after an ingest that bypasses the session (COPY)"""
+        def copy_batch(service, batch):
+            # Like COPY: written on the connection, unseen by the session hooks
+            service.db.connection().execute(insert(Photo.__table__), batch)
+
+        monkeypatch.setattr(db.get_bind().dialect, "driver", "psycopg2")
+        monkeypatch.setattr(PhotoService, "_copy_batch", copy_batch)
+        before = client.get("/api/v1/dashboard/stats", headers=auth_headers).json()["data"]
+
+        PhotoService(db).bulk_ingest(test_gallery.id, _ingest_payload(5))
+
+        after = client.get("/api/v1/dashboard/stats", headers=auth_headers).json()["data"]
+        assert after["storage_used_bytes"] == before["storage_used_bytes"] + sum(
+            p["file_size"] for p in _ingest_payload(5)
+        )
+
+    def test_bulk_ingest_ndjson_stream(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery
+    ):
+        """Test an NDJSON body sent in small chunks is parsed incrementally"""
+        body = "\n".join(json.dumps(p) for p in _ingest_payload(30)).encode()
+
+        def chunks():
+            for i in range(0, len(body), 7):
+                yield body[i:i + 7]
+
+        response = client.post(
+            f"/api/v1/galleries/{test_gallery.id}/photos/bulk",
+            headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+            content=chunks()
+        )
+
+        assert response.status_code == 201
+        assert response.json()["data"]["inserted"] == 30
+        assert db.query(Photo).filter(Photo.gallery_id == test_gallery.id).count() == 30
+
+    def test_bulk_ingest_invalid_record_rolls_back(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery
+    ):
+        """Test an invalid photo rejects the whole payload"""
+        payload = _ingest_payload(15)
+        del payload[12]["file_size"]
+
+        response = client.post(
+            f"/api/v1/galleries/{test_gallery.id}/photos/bulk",
+            headers=auth_headers,
+            params={"batch_size": 5},
+            json=payload
+        )
+
+        assert response.status_code == 400
+        assert "Invalid photo 12: file_size" in response.json()["detail"]
+        db.expire_all()
+        assert db.query(Photo).count() == 0
+        assert test_gallery.photo_count == 0
+
+    def test_bulk_ingest_duplicate_file_id(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery,
+        test_photo: Photo
+    ):
+        """Test a google_drive_file_id already stored is rejected"""
+        payload = _ingest_payload(3)
+        payload[1]["google_drive_file_id"] = test_photo.google_drive_file_id
+
+        response = client.post(
+            f"/api/v1/galleries/{test_gallery.id}/photos/bulk",
+            headers=auth_headers,
+            json=payload
+        )
+
+        assert response.status_code == 400
+        assert "already exists" in response.json()["detail"]
+        assert db.query(Photo).count() == 1
+
+    def test_bulk_ingest_malformed_json(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        test_gallery: Gallery
+    ):
+        """Test a truncated body is rejected"""
+        response = client.post(
+            f"/api/v1/galleries/{test_gallery.id}/photos/bulk",
+            headers=auth_headers,
+            content=b'[{"file_name": "a.jpg"'
+        )
+
+        assert response.status_code == 400
+
+    def test_bulk_ingest_gallery_not_found(self, client: TestClient, auth_headers: dict):
+        """Test ingesting into a missing gallery"""
+        response = client.post(
+            f"/api/v1/galleries/{uuid4()}/photos/bulk",
+            headers=auth_headers,
+            json=[]
+        )
+
+        assert response.status_code == 404
+
+    def test_bulk_ingest_requires_auth(self, client: TestClient, test_gallery: Gallery):
+        """Test bulk ingestion requires authentication"""
+        response = client.post(f"/api/v1/galleries/{test_gallery.id}/photos/bulk", json=[])
+
+        assert response.status_code == 401
+
+
+@pytest.mark.unit
+class TestExportPhotos:
+    """Tests for GET /api/v1/galleries/{gallery_id}/photos/export"""
+
+    def test_export_csv(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery
+    ):
+        """Test the CSV export lists every photo ordered by file name"""
+        PhotoService(db).bulk_ingest(test_gallery.id, _ingest_payload(5)[::-1])
+
+        response = client.get(
+            f"/api/v1/galleries/{test_gallery.id}/photos/export?format=csv",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "text/csv; charset=utf-8"
+        assert "attachment" in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [r["file_name"] for r in rows] == [f"bulk_{i:04d}.jpg" for i in range(5)]
+        assert rows[0]["selected_by_client"] == "true"
+        assert rows[1]["width"] == ""
+
+    def test_export_selection_ndjson(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery
+    ):
+        """Test the NDJSON export of the client's selection"""
+        PhotoService(db).bulk_ingest(test_gallery.id, _ingest_payload(5))
+
+        response = client.get(
+            f"/api/v1/galleries/{test_gallery.id}/photos/export",
+            params={"format": "ndjson", "selected_by_client": True},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["file_name"] for r in rows] == ["bulk_0000.jpg", "bulk_0002.jpg", "bulk_0004.jpg"]
+        assert set(rows[0]) == set(EXPORT_COLUMNS)
+        assert rows[0]["file_size"] == 1000
+
+    def test_export_errors(self, client: TestClient, auth_headers: dict, test_gallery: Gallery):
+        """Test export auth, unknown galleries and unknown formats"""
+        url = f"/api/v1/galleries/{test_gallery.id}/photos/export"
+
+        assert client.get(url).status_code == 401
+        assert client.get(url, params={"format": "xml"}, headers=auth_headers).status_code == 422
+        assert client.get(
+            f"/api/v1/galleries/{uuid4()}/photos/export", headers=auth_headers
+        ).status_code == 404
+
+    def test_csv_is_encoded_in_chunks(self):
+        """Test large exports are flushed in chunks instead of one body"""
+        chunks = list(iter_csv(("n",), ((i,) for i in range(1200))))
+
+        assert len(chunks) == 3
+        assert b"".join(chunks).decode().splitlines() == ["n", *map(str, range(1200))]
+
+
+def _jpeg(width: int, height: int, orientation: int = 1) -> bytes:
+    """Encode a JPEG with a few EXIF fields."""
+    Image = pytest.importorskip("PIL.Image")
+    exif = Image.Exif()
+    exif[0x010F] = "Canon"
+    exif[0x0110] = "Canon EOS R5"
+    exif[0x0112] = orientation
+    exif.get_ifd(0x8769)[0x8827] = 400
+    exif.get_ifd(0x8769)[0x9003] = "2024:05:01 14:30:00"
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 120, 80)).save(buffer, "JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+@pytest.mark.unit
+class TestPhotoDerivatives:
+    """Tests for GET /api/v1/photos/{id}/image/{size}"""
+
+    @pytest.fixture
+    def shared_photo(self, db: Session, test_photo: Photo, test_gallery: Gallery) -> Photo:
+        """The test photo in a gallery shared with an access token."""
+        test_gallery.access_token = "share-token"
+        db.commit()
+        return test_photo
+
+    def test_renders_thumbnail_and_fills_metadata(
+        self,
+        client: TestClient,
+        db: Session,
+        shared_photo: Photo,
+        originals_dir,
+        derivative_pool
+    ):
+        """Test the first request renders from the original, later ones hit the disk cache"""
+        Image = pytest.importorskip("PIL.Image")
+        # Stored landscape, displayed portrait (rotated 90 degrees)
+        (originals_dir / shared_photo.google_drive_file_id).write_bytes(_jpeg(1200, 800, orientation=6))
+
+        response = client.get(f"/api/v1/photos/{shared_photo.id}/image/thumb?access_token=share-token")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/webp"
+        assert response.headers["cache-control"] == "private, max-age=86400"
+        assert Image.open(io.BytesIO(response.content)).size == (213, 320)
+
+        db.refresh(shared_photo)
+        assert (shared_photo.width, shared_photo.height) == (800, 1200)
+        assert shared_photo.photo_metadata["camera"] == "Canon EOS R5"
+        assert shared_photo.photo_metadata["iso"] == 400
+        assert shared_photo.photo_metadata["taken_at"] == "2024-05-01T14:30:00"
+        assert len(shared_photo.photo_metadata["original"]["sha256"]) == 64
+
+        # Every size was rendered from the one fetch; the original is no longer needed
+        (originals_dir / shared_photo.google_drive_file_id).unlink()
+        response = client.get(
+            f"/api/v1/photos/{shared_photo.id}/image/large?access_token=share-token&format=jpeg"
+        )
+        assert response.status_code == 404
+        response = client.get(f"/api/v1/photos/{shared_photo.id}/image/medium?access_token=share-token")
+        assert response.status_code == 200
+        assert Image.open(io.BytesIO(response.content)).size == (800, 1200)
+        assert derivative_pool.cache.stats()["files"] == 4
+
+    def test_etag_and_range(self, client: TestClient, shared_photo: Photo, originals_dir):
+        """Test revalidation with If-None-Match and partial content"""
+        (originals_dir / shared_photo.google_drive_file_id).write_bytes(_jpeg(640, 480))
+        url = f"/api/v1/photos/{shared_photo.id}/image/small?access_token=share-token&format=jpeg"
+        response = client.get(url)
+        etag = response.headers["etag"]
+
+        assert response.headers["content-type"] == "image/jpeg"
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+        partial = client.get(url, headers={"Range": "bytes=0-9"})
+        assert partial.status_code == 206
+        assert partial.content == response.content[:10]
+        assert partial.headers["content-range"] == f"bytes 0-9/{len(response.content)}"
+
+    def test_access_control(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        shared_photo: Photo,
+        originals_dir
+    ):
+        """Test images need the gallery access token or a logged-in user"""
+        (originals_dir / shared_photo.google_drive_file_id).write_bytes(_jpeg(100, 100))
+        url = f"/api/v1/photos/{shared_photo.id}/image/thumb"
+
+        assert client.get(url).status_code == 403
+        assert client.get(f"{url}?access_token=wrong").status_code == 403
+        assert client.get(url, headers=auth_headers).status_code == 200
+        assert client.get(f"/api/v1/photos/{uuid4()}/image/thumb", headers=auth_headers).status_code == 404
+        assert client.get(f"{url}?format=gif", headers=auth_headers).status_code == 422
+
+    def test_bad_access_token_falls_back_to_bearer(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        shared_photo: Photo,
+        originals_dir
+    ):
+        """Test a wrong access token does not fail a request with a valid bearer, nor the other way round"""
+        (originals_dir / shared_photo.google_drive_file_id).write_bytes(_jpeg(100, 100))
+        url = f"/api/v1/photos/{shared_photo.id}/image/thumb"
+
+        assert client.get(f"{url}?access_token=wrong", headers=auth_headers).status_code == 200
+        bad_bearer = {"Authorization": "Bearer not-a-token"}
+        assert client.get(f"{url}?access_token=share-token", headers=bad_bearer).status_code == 200
+        assert client.get(f"{url}?access_token=wrong", headers=bad_bearer).status_code == 401
+
+    def test_unreadable_original(self, client: TestClient, auth_headers: dict, shared_photo: Photo, originals_dir):
+        """Test a missing original is 404 and a corrupt one 422"""
+        url = f"/api/v1/photos/{shared_photo.id}/image/thumb"
+        assert client.get(url, headers=auth_headers).status_code == 404
+
+        (originals_dir / shared_photo.google_drive_file_id).write_bytes(b"not an image")
+        pytest.importorskip("PIL")
+        assert client.get(url, headers=auth_headers).status_code == 422
+
+    def test_falls_back_to_drive_thumbnail_without_pillow(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        shared_photo: Photo,
+        originals_dir,
+        monkeypatch
+    ):
+        """Test the Drive thumbnail is used when derivatives cannot be rendered"""
+        from app.services import derivatives
+
+        def unavailable(data, image_format):
+            raise derivatives.DerivativesUnavailable("Pillow is not installed")
+
+        monkeypatch.setattr(derivatives, "render_derivatives", unavailable)
+        (originals_dir / shared_photo.google_drive_file_id).write_bytes(b"original")
+
+        response = client.get(
+            f"/api/v1/photos/{shared_photo.id}/image/thumb",
+            headers=auth_headers,
+            follow_redirects=False
+        )
+
+        assert response.status_code == 307
+        assert response.headers["location"] == shared_photo.google_drive_thumbnail_link
+
+    def test_concurrent_requests_share_one_render(self, db: Session, test_photo: Photo, tmp_path):
+        """Test the pool renders a photo once however many requests wait for it"""
+        import threading
+
+        from app.core.derivative_cache import DerivativeCache
+        from app.services.derivatives import DerivativePool
+        from app.services.image_source import ImageSource
+
+        pytest.importorskip("PIL")
+        release = threading.Event()
+        fetches = []
+
+        class SlowSource(ImageSource):
+            def fetch(self, photo):
+                fetches.append(photo.id)
+                release.wait(5)
+                return _jpeg(400, 300)
+
+        pool = DerivativePool(
+            session_factory=sessionmaker(bind=db.get_bind()),
+            source_factory=lambda session: SlowSource(),
+            cache=DerivativeCache(str(tmp_path / "cache"), max_bytes=10 * 1024 ** 2),
+            max_workers=2
+        )
+        try:
+            futures = [pool.submit(test_photo.id, "webp") for _ in range(5)]
+            release.set()
+            digests = {future.result(timeout=10) for future in futures}
+        finally:
+            pool.shutdown()
+
+        assert len(digests) == 1
+        assert len(fetches) == 1
+
+
+@pytest.mark.unit
+class TestDerivativeCache:
+    """Tests for the content-addressed derivative cache"""
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test the cache stays under its size limit, evicting the oldest use first"""
+        from app.core.derivative_cache import DerivativeCache, derivative_key
+
+        cache = DerivativeCache(str(tmp_path), max_bytes=250)
+        keys = [derivative_key("original", size, "webp") for size in ("a", "b", "c")]
+        cache.put(keys[0], "webp", b"0" * 100)
+        cache.put(keys[1], "webp", b"1" * 100)
+        assert cache.get(keys[0], "webp") is not None  # now the most recent
+        cache.put(keys[2], "webp", b"2" * 100)
+
+        assert cache.get(keys[1], "webp") is None
+        assert cache.get(keys[0], "webp").read_bytes() == b"0" * 100
+        assert cache.stats()["bytes"] == 200
+        assert cache.stats()["evictions"] == 1
+        assert cache.path_for(keys[2], "webp").parent.name == keys[2][:2]
+
+        # A new instance indexes what is on disk
+        reloaded = DerivativeCache(str(tmp_path), max_bytes=250)
+        assert reloaded.stats()["files"] == 2
+        assert reloaded.get(keys[2], "webp").read_bytes() == b"2" * 100
@@ -0,0 +1,182 @@
+"""
+Unit tests for full-text search.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.search import search_terms
+from app.models.approval import Approval
+from app.models.client import Client
+from app.models.gallery import Gallery
+
+
+@pytest.mark.unit
+class TestSearch:
+    """Tests for the search endpoint and the search indexes"""
+
+    def test_search_terms(self):
+        """Test input is split into lowercase word terms"""
+        assert search_terms("John@Example.com") == ["john", "example", "com"]
+        assert search_terms("  São Paulo! ") == ["são", "paulo"]
+        assert search_terms("?!") == []
+
+    def test_search_mixed_results(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery,
+        test_client_model: Client
+    ):
+        """Test one query returns galleries, clients and approvals"""
+        db.add(Approval(
+            gallery_id=test_gallery.id,
+            gallery_name=test_gallery.title,
+            client_id=test_client_model.id,
+            client_name=test_client_model.name
+        ))
+        db.commit()
+
+        response = client.get("/api/v1/search?q=john", headers=auth_headers)
+
+        assert response.status_code == 200
+        results = response.json()["data"]
+        assert {result["type"] for result in results} == {"client", "approval"}
+        client_hit = next(result for result in results if result["type"] == "client")
+        assert client_hit["id"] == str(test_client_model.id)
+        assert client_hit["subtitle"] == "john@example.com"
+
+        response = client.get("/api/v1/search?q=wedd&type=gallery", headers=auth_headers)
+        results = response.json()["data"]
+        assert [(r["type"], r["id"], r["subtitle"]) for r in results] == [
+            ("gallery", str(test_gallery.id), "John Doe")
+        ]
+
+    def test_search_prefixes_and_accents(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_client_model: Client
+    ):
+        """Test terms match word prefixes, ignoring accents, all terms required"""
+        db.add(Gallery(title="Casamento João e Maria", location="Florianópolis", client_id=test_client_model.id))
+        db.commit()
+
+        def titles(q: str) -> list:
+            response = client.get("/api/v1/search", params={"q": q, "type": "gallery"}, headers=auth_headers)
+            return [result["title"] for result in response.json()["data"]]
+
+        assert titles("joao floria") == ["Casamento João e Maria"]
+        assert titles("CASAM") == ["Casamento João e Maria"]
+        assert titles("casamento pedro") == []
+        assert titles("amento") == []
+
+    def test_search_ranks_better_matches_first(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_client_model: Client
+    ):
+        """Test results are ordered by score"""
+        db.add_all([
+            Gallery(title="Ensaio", description="Ensaio de família no parque", client_id=test_client_model.id),
+            Gallery(title="Ensaio ensaio", description="Ensaio", client_id=test_client_model.id),
+        ])
+        db.commit()
+
+        response = client.get("/api/v1/search?q=ensaio", headers=auth_headers)
+
+        results = response.json()["data"]
+        assert [result["title"] for result in results] == ["Ensaio ensaio", "Ensaio"]
+        assert results[0]["score"] > results[1]["score"]
+
+    def test_search_index_follows_writes(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery
+    ):
+        """Test updated and deleted rows are reindexed"""
+        test_gallery.title = "Batizado"
+        db.commit()
+
+        def hits(q: str) -> int:
+            return len(client.get(f"/api/v1/search?q={q}", headers=auth_headers).json()["data"])
+
+        assert hits("wedding") == 1  # still in the description
+        assert hits("test") == 0
+        assert hits("batizado") == 1
+
+        db.delete(test_gallery)
+        db.commit()
+        assert hits("batizado") == 0
+
+    def test_search_survives_renumbered_rowids(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery
+    ):
+        """Test matches are mapped back by primary key, not by rowid (which VACUUM may renumber)"""
+        other = Gallery(title="Batizado", client_id=test_gallery.client_id)
+        db.add(other)
+        db.commit()
+        # Swap the two rows' rowids, as a VACUUM is free to renumber them
+        first, second = db.execute(text("SELECT rowid FROM galleries ORDER BY rowid")).scalars()
+        db.execute(text("UPDATE galleries SET rowid = -rowid"))
+        db.execute(text("UPDATE galleries SET rowid = :total + rowid"), {"total": first + second})
+        db.commit()
+
+        for q, expected in (("wedding", test_gallery), ("batizado", other)):
+            response = client.get(f"/api/v1/search?q={q}&type=gallery", headers=auth_headers)
+            assert [result["id"] for result in response.json()["data"]] == [str(expected.id)]
+            response = client.get(f"/api/v1/galleries?search={q}", headers=auth_headers)
+            assert [gallery["id"] for gallery in response.json()["data"]] == [str(expected.id)]
+
+    def test_index_writes_look_rows_up_by_key(self, db: Session, test_gallery: Gallery):
+        """Test the triggers find a row's FTS entry through the keys index, not by a scan"""
+        key = db.execute(
+            text("SELECT key FROM galleries_fts_keys WHERE id = (SELECT id FROM galleries)")
+        ).scalar_one()
+        assert db.execute(
+            text("SELECT title FROM galleries_fts WHERE rowid = :key"), {"key": key}
+        ).scalar_one() == test_gallery.title
+
+        plan = db.execute(
+            text("EXPLAIN QUERY PLAN SELECT key FROM galleries_fts_keys WHERE id = :id"), {"id": "x"}
+        ).all()
+        assert [row[-1] for row in plan if row[-1].startswith("SEARCH galleries_fts_keys")]
+
+        db.delete(test_gallery)
+        db.commit()
+        assert db.execute(text("SELECT count(*) FROM galleries_fts")).scalar_one() == 0
+        assert db.execute(text("SELECT count(*) FROM galleries_fts_keys")).scalar_one() == 0
+
+    def test_list_galleries_search_by_client(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_gallery: Gallery
+    ):
+        """Test the gallery listing matches on the gallery or its client"""
+        other = Client(name="Ana Lima", email="ana@example.com", hashed_password="x")
+        db.add(other)
+        db.flush()
+        db.add(Gallery(title="Aniversário", client_id=other.id))
+        db.commit()
+
+        response = client.get("/api/v1/galleries?search=doe", headers=auth_headers)
+
+        assert [gallery["id"] for gallery in response.json()["data"]] == [str(test_gallery.id)]
+        assert response.json()["meta"]["total"] == 1
+
+    def test_search_requires_auth(self, client: TestClient):
+        """Test searching without authentication"""
+        assert client.get("/api/v1/search?q=john").status_code == 401